@@ -5,40 +5,133 @@
 بما في ذلك معالجات التحديثات والأخطاء والمحادثات.
 """
 
+import asyncio
 import logging
-import sys
-from typing import Optional
+from typing import List, Optional
 from telegram import Update
+from telegram.request import BaseRequest
 from telegram.ext import (
-    Application, CommandHandler, CallbackQueryHandler, MessageHandler,
-    filters, ConversationHandler, ContextTypes
+    Application, CommandHandler, MessageHandler,
+    TypeHandler, filters, ConversationHandler, ContextTypes
 )
 
 # --- استيراد الإعدادات والمعالجات ---
-from src.core.config import BOT_TOKEN, logger as config_logger, DEBUG_MODE, ADMIN_IDS
-from src.database import init_db
+from src.core.config import (
+    BOT_TOKEN, BOT_API_URL, logger as config_logger, DEBUG_MODE, ADMIN_IDS, METRICS_FLUSH_INTERVAL,
+    METRICS_HOST, METRICS_PORT, DB_PROFILING, LOOP_LAG_THRESHOLD_MS,
+    TRACE_FILE, TRACE_SAMPLE_RATE, TRACE_SLOW_MS,
+    RECORD_UPDATES_FILE, RECORD_SAMPLE_RATE, RECORD_SALT, MAX_CONCURRENT_UPDATES,
+    MAX_PENDING_UPDATES, MAX_PENDING_UPDATES_PER_USER, RATE_LIMITS, CALLBACK_DEDUP_TTL,
+    UPDATE_MODE, WEBHOOK_LISTEN, WEBHOOK_PORT, WEBHOOK_PATH, WEBHOOK_SECRET_TOKEN, WEBHOOK_URL
+)
+from src.database import init_db, query_profiler
 from src.bot.handlers import (
-    start, button_callback_handler, admin_panel, admin_callback_handler,
+    start, admin_panel, callback_router,
+    retention_report_command, performance_report_command, db_profile_command,
+    profile_command,
     find_user_by_id_handler, find_user_by_username_handler,
     broadcast_message_handler, add_points_handler, cancel_handler,
-    show_store_menu, claim_reward_handler, admin_manage_rewards,
-    show_notifications_menu, notifications_callback_handler,
-    toggle_notification_type,
     ASK_FOR_USER_ID, ASK_FOR_USERNAME, ASK_FOR_BROADCAST_MESSAGE, ASK_FOR_POINTS
 )
 from src.utils.exceptions import DragonBotException, ConfigurationError
-
-# --- إعداد تسجيل الأنشطة ---
-logging.basicConfig(
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    level=logging.INFO,
-    handlers=[
-        logging.FileHandler("bot.log", encoding="utf-8"),
-        logging.StreamHandler(sys.stdout)
-    ]
+from src.utils import (
+    advanced_stats_manager, metrics_store, activity_tracker, activity_bitmaps,
+    metrics_registry, MetricsServer
+)
+from src.bot.middleware import (
+    track_user_activity, count_update, load_user_context,
+    ACTIVITY_GROUP, METRICS_GROUP, USER_GROUP
 )
+from src.bot.instrumentation import InstrumentedRequest, instrument_application
+from src.bot.application import DragonApplication
+from src.bot.loop_monitor import loop_monitor
+from src.bot.recorder import update_recorder, RECORD_GROUP
+from src.bot.rate_limit import rate_limiter, THROTTLE_GROUP
+from src.bot.admission import admission_controller
+from src.bot.update_processor import PerUserUpdateProcessor
+from src.bot.webhook import run_webhook
+from src.bot.update_types import update_type_filter, handled_update_types, FILTER_GROUP
+from src.utils.tracing import tracer
+
 logger: logging.Logger = logging.getLogger(__name__)
 
+# المهام الخلفية التي تعمل طوال عمر التطبيق
+_background_tasks: List[asyncio.Task] = []
+
+# خادم مقاييس Prometheus (عند تفعيله عبر METRICS_PORT)
+_metrics_server: Optional[MetricsServer] = None
+
+
+async def post_init(application: Application) -> None:
+    """
+    تشغيل المهام الخلفية بعد تهيئة التطبيق.
+
+    Args:
+        application (Application): تطبيق البوت
+
+    Returns:
+        None
+    """
+    global _metrics_server
+
+    _background_tasks.append(
+        asyncio.create_task(metrics_store.run_periodic_flush(METRICS_FLUSH_INTERVAL))
+    )
+    _background_tasks.append(
+        asyncio.create_task(activity_tracker.run_periodic_flush(METRICS_FLUSH_INTERVAL))
+    )
+    _background_tasks.append(
+        asyncio.create_task(activity_bitmaps.run_periodic_flush(METRICS_FLUSH_INTERVAL))
+    )
+
+    metrics_registry.gauge(
+        "dragon_update_queue_depth", "عدد التحديثات المنتظرة في طابور التطبيق"
+    ).set_function(application.update_queue.qsize)
+
+    if LOOP_LAG_THRESHOLD_MS:
+        loop_monitor.start()
+
+    if METRICS_PORT:
+        _metrics_server = MetricsServer(METRICS_HOST, METRICS_PORT)
+        try:
+            await _metrics_server.start()
+        except OSError as e:
+            logger.error(f"فشل تشغيل خادم المقاييس: {e}")
+            _metrics_server = None
+
+
+async def post_shutdown(application: Application) -> None:
+    """
+    إيقاف المهام الخلفية وحفظ المقاييس قبل الإغلاق.
+
+    Args:
+        application (Application): تطبيق البوت
+
+    Returns:
+        None
+    """
+    global _metrics_server
+
+    for task in _background_tasks:
+        task.cancel()
+    _background_tasks.clear()
+    loop_monitor.stop()
+
+    if _metrics_server is not None:
+        await _metrics_server.stop()
+        _metrics_server = None
+
+    # كل مخزن يُحفظ على حدة حتى لا يمنع فشل أحدها حفظ البقية
+    for name, flush in (
+        ("المقاييس الزمنية", metrics_store.flush),
+        ("رسومات النشطين", activity_tracker.flush),
+        ("خرائط النشاط", activity_bitmaps.flush),
+    ):
+        try:
+            flush()
+        except DragonBotException as e:
+            logger.error(f"فشل حفظ {name} عند الإغلاق: {e.message}")
+
 
 async def error_handler(update: object, context: ContextTypes.DEFAULT_TYPE) -> None:
     """
@@ -58,6 +151,7 @@ async def error_handler(update: object, context: ContextTypes.DEFAULT_TYPE) -> N
         f"❌ حدث استثناء أثناء معالجة التحديث: {update}",
         exc_info=context.error
     )
+    advanced_stats_manager.record_error(type(context.error).__name__)
 
     # محاولة إرسال رسالة للمستخدم إذا كان ممكنًا
     if isinstance(update, Update) and update.effective_message:
@@ -88,6 +182,128 @@ async def error_handler(update: object, context: ContextTypes.DEFAULT_TYPE) -> N
                 logger.error(f"فشل إرسال إشعار الخطأ للمسؤول: {e}")
 
 
+def build_application(
+    token: str,
+    request: Optional[BaseRequest] = None,
+    get_updates_request: Optional[BaseRequest] = None,
+    base_url: Optional[str] = None
+) -> Application:
+    """
+    إنشاء تطبيق البوت وتسجيل جميع المعالجات ومراحل المعالجة المسبقة.
+
+    يُستخدم في التشغيل الفعلي وفي أدوات إعادة التشغيل والاختبار
+    (مع طبقة طلبات وهمية بدلاً من Telegram).
+
+    Args:
+        token (str): رمز البوت
+        request (Optional[BaseRequest]): طبقة طلبات Bot API (افتراضي: InstrumentedRequest)
+        get_updates_request (Optional[BaseRequest]): طبقة طلبات getUpdates
+        base_url (Optional[str]): عنوان Bot API الأساسي (افتراضي: BOT_API_URL أو Telegram)
+
+    Returns:
+        Application: التطبيق الجاهز للتشغيل
+    """
+    admission_controller.configure(MAX_CONCURRENT_UPDATES, MAX_PENDING_UPDATES)
+    callback_router.deduplicator.configure(CALLBACK_DEDUP_TTL)
+    builder = (
+        Application.builder()
+        .application_class(DragonApplication)
+        .token(token)
+        .request(request or InstrumentedRequest(connection_pool_size=256))
+        .concurrent_updates(PerUserUpdateProcessor(
+            MAX_CONCURRENT_UPDATES, admission_controller, MAX_PENDING_UPDATES_PER_USER
+        ))
+        .post_init(post_init)
+        .post_shutdown(post_shutdown)
+    )
+    if get_updates_request is not None:
+        builder = builder.get_updates_request(get_updates_request)
+    if base_url or BOT_API_URL:
+        builder = builder.base_url(base_url or BOT_API_URL)
+    application = builder.build()
+
+    # --- محادثة المدير (للبحث عن مستخدم، الإذاعة، إلخ) ---
+    # نقاط الدخول تمر بنفس موجّه الأزرار (مع فحص صلاحية المدير)،
+    # وتُسجَّل المحادثة قبل معالج الأزرار العام حتى لا يلتقطها
+    admin_conv_handler = ConversationHandler(
+        entry_points=[
+            callback_router.handler(
+                pattern=callback_router.pattern_for(
+                    "admin_find_user_by_id", "admin_find_user_by_username",
+                    "admin_broadcast", "add_points"
+                )
+            )
+        ],
+        states={
+            ASK_FOR_USER_ID: [
+                MessageHandler(
+                    filters.TEXT & ~filters.COMMAND,
+                    find_user_by_id_handler
+                )
+            ],
+            ASK_FOR_USERNAME: [
+                MessageHandler(
+                    filters.TEXT & ~filters.COMMAND,
+                    find_user_by_username_handler
+                )
+            ],
+            ASK_FOR_BROADCAST_MESSAGE: [
+                MessageHandler(
+                    filters.TEXT & ~filters.COMMAND,
+                    broadcast_message_handler
+                )
+            ],
+            ASK_FOR_POINTS: [
+                MessageHandler(
+                    filters.TEXT & ~filters.COMMAND,
+                    add_points_handler
+                )
+            ],
+        },
+        fallbacks=[
+            CommandHandler('cancel', cancel_handler),
+            callback_router.handler(pattern=callback_router.pattern_for("admin_panel"))
+        ],
+        allow_reentry=True,
+        per_message=False
+    )
+
+    logger.info("📝 إضافة معالجات التحديثات...")
+
+    # --- مراحل المعالجة المسبقة (تعمل على كل تحديث) ---
+    if update_recorder.enabled:
+        application.add_handler(TypeHandler(Update, update_recorder.record), group=RECORD_GROUP)
+    application.add_handler(TypeHandler(Update, count_update), group=METRICS_GROUP)
+    application.add_handler(TypeHandler(Update, track_user_activity), group=ACTIVITY_GROUP)
+    if rate_limiter.enabled:
+        application.add_handler(TypeHandler(Update, rate_limiter.throttle), group=THROTTLE_GROUP)
+    application.add_handler(TypeHandler(Update, load_user_context), group=USER_GROUP)
+
+    # --- إضافة المعالجات الأساسية ---
+    application.add_handler(CommandHandler("start", start))
+    application.add_handler(CommandHandler("admin", admin_panel))
+    application.add_handler(CommandHandler("retention", retention_report_command))
+    application.add_handler(CommandHandler("perf", performance_report_command))
+    application.add_handler(CommandHandler("dbprofile", db_profile_command))
+    application.add_handler(CommandHandler("profile", profile_command))
+
+    # محادثة المدير أولاً، ثم جميع الأزرار الأخرى عبر جدول التوجيه
+    application.add_handler(admin_conv_handler)
+    application.add_handler(callback_router.handler())
+
+    # طلب أنواع التحديثات المعالجة فقط، ورفض غيرها قبل أي مرحلة أخرى
+    update_type_filter.configure(handled_update_types(application))
+    application.add_handler(TypeHandler(Update, update_type_filter.filter), group=FILTER_GROUP)
+
+    # إضافة معالج الأخطاء العالمي
+    application.add_error_handler(error_handler)
+
+    # قياس زمن جميع المعالجات (بعد تسجيلها)
+    instrument_application(application)
+
+    return application
+
+
 def main() -> None:
     """
     الدالة الرئيسية لتشغيل البوت.
@@ -96,7 +312,7 @@ def main() -> None:
     1. تهيئة قاعدة البيانات
     2. إنشاء تطبيق البوت
     3. إضافة معالجات التحديثات
-    4. بدء البوت في وضع polling
+    4. بدء البوت في وضع polling أو webhook (حسب UPDATE_MODE)
 
     Returns:
         None
@@ -122,7 +338,15 @@ def main() -> None:
 
     # --- تهيئة قاعدة البيانات ---
     try:
+        if DB_PROFILING:
+            query_profiler.enable()
+        tracer.configure(TRACE_FILE, TRACE_SAMPLE_RATE, TRACE_SLOW_MS)
+        update_recorder.configure(RECORD_UPDATES_FILE, RECORD_SAMPLE_RATE, RECORD_SALT)
+        rate_limiter.configure(RATE_LIMITS)
         init_db()
+        metrics_store.load()
+        activity_tracker.load()
+        activity_bitmaps.load()
         logger.info("✅ تم تهيئة قاعدة البيانات بنجاح")
     except Exception as e:
         logger.critical(f"❌ فشل تهيئة قاعدة البيانات: {e}", exc_info=True)
@@ -130,113 +354,8 @@ def main() -> None:
 
     try:
         # --- إنشاء كائن التطبيق ---
-        logger.info(f"🔧 إنشاء تطبيق البوت...")
-        application = Application.builder().token(BOT_TOKEN).build()
-        logger.info("✅ تم إنشاء التطبيق بنجاح")
-
-        # --- محادثة المدير (للبحث عن مستخدم، الإذاعة، إلخ) ---
-        admin_conv_handler = ConversationHandler(
-            entry_points=[
-                CallbackQueryHandler(
-                    admin_callback_handler,
-                    pattern=r'^(admin_find_user_by_id|admin_find_user_by_username|admin_broadcast|admin_add_points_)'
-                )
-            ],
-            states={
-                ASK_FOR_USER_ID: [
-                    MessageHandler(
-                        filters.TEXT & ~filters.COMMAND,
-                        find_user_by_id_handler
-                    )
-                ],
-                ASK_FOR_USERNAME: [
-                    MessageHandler(
-                        filters.TEXT & ~filters.COMMAND,
-                        find_user_by_username_handler
-                    )
-                ],
-                ASK_FOR_BROADCAST_MESSAGE: [
-                    MessageHandler(
-                        filters.TEXT & ~filters.COMMAND,
-                        broadcast_message_handler
-                    )
-                ],
-                ASK_FOR_POINTS: [
-                    MessageHandler(
-                        filters.TEXT & ~filters.COMMAND,
-                        add_points_handler
-                    )
-                ],
-            },
-            fallbacks=[
-                CommandHandler('cancel', cancel_handler),
-                CallbackQueryHandler(admin_callback_handler, pattern='^admin_panel$')
-            ],
-            per_message=False
-        )
-
-        logger.info("📝 إضافة معالجات التحديثات...")
-
-        # --- إضافة المعالجات الأساسية ---
-        application.add_handler(CommandHandler("start", start))
-        application.add_handler(CommandHandler("admin", admin_panel))
-
-        # معالج أزرار المستخدم العادي
-        application.add_handler(
-            CallbackQueryHandler(
-                button_callback_handler,
-                pattern=r'^(user_|main_menu|about_|store)'
-            )
-        )
-
-        # معالج أزرار المدير (خارج المحادثة)
-        application.add_handler(
-            CallbackQueryHandler(
-                admin_callback_handler,
-                pattern=r'^(admin_|top_|manage_)'
-            )
-        )
-        
-        # معالج الإشعارات
-        application.add_handler(
-            CallbackQueryHandler(
-                notifications_callback_handler,
-                pattern=r'^(notifications_|show_notifications_menu)'
-            )
-        )
-        
-        # معالج تبديل تفضيلات الإشعارات
-        application.add_handler(
-            CallbackQueryHandler(
-                toggle_notification_type,
-                pattern=r'^toggle_notif_'
-            )
-        )
-        
-        # معالج المكافآت
-        async def reward_callback_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-            """معالج استعلامات المكافآت."""
-            reward_id_str = update.callback_query.data.split('_')[-1]
-            try:
-                reward_id = int(reward_id_str)
-                await claim_reward_handler(update, context, reward_id)
-            except (ValueError, IndexError):
-                logger.warning(f"معرّف مكافأة غير صحيح: {reward_id_str}")
-                await update.callback_query.answer("❌ خطأ في المكافأة", show_alert=True)
-        
-        application.add_handler(
-            CallbackQueryHandler(
-                reward_callback_handler,
-                pattern=r'^claim_reward_\d+$'
-            )
-        )
-
-        # إضافة محادثة المدير
-        application.add_handler(admin_conv_handler)
-
-        # إضافة معالج الأخطاء العالمي
-        application.add_error_handler(error_handler)
-
+        logger.info("🔧 إنشاء تطبيق البوت...")
+        application = build_application(BOT_TOKEN)
         logger.info("✅ تم إضافة جميع المعالجات")
 
         # --- عرض معلومات البدء ---
@@ -248,11 +367,20 @@ def main() -> None:
         logger.info("=" * 50)
 
         # --- بدء البوت ---
-        logger.info("🚀 بدء البوت بنمط polling...")
-        application.run_polling(
-            allowed_updates=Update.ALL_TYPES,
-            drop_pending_updates=True
-        )
+        # التحديثات المعلقة أثناء إعادة التشغيل تُعالج ولا تُحذف
+        if UPDATE_MODE == "webhook":
+            logger.info("🚀 بدء البوت بنمط webhook...")
+            asyncio.run(run_webhook(
+                application, WEBHOOK_LISTEN, WEBHOOK_PORT, WEBHOOK_PATH,
+                WEBHOOK_SECRET_TOKEN, WEBHOOK_URL,
+                allowed_updates=update_type_filter.allowed_updates
+            ))
+        else:
+            logger.info("🚀 بدء البوت بنمط polling...")
+            application.run_polling(
+                allowed_updates=update_type_filter.allowed_updates,
+                drop_pending_updates=False
+            )
 
     except KeyboardInterrupt:
         logger.info("⏹️ تم إيقاف البوت من قبل المستخدم")
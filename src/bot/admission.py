@@ -0,0 +1,253 @@
+"""
+التحكم في قبول التحديثات تحت الحمل مع أولويات وطابور انتظار محدود.
+
+عند انشغال جميع مقاعد المعالجة تنتظر التحديثات في طابور أولويات:
+أوامر المسؤولين أولاً، ثم الأزرار، ثم /start، ثم بقية الرسائل. الطابور
+محدود بـ MAX_PENDING_UPDATES؛ عند امتلائه يُسقط أقل التحديثات أولوية
+(الجديد أو أحدث المنتظرين) بدلاً من أن يتراكم تأخير الجميع. تحديثات
+المسؤولين لا تُسقط أبداً.
+
+الأعمال الثانوية (مثل إشعار المسؤول بمستخدم جديد) تُنفذ فوراً عند الهدوء،
+وتُؤجل تحت الحمل إلى أن يفرغ الطابور.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+from collections import deque
+from contextlib import asynccontextmanager
+from enum import IntEnum
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, List, Optional, Tuple
+
+from telegram import Update
+
+from src.utils.helpers import is_admin
+from src.utils.metrics import metrics_registry
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+_MAX_DEFERRED: int = 1000
+"""الحد الأقصى للأعمال المؤجلة (يُسقط أقدمها عند تجاوزه)"""
+
+
+class Priority(IntEnum):
+    """فئات أولوية التحديثات (الأصغر أولاً)."""
+
+    ADMIN = 0
+    CALLBACK = 1
+    START = 2
+    OTHER = 3
+
+
+PENDING_UPDATES = metrics_registry.gauge(
+    "dragon_pending_updates", "عدد التحديثات المنتظرة دوراً في المعالجة", ("priority",)
+)
+SHED_UPDATES = metrics_registry.counter(
+    "dragon_shed_updates", "عدد التحديثات المُسقطة بسبب امتلاء طابور الانتظار", ("priority",)
+)
+SHED_JOBS = metrics_registry.counter(
+    "dragon_shed_jobs", "عدد الأعمال المؤجلة المُسقطة", ("job",)
+)
+
+
+class UpdateShed(Exception):
+    """
+    استثناء يُرفع عند إسقاط تحديث لامتلاء طابور الانتظار.
+    """
+
+    def __init__(self, priority: Priority):
+        """
+        Args:
+            priority (Priority): أولوية التحديث المُسقط
+        """
+        super().__init__(f"تم إسقاط تحديث بأولوية {priority.name}")
+        self.priority = priority
+
+
+def update_priority(update: object) -> Priority:
+    """
+    أولوية التحديث.
+
+    Args:
+        update (object): التحديث
+
+    Returns:
+        Priority: فئة الأولوية
+    """
+    if not isinstance(update, Update):
+        return Priority.OTHER
+    user = update.effective_user
+    if user and is_admin(user.id):
+        return Priority.ADMIN
+    if update.callback_query:
+        return Priority.CALLBACK
+    message = update.message
+    if message and message.text and message.text.split(maxsplit=1)[0].split("@", 1)[0] == "/start":
+        return Priority.START
+    return Priority.OTHER
+
+
+class AdmissionController:
+    """
+    مقاعد معالجة محدودة مع طابور انتظار أولويات محدود وأعمال مؤجلة.
+    """
+
+    def __init__(self, max_active: int = 64, max_pending: int = 256):
+        """
+        تهيئة المتحكم.
+
+        Args:
+            max_active (int): عدد التحديثات المعالجة بالتوازي
+            max_pending (int): الحد الأقصى للتحديثات المنتظرة
+        """
+        self.max_active = max_active
+        self.max_pending = max_pending
+        self._active = 0
+        self._pending = 0
+        self._sequence = itertools.count()
+        # (الأولوية، رقم الوصول، المستقبل)؛ المستقبلات المنتهية تُحذف عند إخراجها
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._deferred: Deque[Tuple[str, Callable[[], Awaitable[Any]]]] = deque()
+        self._drain_task: Optional[asyncio.Task] = None
+        metrics_registry.gauge(
+            "dragon_deferred_jobs", "عدد الأعمال المؤجلة إلى انخفاض الحمل"
+        ).set_function(lambda: len(self._deferred))
+
+    def configure(self, max_active: int, max_pending: int) -> None:
+        """
+        ضبط الحدود (يُستدعى عند إنشاء التطبيق).
+
+        Args:
+            max_active (int): عدد التحديثات المعالجة بالتوازي
+            max_pending (int): الحد الأقصى للتحديثات المنتظرة
+        """
+        self.max_active = max_active
+        self.max_pending = max_pending
+
+    @property
+    def pending(self) -> int:
+        """عدد التحديثات المنتظرة."""
+        return self._pending
+
+    @property
+    def overloaded(self) -> bool:
+        """هل جميع المقاعد مشغولة؟"""
+        return self._pending > 0 or self._active >= self.max_active
+
+    @asynccontextmanager
+    async def admit(self, priority: Priority) -> AsyncIterator[None]:
+        """
+        انتظار مقعد معالجة حسب الأولوية وتحريره عند الخروج.
+
+        Args:
+            priority (Priority): أولوية التحديث
+
+        Raises:
+            UpdateShed: إذا أُسقط التحديث لامتلاء الطابور
+        """
+        await self._acquire(priority)
+        try:
+            yield
+        finally:
+            self._release()
+
+    async def _acquire(self, priority: Priority) -> None:
+        """الحصول على مقعد، أو الانتظار في الطابور، أو الإسقاط."""
+        if self._active < self.max_active and not self._pending:
+            self._active += 1
+            return
+
+        if self._pending >= self.max_pending and priority != Priority.ADMIN:
+            victim = max(
+                (waiter for waiter in self._waiters if not waiter[2].done()), default=None
+            )
+            if victim is None or victim[0] <= priority:
+                SHED_UPDATES.inc(priority.name.lower())
+                raise UpdateShed(priority)
+            self._dequeued(victim[0])
+            victim[2].set_exception(UpdateShed(Priority(victim[0])))
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), future))
+        self._pending += 1
+        PENDING_UPDATES.inc(priority.name.lower())
+        try:
+            await future
+        except UpdateShed:
+            SHED_UPDATES.inc(priority.name.lower())
+            raise
+        except asyncio.CancelledError:
+            if future.cancelled():
+                self._dequeued(priority)
+            elif future.exception() is None:
+                # سُلّم المقعد قبل الإلغاء مباشرة
+                self._release()
+            raise
+
+    def _dequeued(self, priority: int) -> None:
+        """احتساب خروج تحديث من الطابور."""
+        self._pending -= 1
+        PENDING_UPDATES.dec(Priority(priority).name.lower())
+
+    def _release(self) -> None:
+        """تسليم المقعد لأعلى المنتظرين أولوية، أو تحريره."""
+        while self._waiters:
+            priority, _, future = heapq.heappop(self._waiters)
+            if future.done():
+                continue
+            self._dequeued(priority)
+            future.set_result(None)
+            return
+        self._active -= 1
+        if self._deferred and not self.overloaded:
+            self._schedule_drain()
+
+    async def run_or_defer(self, job_name: str, job: Callable[[], Awaitable[Any]]) -> None:
+        """
+        تنفيذ عمل ثانوي فوراً، أو تأجيله إذا كانت جميع المقاعد مشغولة.
+
+        Args:
+            job_name (str): اسم العمل (للمقاييس والسجلات)
+            job (Callable[[], Awaitable[Any]]): دالة تعيد العمل المطلوب تنفيذه
+        """
+        if not self.overloaded and not self._deferred:
+            await job()
+            return
+        if len(self._deferred) >= _MAX_DEFERRED:
+            dropped_name, _ = self._deferred.popleft()
+            SHED_JOBS.inc(dropped_name)
+        self._deferred.append((job_name, job))
+
+    def _schedule_drain(self) -> None:
+        """بدء تنفيذ الأعمال المؤجلة إن لم يكن جارياً."""
+        if self._drain_task is None or self._drain_task.done():
+            self._drain_task = asyncio.get_running_loop().create_task(self._drain())
+
+    async def _drain(self) -> None:
+        """تنفيذ الأعمال المؤجلة ما دام الحمل منخفضاً."""
+        while self._deferred and not self.overloaded:
+            job_name, job = self._deferred.popleft()
+            try:
+                await job()
+            except Exception as e:
+                logger.error(f"خطأ في تنفيذ العمل المؤجل {job_name}: {e}", exc_info=True)
+
+    async def close(self) -> None:
+        """إيقاف تنفيذ الأعمال المؤجلة وإسقاط ما تبقى منها."""
+        if self._drain_task is not None and not self._drain_task.done():
+            self._drain_task.cancel()
+            try:
+                await self._drain_task
+            except asyncio.CancelledError:
+                pass
+        self._drain_task = None
+        if self._deferred:
+            logger.warning("⚠️ إسقاط %d عمل مؤجل عند الإيقاف", len(self._deferred))
+            for job_name, _ in self._deferred:
+                SHED_JOBS.inc(job_name)
+            self._deferred.clear()
+
+
+# إنشاء مثيل من المتحكم (يُضبط في build_application)
+admission_controller = AdmissionController()
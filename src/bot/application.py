@@ -0,0 +1,65 @@
+"""
+فئة التطبيق الخاصة بالبوت.
+
+توسّع Application من python-telegram-bot لإحاطة معالجة كل تحديث
+بسجل محاسبة العمليات (قاعدة البيانات وBot API) وفحص ميزانيتها،
+وبسياق تسجيل يحمل معرّف التحديث والمستخدم، وبتتبع للفترات الزمنية.
+"""
+
+import logging
+
+from telegram import Update
+from telegram.ext import Application
+
+from src.core.config import UPDATE_DB_BUDGET, UPDATE_API_BUDGET
+from src.core.logging_setup import bind_update_context
+from src.utils.metrics import metrics_registry
+from src.utils.round_trips import track_round_trips, check_budget
+from src.utils.tracing import tracer
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+UPDATE_DB_OPERATIONS = metrics_registry.histogram(
+    "dragon_update_db_operations", "عدد عمليات قاعدة البيانات لكل تحديث",
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21)
+)
+UPDATE_API_CALLS = metrics_registry.histogram(
+    "dragon_update_api_calls", "عدد استدعاءات Bot API لكل تحديث",
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21)
+)
+UPDATES_OVER_BUDGET = metrics_registry.counter(
+    "dragon_updates_over_budget", "عدد التحديثات التي تجاوزت ميزانية العمليات", ("handler",)
+)
+
+
+class DragonApplication(Application):
+    """
+    تطبيق يحاسب عمليات قاعدة البيانات واستدعاءات Bot API لكل تحديث
+    ويربط سجلات التحديث بمعرّفاته.
+    """
+
+    async def process_update(self, update: object) -> None:
+        """
+        معالجة تحديث داخل سجل محاسبة جديد ثم فحص الميزانية.
+
+        تحمل جميع السجلات أثناء المعالجة معرّف التحديث والمستخدم،
+        وتبدأ المعالجة تتبعاً جديداً عند تفعيل التتبع.
+
+        Args:
+            update (object): التحديث
+        """
+        if isinstance(update, Update):
+            user = update.effective_user
+            update_id, user_id = update.update_id, user.id if user else None
+        else:
+            update_id = user_id = None
+
+        with bind_update_context(update_id, user_id):
+            with track_round_trips() as trips, \
+                    tracer.start_trace("update", update_id=update_id, user_id=user_id):
+                await super().process_update(update)
+
+            UPDATE_DB_OPERATIONS.observe(trips.db)
+            UPDATE_API_CALLS.observe(trips.api)
+            if not check_budget(trips, UPDATE_DB_BUDGET, UPDATE_API_BUDGET):
+                UPDATES_OVER_BUDGET.inc(trips.handler)
@@ -0,0 +1,131 @@
+"""
+تجاهل استعلامات الأزرار المكررة (الضغط المزدوج وإعادة التسليم).
+
+يُسجَّل كل استعلام زر بمفتاحين: (المستخدم، معرّف الاستعلام) لالتقاط إعادة
+تسليم Telegram لنفس التحديث، و(المستخدم، بيانات الزر) لالتقاط الضغط
+المزدوج الذي ينتج استعلامين مختلفين بنفس البيانات. أثناء التنفيذ يحمل
+المفتاحان علامة "قيد التنفيذ"، وبعد النجاح يُتذكران لمدة قصيرة (TTL)؛
+أما الفشل فيحذفهما حتى يمكن إعادة المحاولة فوراً.
+"""
+
+import logging
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+from src.utils.metrics import metrics_registry
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+REDELIVERED: str = "redelivered"
+"""نفس الاستعلام أُعيد تسليمه (لا يُرد عليه مرة أخرى)"""
+
+IN_FLIGHT: str = "in_flight"
+"""استعلام بنفس البيانات ما زال قيد التنفيذ"""
+
+DONE: str = "done"
+"""استعلام بنفس البيانات نُفذ بنجاح قبل قليل"""
+
+_IN_FLIGHT_TIMEOUT: float = 60.0
+"""أقصى مدة لعلامة "قيد التنفيذ" (احتياطاً إذا لم تُستدعَ finish)"""
+
+_SWEEP_INTERVAL: float = 5.0
+"""أقل فاصل بين عمليات حذف المفاتيح المنتهية بالثواني"""
+
+_DedupKey = Tuple[int, str, str]
+
+
+class CallbackDeduplicator:
+    """
+    ذاكرة قصيرة الأمد لاستعلامات الأزرار المعالجة.
+    """
+
+    def __init__(self, ttl: float = 3.0, clock: Callable[[], float] = time.monotonic):
+        """
+        تهيئة الذاكرة.
+
+        Args:
+            ttl (float): مدة تذكر الاستعلام بعد نجاحه بالثواني (0 لتعطيل التجاهل)
+            clock (Callable[[], float]): مصدر الوقت (قابل للاستبدال في الاختبارات)
+        """
+        self.ttl = ttl
+        self._clock = clock
+        # المفتاح ← (الحالة، وقت الانتهاء)
+        self._entries: Dict[_DedupKey, Tuple[str, float]] = {}
+        self._next_sweep = 0.0
+        metrics_registry.gauge(
+            "dragon_callback_dedup_entries", "عدد مفاتيح استعلامات الأزرار المتذكرة"
+        ).set_function(lambda: len(self._entries))
+
+    def configure(self, ttl: float) -> None:
+        """
+        ضبط مدة التذكر وبدء ذاكرة فارغة (يُستدعى عند إنشاء التطبيق).
+
+        Args:
+            ttl (float): المدة بالثواني (0 لتعطيل التجاهل)
+        """
+        self.ttl = ttl
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _keys(user_id: int, query_id: str, data: str) -> Tuple[_DedupKey, _DedupKey]:
+        return (user_id, "id", query_id), (user_id, "data", data)
+
+    def begin(self, user_id: int, query_id: str, data: str) -> Optional[str]:
+        """
+        تسجيل بدء معالجة استعلام، أو إعادة سبب تكراره.
+
+        Args:
+            user_id (int): معرّف المستخدم
+            query_id (str): معرّف استعلام الزر
+            data (str): بيانات الزر
+
+        Returns:
+            Optional[str]: None إذا لم يكن مكرراً (ويُعلَّم قيد التنفيذ)،
+            وإلا REDELIVERED أو IN_FLIGHT أو DONE
+        """
+        if self.ttl <= 0:
+            return None
+        now = self._clock()
+        if now >= self._next_sweep:
+            self._sweep(now)
+
+        by_id, by_data = self._keys(user_id, query_id, data)
+        entry = self._entries.get(by_id)
+        if entry is not None and entry[1] > now:
+            return REDELIVERED
+        entry = self._entries.get(by_data)
+        if entry is not None and entry[1] > now:
+            return entry[0]
+
+        marker = (IN_FLIGHT, now + _IN_FLIGHT_TIMEOUT)
+        self._entries[by_id] = self._entries[by_data] = marker
+        return None
+
+    def finish(self, user_id: int, query_id: str, data: str, succeeded: bool) -> None:
+        """
+        تسجيل انتهاء معالجة استعلام.
+
+        Args:
+            user_id (int): معرّف المستخدم
+            query_id (str): معرّف استعلام الزر
+            data (str): بيانات الزر
+            succeeded (bool): هل نجحت المعالجة؟ (الفشل يسمح بإعادة المحاولة فوراً)
+        """
+        if self.ttl <= 0:
+            return
+        by_id, by_data = self._keys(user_id, query_id, data)
+        if succeeded:
+            self._entries[by_id] = self._entries[by_data] = (DONE, self._clock() + self.ttl)
+        else:
+            self._entries.pop(by_id, None)
+            self._entries.pop(by_data, None)
+
+    def _sweep(self, now: float) -> None:
+        """حذف المفاتيح المنتهية."""
+        self._next_sweep = now + _SWEEP_INTERVAL
+        expired = [key for key, entry in self._entries.items() if entry[1] <= now]
+        for key in expired:
+            del self._entries[key]
@@ -1,13 +1,17 @@
 """
 وحدة معالجات أوامر الـ Telegram.
 
-تحتوي على جميع معالجات الأوامر والاستعلامات.
+تحتوي على جميع معالجات الأوامر والاستعلامات. معالجات الأزرار تسجل
+مساراتها في callback_router عند استيراد وحداتها.
 """
 
+from src.bot.router import callback_router
+
 from .start import start
-from .user_handlers import button_callback_handler
+from .user_handlers import show_main_menu, show_user_points
 from .admin_handlers import (
-    admin_panel, admin_callback_handler, find_user_by_id_handler,
+    admin_panel, show_admin_panel, retention_report_command, performance_report_command,
+    db_profile_command, profile_command, find_user_by_id_handler,
     find_user_by_username_handler, broadcast_message_handler, add_points_handler,
     cancel_handler, ASK_FOR_USER_ID, ASK_FOR_USERNAME, ASK_FOR_BROADCAST_MESSAGE, ASK_FOR_POINTS
 )
@@ -16,16 +20,22 @@ from .rewards_handler import (
     admin_manage_rewards
 )
 from .notification_handler import (
-    show_notifications_menu, notifications_callback_handler, 
+    show_notifications_menu, mark_notifications_read,
     show_notification_preferences, toggle_notification_type,
     send_notification_to_admins
 )
 
 __all__ = [
+    "callback_router",
     "start",
-    "button_callback_handler",
+    "show_main_menu",
+    "show_user_points",
     "admin_panel",
-    "admin_callback_handler",
+    "show_admin_panel",
+    "retention_report_command",
+    "performance_report_command",
+    "db_profile_command",
+    "profile_command",
     "find_user_by_id_handler",
     "find_user_by_username_handler",
     "broadcast_message_handler",
@@ -40,7 +50,7 @@ __all__ = [
     "show_store_menu",
     "admin_manage_rewards",
     "show_notifications_menu",
-    "notifications_callback_handler",
+    "mark_notifications_read",
     "show_notification_preferences",
     "toggle_notification_type",
     "send_notification_to_admins",
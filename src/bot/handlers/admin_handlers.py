@@ -12,12 +12,17 @@ from telegram.constants import ParseMode
 from telegram.ext import ContextTypes, ConversationHandler
 
 from src.database import (
+    query_profiler,
     get_total_users_count, get_banned_users_count, get_top_users_by_points,
     get_top_users_by_referrals, get_user, find_user_by_username, save_user,
     get_all_users, get_referral_count, get_top_users_by_level
 )
 from src.utils.helpers import is_admin
 from src.utils import advanced_stats_manager
+from src.bot.instrumentation import build_performance_report
+from src.bot.profiling import live_profiler, MAX_PROFILE_SECONDS
+from src.bot.messaging import edit_message_text
+from src.bot.router import callback_router
 from src.bot.ui import (
     create_admin_menu, create_manage_user_menu,
     create_user_control_panel, back_to_main_menu_button
@@ -45,6 +50,7 @@ async def admin_panel(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Non
         None
     """
     user_id: int = update.effective_user.id
+    advanced_stats_manager.record_command_usage("admin")
 
     if not is_admin(user_id):
         await update.message.reply_text("⚠️ هذه المنطقة مخصصة للمدير فقط!")
@@ -53,90 +59,240 @@ async def admin_panel(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Non
 
     text: str = "👑 أهلاً بك في لوحة تحكم المدير."
     await update.message.reply_text(text, reply_markup=create_admin_menu())
-    logger.info(f"افتتح المسؤول {user_id} لوحة التحكم")
+    logger.info("افتتح المسؤول %s لوحة التحكم", user_id)
 
 
-async def admin_callback_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Optional[int]:
+async def retention_report_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """
-    المعالج الرئيسي لجميع ردود أزرار المدير.
+    معالج أمر /retention لعرض تقرير الاحتفاظ لمجموعات المنضمين.
 
-    يوجه الاستعلامات حسب نوع الزر المضغوط.
+    Args:
+        update (Update): تحديث Telegram
+        context (ContextTypes.DEFAULT_TYPE): السياق
+
+    Returns:
+        None
+    """
+    user_id: int = update.effective_user.id
+
+    if not is_admin(user_id):
+        await update.message.reply_text("⚠️ هذه المنطقة مخصصة للمدير فقط!")
+        logger.warning(f"محاولة وصول غير مصرح بها من {user_id}")
+        return
+
+    await update.message.reply_text(
+        advanced_stats_manager.get_retention_report(),
+        parse_mode=ParseMode.MARKDOWN,
+        reply_markup=create_admin_menu()
+    )
+
+
+async def performance_report_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """
+    معالج أمر /perf لعرض زمن المعالجات وقاعدة البيانات وBot API.
 
     Args:
         update (Update): تحديث Telegram
         context (ContextTypes.DEFAULT_TYPE): السياق
 
     Returns:
-        Optional[int]: حالة ConversationHandler أو None
+        None
     """
-    query = update.callback_query
-    await query.answer()
-    user_id: int = query.from_user.id
+    user_id: int = update.effective_user.id
 
     if not is_admin(user_id):
-        await query.answer("ليس لديك صلاحية لهذا الإجراء!", show_alert=True)
-        logger.warning(f"محاولة وصول غير مصرح لـ {user_id}")
-        return None
+        await update.message.reply_text("⚠️ هذه المنطقة مخصصة للمدير فقط!")
+        logger.warning(f"محاولة وصول غير مصرح بها من {user_id}")
+        return
+
+    await update.message.reply_text(
+        build_performance_report(),
+        parse_mode=ParseMode.MARKDOWN
+    )
+
+
+async def db_profile_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """
+    معالج أمر /dbprofile لإدارة محلل استعلامات SQL.
 
-    data: str = query.data
-    logger.debug(f"استعلام من مسؤول {user_id}: {data}")
+    الاستخدام: /dbprofile [on [ms] | off | reset]، وبدون وسائط يعرض التقرير.
+
+    Args:
+        update (Update): تحديث Telegram
+        context (ContextTypes.DEFAULT_TYPE): السياق
+
+    Returns:
+        None
+    """
+    user_id: int = update.effective_user.id
+
+    if not is_admin(user_id):
+        await update.message.reply_text("⚠️ هذه المنطقة مخصصة للمدير فقط!")
+        logger.warning(f"محاولة وصول غير مصرح بها من {user_id}")
+        return
+
+    args = context.args or []
+    action = args[0].lower() if args else ""
+
+    if action == "on":
+        try:
+            threshold = float(args[1]) if len(args) > 1 else None
+        except ValueError:
+            await update.message.reply_text("❌ حد البطء يجب أن يكون رقماً بالمللي ثانية.")
+            return
+        query_profiler.enable(threshold)
+    elif action == "off":
+        query_profiler.disable()
+    elif action == "reset":
+        query_profiler.reset()
+    elif action:
+        await update.message.reply_text("❌ الاستخدام: /dbprofile [on [ms] | off | reset]")
+        return
+
+    await update.message.reply_text(query_profiler.report(), parse_mode=ParseMode.MARKDOWN)
+
+
+async def profile_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """
+    معالج أمر /profile N لتحليل أداء البوت الحي لمدة N ثانية.
+
+    يعمل التحليل كمهمة خلفية حتى لا يحجب معالجة التحديثات، ثم تُرسل
+    النتائج كمستندين: تقرير نصي وملف pstats للتحليل خارج البوت.
+
+    Args:
+        update (Update): تحديث Telegram
+        context (ContextTypes.DEFAULT_TYPE): السياق
+
+    Returns:
+        None
+    """
+    user_id: int = update.effective_user.id
+
+    if not is_admin(user_id):
+        await update.message.reply_text("⚠️ هذه المنطقة مخصصة للمدير فقط!")
+        logger.warning(f"محاولة وصول غير مصرح بها من {user_id}")
+        return
 
     try:
-        if data == "admin_panel":
-            await query.edit_message_text("👑 لوحة تحكم المدير", reply_markup=create_admin_menu())
-        elif data == "admin_stats":
-            await show_stats(update, context)
-        elif data == "admin_top_points":
-            await show_top_users_by_points(update, context)
-        elif data == "admin_top_referrals":
-            await show_top_users_by_referrals(update, context)
-        elif data == "admin_manage_user":
-            await show_manage_user_menu(update, context)
-        elif data == "admin_find_user_by_id":
-            await query.edit_message_text("⌨️ أدخل المعرف الرقمي (ID) للمستخدم:")
-            return ASK_FOR_USER_ID
-        elif data == "admin_find_user_by_username":
-            await query.edit_message_text("⌨️ أدخل اسم المستخدم (بدون @):")
-            return ASK_FOR_USERNAME
-        elif data == "show_notifications_menu":
-            # استيراد معالج الإشعارات
-            from src.bot.handlers.notification_handler import show_notifications_menu
-            await show_notifications_menu(update, context)
-        elif data == "admin_back":
-            # العودة إلى قائمة الإدارة
-            await query.edit_message_text(
-                "🔐 **لوحة التحكم الإدارية**",
-                reply_markup=create_admin_menu(),
-                parse_mode="HTML"
-            )
-        elif data == "admin_broadcast":
-            await query.edit_message_text(
-                "📝 أدخل الآن رسالة الإذاعة. يمكنك استخدام تنسيق Markdown.\n"
-                "لإلغاء الإذاعة، أرسل /cancel."
-            )
-            return ASK_FOR_BROADCAST_MESSAGE
-        elif "_ban_" in data or "_unban_" in data:
-            await handle_ban_unban(update, context)
-        elif "_add_points_" in data:
-            user_id_to_add: int = int(data.split('_')[-1])
-            context.user_data['user_id_to_modify'] = user_id_to_add
-            await query.edit_message_text(
-                f"➕ أدخل عدد النقاط التي تريد إضافتها للمستخدم `{user_id_to_add}`:"
-            )
-            return ASK_FOR_POINTS
-        else:
-            logger.warning(f"استعلام غير معروف: {data}")
+        seconds = int(context.args[0]) if context.args else 30
+    except ValueError:
+        await update.message.reply_text("❌ الاستخدام: /profile [عدد الثواني]")
+        return
 
-    except DatabaseError as e:
-        await query.edit_message_text(f"❌ خطأ: {e.message}")
-        logger.error(f"خطأ في قاعدة البيانات: {e.message}")
-    except Exception as e:
-        await query.edit_message_text("❌ حدث خطأ غير متوقع.")
-        logger.error(f"خطأ في معالج الأزرار الإداري: {str(e)}", exc_info=True)
+    if live_profiler.running:
+        await update.message.reply_text("⏳ توجد جلسة تحليل قيد التشغيل بالفعل.")
+        return
+
+    seconds = max(1, min(seconds, MAX_PROFILE_SECONDS))
+    chat_id = update.effective_chat.id
+    await update.message.reply_text(f"🔬 بدء تحليل الأداء لمدة {seconds} ثانية...")
 
-    return None
+    async def run_and_send() -> None:
+        try:
+            report, raw = await live_profiler.profile(seconds)
+        except RuntimeError as e:
+            await context.bot.send_message(chat_id, f"❌ {e}")
+            return
+        await context.bot.send_document(
+            chat_id, document=report.encode("utf-8"), filename="profile.txt",
+            caption=f"🔥 أعلى النقاط الساخنة خلال {seconds} ثانية"
+        )
+        await context.bot.send_document(chat_id, document=raw, filename="profile.prof")
 
+    context.application.create_task(run_and_send(), update=update)
+
+
+@callback_router.route("admin_panel", admin=True)
+@callback_router.route("admin_back", admin=True)
+async def show_admin_panel(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+    """
+    العودة إلى لوحة تحكم المدير (وإنهاء أي محادثة إدارية جارية).
+
+    Args:
+        update (Update): تحديث Telegram
+        context (ContextTypes.DEFAULT_TYPE): السياق
+
+    Returns:
+        int: ConversationHandler.END
+    """
+    await edit_message_text(update.callback_query, "👑 لوحة تحكم المدير", reply_markup=create_admin_menu())
+    return ConversationHandler.END
+
+
+@callback_router.route("admin_find_user_by_id", admin=True)
+async def ask_for_user_id(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+    """
+    بدء البحث عن مستخدم بمعرّفه.
+
+    Args:
+        update (Update): تحديث Telegram
+        context (ContextTypes.DEFAULT_TYPE): السياق
 
+    Returns:
+        int: حالة ConversationHandler
+    """
+    await edit_message_text(update.callback_query, "⌨️ أدخل المعرف الرقمي (ID) للمستخدم:")
+    return ASK_FOR_USER_ID
+
+
+@callback_router.route("admin_find_user_by_username", admin=True)
+async def ask_for_username(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+    """
+    بدء البحث عن مستخدم باسم المستخدم.
+
+    Args:
+        update (Update): تحديث Telegram
+        context (ContextTypes.DEFAULT_TYPE): السياق
+
+    Returns:
+        int: حالة ConversationHandler
+    """
+    await edit_message_text(update.callback_query, "⌨️ أدخل اسم المستخدم (بدون @):")
+    return ASK_FOR_USERNAME
+
+
+@callback_router.route("admin_broadcast", admin=True)
+async def ask_for_broadcast_message(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+    """
+    بدء الإذاعة بطلب نص الرسالة.
+
+    Args:
+        update (Update): تحديث Telegram
+        context (ContextTypes.DEFAULT_TYPE): السياق
+
+    Returns:
+        int: حالة ConversationHandler
+    """
+    await edit_message_text(
+        update.callback_query,
+        "📝 أدخل الآن رسالة الإذاعة. يمكنك استخدام تنسيق Markdown.\n"
+        "لإلغاء الإذاعة، أرسل /cancel."
+    )
+    return ASK_FOR_BROADCAST_MESSAGE
+
+
+@callback_router.route("add_points", admin=True, payload=int)
+async def ask_for_points(update: Update, context: ContextTypes.DEFAULT_TYPE, user_id: int) -> int:
+    """
+    بدء إضافة نقاط لمستخدم بطلب عدد النقاط.
+
+    Args:
+        update (Update): تحديث Telegram
+        context (ContextTypes.DEFAULT_TYPE): السياق
+        user_id (int): معرّف المستخدم (من بيانات الزر add_points:<uid>)
+
+    Returns:
+        int: حالة ConversationHandler
+    """
+    context.user_data['user_id_to_modify'] = user_id
+    await edit_message_text(
+        update.callback_query,
+        f"➕ أدخل عدد النقاط التي تريد إضافتها للمستخدم `{user_id}`:"
+    )
+    return ASK_FOR_POINTS
+
+
+@callback_router.route("admin_stats", admin=True)
 async def show_stats(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """
     عرض إحصائيات البوت العامة.
@@ -155,6 +311,7 @@ async def show_stats(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None
     try:
         total_users: int = get_total_users_count()
         banned_users: int = get_banned_users_count()
+        advanced_stats_manager.update_user_activity_stats({"total_users": total_users})
         
         # الحصول على الإحصائيات المتقدمة
         daily_summary = advanced_stats_manager.get_daily_summary()
@@ -165,7 +322,11 @@ async def show_stats(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None
             f"📊 **إحصائيات البوت:**\n\n"
             f"👥 إجمالي المستخدمين: **{total_users}**\n"
             f"🚫 المستخدمون المحظورون: **{banned_users}**\n"
-            f"✅ المستخدمون النشطون: **{total_users - banned_users}**\n\n"
+            f"✅ المستخدمون غير المحظورين: **{total_users - banned_users}**\n"
+            f"📊 النشطون يوم/أسبوع/شهر: **{daily_summary['active_users']}** / "
+            f"**{weekly_summary['week_active_users']}** / "
+            f"**{monthly_summary['monthly_active_users']}** "
+            f"(±{advanced_stats_manager.active_users_error * 100:.1f}%)\n\n"
             f"📅 **اليوم:**\n"
             f"  • النشطون: {daily_summary['active_users']}\n"
             f"  • مستخدمون جدد: {daily_summary['new_users']}\n"
@@ -181,18 +342,20 @@ async def show_stats(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None
         # إضافة تقرير صحة النظام
         stats_text += "\n\n" + advanced_stats_manager.get_health_report()
         
-        await query.edit_message_text(
+        await edit_message_text(
+            query,
             stats_text,
             parse_mode=ParseMode.MARKDOWN,
             reply_markup=create_admin_menu()
         )
-        logger.debug(f"عرض الإحصائيات المتقدمة للمسؤول {query.from_user.id}")
+        logger.debug("عرض الإحصائيات المتقدمة للمسؤول %s", query.from_user.id)
 
     except DatabaseError as e:
-        await query.edit_message_text(f"❌ خطأ: {e.message}")
+        await edit_message_text(query, f"❌ خطأ: {e.message}")
         logger.error(f"خطأ في استرجاع الإحصائيات: {e.message}")
 
 
+@callback_router.route("admin_top_points", admin=True)
 async def show_top_users_by_points(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """
     عرض قائمة أكثر 10 مستخدمين نقاطاً.
@@ -210,7 +373,8 @@ async def show_top_users_by_points(update: Update, context: ContextTypes.DEFAULT
         top_users = get_top_users_by_points(10)
 
         if not top_users:
-            await query.edit_message_text(
+            await edit_message_text(
+                query,
                 "🏆 لا يوجد مستخدمون لعرضهم.",
                 reply_markup=create_admin_menu()
             )
@@ -220,17 +384,19 @@ async def show_top_users_by_points(update: Update, context: ContextTypes.DEFAULT
         for i, user in enumerate(top_users, 1):
             text += f"{i}. {user.first_name} (`{user.user_id}`) - **{user.points}** نقطة\n"
 
-        await query.edit_message_text(
+        await edit_message_text(
+            query,
             text,
             parse_mode=ParseMode.MARKDOWN,
             reply_markup=create_admin_menu()
         )
 
     except DatabaseError as e:
-        await query.edit_message_text(f"❌ خطأ: {e.message}")
+        await edit_message_text(query, f"❌ خطأ: {e.message}")
         logger.error(f"خطأ في استرجاع الترتيب: {e.message}")
 
 
+@callback_router.route("admin_top_referrals", admin=True)
 async def show_top_users_by_referrals(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """
     عرض قائمة أكثر 10 مستخدمين إحالة.
@@ -248,7 +414,8 @@ async def show_top_users_by_referrals(update: Update, context: ContextTypes.DEFA
         top_users = get_top_users_by_referrals(10)
 
         if not top_users:
-            await query.edit_message_text(
+            await edit_message_text(
+                query,
                 "📈 لا يوجد مستخدمون لعرضهم.",
                 reply_markup=create_admin_menu()
             )
@@ -258,17 +425,19 @@ async def show_top_users_by_referrals(update: Update, context: ContextTypes.DEFA
         for i, user_data in enumerate(top_users, 1):
             text += f"{i}. {user_data['first_name']} - **{user_data['referral_count']}** إحالة\n"
 
-        await query.edit_message_text(
+        await edit_message_text(
+            query,
             text,
             parse_mode=ParseMode.MARKDOWN,
             reply_markup=create_admin_menu()
         )
 
     except DatabaseError as e:
-        await query.edit_message_text(f"❌ خطأ: {e.message}")
+        await edit_message_text(query, f"❌ خطأ: {e.message}")
         logger.error(f"خطأ في استرجاع الإحالات: {e.message}")
 
 
+@callback_router.route("admin_manage_user", admin=True)
 async def show_manage_user_menu(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """
     عرض قائمة إدارة المستخدمين.
@@ -281,7 +450,8 @@ async def show_manage_user_menu(update: Update, context: ContextTypes.DEFAULT_TY
         None
     """
     query = update.callback_query
-    await query.edit_message_text(
+    await edit_message_text(
+        query,
         "👤 **إدارة المستخدمين**\n\nاختر طريقة البحث عن المستخدم:",
         reply_markup=create_manage_user_menu()
     )
@@ -307,7 +477,7 @@ async def find_user_by_id_handler(update: Update, context: ContextTypes.DEFAULT_
     try:
         db_user: Optional[User] = get_user(user_id)
         await display_user_info_for_admin(update, context, db_user)
-        logger.debug(f"بحث عن مستخدم برقمه: {user_id}")
+        logger.debug("بحث عن مستخدم برقمه: %s", user_id)
 
     except DatabaseError as e:
         await update.message.reply_text(f"❌ خطأ: {e.message}")
@@ -332,7 +502,7 @@ async def find_user_by_username_handler(update: Update, context: ContextTypes.DE
     try:
         db_user: Optional[User] = find_user_by_username(username)
         await display_user_info_for_admin(update, context, db_user)
-        logger.debug(f"بحث عن مستخدم باسم المستخدم: {username}")
+        logger.debug("بحث عن مستخدم باسم المستخدم: %s", username)
 
     except DatabaseError as e:
         await update.message.reply_text(f"❌ خطأ: {e.message}")
@@ -392,21 +562,41 @@ async def display_user_info_for_admin(
     )
 
 
-async def handle_ban_unban(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+@callback_router.route("ban", admin=True, payload=int)
+async def ban_user_handler(update: Update, context: ContextTypes.DEFAULT_TYPE, user_id: int) -> None:
+    """
+    معالج حظر المستخدم (بيانات الزر ban:<uid>).
+
+    Args:
+        update (Update): تحديث Telegram
+        context (ContextTypes.DEFAULT_TYPE): السياق
+        user_id (int): معرّف المستخدم
+
+    Returns:
+        None
+    """
+    await _set_user_banned(update, user_id, True)
+
+
+@callback_router.route("unban", admin=True, payload=int)
+async def unban_user_handler(update: Update, context: ContextTypes.DEFAULT_TYPE, user_id: int) -> None:
     """
-    معالج حظر وإلغاء حظر المستخدم.
+    معالج رفع الحظر عن المستخدم (بيانات الزر unban:<uid>).
 
     Args:
         update (Update): تحديث Telegram
         context (ContextTypes.DEFAULT_TYPE): السياق
+        user_id (int): معرّف المستخدم
 
     Returns:
         None
     """
+    await _set_user_banned(update, user_id, False)
+
+
+async def _set_user_banned(update: Update, user_id: int, banned: bool) -> None:
+    """حظر المستخدم أو رفع الحظر عنه وعرض النتيجة للمسؤول."""
     query = update.callback_query
-    data_parts: list = query.data.split('_')
-    action: str = data_parts[1]
-    user_id: int = int(data_parts[2])
 
     try:
         db_user: Optional[User] = get_user(user_id)
@@ -415,20 +605,19 @@ async def handle_ban_unban(update: Update, context: ContextTypes.DEFAULT_TYPE) -
             await query.answer("المستخدم غير موجود!", show_alert=True)
             return
 
-        if action == 'ban':
-            db_user.is_banned = True
+        db_user.is_banned = banned
+        if banned:
             message: str = f"🚫 تم حظر المستخدم {db_user.first_name} بنجاح."
-            logger.info(f"المسؤول {query.from_user.id} حظر المستخدم {user_id}")
-        else:  # unban
-            db_user.is_banned = False
+            logger.info("المسؤول %s حظر المستخدم %s", query.from_user.id, user_id)
+        else:
             message = f"✅ تم رفع الحظر عن المستخدم {db_user.first_name} بنجاح."
-            logger.info(f"المسؤول {query.from_user.id} رفع الحظر عن المستخدم {user_id}")
+            logger.info("المسؤول %s رفع الحظر عن المستخدم %s", query.from_user.id, user_id)
 
         save_user(db_user)
-        await query.edit_message_text(message, reply_markup=create_admin_menu())
+        await edit_message_text(query, message, reply_markup=create_admin_menu())
 
     except DatabaseError as e:
-        await query.edit_message_text(f"❌ خطأ: {e.message}")
+        await edit_message_text(query, f"❌ خطأ: {e.message}")
         logger.error(f"خطأ في حظر/إلغاء الحظر: {e.message}")
 
 
@@ -570,147 +759,5 @@ async def cancel_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
         "❌ تم إلغاء العملية.",
         reply_markup=create_admin_menu()
     )
-    logger.debug(f"المستخدم {update.effective_user.id} ألغى العملية")
-    return ConversationHandler.END
-
-async def show_top_users_by_points(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """عرض قائمة أكثر المستخدمين نقاطاً."""
-    query = update.callback_query
-    top_users = get_top_users_by_points(10)
-    if not top_users:
-        await query.edit_message_text("🏆 لا يوجد مستخدمون لعرضهم.", reply_markup=create_admin_menu())
-        return
-
-    text = "🏆 **أكثر 10 مستخدمين نقاطًا:**\n\n"
-    for i, user in enumerate(top_users, 1):
-        text += f"{i}. {user.first_name} (`{user.user_id}`) - **{user.points}** نقطة\n"
-    
-    await query.edit_message_text(text, parse_mode=ParseMode.MARKDOWN, reply_markup=create_admin_menu())
-
-async def show_top_users_by_referrals(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """عرض قائمة أكثر المستخدمين إحالة."""
-    query = update.callback_query
-    top_users = get_top_users_by_referrals(10)
-    if not top_users:
-        await query.edit_message_text("📈 لا يوجد مستخدمون لعرضهم.", reply_markup=create_admin_menu())
-        return
-
-    text = "📈 **أكثر 10 مستخدمين دعوة للأصدقاء:**\n\n"
-    for i, user_data in enumerate(top_users, 1):
-        text += f"{i}. {user_data['first_name']} - **{user_data['referral_count']}** دعوة\n"
-
-    await query.edit_message_text(text, parse_mode=ParseMode.MARKDOWN, reply_markup=create_admin_menu())
-
-async def show_manage_user_menu(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """عرض قائمة إدارة المستخدمين."""
-    query = update.callback_query
-    await query.edit_message_text("👤 **إدارة المستخدمين**\n\nاختر طريقة البحث عن المستخدم:", reply_markup=create_manage_user_menu())
-
-async def find_user_by_id_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """معالج استلام معرف المستخدم للبحث."""
-    try:
-        user_id = int(update.message.text)
-    except ValueError:
-        await update.message.reply_text("⚠️ المعرف يجب أن يكون رقمًا. حاول مرة أخرى.")
-        return ASK_FOR_USER_ID
-
-    db_user = get_user(user_id)
-    await display_user_info_for_admin(update, context, db_user)
-    return ConversationHandler.END
-
-async def find_user_by_username_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """معالج استلام اسم المستخدم للبحث."""
-    username = update.message.text.lstrip('@')
-    db_user = find_user_by_username(username)
-    await display_user_info_for_admin(update, context, db_user)
-    return ConversationHandler.END
-
-async def display_user_info_for_admin(update, context, db_user):
-    """عرض معلومات المستخدم وأزرار التحكم للمدير."""
-    if not db_user:
-        await update.message.reply_text("❌ لم يتم العثور على المستخدم.", reply_markup=create_admin_menu())
-        return
-
-    user_info = (
-        f"**معلومات المستخدم:**\n"
-        f"- **الاسم:** {db_user.first_name}\n"
-        f"- **المعرف:** `{db_user.user_id}`\n"
-        f"- **اسم المستخدم:** @{db_user.username}\n"
-        f"- **النقاط:** {db_user.points}\n"
-        f"- **تاريخ الانضمام:** {db_user.join_date.strftime('%Y-%m-%d') if db_user.join_date else 'غير معروف'}\n"
-        f"- **محظور:** {'نعم' if db_user.is_banned else 'لا'}"
-    )
-    await update.message.reply_text(
-        user_info, 
-        parse_mode=ParseMode.MARKDOWN, 
-        reply_markup=create_user_control_panel(db_user.user_id, db_user.is_banned)
-    )
-
-async def handle_ban_unban(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """معالج حظر وإلغاء حظر المستخدم."""
-    query = update.callback_query
-    data_parts = query.data.split('_')
-    action = data_parts[1]
-    user_id = int(data_parts[2])
-
-    db_user = get_user(user_id)
-    if not db_user:
-        await query.answer("المستخدم غير موجود!", show_alert=True)
-        return
-
-    if action == 'ban':
-        db_user.is_banned = True
-        message = f"🚫 تم حظر المستخدم {db_user.first_name} بنجاح."
-    else: # unban
-        db_user.is_banned = False
-        message = f"✅ تم رفع الحظر عن المستخدم {db_user.first_name} بنجاح."
-    
-    save_user(db_user)
-    await query.edit_message_text(message, reply_markup=create_admin_menu())
-
-async def add_points_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """معالج إضافة نقاط للمستخدم."""
-    try:
-        points_to_add = int(update.message.text)
-        user_id = context.user_data.get('user_id_to_modify')
-    except (ValueError, KeyError):
-        await update.message.reply_text("حدث خطأ، يرجى المحاولة مرة أخرى.", reply_markup=create_admin_menu())
-        return ConversationHandler.END
-
-    db_user = get_user(user_id)
-    if db_user:
-        db_user.points += points_to_add
-        save_user(db_user)
-        await update.message.reply_text(f"✅ تم إضافة {points_to_add} نقطة إلى {db_user.first_name}. رصيده الآن {db_user.points} نقطة.", reply_markup=create_admin_menu())
-    else:
-        await update.message.reply_text("❌ لم يتم العثور على المستخدم.", reply_markup=create_admin_menu())
-
-    if 'user_id_to_modify' in context.user_data:
-        del context.user_data['user_id_to_modify']
-    return ConversationHandler.END
-
-async def broadcast_message_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """معالج استلام رسالة الإذاعة وإرسالها لجميع المستخدمين."""
-    message_text = update.message.text
-    all_users = get_all_users()
-    sent_count = 0
-    failed_count = 0
-    
-    await update.message.reply_text(f"⏳ جاري بدء الإذاعة إلى {len(all_users)} مستخدم... يرجى الانتظار.")
-
-    for user in all_users:
-        if user.is_banned: continue
-        try:
-            await context.bot.send_message(user.user_id, message_text, parse_mode=ParseMode.HTML)
-            sent_count += 1
-        except Exception:
-            failed_count += 1
-    
-    feedback = f"📣 اكتملت الإذاعة!\n\n- ✅ تم الإرسال بنجاح إلى: {sent_count} مستخدم.\n- ❌ فشل الإرسال لـ: {failed_count} مستخدم."
-    await update.message.reply_text(feedback, reply_markup=create_admin_menu())
-    return ConversationHandler.END
-
-async def cancel_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """إلغاء المحادثة الحالية."""
-    await update.message.reply_text("تم إلغاء العملية.", reply_markup=create_admin_menu())
+    logger.debug("المستخدم %s ألغى العملية", update.effective_user.id)
     return ConversationHandler.END
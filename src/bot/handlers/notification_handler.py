@@ -10,15 +10,17 @@ import logging
 
 from src.utils import (
     notification_manager,
-    is_admin,
     get_admin_ids,
 )
 from src.utils.notification_manager import NotificationType, NotificationLevel
-from src.bot.ui import create_confirmation_menu, create_admin_menu
+from src.bot.messaging import edit_message_text
+from src.bot.router import callback_router
 
 logger: logging.Logger = logging.getLogger(__name__)
 
 
+@callback_router.route("show_notifications_menu", admin=True)
+@callback_router.route("notifications_refresh", admin=True)
 async def show_notifications_menu(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """
     عرض قائمة الإشعارات.
@@ -27,10 +29,6 @@ async def show_notifications_menu(update: Update, context: ContextTypes.DEFAULT_
         update (Update): تحديث Telegram
         context (ContextTypes.DEFAULT_TYPE): سياق المعالج
     """
-    if not is_admin(update.effective_user.id, get_admin_ids()):
-        await update.callback_query.answer("❌ ليس لديك صلاحيات")
-        return
-    
     admin_id = update.effective_user.id
     notifications = notification_manager.get_notifications_for_admin(admin_id, unread_only=True)
     
@@ -56,40 +54,29 @@ async def show_notifications_menu(update: Update, context: ContextTypes.DEFAULT_
     
     keyboard_markup = InlineKeyboardMarkup(keyboard)
     
-    await update.callback_query.edit_message_text(
+    await edit_message_text(
+        update.callback_query,
         text=text,
         reply_markup=keyboard_markup,
         parse_mode="HTML"
     )
 
 
-async def notifications_callback_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+@callback_router.route("notifications_mark_read", admin=True, answer=False)
+async def mark_notifications_read(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """
-    معالج استدعاءات الإشعارات.
+    وضع علامة مقروء على جميع إشعارات المشرف ثم تحديث القائمة.
     
     Args:
         update (Update): تحديث Telegram
         context (ContextTypes.DEFAULT_TYPE): سياق المعالج
     """
-    if not is_admin(update.effective_user.id, get_admin_ids()):
-        await update.callback_query.answer("❌ ليس لديك صلاحيات")
-        return
-    
-    query = update.callback_query
-    admin_id = update.effective_user.id
-    
-    if query.data == "notifications_refresh":
-        await show_notifications_menu(update, context)
-    
-    elif query.data == "notifications_mark_read":
-        count = notification_manager.mark_all_as_read(admin_id)
-        await query.answer(f"✅ تم تحديد {count} إشعار كمقروء")
-        await show_notifications_menu(update, context)
-    
-    elif query.data == "notifications_settings":
-        await show_notification_preferences(update, context)
+    count = notification_manager.mark_all_as_read(update.effective_user.id)
+    await update.callback_query.answer(f"✅ تم تحديد {count} إشعار كمقروء")
+    await show_notifications_menu(update, context)
 
 
+@callback_router.route("notifications_settings", admin=True)
 async def show_notification_preferences(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """
     عرض تفضيلات الإشعارات.
@@ -113,7 +100,7 @@ async def show_notification_preferences(update: Update, context: ContextTypes.DE
         keyboard.append([
             InlineKeyboardButton(
                 f"{emoji} {notif_type.value}",
-                callback_data=f"toggle_notif_{notif_type.name}"
+                callback_data=f"toggle_notif:{notif_type.name}"
             )
         ])
     
@@ -123,28 +110,33 @@ async def show_notification_preferences(update: Update, context: ContextTypes.DE
     
     keyboard_markup = InlineKeyboardMarkup(keyboard)
     
-    await update.callback_query.edit_message_text(
+    await edit_message_text(
+        update.callback_query,
         text=text,
         reply_markup=keyboard_markup,
         parse_mode="HTML"
     )
 
 
-async def toggle_notification_type(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+@callback_router.route(
+    "toggle_notif", admin=True, answer=False, payload=lambda name: NotificationType[name]
+)
+async def toggle_notification_type(
+    update: Update,
+    context: ContextTypes.DEFAULT_TYPE,
+    notif_type: NotificationType
+) -> None:
     """
     تبديل نوع الإشعار.
     
     Args:
         update (Update): تحديث Telegram
         context (ContextTypes.DEFAULT_TYPE): سياق المعالج
+        notif_type (NotificationType): نوع الإشعار (من بيانات الزر toggle_notif:<NAME>)
     """
     query = update.callback_query
     admin_id = update.effective_user.id
     
-    # استخراج نوع الإشعار من callback_data
-    notif_type_name = query.data.replace("toggle_notif_", "")
-    notif_type = NotificationType[notif_type_name]
-    
     # الحصول على التفضيلات الحالية
     current_prefs = set(notification_manager.get_admin_preferences(admin_id))
     
@@ -210,4 +202,4 @@ async def send_notification_to_admins(
             except Exception as e:
                 logger.error(f"خطأ في إرسال إشعار للمشرف {admin_id}: {str(e)}")
     
-    logger.info(f"تم إنشاء إشعار: {title}")
+    logger.info("تم إنشاء إشعار: %s", title)
@@ -8,9 +8,13 @@ import logging
 from typing import Optional
 from telegram import Update, InlineKeyboardMarkup, InlineKeyboardButton
 from telegram.ext import ContextTypes
-from src.database import get_user, save_user
+from src.database import save_user
+from src.bot.middleware import context_user
+from src.bot.messaging import edit_message_text
+from src.bot.router import callback_router
 from src.models.user import User
 from src.utils.reward_manager import reward_manager
+from src.utils.advanced_stats_manager import advanced_stats_manager
 from src.utils.exceptions import (
     InsufficientPoints,
     RewardNotFound,
@@ -20,6 +24,7 @@ from src.utils.exceptions import (
 logger: logging.Logger = logging.getLogger(__name__)
 
 
+@callback_router.route("store_rewards", registered=True)
 async def show_rewards_menu(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """
     عرض قائمة المكافآت المتاحة للمستخدم.
@@ -35,10 +40,10 @@ async def show_rewards_menu(update: Update, context: ContextTypes.DEFAULT_TYPE)
     user_id: int = query.from_user.id
     
     try:
-        db_user: Optional[User] = get_user(user_id)
+        db_user: Optional[User] = context_user(update, context)
         
         if not db_user:
-            await query.edit_message_text("❌ خطأ: لم يتم العثور على بياناتك")
+            await edit_message_text(query, "❌ خطأ: لم يتم العثور على بياناتك")
             return
         
         available_rewards = reward_manager.get_available_rewards(db_user.points)
@@ -50,7 +55,8 @@ async def show_rewards_menu(update: Update, context: ContextTypes.DEFAULT_TYPE)
                 f"نقاطك الحالية: {db_user.points} 🎯"
             )
             keyboard = [[InlineKeyboardButton("🔙 العودة", callback_data="main_menu")]]
-            await query.edit_message_text(
+            await edit_message_text(
+                query,
                 text,
                 reply_markup=InlineKeyboardMarkup(keyboard)
             )
@@ -73,24 +79,27 @@ async def show_rewards_menu(update: Update, context: ContextTypes.DEFAULT_TYPE)
             
             button_text = f"🎁 {reward.name} ({reward.cost})"
             keyboard.append(
-                [InlineKeyboardButton(button_text, callback_data=f"claim_reward_{reward.reward_id}")]
+                [InlineKeyboardButton(button_text, callback_data=f"claim_reward:{reward.reward_id}")]
             )
         
         keyboard.append([InlineKeyboardButton("🔙 العودة", callback_data="main_menu")])
         
-        await query.edit_message_text(
+        await edit_message_text(
+            query,
             text,
             parse_mode="Markdown",
             reply_markup=InlineKeyboardMarkup(keyboard)
         )
         
-        logger.debug(f"عرض المكافآت للمستخدم {user_id}")
+        logger.debug("عرض المكافآت للمستخدم %s", user_id)
         
     except Exception as e:
-        await query.edit_message_text(f"❌ خطأ: {str(e)}")
+        await edit_message_text(query, f"❌ خطأ: {str(e)}")
         logger.error(f"خطأ في عرض المكافآت: {str(e)}", exc_info=True)
 
 
+@callback_router.route("claim_reward", payload=int, answer=False)
+@callback_router.route("confirm_reward", payload=int, answer=False)
 async def claim_reward_handler(
     update: Update,
     context: ContextTypes.DEFAULT_TYPE,
@@ -111,18 +120,20 @@ async def claim_reward_handler(
     user_id: int = query.from_user.id
     
     try:
-        db_user: Optional[User] = get_user(user_id)
+        db_user: Optional[User] = context_user(update, context)
         
         if not db_user:
             await query.answer("❌ خطأ: لم يتم العثور على بياناتك", show_alert=True)
             return
         
         # محاولة الحصول على المكافأة
+        points_before: int = db_user.points
         success, message = reward_manager.claim_reward(db_user, reward_id)
         
         if success:
             # حفظ البيانات المحدثة
             save_user(db_user)
+            advanced_stats_manager.record_reward_claimed(points_before - db_user.points)
             
             await query.answer("✅ تم الحصول على المكافأة!", show_alert=True)
             
@@ -133,8 +144,8 @@ async def claim_reward_handler(
                 f"نقاطك المتبقية: {db_user.points}"
             )
             
-            await query.edit_message_text(confirmation_text, parse_mode="Markdown")
-            logger.info(f"المستخدم {user_id} حصل على مكافأة برقم {reward_id}")
+            await edit_message_text(query, confirmation_text, parse_mode="Markdown")
+            logger.info("المستخدم %s حصل على مكافأة برقم %s", user_id, reward_id)
             
     except InsufficientPoints as e:
         await query.answer(f"⚠️ {e.message}", show_alert=True)
@@ -171,13 +182,15 @@ async def show_store_menu(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
         [InlineKeyboardButton("🔙 العودة", callback_data="main_menu")]
     ]
     
-    await query.edit_message_text(
+    await edit_message_text(
+        query,
         text,
         reply_markup=InlineKeyboardMarkup(keyboard)
     )
-    logger.debug(f"عرض قائمة المتجر للمستخدم {query.from_user.id}")
+    logger.debug("عرض قائمة المتجر للمستخدم %s", query.from_user.id)
 
 
+@callback_router.route("admin_manage_rewards", admin=True)
 async def admin_manage_rewards(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """
     عرض قائمة إدارة المكافآت للمسؤول.
@@ -214,9 +227,10 @@ async def admin_manage_rewards(update: Update, context: ContextTypes.DEFAULT_TYP
         [InlineKeyboardButton("🔙 الرجوع", callback_data="admin_panel")]
     ]
     
-    await query.edit_message_text(
+    await edit_message_text(
+        query,
         text,
         parse_mode="Markdown",
         reply_markup=InlineKeyboardMarkup(keyboard)
     )
-    logger.debug(f"عرض إدارة المكافآت للمسؤول {query.from_user.id}")
\ No newline at end of file
+    logger.debug("عرض إدارة المكافآت للمسؤول %s", query.from_user.id)
\ No newline at end of file
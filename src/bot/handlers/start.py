@@ -15,8 +15,12 @@ from telegram.ext import ContextTypes
 from src.models.user import User
 from src.database import get_user, save_user, get_user_by_referral_code
 from src.utils.helpers import generate_referral_code, is_admin
+from src.utils import advanced_stats_manager
 from src.core.config import POINTS_PER_REFERRAL, ADMIN_IDS, PRIMARY_ADMIN_ID
 from src.bot.ui import create_main_menu
+from src.bot.middleware import context_user, set_context_user
+from src.bot.admission import admission_controller
+from src.bot.messaging import reply_text
 from src.utils.exceptions import UserNotFound, UserBanned, DatabaseError
 
 logger: logging.Logger = logging.getLogger(__name__)
@@ -41,30 +45,25 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         logger.warning("⚠️ لم يتم العثور على معلومات المستخدم")
         return
 
-    try:
-        db_user: Optional[User] = get_user(effective_user.id)
+    advanced_stats_manager.record_command_usage("start")
 
-        # إذا كان المستخدم محظورًا، لا تفعل شيئًا
-        if db_user and db_user.is_banned:
-            await update.message.reply_text("❌ أنت محظور من استخدام هذا البوت.")
-            logger.warning(f"محاولة وصول من مستخدم محظور: {effective_user.id}")
-            return
+    try:
+        # المستخدمون المحظورون يُرفضون مسبقاً في مرحلة load_user_context
+        db_user: Optional[User] = context_user(update, context)
 
         # التحقق من وجود إحالة قبل تسجيل المستخدم الجديد
         if not db_user:
             await _check_for_referral(update, context)
             db_user = await _register_new_user(effective_user, context)
+            set_context_user(context, db_user)
 
         # عرض الترحيب والقائمة الرئيسية
         welcome_text: str = (
             f"👋 أهلاً بك {effective_user.first_name}!\n\n"
             "اختر أحد الخيارات من القائمة أدناه:"
         )
-        await update.message.reply_text(
-            welcome_text,
-            reply_markup=create_main_menu()
-        )
-        logger.info(f"✅ رحب البوت بالمستخدم: {effective_user.id} ({effective_user.first_name})")
+        await reply_text(update.message, welcome_text, reply_markup=create_main_menu())
+        logger.info("✅ رحب البوت بالمستخدم: %s (%s)", effective_user.id, effective_user.first_name)
 
     except UserBanned as e:
         await update.message.reply_text(f"❌ {e.message}")
@@ -107,10 +106,13 @@ async def _register_new_user(
             referred_by=context.user_data.get('referrer_id')
         )
         save_user(new_user)
-        logger.info(f"✅ تم تسجيل مستخدم جديد: {user.id} ({user.first_name})")
+        advanced_stats_manager.record_new_user(user.id)
+        logger.info("✅ تم تسجيل مستخدم جديد: %s (%s)", user.id, user.first_name)
 
-        # إرسال إشعار للمدير بوجود مستخدم جديد
-        await _notify_admin_new_user(user, new_user, context)
+        # إرسال إشعار للمدير بوجود مستخدم جديد (يُؤجل تحت الحمل)
+        await admission_controller.run_or_defer(
+            "admin_new_user", lambda: _notify_admin_new_user(user, new_user, context)
+        )
 
         return new_user
 
@@ -197,7 +199,9 @@ async def _check_for_referral(update: Update, context: ContextTypes.DEFAULT_TYPE
         # مكافأة المُحيل بالنقاط
         referrer.points += POINTS_PER_REFERRAL
         save_user(referrer)
-        logger.info(f"✅ تم مكافأة المُحيل {referrer.user_id} بـ {POINTS_PER_REFERRAL} نقطة")
+        advanced_stats_manager.record_referral_click()
+        advanced_stats_manager.record_points_earned(POINTS_PER_REFERRAL)
+        logger.info("✅ تم مكافأة المُحيل %s بـ %s نقطة", referrer.user_id, POINTS_PER_REFERRAL)
 
         # تخزين هوية المحيل لمكافأته لاحقًا عند التسجيل
         context.user_data['referrer_id'] = referrer.user_id
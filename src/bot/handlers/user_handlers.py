@@ -2,79 +2,30 @@
 معالجات أزرار القائمة للمستخدمين العاديين.
 
 يحتوي هذا الملف على معالجات جميع الأزرار والاستعلامات
-المتعلقة بحسابات المستخدمين العاديين.
+المتعلقة بحسابات المستخدمين العاديين، وتُسجَّل كمسارات في موجّه الأزرار.
 """
 
 import logging
 from typing import Optional
 from telegram import Update, InlineKeyboardMarkup, InlineKeyboardButton
 from telegram.ext import ContextTypes
-from src.database import get_user, get_referral_count
+from src.database import get_referral_count
 from src.core.config import POINTS_PER_REFERRAL
+from src.bot.middleware import context_user
+from src.bot.messaging import edit_message_text
+from src.bot.router import callback_router
 from src.bot.ui import (
     create_main_menu, create_about_menu, back_to_main_menu_button,
     create_store_menu
 )
 from src.models.user import User
-from src.utils.exceptions import UserNotFound, DatabaseError
+from src.utils.activity_bitmaps import activity_bitmaps
+from src.utils.exceptions import DatabaseError
 
 logger: logging.Logger = logging.getLogger(__name__)
 
 
-async def button_callback_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    """
-    المعالج الرئيسي لجميع ردود الأزرار من المستخدمين العاديين.
-    
-    يتعامل مع توجيه الاستعلامات إلى المعالجات الفرعية المناسبة.
-    
-    Args:
-        update (Update): تحديث Telegram يحتوي على استعلام الزر
-        context (ContextTypes.DEFAULT_TYPE): السياق
-        
-    Returns:
-        None
-    """
-    query = update.callback_query
-    await query.answer()  # يجب استدعاء answer() دائمًا لإغلاق قائمة التحميل
-
-    # التأكد من وجود مستخدم مسجل
-    user_id: int = query.from_user.id
-    db_user: Optional[User] = get_user(user_id)
-
-    if not db_user:
-        await query.edit_message_text(
-            "⚠️ عذرًا، حدث خطأ. يرجى الضغط على /start للبدء من جديد."
-        )
-        logger.warning(f"محاولة استخدام زر من مستخدم غير مسجل: {user_id}")
-        return
-
-    # توجيه الردود بناءً على بيانات الزر
-    data: str = query.data
-
-    try:
-        if data == 'main_menu':
-            await show_main_menu(update, context)
-        elif data == 'user_points':
-            await show_user_points(update, context)
-        elif data == 'user_referral':
-            await show_user_referral_link(update, context)
-        elif data == 'user_about':
-            await show_about_menu(update, context)
-        elif data == 'user_feedback':
-            await request_feedback(update, context)
-        elif data == 'store_menu':
-            await show_store_menu(update, context)
-        else:
-            logger.warning(f"استعلام زر غير معروف: {data}")
-
-    except DatabaseError as e:
-        await query.edit_message_text(f"❌ خطأ: {e.message}")
-        logger.error(f"خطأ في قاعدة البيانات: {e.message}")
-    except Exception as e:
-        await query.edit_message_text("❌ حدث خطأ. يرجى المحاولة لاحقًا.")
-        logger.error(f"خطأ غير متوقع في معالج الأزرار: {str(e)}", exc_info=True)
-
-
+@callback_router.route("main_menu", registered=True)
 async def show_main_menu(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """
     عرض القائمة الرئيسية للمستخدم.
@@ -93,10 +44,11 @@ async def show_main_menu(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
         f"👋 أهلاً بك مجددًا {user_first_name}!\n\n"
         "اختر أحد الخيارات من القائمة أدناه:"
     )
-    await query.edit_message_text(text, reply_markup=create_main_menu())
-    logger.debug(f"عرض القائمة الرئيسية للمستخدم {query.from_user.id}")
+    await edit_message_text(query, text, reply_markup=create_main_menu())
+    logger.debug("عرض القائمة الرئيسية للمستخدم %s", query.from_user.id)
 
 
+@callback_router.route("user_points", registered=True)
 async def show_user_points(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """
     عرض نقاط المستخدم والإحصائيات الخاصة به.
@@ -114,13 +66,14 @@ async def show_user_points(update: Update, context: ContextTypes.DEFAULT_TYPE) -
     user_id: int = query.from_user.id
 
     try:
-        db_user: Optional[User] = get_user(user_id)
+        db_user: Optional[User] = context_user(update, context)
 
         if not db_user:
-            await query.edit_message_text("❌ خطأ، لم يتم العثور على بياناتك. اضغط /start")
+            await edit_message_text(query, "❌ خطأ، لم يتم العثور على بياناتك. اضغط /start")
             return
 
         referral_count: int = get_referral_count(user_id)
+        streak: int = activity_bitmaps.streak(user_id)
 
         # بناء رسالة الإحصائيات
         points_text: str = (
@@ -129,24 +82,27 @@ async def show_user_points(update: Update, context: ContextTypes.DEFAULT_TYPE) -
             f"⭐ مستواك الحالي: **{db_user.level}**\n"
             f"✨ خبرتك: **{db_user.experience}** XP\n"
             f"🏅 رتبتك: **{db_user.rank}**\n"
-            f"👥 عدد من دعوتهم: **{referral_count}** شخص"
+            f"👥 عدد من دعوتهم: **{referral_count}** شخص\n"
+            f"🔥 أيام نشاطك المتتالية: **{streak}**"
         )
 
-        await query.edit_message_text(
+        await edit_message_text(
+            query,
             points_text,
             parse_mode="Markdown",
             reply_markup=back_to_main_menu_button()
         )
-        logger.debug(f"عرض النقاط للمستخدم {user_id}")
+        logger.debug("عرض النقاط للمستخدم %s", user_id)
 
     except DatabaseError as e:
-        await query.edit_message_text(f"❌ خطأ في البيانات: {e.message}")
+        await edit_message_text(query, f"❌ خطأ في البيانات: {e.message}")
         logger.error(f"خطأ في استرجاع نقاط المستخدم {user_id}: {e.message}")
     except Exception as e:
-        await query.edit_message_text("❌ حدث خطأ غير متوقع.")
+        await edit_message_text(query, "❌ حدث خطأ غير متوقع.")
         logger.error(f"خطأ في show_user_points: {str(e)}", exc_info=True)
 
 
+@callback_router.route("user_referral", registered=True)
 async def show_user_referral_link(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """
     عرض رابط الإحالة الخاص بالمستخدم.
@@ -165,10 +121,11 @@ async def show_user_referral_link(update: Update, context: ContextTypes.DEFAULT_
     user_id: int = query.from_user.id
 
     try:
-        db_user: Optional[User] = get_user(user_id)
+        db_user: Optional[User] = context_user(update, context)
 
         if not db_user or not db_user.referral_code:
-            await query.edit_message_text(
+            await edit_message_text(
+                query,
                 "❌ خطأ، لم يتم العثور على رمز الإحالة. اضغط /start"
             )
             return
@@ -187,22 +144,24 @@ async def show_user_referral_link(update: Update, context: ContextTypes.DEFAULT_
             f"ستحصل على **{POINTS_PER_REFERRAL}** نقطة عن كل شخص ينضم من خلاله."
         )
 
-        await query.edit_message_text(
+        await edit_message_text(
+            query,
             referral_text,
             parse_mode="Markdown",
             reply_markup=back_to_main_menu_button(),
             disable_web_page_preview=True
         )
-        logger.debug(f"عرض رابط الإحالة للمستخدم {user_id}")
+        logger.debug("عرض رابط الإحالة للمستخدم %s", user_id)
 
     except DatabaseError as e:
-        await query.edit_message_text(f"❌ خطأ في البيانات: {e.message}")
+        await edit_message_text(query, f"❌ خطأ في البيانات: {e.message}")
         logger.error(f"خطأ في استرجاع رمز الإحالة {user_id}: {e.message}")
     except Exception as e:
-        await query.edit_message_text("❌ حدث خطأ غير متوقع.")
+        await edit_message_text(query, "❌ حدث خطأ غير متوقع.")
         logger.error(f"خطأ في show_user_referral_link: {str(e)}", exc_info=True)
 
 
+@callback_router.route("user_about", registered=True)
 async def show_about_menu(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """
     عرض قائمة معلومات البوت (حول البوت).
@@ -227,14 +186,16 @@ async def show_about_menu(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
         "👨‍💼 لوحة تحكم للمدير"
     )
 
-    await query.edit_message_text(
+    await edit_message_text(
+        query,
         about_text,
         parse_mode="Markdown",
         reply_markup=create_about_menu()
     )
-    logger.debug(f"عرض قائمة المعلومات للمستخدم {query.from_user.id}")
+    logger.debug("عرض قائمة المعلومات للمستخدم %s", query.from_user.id)
 
 
+@callback_router.route("user_feedback", registered=True)
 async def request_feedback(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """
     طلب إرسال ملاحظة أو تغذية راجعة من المستخدم.
@@ -249,7 +210,8 @@ async def request_feedback(update: Update, context: ContextTypes.DEFAULT_TYPE) -
         None
     """
     query = update.callback_query
-    await query.edit_message_text(
+    await edit_message_text(
+        query,
         "💬 **إرسال ملاحظة للمطور**\n\n"
         "اكتب الآن رسالتك وسأقوم بإيصالها مباشرة للمطور.\n"
         "لإلغاء العملية، اضغط على الزر أدناه.",
@@ -258,9 +220,10 @@ async def request_feedback(update: Update, context: ContextTypes.DEFAULT_TYPE) -
         )
     )
     context.user_data['awaiting_feedback'] = True
-    logger.debug(f"بدء استقبال الملاحظات من المستخدم {query.from_user.id}")
+    logger.debug("بدء استقبال الملاحظات من المستخدم %s", query.from_user.id)
 
 
+@callback_router.route("store_menu", registered=True)
 async def show_store_menu(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """
     عرض قائمة المتجر الرئيسية.
@@ -279,8 +242,9 @@ async def show_store_menu(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
         "اختر ما تريد من المتجر:\n"
     )
     
-    await query.edit_message_text(
+    await edit_message_text(
+        query,
         text,
         reply_markup=create_store_menu()
     )
-    logger.debug(f"عرض المتجر للمستخدم {query.from_user.id}")
+    logger.debug("عرض المتجر للمستخدم %s", query.from_user.id)
@@ -0,0 +1,229 @@
+"""
+قياس أداء معالجات التحديثات واستدعاءات Bot API.
+
+تُغلَّف دوال جميع المعالجات المسجلة في التطبيق لتسجيل زمن التنفيذ
+وعدد الأخطاء وعدد التنفيذات الجارية، ويُقاس زمن كل استدعاء لـ Bot API
+عبر طبقة طلبات HTTP مخصصة. زمن قاعدة البيانات يُقاس في مدير قاعدة البيانات.
+"""
+
+import functools
+import logging
+import time
+from types import FrameType
+from typing import Any, Awaitable, Callable, Iterable, List, Optional, Tuple
+
+from telegram.ext import Application, ApplicationHandlerStop, BaseHandler, ConversationHandler
+from telegram.request import HTTPXRequest
+
+from src.utils.metrics import metrics_registry, Histogram
+from src.utils.round_trips import record_api_call, record_handler
+from src.utils.tracing import tracer
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+HANDLER_SECONDS = metrics_registry.histogram(
+    "dragon_handler_seconds", "زمن تنفيذ معالجات التحديثات بالثواني", ("handler",)
+)
+HANDLER_ERRORS = metrics_registry.counter(
+    "dragon_handler_errors", "عدد الاستثناءات في معالجات التحديثات", ("handler",)
+)
+HANDLER_IN_FLIGHT = metrics_registry.gauge(
+    "dragon_handler_in_flight", "عدد المعالجات قيد التنفيذ حالياً", ("handler",)
+)
+BOT_API_SECONDS = metrics_registry.histogram(
+    "dragon_bot_api_seconds", "زمن استدعاءات Bot API بالثواني", ("method",)
+)
+BOT_API_ERRORS = metrics_registry.counter(
+    "dragon_bot_api_errors", "عدد استدعاءات Bot API الفاشلة", ("method",)
+)
+BOT_API_IN_FLIGHT = metrics_registry.gauge(
+    "dragon_bot_api_in_flight", "عدد طلبات Bot API الصادرة التي تنتظر الرد"
+)
+
+
+def instrument_callback(
+    callback: Callable[..., Awaitable[Any]],
+    name: str
+) -> Callable[..., Awaitable[Any]]:
+    """
+    تغليف دالة معالج لقياس زمنها وأخطائها.
+
+    Args:
+        callback (Callable): دالة المعالج الأصلية
+        name (str): اسم المعالج في المقاييس
+
+    Returns:
+        Callable: الدالة المغلفة (تعيد نفس قيمة الدالة الأصلية)
+    """
+    if getattr(callback, "__instrumented__", False):
+        return callback
+
+    @functools.wraps(callback)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        record_handler(name)
+        HANDLER_IN_FLIGHT.inc(name)
+        started = time.perf_counter()
+        try:
+            with tracer.span(f"handler {name}"):
+                return await callback(*args, **kwargs)
+        except ApplicationHandlerStop:
+            raise
+        except Exception:
+            HANDLER_ERRORS.inc(name)
+            raise
+        finally:
+            HANDLER_SECONDS.observe(time.perf_counter() - started, name)
+            HANDLER_IN_FLIGHT.dec(name)
+
+    wrapper.__instrumented__ = True  # type: ignore[attr-defined]
+    return wrapper
+
+
+def handler_name_from_frame(frame: Optional[FrameType]) -> str:
+    """
+    اسم المعالج المغلَّف الذي ينفّذ الإطار الحالي (بالبحث في سلسلة الإطارات).
+
+    Args:
+        frame (Optional[FrameType]): الإطار الأعمق
+
+    Returns:
+        str: اسم المعالج أو '-' إذا لم يكن الإطار داخل معالج
+    """
+    while frame is not None:
+        code = frame.f_code
+        if code.co_name == "wrapper" and code.co_filename == __file__:
+            return str(frame.f_locals.get("name", "-"))
+        frame = frame.f_back
+    return "-"
+
+
+def _iter_handlers(handlers: Iterable[BaseHandler]) -> Iterable[BaseHandler]:
+    """المرور على المعالجات بما فيها المعالجات الداخلية للمحادثات."""
+    for handler in handlers:
+        if isinstance(handler, ConversationHandler):
+            yield from _iter_handlers(handler.entry_points)
+            for state_handlers in handler.states.values():
+                yield from _iter_handlers(state_handlers)
+            yield from _iter_handlers(handler.fallbacks)
+        else:
+            yield handler
+
+
+def instrument_application(application: Application) -> int:
+    """
+    تغليف جميع المعالجات المسجلة في التطبيق بطبقة القياس.
+
+    يجب استدعاؤها بعد إضافة جميع المعالجات وقبل بدء التشغيل.
+
+    Args:
+        application (Application): تطبيق البوت
+
+    Returns:
+        int: عدد المعالجات التي تم تغليفها
+    """
+    count = 0
+    for group_handlers in application.handlers.values():
+        for handler in _iter_handlers(group_handlers):
+            callback = handler.callback
+            if getattr(callback, "__instrumented__", False):
+                continue
+            handler.callback = instrument_callback(callback, callback.__name__)
+            count += 1
+    logger.info("تم تغليف %d معالج بطبقة قياس الأداء", count)
+    return count
+
+
+class InstrumentedRequest(HTTPXRequest):
+    """
+    طبقة طلبات HTTP تقيس زمن كل استدعاء لـ Bot API حسب اسم الطريقة.
+    """
+
+    async def do_request(self, url: str, method: str, *args: Any, **kwargs: Any) -> Tuple[int, bytes]:
+        """
+        تنفيذ الطلب مع قياس زمنه.
+
+        Args:
+            url (str): رابط الطريقة في Bot API
+            method (str): طريقة HTTP
+
+        Returns:
+            Tuple[int, bytes]: رمز الحالة ومحتوى الرد
+        """
+        api_method = url.rsplit("/", 1)[-1]
+        record_api_call(api_method)
+        BOT_API_IN_FLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            with tracer.span(f"bot_api {api_method}"):
+                status, payload = await super().do_request(url, method, *args, **kwargs)
+        except Exception:
+            BOT_API_ERRORS.inc(api_method)
+            raise
+        finally:
+            BOT_API_SECONDS.observe(time.perf_counter() - started, api_method)
+            BOT_API_IN_FLIGHT.dec()
+
+        if status >= 400:
+            BOT_API_ERRORS.inc(api_method)
+        return status, payload
+
+
+def _latency_lines(histogram: Histogram, limit: int, with_handlers: bool = False) -> List[str]:
+    """أسطر المئينات لأبطأ السلاسل في مدرج تكراري (مرتبة حسب p95)."""
+    rows = []
+    for labels in histogram.label_sets():
+        rows.append((histogram.quantile(0.95, *labels), labels))
+    rows.sort(reverse=True)
+
+    lines = []
+    for p95, labels in rows[:limit]:
+        line = (
+            f"• `{labels[0]}` — {histogram.count(*labels)} مرة | "
+            f"p50 {histogram.quantile(0.5, *labels) * 1000:.0f} / "
+            f"p95 {p95 * 1000:.0f} / "
+            f"p99 {histogram.quantile(0.99, *labels) * 1000:.0f} ms"
+        )
+        if with_handlers:
+            line += (
+                f" | أخطاء {HANDLER_ERRORS.value(*labels):.0f}"
+                f" | جارية {HANDLER_IN_FLIGHT.value(*labels):.0f}"
+            )
+        lines.append(line)
+    return lines or ["• لا توجد بيانات بعد"]
+
+
+def build_performance_report(limit: int = 8) -> str:
+    """
+    إنشاء تقرير أداء بصيغة Markdown للمعالجات وقاعدة البيانات وBot API.
+
+    Args:
+        limit (int): الحد الأقصى للسطور في كل قسم (افتراضي: 8)
+
+    Returns:
+        str: التقرير
+    """
+    db_histogram = metrics_registry.get("dragon_db_query_seconds")
+    lag_histogram = metrics_registry.get("dragon_event_loop_lag_seconds")
+    stalls = metrics_registry.get("dragon_event_loop_stalls")
+
+    sections = [
+        "⏱️ **تقرير الأداء**\n",
+        "🧩 **المعالجات:**",
+        *_latency_lines(HANDLER_SECONDS, limit, with_handlers=True),
+        "\n🗄️ **قاعدة البيانات:**",
+        *(_latency_lines(db_histogram, limit) if db_histogram else ["• لا توجد بيانات بعد"]),
+        "\n📡 **Bot API:**",
+        *_latency_lines(BOT_API_SECONDS, limit),
+    ]
+    if lag_histogram and lag_histogram.count():
+        stall_lines = [
+            f"• توقفات في `{labels[0]}`: {count:.0f}"
+            for labels, count in sorted(stalls.items(), key=lambda item: -item[1])[:limit]
+        ] if stalls else []
+        sections += [
+            "\n🩺 **حلقة الأحداث:**",
+            f"• تأخر p50 {lag_histogram.quantile(0.5) * 1000:.0f} / "
+            f"p99 {lag_histogram.quantile(0.99) * 1000:.0f} ms",
+            *stall_lines,
+        ]
+    return "\n".join(sections)
@@ -0,0 +1,137 @@
+"""
+مراقب تأخر حلقة الأحداث (Event-loop lag).
+
+تقيس مهمة صغيرة تأخر جدولتها في كل دورة وتحدّث نبضة دورية،
+بينما يراقب خيط منفصل هذه النبضة. عند توقف الحلقة أكثر من الحد المحدد
+يلتقط الخيط مكدس الاستدعاءات الحالي لخيط الحلقة (الكود الحاجب نفسه)
+ويسجله مع اسم المعالج الذي يعمل على التحديث الحالي.
+"""
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from types import FrameType
+from typing import Deque, List, Optional
+
+from src.bot.instrumentation import handler_name_from_frame
+from src.core.config import LOOP_LAG_THRESHOLD_MS, LOOP_MONITOR_INTERVAL_MS
+from src.utils.metrics import metrics_registry
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+LOOP_LAG_SECONDS = metrics_registry.histogram(
+    "dragon_event_loop_lag_seconds", "تأخر جدولة حلقة الأحداث بالثواني",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+)
+LOOP_STALLS = metrics_registry.counter(
+    "dragon_event_loop_stalls", "عدد مرات توقف حلقة الأحداث فوق الحد", ("handler",)
+)
+
+_STACK_DEPTH: int = 15
+"""عدد الإطارات المحفوظة من مكدس الكود الحاجب"""
+
+
+@dataclass
+class StallReport:
+    """
+    تقرير توقف واحد لحلقة الأحداث.
+    """
+    timestamp: datetime
+    duration: float
+    handler: str
+    stack: List[str]
+
+
+class LoopLagMonitor:
+    """
+    مراقب تأخر حلقة الأحداث مع التقاط مكدس الكود الحاجب.
+    """
+
+    def __init__(self, interval: float = 0.1, threshold: float = 0.25, max_reports: int = 20):
+        """
+        تهيئة المراقب.
+
+        Args:
+            interval (float): الفاصل بين نبضات الحلقة بالثواني (افتراضي: 0.1)
+            threshold (float): حد التوقف الذي يستدعي التقاط المكدس (افتراضي: 0.25)
+            max_reports (int): عدد تقارير التوقف المحفوظة في الذاكرة (افتراضي: 20)
+        """
+        self.interval = interval
+        self.threshold = threshold
+        self.reports: Deque[StallReport] = deque(maxlen=max_reports)
+        self._heartbeat: float = time.monotonic()
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def start(self) -> None:
+        """بدء المراقبة (يُستدعى من داخل حلقة الأحداث)."""
+        if self._task is not None:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.get_running_loop().create_task(self._tick())
+        self._thread = threading.Thread(target=self._watch, name="loop-lag-monitor", daemon=True)
+        self._thread.start()
+        logger.info("🩺 مراقب تأخر الحلقة يعمل (الحد: %.0f ms)", self.threshold * 1000)
+
+    def stop(self) -> None:
+        """إيقاف المراقبة."""
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self._thread = None
+
+    async def _tick(self) -> None:
+        """قياس تأخر الجدولة وتحديث النبضة."""
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            LOOP_LAG_SECONDS.observe(max(0.0, loop.time() - expected))
+            self._heartbeat = time.monotonic()
+
+    def _watch(self) -> None:
+        """خيط المراقبة: التقاط المكدس عند توقف النبضة."""
+        reported = False
+        while not self._stop.wait(self.interval / 2):
+            stalled = time.monotonic() - self._heartbeat - self.interval
+            if stalled < self.threshold:
+                reported = False
+                continue
+            if reported:
+                continue
+            reported = True
+
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is not None:
+                self._report(frame, stalled)
+
+    def _report(self, frame: FrameType, stalled: float) -> StallReport:
+        """تسجيل تقرير توقف من إطار خيط الحلقة."""
+        handler = handler_name_from_frame(frame)
+        stack = traceback.format_list(traceback.extract_stack(frame)[-_STACK_DEPTH:])
+        report = StallReport(datetime.now(), stalled, handler, stack)
+        self.reports.append(report)
+        LOOP_STALLS.inc(handler)
+        logger.warning(
+            "🐌 حلقة الأحداث متوقفة منذ %.0f ms في المعالج %s:\n%s",
+            stalled * 1000, handler, "".join(stack)
+        )
+        return report
+
+
+# إنشاء مثيل من مراقب الحلقة
+loop_monitor = LoopLagMonitor(
+    interval=LOOP_MONITOR_INTERVAL_MS / 1000,
+    threshold=LOOP_LAG_THRESHOLD_MS / 1000
+)
@@ -0,0 +1,157 @@
+"""
+تعديل الرسائل مع تجاهل التعديلات التي لا تغير شيئاً.
+
+يُحفظ لكل رسالة (المحادثة، معرّف الرسالة) بصمة آخر نص وأزرار أرسلها
+البوت. إذا طُلب تعديل بنفس البصمة (مثل الضغط على "تحديث" أو على نفس
+القائمة مرتين) لا يُستدعى Bot API أصلاً: الموجّه رد على الاستعلام قبل
+المعالج، فلا يبقى ما يُرسل. يتجنب ذلك أيضاً خطأ "message is not modified".
+
+كل تعديلات نصوص الرسائل يجب أن تمر عبر edit_message_text حتى تبقى
+البصمات مطابقة لمحتوى الرسائل الفعلي.
+"""
+
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+from telegram import Message
+from telegram.error import BadRequest
+
+from src.utils.metrics import record_cache_lookup
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+_MAX_FINGERPRINTS: int = 10000
+"""الحد الأقصى لعدد الرسائل المحفوظة بصماتها (يُحذف الأقدم استخداماً)"""
+
+
+def _fingerprint(text: str, reply_markup: Any, parse_mode: Optional[str]) -> bytes:
+    """بصمة محتوى الرسالة المعروض (النص وطريقة تنسيقه والأزرار)."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(text.encode())
+    digest.update(b"\0" + (parse_mode or "").encode() + b"\0")
+    if reply_markup is not None:
+        digest.update(reply_markup.to_json().encode())
+    return digest.digest()
+
+
+def _message_key(query: Any) -> Optional[Hashable]:
+    """مفتاح رسالة الاستعلام، أو None إذا تعذر تحديدها."""
+    message = getattr(query, "message", None)
+    if message is not None:
+        # chat متاح أيضاً في InaccessibleMessage (الرسائل القديمة) بخلاف chat_id
+        chat = getattr(message, "chat", None)
+        if chat is None:
+            return None
+        return chat.id, message.message_id
+    inline_message_id = getattr(query, "inline_message_id", None)
+    if inline_message_id:
+        return inline_message_id
+    return None
+
+
+class MessageFingerprints:
+    """
+    بصمات آخر محتوى معروض لكل رسالة (LRU محدود الحجم).
+    """
+
+    def __init__(self, max_size: int = _MAX_FINGERPRINTS):
+        """
+        تهيئة الذاكرة.
+
+        Args:
+            max_size (int): الحد الأقصى لعدد الرسائل
+        """
+        self.max_size = max_size
+        self._fingerprints: "OrderedDict[Hashable, bytes]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._fingerprints)
+
+    def matches(self, key: Hashable, fingerprint: bytes) -> bool:
+        """
+        هل آخر محتوى معروض للرسالة مطابق للبصمة؟
+
+        Args:
+            key (Hashable): مفتاح الرسالة
+            fingerprint (bytes): البصمة
+
+        Returns:
+            bool: True إذا كان المحتوى مطابقاً
+        """
+        hit = self._fingerprints.get(key) == fingerprint
+        if hit:
+            self._fingerprints.move_to_end(key)
+        record_cache_lookup("message_fingerprints", hit)
+        return hit
+
+    def remember(self, key: Hashable, fingerprint: bytes) -> None:
+        """
+        حفظ بصمة آخر محتوى معروض للرسالة.
+
+        Args:
+            key (Hashable): مفتاح الرسالة
+            fingerprint (bytes): البصمة
+        """
+        self._fingerprints[key] = fingerprint
+        self._fingerprints.move_to_end(key)
+        if len(self._fingerprints) > self.max_size:
+            self._fingerprints.popitem(last=False)
+
+
+# إنشاء مثيل من ذاكرة البصمات
+message_fingerprints = MessageFingerprints()
+
+
+async def edit_message_text(query: Any, text: str, **kwargs: Any) -> bool:
+    """
+    تعديل نص رسالة استعلام زر ما لم يكن المحتوى المعروض مطابقاً.
+
+    Args:
+        query (Any): استعلام الزر (CallbackQuery)
+        text (str): النص الجديد
+        **kwargs: بقية معاملات edit_message_text (reply_markup, parse_mode, ...)
+
+    Returns:
+        bool: True إذا عُدلت الرسالة، False إذا كان المحتوى مطابقاً فلم تُعدل
+    """
+    key = _message_key(query)
+    if key is None:
+        await query.edit_message_text(text, **kwargs)
+        return True
+
+    fingerprint = _fingerprint(text, kwargs.get("reply_markup"), kwargs.get("parse_mode"))
+    if message_fingerprints.matches(key, fingerprint):
+        return False
+
+    try:
+        await query.edit_message_text(text, **kwargs)
+    except BadRequest as e:
+        if "not modified" not in str(e).lower():
+            raise
+        logger.debug("تعديل بلا تغيير للرسالة %s", key)
+        message_fingerprints.remember(key, fingerprint)
+        return False
+    message_fingerprints.remember(key, fingerprint)
+    return True
+
+
+async def reply_text(message: Message, text: str, **kwargs: Any) -> Message:
+    """
+    الرد برسالة جديدة مع حفظ بصمتها (حتى لا يُعاد إرسال نفس المحتوى عند تعديلها).
+
+    Args:
+        message (Message): الرسالة المردود عليها
+        text (str): نص الرد
+        **kwargs: بقية معاملات reply_text (reply_markup, parse_mode, ...)
+
+    Returns:
+        Message: الرسالة المرسلة
+    """
+    sent = await message.reply_text(text, **kwargs)
+    message_fingerprints.remember(
+        (sent.chat.id, sent.message_id),
+        _fingerprint(text, kwargs.get("reply_markup"), kwargs.get("parse_mode"))
+    )
+    return sent
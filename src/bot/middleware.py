@@ -0,0 +1,172 @@
+"""
+مراحل المعالجة المسبقة (Middleware) للتحديثات.
+
+تُسجَّل هذه المعالجات في مجموعات سالبة داخل Application
+لتعمل على كل تحديث قبل معالجات الأوامر والأزرار.
+آخر هذه المراحل تحمّل المستخدم المسجل مرة واحدة لكل تحديث وتربطه بالسياق
+(context_user)، وترفض تحديثات المستخدمين المحظورين قبل أي معالج.
+"""
+
+import logging
+import time
+from collections import deque
+from typing import Deque, List, Optional
+
+from telegram import Update
+from telegram.ext import ApplicationHandlerStop, ContextTypes
+
+from src.database import get_user
+from src.models.user import User
+from src.utils.activity_bitmaps import activity_bitmaps
+from src.utils.activity_tracker import activity_tracker
+from src.utils.metrics import metrics_registry
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+METRICS_GROUP: int = -4
+"""مجموعة معالج عدّ التحديثات (تعمل قبل أي معالج آخر)"""
+
+ACTIVITY_GROUP: int = -3
+"""مجموعة معالج تتبع النشاط"""
+
+USER_GROUP: int = -1
+"""مجموعة معالج تحميل المستخدم وفحص الحظر (آخر مرحلة قبل المعالجات)"""
+
+BANNED_MESSAGE: str = "❌ أنت محظور من استخدام هذا البوت."
+"""الرد على تحديثات المستخدمين المحظورين"""
+
+UPDATES_TOTAL = metrics_registry.counter(
+    "dragon_updates", "عدد التحديثات المستلمة حسب النوع", ("type",)
+)
+UPDATES_PER_SECOND = metrics_registry.gauge(
+    "dragon_updates_per_second", "معدل التحديثات المستلمة خلال آخر دقيقة"
+)
+BANNED_UPDATES = metrics_registry.counter(
+    "dragon_banned_updates", "عدد التحديثات المرفوضة من مستخدمين محظورين"
+)
+
+_RATE_WINDOW: int = 60
+"""طول نافذة حساب معدل التحديثات بالثواني"""
+
+# عدد التحديثات لكل ثانية خلال النافذة: [الثانية، العدد]
+_recent_updates: Deque[List[int]] = deque(maxlen=_RATE_WINDOW)
+
+
+def _updates_per_second() -> float:
+    """متوسط عدد التحديثات في الثانية خلال آخر دقيقة."""
+    cutoff = int(time.monotonic()) - _RATE_WINDOW
+    return sum(count for second, count in _recent_updates if second > cutoff) / _RATE_WINDOW
+
+
+UPDATES_PER_SECOND.set_function(_updates_per_second)
+
+
+def _update_type(update: Update) -> str:
+    """نوع التحديث المستخدم في تسميات المقاييس."""
+    if update.callback_query:
+        return "callback_query"
+    if update.message:
+        return "command" if update.message.text and update.message.text.startswith("/") else "message"
+    return "other"
+
+
+async def count_update(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """
+    عدّ التحديثات المستلمة حسب النوع لحساب المعدل.
+
+    Args:
+        update (Update): تحديث Telegram
+        context (ContextTypes.DEFAULT_TYPE): السياق
+
+    Returns:
+        None
+    """
+    UPDATES_TOTAL.inc(_update_type(update))
+    second = int(time.monotonic())
+    if _recent_updates and _recent_updates[-1][0] == second:
+        _recent_updates[-1][1] += 1
+    else:
+        _recent_updates.append([second, 1])
+
+
+async def track_user_activity(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """
+    تسجيل المستخدم صاحب التحديث في رسم النشاط اليومي.
+
+    Args:
+        update (Update): تحديث Telegram
+        context (ContextTypes.DEFAULT_TYPE): السياق
+
+    Returns:
+        None
+    """
+    if update.effective_user:
+        activity_tracker.record(update.effective_user.id)
+        activity_bitmaps.record_activity(update.effective_user.id)
+
+
+def set_context_user(context: ContextTypes.DEFAULT_TYPE, db_user: Optional[User]) -> None:
+    """
+    ربط المستخدم المسجل بسياق التحديث الحالي.
+
+    Args:
+        context (ContextTypes.DEFAULT_TYPE): السياق (مشترك بين جميع معالجات التحديث)
+        db_user (Optional[User]): المستخدم (None إذا لم يكن مسجلاً)
+    """
+    context.db_user = db_user
+    context.db_user_loaded = True
+
+
+def context_user(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Optional[User]:
+    """
+    المستخدم المسجل صاحب التحديث، يُقرأ من قاعدة البيانات مرة واحدة لكل تحديث.
+
+    يعيد المستخدم المرتبط بالسياق إن حمّلته مرحلة load_user_context،
+    وإلا يحمّله الآن ويربطه بالسياق لبقية معالجات التحديث.
+
+    Args:
+        update (Update): تحديث Telegram
+        context (ContextTypes.DEFAULT_TYPE): السياق
+
+    Returns:
+        Optional[User]: المستخدم أو None إذا لم يكن مسجلاً
+
+    Raises:
+        DatabaseError: في حالة حدوث خطأ في قاعدة البيانات
+    """
+    if getattr(context, "db_user_loaded", False):
+        return context.db_user
+    user = update.effective_user
+    db_user = get_user(user.id) if user else None
+    set_context_user(context, db_user)
+    return db_user
+
+
+async def load_user_context(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """
+    تحميل المستخدم صاحب التحديث وربطه بالسياق، ورفض المستخدمين المحظورين.
+
+    Args:
+        update (Update): تحديث Telegram
+        context (ContextTypes.DEFAULT_TYPE): السياق
+
+    Returns:
+        None
+
+    Raises:
+        ApplicationHandlerStop: إذا كان المستخدم محظوراً (لإيقاف بقية المعالجات)
+    """
+    if not update.effective_user:
+        return
+
+    db_user = context_user(update, context)
+    if not (db_user and db_user.is_banned):
+        return
+
+    BANNED_UPDATES.inc()
+    logger.warning("محاولة وصول من مستخدم محظور: %s", db_user.user_id)
+    if update.callback_query:
+        await update.callback_query.answer(BANNED_MESSAGE, show_alert=True)
+    elif update.effective_message:
+        await update.effective_message.reply_text(BANNED_MESSAGE)
+    raise ApplicationHandlerStop
@@ -0,0 +1,78 @@
+"""
+التحليل الحي للأداء عند الطلب (/profile N).
+
+يفعّل cProfile على خيط حلقة الأحداث لعدد محدد من الثواني أثناء
+معالجة التحديثات الحقيقية، ثم يعيد أعلى النقاط الساخنة حسب الزمن التراكمي
+مع ملف إحصائيات pstats للأدوات الخارجية (snakeviz، pstats، ...).
+لا يوجد أي حمل إضافي عندما لا يكون التحليل قيد التشغيل.
+"""
+
+import asyncio
+import cProfile
+import io
+import logging
+import marshal
+import pstats
+from typing import Tuple
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+MAX_PROFILE_SECONDS: int = 300
+"""الحد الأقصى لمدة جلسة التحليل بالثواني"""
+
+
+class LiveProfiler:
+    """
+    محلل أداء حي لجلسة واحدة في كل مرة.
+    """
+
+    def __init__(self):
+        """تهيئة المحلل."""
+        self._running: bool = False
+
+    @property
+    def running(self) -> bool:
+        """هل توجد جلسة تحليل قيد التشغيل؟"""
+        return self._running
+
+    async def profile(self, seconds: float, top: int = 40) -> Tuple[str, bytes]:
+        """
+        تحليل حركة البوت الحية لعدد من الثواني.
+
+        Args:
+            seconds (float): مدة التحليل بالثواني (بحد أقصى MAX_PROFILE_SECONDS)
+            top (int): عدد الدوال في التقرير النصي (افتراضي: 40)
+
+        Returns:
+            Tuple[str, bytes]: (التقرير النصي مرتباً حسب الزمن التراكمي، ملف pstats)
+
+        Raises:
+            RuntimeError: إذا كانت هناك جلسة تحليل أخرى قيد التشغيل
+        """
+        if self._running:
+            raise RuntimeError("جلسة تحليل أخرى قيد التشغيل")
+
+        seconds = max(1.0, min(float(seconds), MAX_PROFILE_SECONDS))
+        profiler = cProfile.Profile()
+        self._running = True
+        logger.info("🔬 بدء تحليل الأداء الحي لمدة %.0f ثانية", seconds)
+        try:
+            profiler.enable()
+            await asyncio.sleep(seconds)
+        finally:
+            profiler.disable()
+            self._running = False
+
+        profiler.create_stats()
+        raw = marshal.dumps(profiler.stats)
+
+        report = io.StringIO()
+        report.write(f"Live profile: {seconds:.0f}s of traffic\n\n")
+        stats = pstats.Stats(profiler, stream=report)
+        stats.strip_dirs().sort_stats(pstats.SortKey.CUMULATIVE).print_stats(top)
+        logger.info("✅ انتهى تحليل الأداء الحي")
+        return report.getvalue(), raw
+
+
+# إنشاء مثيل من المحلل الحي
+live_profiler = LiveProfiler()
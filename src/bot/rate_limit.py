@@ -0,0 +1,204 @@
+"""
+تحديد معدل طلبات كل مستخدم (Anti-flood) بدلو رموز (Token bucket).
+
+لكل مستخدم دلو لكل أمر أو بادئة زر لها حد خاص في RATE_LIMITS، ودلو مشترك
+(default) لبقية التحديثات. يُحذف الدلو من الذاكرة بعد امتلائه من جديد
+(فغيابه يساوي دلواً ممتلئاً)، فلا ينمو الجدول إلا بعدد المستخدمين النشطين حالياً.
+
+مرحلة التحديد تعمل قبل تحميل المستخدم من قاعدة البيانات، فيُرد على الزر
+المحدود برسالة قصيرة دون أي عملية على قاعدة البيانات أو تعديل للرسالة.
+"""
+
+import logging
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from telegram import Update
+from telegram.ext import ApplicationHandlerStop, ContextTypes
+
+from src.bot.router import SEPARATOR
+from src.utils.helpers import is_admin
+from src.utils.metrics import metrics_registry
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+THROTTLE_GROUP: int = -2
+"""مجموعة مرحلة تحديد المعدل (قبل تحميل المستخدم من قاعدة البيانات)"""
+
+DEFAULT_SCOPE: str = "default"
+"""نطاق التحديثات التي ليس لها حد خاص"""
+
+THROTTLED_MESSAGE: str = "⏳ مهلاً، طلبات كثيرة. حاول بعد قليل."
+"""الرد على الأزرار المحدودة"""
+
+THROTTLED_UPDATES = metrics_registry.counter(
+    "dragon_throttled_updates", "عدد التحديثات المرفوضة بسبب تجاوز حد المعدل", ("scope",)
+)
+
+_SWEEP_INTERVAL: float = 5.0
+"""أقل فاصل بين عمليات حذف الدلاء الممتلئة بالثواني"""
+
+
+class TokenBuckets:
+    """
+    دلاء رموز حسب المفتاح مع حذف الدلاء الخاملة.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        """
+        تهيئة المخزن.
+
+        Args:
+            clock (Callable[[], float]): مصدر الوقت (قابل للاستبدال في الاختبارات)
+        """
+        self._clock = clock
+        # المفتاح ← [الرموز المتبقية، وقت آخر تحديث، وقت الامتلاء من جديد]
+        self._buckets: Dict[Tuple[int, str], List[float]] = {}
+        self._next_sweep = 0.0
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def allow(self, key: Tuple[int, str], rate: float, burst: int) -> bool:
+        """
+        استهلاك رمز من دلو المفتاح إن وُجد.
+
+        Args:
+            key (Tuple[int, str]): (معرّف المستخدم، النطاق)
+            rate (float): عدد الرموز المضافة في الثانية
+            burst (int): سعة الدلو
+
+        Returns:
+            bool: True إذا سُمح بالطلب
+        """
+        now = self._clock()
+        if now >= self._next_sweep:
+            self._sweep(now)
+
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            tokens = burst
+        else:
+            tokens = min(burst, bucket[0] + (now - bucket[1]) * rate)
+
+        if tokens < 1:
+            bucket[0], bucket[1] = tokens, now
+            return False
+
+        tokens -= 1
+        full_at = now + (burst - tokens) / rate
+        if bucket is None:
+            self._buckets[key] = [tokens, now, full_at]
+        else:
+            bucket[0], bucket[1], bucket[2] = tokens, now, full_at
+        return True
+
+    def _sweep(self, now: float) -> None:
+        """حذف الدلاء التي امتلأت من جديد."""
+        self._next_sweep = now + _SWEEP_INTERVAL
+        expired = [key for key, bucket in self._buckets.items() if bucket[2] <= now]
+        for key in expired:
+            del self._buckets[key]
+
+
+def update_scope(update: Update) -> Optional[str]:
+    """
+    نطاق التحديث: مفتاح مسار الزر أو اسم الأمر.
+
+    Args:
+        update (Update): التحديث
+
+    Returns:
+        Optional[str]: النطاق، أو None للرسائل العادية (تُحسب في default)
+    """
+    if update.callback_query:
+        return (update.callback_query.data or "").partition(SEPARATOR)[0]
+    message = update.message
+    if message and message.text and message.text.startswith("/"):
+        return message.text.split(maxsplit=1)[0][1:].split("@", 1)[0].lower()
+    return None
+
+
+class RateLimiter:
+    """
+    مرحلة تحديد معدل طلبات كل مستخدم.
+    """
+
+    def __init__(
+        self,
+        limits: Optional[Dict[str, Tuple[float, int]]] = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        تهيئة المحدِّد.
+
+        Args:
+            limits (Optional[Dict[str, Tuple[float, int]]]): النطاق ← (المعدل في الثانية، السعة)
+            clock (Callable[[], float]): مصدر الوقت
+        """
+        self.limits: Dict[str, Tuple[float, int]] = dict(limits or {})
+        self.buckets = TokenBuckets(clock)
+        metrics_registry.gauge(
+            "dragon_rate_limit_buckets", "عدد دلاء تحديد المعدل المحفوظة في الذاكرة"
+        ).set_function(lambda: len(self.buckets))
+
+    def configure(self, limits: Dict[str, Tuple[float, int]]) -> None:
+        """
+        ضبط الحدود (يُستدعى عند بدء التشغيل).
+
+        Args:
+            limits (Dict[str, Tuple[float, int]]): النطاق ← (المعدل في الثانية، السعة)
+        """
+        self.limits = dict(limits)
+
+    @property
+    def enabled(self) -> bool:
+        """هل يوجد أي حد مفعّل؟"""
+        return bool(self.limits)
+
+    def allow(self, user_id: int, scope: Optional[str]) -> Tuple[bool, str]:
+        """
+        هل يُسمح بطلب المستخدم في هذا النطاق؟
+
+        Args:
+            user_id (int): معرّف المستخدم
+            scope (Optional[str]): نطاق التحديث
+
+        Returns:
+            Tuple[bool, str]: (هل سُمح، النطاق المحتسب)
+        """
+        if scope not in self.limits:
+            scope = DEFAULT_SCOPE
+        limit = self.limits.get(scope)
+        if limit is None:
+            return True, scope
+        return self.buckets.allow((user_id, scope), *limit), scope
+
+    async def throttle(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        """
+        معالج TypeHandler: رفض تحديثات المستخدم الذي تجاوز حده.
+
+        Args:
+            update (Update): تحديث Telegram
+            context (ContextTypes.DEFAULT_TYPE): السياق
+
+        Raises:
+            ApplicationHandlerStop: إذا تجاوز المستخدم حده (لإيقاف بقية المعالجات)
+        """
+        user = update.effective_user
+        if not self.limits or user is None or is_admin(user.id):
+            return
+
+        allowed, scope = self.allow(user.id, update_scope(update))
+        if allowed:
+            return
+
+        THROTTLED_UPDATES.inc(scope)
+        logger.debug("تحديد معدل المستخدم %s في %s", user.id, scope)
+        if update.callback_query:
+            await update.callback_query.answer(THROTTLED_MESSAGE)
+        raise ApplicationHandlerStop
+
+
+# إنشاء مثيل من المحدِّد (معطل حتى استدعاء configure)
+rate_limiter = RateLimiter()
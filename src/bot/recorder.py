@@ -0,0 +1,209 @@
+"""
+مسجّل التحديثات الواردة لإعادة تشغيلها لاحقاً (Record/Replay).
+
+يلتقط عينة من التحديثات (حسب المستخدم، فتُسجَّل جلسة المستخدم كاملة)
+ويكتبها كأسطر JSON بعد إخفاء البيانات الشخصية: تُستبدل المعرّفات بقيم
+مجزأة ثابتة (نفس المستخدم ← نفس المعرّف) وتُحذف الأسماء وتُقنّع النصوص الحرة.
+تتم الكتابة من خيط منفصل حتى لا تُحجب حلقة الأحداث.
+أداة إعادة التشغيل: src/devtools/replay.py
+"""
+
+import atexit
+import hashlib
+import json
+import logging
+import queue
+import re
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from telegram import Update
+from telegram.ext import ContextTypes
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+RECORD_GROUP: int = -5
+"""مجموعة معالج التسجيل (بعد تصفية أنواع التحديثات وقبل بقية المراحل)"""
+
+_PERSONAL_FIELDS = ("first_name", "last_name", "username", "title", "bio", "phone_number")
+_ID_FIELDS = ("id", "user_id", "chat_id")
+_USER_ID_CALLBACKS = ("ban", "unban", "add_points")
+"""مفاتيح أزرار حمولتها معرّف مستخدم (بالصيغة key:<user_id>)"""
+
+_NUMBER = re.compile(r"-?[0-9]+")
+"""نص رقمي يُجزأ كمعرّف"""
+
+
+class UpdateRecorder:
+    """
+    مسجّل تحديثات بالعينة مع إخفاء البيانات الشخصية.
+    """
+
+    def __init__(self, path: str = "", sample_rate: float = 0.0, salt: str = ""):
+        """
+        تهيئة المسجّل.
+
+        Args:
+            path (str): مسار ملف التسجيل JSONL (فارغ لتعطيله)
+            sample_rate (float): نسبة المستخدمين الذين تُسجَّل تحديثاتهم بين 0 و 1
+            salt (str): ملح تجزئة المعرّفات
+        """
+        self.path = path
+        self.sample_rate = sample_rate
+        self.salt = salt
+        self._queue: "queue.SimpleQueue[Optional[str]]" = queue.SimpleQueue()
+        self._writer: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def configure(self, path: str, sample_rate: float, salt: str) -> None:
+        """
+        ضبط إعدادات المسجّل (يُستدعى عند بدء التشغيل).
+
+        Args:
+            path (str): مسار ملف التسجيل
+            sample_rate (float): نسبة المستخدمين المسجَّلين
+            salt (str): ملح تجزئة المعرّفات
+        """
+        self.path = path
+        self.sample_rate = sample_rate
+        self.salt = salt
+        if self.enabled:
+            logger.info("🎙️ تسجيل التحديثات مفعّل (العينة: %.1f%%) → %s", sample_rate * 100, path)
+
+    @property
+    def enabled(self) -> bool:
+        """هل التسجيل مفعّل؟"""
+        return bool(self.path) and self.sample_rate > 0
+
+    def _hash_id(self, value: int) -> int:
+        """معرّف مجزأ ثابت بنفس الإشارة (معرّفات المجموعات سالبة)."""
+        digest = hashlib.sha256(f"{self.salt}:{abs(value)}".encode()).digest()
+        hashed = int.from_bytes(digest[:6], "big") or 1
+        return -hashed if value < 0 else hashed
+
+    def is_sampled(self, user_id: Optional[int]) -> bool:
+        """
+        هل يقع المستخدم ضمن العينة؟ (قرار ثابت لكل مستخدم)
+
+        Args:
+            user_id (Optional[int]): معرّف المستخدم
+
+        Returns:
+            bool: True إذا كان يجب تسجيل تحديثاته
+        """
+        if self.sample_rate >= 1:
+            return True
+        key = abs(user_id) if user_id is not None else 0
+        digest = hashlib.sha256(f"sample:{self.salt}:{key}".encode()).digest()
+        return int.from_bytes(digest[:4], "big") / 2 ** 32 < self.sample_rate
+
+    def anonymize(self, data: Any) -> Any:
+        """
+        إخفاء البيانات الشخصية في تحديث بصيغة قاموس.
+
+        تُجزأ المعرّفات (بما فيها معرّفات المستخدمين في بيانات الأزرار
+        ومستخدمي إشارات text_mention والنصوص الرقمية كالمعرّف المكتوب عند
+        البحث عن مستخدم)، وتُستبدل الأسماء، وتُقنّع النصوص الحرة مع الإبقاء
+        على الأوامر وبيانات الأزرار اللازمة لإعادة التشغيل.
+
+        Args:
+            data (Any): التحديث أو جزء منه
+
+        Returns:
+            Any: نسخة مُخفاة من البيانات
+        """
+        if isinstance(data, list):
+            return [self.anonymize(item) for item in data]
+        if not isinstance(data, dict):
+            return data
+
+        result: Dict[str, Any] = {}
+        for key, value in data.items():
+            if key in _ID_FIELDS and isinstance(value, int) and not isinstance(value, bool):
+                result[key] = self._hash_id(value)
+            elif key in _PERSONAL_FIELDS and isinstance(value, str):
+                result[key] = key
+            elif key in ("text", "caption") and isinstance(value, str):
+                result[key] = self._anonymize_text(value)
+            elif key == "data" and isinstance(value, str):
+                result[key] = self._anonymize_callback_data(value)
+            else:
+                result[key] = self.anonymize(value)
+        return result
+
+    def _anonymize_text(self, text: str) -> str:
+        """تجزئة النص الرقمي (قد يكون معرّف مستخدم) وتقنيع بقية النصوص الحرة."""
+        number = text.strip()
+        if _NUMBER.fullmatch(number):
+            return str(self._hash_id(int(number)))
+        return _mask_text(text)
+
+    def _anonymize_callback_data(self, data: str) -> str:
+        """تجزئة معرّف المستخدم في بيانات أزرار مثل ban:<user_id>."""
+        action, sep, payload = data.partition(":")
+        if sep and action in _USER_ID_CALLBACKS and payload.isdigit():
+            return f"{action}:{self._hash_id(int(payload))}"
+        return data
+
+    async def record(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        """
+        معالج TypeHandler: تسجيل التحديث إذا كان مستخدمه ضمن العينة.
+
+        Args:
+            update (Update): التحديث
+            context (ContextTypes.DEFAULT_TYPE): السياق
+        """
+        if not self.enabled:
+            return
+        user = update.effective_user
+        if not self.is_sampled(user.id if user else None):
+            return
+
+        line = json.dumps(
+            {"ts": round(time.time(), 3), "update": self.anonymize(update.to_dict())},
+            ensure_ascii=False
+        )
+        self._ensure_writer()
+        self._queue.put(line)
+
+    def _ensure_writer(self) -> None:
+        """تشغيل خيط الكتابة عند أول تحديث مسجَّل."""
+        if self._writer is not None:
+            return
+        with self._lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_loop, name="update-recorder", daemon=True)
+                self._writer.start()
+                atexit.register(self.close)
+
+    def _write_loop(self) -> None:
+        """خيط الكتابة: إضافة التحديثات المسجلة إلى الملف."""
+        while True:
+            line = self._queue.get()
+            if line is None:
+                return
+            try:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(line + "\n")
+            except OSError as e:
+                logger.error(f"فشل كتابة التحديث المسجَّل: {e}")
+
+    def close(self) -> None:
+        """إيقاف خيط الكتابة بعد كتابة التحديثات المتبقية."""
+        writer = self._writer
+        if writer is not None:
+            self._queue.put(None)
+            writer.join(timeout=5)
+            self._writer = None
+
+
+def _mask_text(text: str) -> str:
+    """تقنيع النص الحر مع الإبقاء على الأوامر."""
+    if text.startswith("/"):
+        return text
+    return "".join(ch if ch.isspace() else "x" for ch in text)
+
+
+# إنشاء مثيل من المسجّل (معطل حتى استدعاء configure)
+update_recorder = UpdateRecorder()
@@ -0,0 +1,284 @@
+"""
+موجّه استعلامات الأزرار (Callback Router).
+
+جدول توجيه واحد بدلاً من عدة CallbackQueryHandler بأنماط متداخلة
+وسلاسل if/elif داخل المعالجات. بيانات الزر بالصيغة "key" أو "key:payload"،
+ويُبحث عن المفتاح في قاموس (O(1)) ثم تُحلَّل الحمولة بالنوع المعلن للمسار
+(مثل claim_reward:<id> أو ban:<uid>). صلاحية المدير وشرط التسجيل يُعلنان
+لكل مسار ويُفحصان مركزياً قبل استدعاء المعالج. الضغط المزدوج وإعادة تسليم
+نفس الاستعلام يُرد عليهما دون استدعاء المعالج مرة أخرى (انظر src.bot.dedup).
+
+تسجيل مسار:
+    @callback_router.route("ban", admin=True, payload=int)
+    async def ban_user_handler(update, context, user_id): ...
+"""
+
+import logging
+import re
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from telegram import Update
+from telegram.ext import CallbackQueryHandler, ContextTypes
+
+from src.bot.dedup import CallbackDeduplicator, DONE, IN_FLIGHT, REDELIVERED
+from src.bot.instrumentation import instrument_callback
+from src.bot.messaging import edit_message_text
+from src.bot.middleware import context_user
+from src.utils.exceptions import DatabaseError
+from src.utils.helpers import is_admin
+from src.utils.metrics import metrics_registry
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+SEPARATOR: str = ":"
+"""الفاصل بين مفتاح المسار والحمولة في بيانات الزر"""
+
+DENIED_MESSAGE: str = "ليس لديك صلاحية لهذا الإجراء!"
+"""الرد على غير المسؤولين عند ضغط زر إداري"""
+
+UNKNOWN_MESSAGE: str = "⚠️ هذا الزر لم يعد متاحاً."
+"""الرد على الأزرار غير المعروفة أو القديمة"""
+
+UNREGISTERED_MESSAGE: str = "⚠️ عذرًا، حدث خطأ. يرجى الضغط على /start للبدء من جديد."
+"""الرد على مستخدم غير مسجل في مسار يتطلب التسجيل"""
+
+IN_FLIGHT_MESSAGE: str = "⏳ جارٍ تنفيذ طلبك..."
+"""الرد على تكرار زر ما زال طلبه الأول قيد التنفيذ"""
+
+ALREADY_DONE_MESSAGE: str = "✅ تم تنفيذ هذا الطلب."
+"""الرد على تكرار زر نُفذ طلبه الأول (للمسارات التي ترد معالجاتها بنفسها)"""
+
+UNROUTED_CALLBACKS = metrics_registry.counter(
+    "dragon_unrouted_callbacks", "عدد استعلامات الأزرار التي لم يُعثر لها على مسار"
+)
+DENIED_CALLBACKS = metrics_registry.counter(
+    "dragon_denied_callbacks", "عدد استعلامات الأزرار الإدارية المرفوضة", ("route",)
+)
+DUPLICATE_CALLBACKS = metrics_registry.counter(
+    "dragon_duplicate_callbacks", "عدد استعلامات الأزرار المكررة التي لم تُنفذ", ("route", "reason")
+)
+
+RouteCallback = Callable[..., Awaitable[Any]]
+
+
+@dataclass(frozen=True)
+class Route:
+    """
+    مسار واحد في جدول التوجيه.
+    """
+    key: str
+    callback: RouteCallback
+    admin: bool = False
+    payload: Optional[Callable[[str], Any]] = None
+    answer: bool = True
+    registered: bool = False
+
+
+class CallbackRouter:
+    """
+    جدول توجيه استعلامات الأزرار حسب مفتاح البيانات.
+    """
+
+    def __init__(self):
+        """تهيئة جدول توجيه فارغ."""
+        self._routes: Dict[str, Route] = {}
+        self.deduplicator = CallbackDeduplicator()
+
+    def add(
+        self,
+        key: str,
+        callback: RouteCallback,
+        admin: bool = False,
+        payload: Optional[Callable[[str], Any]] = None,
+        answer: bool = True,
+        registered: bool = False
+    ) -> Route:
+        """
+        إضافة مسار إلى الجدول.
+
+        Args:
+            key (str): مفتاح المسار (الجزء قبل ":" في بيانات الزر)
+            callback (RouteCallback): المعالج؛ يُستدعى بـ (update, context[, payload])
+            admin (bool): هل المسار مخصص للمسؤولين فقط؟
+            payload (Optional[Callable[[str], Any]]): محلل الحمولة (مثل int)، أو None لمسار بدون حمولة
+            answer (bool): هل يرد الموجّه على الاستعلام قبل المعالج؟ (False إذا كان المعالج يرد بنفسه)
+            registered (bool): هل يتطلب المسار مستخدماً مسجلاً؟
+
+        Returns:
+            Route: المسار المضاف
+
+        Raises:
+            ValueError: إذا كان المفتاح مسجلاً مسبقاً أو يحتوي على الفاصل
+        """
+        if key in self._routes:
+            raise ValueError(f"مسار مكرر: {key}")
+        if SEPARATOR in key:
+            raise ValueError(f"مفتاح المسار لا يجب أن يحتوي على '{SEPARATOR}': {key}")
+        route = Route(
+            key, instrument_callback(callback, callback.__name__),
+            admin, payload, answer, registered
+        )
+        self._routes[key] = route
+        return route
+
+    def route(self, key: str, **options: Any) -> Callable[[RouteCallback], RouteCallback]:
+        """
+        مزخرف لتسجيل دالة معالج كمسار (يعيد الدالة كما هي).
+
+        Args:
+            key (str): مفتاح المسار
+            **options: خيارات add (admin, payload, answer, registered)
+
+        Returns:
+            Callable: المزخرف
+        """
+        def decorator(callback: RouteCallback) -> RouteCallback:
+            self.add(key, callback, **options)
+            return callback
+        return decorator
+
+    def resolve(self, data: str) -> Optional[Tuple[Route, Any]]:
+        """
+        إيجاد مسار بيانات الزر وتحليل حمولتها.
+
+        Args:
+            data (str): بيانات الزر
+
+        Returns:
+            Optional[Tuple[Route, Any]]: (المسار، الحمولة المحللة) أو None إذا لم يوجد مسار
+            أو كانت الحمولة مفقودة أو غير صالحة
+        """
+        key, sep, raw = data.partition(SEPARATOR)
+        route = self._routes.get(key)
+        if route is None:
+            return None
+        if route.payload is None:
+            return None if sep else (route, None)
+        if not sep:
+            return None
+        try:
+            return route, route.payload(raw)
+        except (ValueError, KeyError):
+            return None
+
+    async def dispatch(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> Any:
+        """
+        توجيه استعلام زر إلى معالج مساره.
+
+        Args:
+            update (Update): تحديث Telegram يحتوي على استعلام الزر
+            context (ContextTypes.DEFAULT_TYPE): السياق
+
+        Returns:
+            Any: قيمة المعالج (حالة ConversationHandler في مسارات المحادثة) أو None
+        """
+        query = update.callback_query
+        user_id: int = query.from_user.id
+        data: str = query.data or ""
+        resolved = self.resolve(data)
+
+        if resolved is None:
+            UNROUTED_CALLBACKS.inc()
+            logger.warning(f"استعلام زر غير معروف: {query.data}")
+            await query.answer(UNKNOWN_MESSAGE)
+            return None
+
+        route, payload = resolved
+        if route.admin and not is_admin(user_id):
+            DENIED_CALLBACKS.inc(route.key)
+            await query.answer(DENIED_MESSAGE, show_alert=True)
+            logger.warning(f"محاولة وصول غير مصرح لـ {user_id} إلى {route.key}")
+            return None
+
+        duplicate = self.deduplicator.begin(user_id, query.id, data)
+        if duplicate is not None:
+            DUPLICATE_CALLBACKS.inc(route.key, duplicate)
+            await self._answer_duplicate(route, query, duplicate)
+            return None
+
+        succeeded = False
+        try:
+            if route.answer:
+                await query.answer()  # إغلاق مؤشر التحميل قبل أي عمل آخر
+            try:
+                if route.registered and not context_user(update, context):
+                    await edit_message_text(query, UNREGISTERED_MESSAGE)
+                    logger.warning(f"محاولة استخدام زر من مستخدم غير مسجل: {user_id}")
+                    return None
+
+                if route.payload is None:
+                    result = await route.callback(update, context)
+                else:
+                    result = await route.callback(update, context, payload)
+                succeeded = True
+                return result
+
+            except DatabaseError as e:
+                await edit_message_text(query, f"❌ خطأ: {e.message}")
+                logger.error(f"خطأ في قاعدة البيانات: {e.message}")
+            except Exception as e:
+                await edit_message_text(query, "❌ حدث خطأ. يرجى المحاولة لاحقًا.")
+                logger.error(f"خطأ غير متوقع في معالج الزر {route.key}: {str(e)}", exc_info=True)
+            return None
+        finally:
+            self.deduplicator.finish(user_id, query.id, data, succeeded)
+
+    @staticmethod
+    async def _answer_duplicate(route: Route, query: Any, reason: str) -> None:
+        """
+        الرد على استعلام مكرر دون استدعاء المعالج.
+
+        إعادة تسليم نفس الاستعلام لا يُرد عليها (رُد عليه في المرة الأولى)،
+        والضغط المزدوج يُرد عليه كما رُد على الأول: رد فارغ إذا كان الموجّه
+        هو من يرد، وإلا رسالة قصيرة بحالة الطلب الأول.
+        """
+        if reason == REDELIVERED:
+            return
+        if reason == IN_FLIGHT:
+            await query.answer(IN_FLIGHT_MESSAGE)
+        elif reason == DONE and route.answer:
+            await query.answer()
+        else:
+            await query.answer(ALREADY_DONE_MESSAGE)
+
+    def pattern_for(self, *keys: str) -> str:
+        """
+        نمط regex يطابق بيانات أزرار مسارات معينة (لنقاط دخول المحادثات).
+
+        Args:
+            *keys (str): مفاتيح المسارات
+
+        Returns:
+            str: النمط
+        """
+        return "^(" + "|".join(re.escape(key) for key in keys) + f")({SEPARATOR}|$)"
+
+    def handler(self, pattern: Optional[str] = None) -> CallbackQueryHandler:
+        """
+        معالج CallbackQueryHandler يمرر الاستعلامات إلى الموجّه.
+
+        معالجات المسارات مغلفة بطبقة القياس بأسمائها، لذلك لا يُقاس
+        الموجّه نفسه كمعالج منفصل.
+
+        Args:
+            pattern (Optional[str]): نمط تقييد البيانات (افتراضي: كل الاستعلامات)
+
+        Returns:
+            CallbackQueryHandler: المعالج
+        """
+        async def route_callback_query(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Any:
+            return await self.dispatch(update, context)
+
+        route_callback_query.__instrumented__ = True  # type: ignore[attr-defined]
+        return CallbackQueryHandler(route_callback_query, pattern=pattern)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._routes
+
+    def __len__(self) -> int:
+        return len(self._routes)
+
+
+# إنشاء مثيل من الموجّه (تسجل وحدات المعالجات مساراتها عند الاستيراد)
+callback_router = CallbackRouter()
@@ -0,0 +1,215 @@
+"""
+معالجة التحديثات بالتوازي مع الحفاظ على ترتيب تحديثات كل مستخدم.
+
+تُعالج تحديثات المستخدمين المختلفين بالتوازي (حتى MAX_CONCURRENT_UPDATES)،
+بينما تمر تحديثات المستخدم الواحد عبر قفل خاص به فتُعالج بترتيب وصولها
+ولا تتسابق على نقاطه أو على حالة محادثته. تُحذف الأقفال عند عدم وجود
+تحديثات جارية أو منتظرة للمستخدم، فلا ينمو جدولها مع عدد المستخدمين.
+
+مقاعد التوازي يوزعها متحكم القبول حسب أولوية التحديث، ويُسقط التحديثات
+الأقل أولوية عند امتلاء طابور الانتظار (انظر src.bot.admission).
+"""
+
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Dict, Optional
+
+from telegram import Update
+from telegram.ext import BaseUpdateProcessor
+
+from src.bot.admission import AdmissionController, Priority, SHED_UPDATES, UpdateShed, update_priority
+from src.utils.metrics import metrics_registry
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+SHED_MESSAGE: str = "⏳ البوت مشغول حالياً، حاول بعد قليل."
+"""الرد على الأزرار المُسقطة تحت الحمل"""
+
+USER_LOCK_WAIT_SECONDS = metrics_registry.histogram(
+    "dragon_user_lock_wait_seconds", "زمن انتظار التحديث لانتهاء تحديثات نفس المستخدم بالثواني",
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+)
+UPDATES_IN_PROGRESS = metrics_registry.gauge(
+    "dragon_updates_in_progress", "عدد التحديثات قيد المعالجة حالياً"
+)
+
+
+class _UserLock:
+    """قفل مستخدم مع عدد التحديثات التي تحمله أو تنتظره."""
+
+    __slots__ = ("lock", "holders")
+
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        self.holders = 0
+
+
+class KeyedLocks:
+    """
+    أقفال غير متزامنة حسب المفتاح، تُنشأ عند الحاجة وتُحذف عند تحريرها.
+    """
+
+    def __init__(self):
+        """تهيئة جدول أقفال فارغ."""
+        self._locks: Dict[int, _UserLock] = {}
+
+    def __len__(self) -> int:
+        return len(self._locks)
+
+    def backlog(self, key: int) -> int:
+        """
+        عدد التحديثات التي تحمل قفل المفتاح أو تنتظره.
+
+        Args:
+            key (int): المفتاح
+
+        Returns:
+            int: عدد التحديثات
+        """
+        entry = self._locks.get(key)
+        return entry.holders if entry is not None else 0
+
+    @asynccontextmanager
+    async def hold(self, key: int) -> AsyncIterator[None]:
+        """
+        الحصول على قفل المفتاح (بترتيب الطلب) وتحريره عند الخروج.
+
+        Args:
+            key (int): المفتاح (معرّف المستخدم أو المحادثة)
+        """
+        entry = self._locks.get(key)
+        if entry is None:
+            entry = self._locks[key] = _UserLock()
+        entry.holders += 1
+        try:
+            async with entry.lock:
+                yield
+        finally:
+            entry.holders -= 1
+            if entry.holders == 0:
+                del self._locks[key]
+
+
+def update_key(update: object) -> Optional[int]:
+    """
+    مفتاح ترتيب التحديث: معرّف المستخدم، أو المحادثة إذا لم يوجد مستخدم.
+
+    Args:
+        update (object): التحديث
+
+    Returns:
+        Optional[int]: المفتاح أو None إذا لم يكن للتحديث صاحب (لا يحتاج ترتيباً)
+    """
+    if not isinstance(update, Update):
+        return None
+    if update.effective_user:
+        return update.effective_user.id
+    if update.effective_chat:
+        return update.effective_chat.id
+    return None
+
+
+class PerUserUpdateProcessor(BaseUpdateProcessor):
+    """
+    معالج تحديثات متوازٍ يحافظ على ترتيب تحديثات كل مستخدم.
+    """
+
+    def __init__(
+        self,
+        max_concurrent_updates: int,
+        admission: Optional[AdmissionController] = None,
+        max_user_backlog: int = 8
+    ):
+        """
+        تهيئة المعالج.
+
+        Args:
+            max_concurrent_updates (int): الحد الأقصى للتحديثات المعالجة بالتوازي
+            admission (Optional[AdmissionController]): متحكم القبول (افتراضي: متحكم خاص
+                بطابور غير محدود عملياً)
+            max_user_backlog (int): الحد الأقصى لتحديثات المستخدم الواحد الجارية أو المنتظرة
+
+        Raises:
+            ValueError: إذا كان الحد أقل من 1
+        """
+        super().__init__(max_concurrent_updates)
+        self.admission = admission or AdmissionController(max_concurrent_updates, 1 << 30)
+        self.max_user_backlog = max_user_backlog
+        self.user_locks = KeyedLocks()
+        metrics_registry.gauge(
+            "dragon_user_locks", "عدد المستخدمين الذين لديهم تحديثات جارية أو منتظرة"
+        ).set_function(lambda: len(self.user_locks))
+
+    async def process_update(self, update: object, coroutine: Awaitable[Any]) -> None:  # type: ignore[misc]
+        """
+        معالجة التحديث بعد انتهاء تحديثات نفس المستخدم السابقة.
+
+        يُؤخذ قفل المستخدم قبل مقعد التوازي، حتى لا تشغل تحديثات مستخدم
+        واحد كثير الطلبات مقاعد المستخدمين الآخرين وهي تنتظر دورها. لذلك
+        تُحد تحديثات المستخدم المنتظرة لقفله بـ max_user_backlog (عدا المسؤولين)،
+        فيبقى مجموع المنتظرين محدوداً: كل مستخدم له تحديث واحد فقط في طابور
+        القبول المحدود، وخلفه max_user_backlog تحديثاً على الأكثر.
+        التحديث المُسقط لا يُعالج، ويُرد على الزر بإشعار قصير.
+
+        Args:
+            update (object): التحديث
+            coroutine (Awaitable[Any]): معالجة التحديث
+        """
+        key = update_key(update)
+        priority = update_priority(update)
+        try:
+            if key is None:
+                await self._admit(priority, update, coroutine)
+                return
+
+            if priority != Priority.ADMIN and self.user_locks.backlog(key) >= self.max_user_backlog:
+                SHED_UPDATES.inc(priority.name.lower())
+                raise UpdateShed(priority)
+
+            waiting_since = time.perf_counter()
+            async with self.user_locks.hold(key):
+                USER_LOCK_WAIT_SECONDS.observe(time.perf_counter() - waiting_since)
+                await self._admit(priority, update, coroutine)
+        except UpdateShed as e:
+            if asyncio.iscoroutine(coroutine):
+                coroutine.close()
+            logger.warning("⚠️ تم إسقاط تحديث تحت الحمل (%s)", e.priority.name.lower())
+            await _answer_shed_callback(update)
+
+    async def _admit(self, priority: Priority, update: object, coroutine: Awaitable[Any]) -> None:
+        """معالجة التحديث بعد الحصول على مقعد حسب أولويته."""
+        async with self.admission.admit(priority):
+            await self.do_process_update(update, coroutine)
+
+    async def do_process_update(self, update: object, coroutine: Awaitable[Any]) -> None:
+        """
+        تنفيذ معالجة التحديث (داخل قفل المستخدم ومقعد التوازي).
+
+        Args:
+            update (object): التحديث
+            coroutine (Awaitable[Any]): معالجة التحديث
+        """
+        UPDATES_IN_PROGRESS.inc()
+        try:
+            await coroutine
+        finally:
+            UPDATES_IN_PROGRESS.dec()
+
+    async def initialize(self) -> None:
+        """لا يحتاج المعالج إلى تهيئة."""
+
+    async def shutdown(self) -> None:
+        """إيقاف الأعمال المؤجلة لدى متحكم القبول."""
+        await self.admission.close()
+
+
+async def _answer_shed_callback(update: object) -> None:
+    """الرد على زر مُسقط حتى لا يبقى مؤشر التحميل ظاهراً للمستخدم."""
+    if not isinstance(update, Update) or not update.callback_query:
+        return
+    try:
+        await update.callback_query.answer(SHED_MESSAGE)
+    except Exception as e:
+        logger.debug(f"تعذر الرد على زر مُسقط: {e}")
@@ -0,0 +1,160 @@
+"""
+تقييد أنواع التحديثات المطلوبة من Telegram بما تعالجه المعالجات فعلاً.
+
+تُستخرج قائمة allowed_updates من المعالجات المسجلة (بما فيها معالجات
+المحادثات)، وتُمرَّر إلى getUpdates أو setWebhook فلا يرسل Telegram
+التحديثات الأخرى أصلاً. مرحلة التصفية ترفض ما يصل رغم ذلك (مثل تحديثات
+أُرسلت قبل تغيير القائمة أو عبر Webhook يدوي) قبل أي مرحلة معالجة أخرى.
+
+رسائل المستخدمين تعني الرسائل الجديدة فقط: الرسائل المعدلة ومنشورات القنوات
+لا تُطلب حتى لو كانت مرشحات PTB تقبلها.
+"""
+
+import logging
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple, Type
+
+from telegram import Update
+from telegram.ext import (
+    Application, ApplicationHandlerStop, BaseHandler, CallbackQueryHandler, ChatBoostHandler,
+    ChatJoinRequestHandler, ChatMemberHandler, ChosenInlineResultHandler, CommandHandler,
+    ContextTypes, ConversationHandler, InlineQueryHandler, MessageHandler, MessageReactionHandler,
+    PollAnswerHandler, PollHandler, PreCheckoutQueryHandler, PrefixHandler, ShippingQueryHandler,
+    StringCommandHandler, StringRegexHandler, TypeHandler
+)
+
+from src.utils.metrics import metrics_registry
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+FILTER_GROUP: int = -6
+"""مجموعة مرحلة تصفية أنواع التحديثات (أول مرحلة على الإطلاق)"""
+
+DROPPED_UPDATES = metrics_registry.counter(
+    "dragon_dropped_updates", "عدد التحديثات المرفوضة لأن نوعها غير معالج", ("type",)
+)
+
+_HANDLER_UPDATE_TYPES: Dict[Type[BaseHandler], Tuple[str, ...]] = {
+    CallbackQueryHandler: (Update.CALLBACK_QUERY,),
+    CommandHandler: (Update.MESSAGE,),
+    PrefixHandler: (Update.MESSAGE,),
+    MessageHandler: (Update.MESSAGE,),
+    InlineQueryHandler: (Update.INLINE_QUERY,),
+    ChosenInlineResultHandler: (Update.CHOSEN_INLINE_RESULT,),
+    ChatMemberHandler: (Update.MY_CHAT_MEMBER, Update.CHAT_MEMBER),
+    ChatJoinRequestHandler: (Update.CHAT_JOIN_REQUEST,),
+    ChatBoostHandler: (Update.CHAT_BOOST, Update.REMOVED_CHAT_BOOST),
+    MessageReactionHandler: (Update.MESSAGE_REACTION, Update.MESSAGE_REACTION_COUNT),
+    PollHandler: (Update.POLL,),
+    PollAnswerHandler: (Update.POLL_ANSWER,),
+    PreCheckoutQueryHandler: (Update.PRE_CHECKOUT_QUERY,),
+    ShippingQueryHandler: (Update.SHIPPING_QUERY,),
+    StringCommandHandler: (),
+    StringRegexHandler: (),
+}
+"""أنواع التحديثات التي يعالجها كل نوع معالج"""
+
+
+def _handler_update_types(handler: BaseHandler) -> Optional[Iterable[str]]:
+    """أنواع تحديثات معالج واحد، أو None إذا تعذر تحديدها (يُطلب كل شيء)."""
+    if isinstance(handler, ConversationHandler):
+        types: List[str] = []
+        nested = list(handler.entry_points) + list(handler.fallbacks)
+        for state_handlers in handler.states.values():
+            nested.extend(state_handlers)
+        for inner in nested:
+            inner_types = _handler_update_types(inner)
+            if inner_types is None:
+                return None
+            types.extend(inner_types)
+        return types
+    if isinstance(handler, TypeHandler):
+        return None if issubclass(handler.type, Update) else ()
+    for handler_class in type(handler).__mro__:
+        if handler_class in _HANDLER_UPDATE_TYPES:
+            return _HANDLER_UPDATE_TYPES[handler_class]
+    return None
+
+
+def handled_update_types(application: Application) -> List[str]:
+    """
+    أنواع التحديثات التي تعالجها معالجات التطبيق (المجموعات غير السالبة).
+
+    مراحل المعالجة المسبقة في المجموعات السالبة تعمل على كل تحديث ولا تحدد
+    ما يحتاجه البوت، لذلك لا تُحتسب.
+
+    Args:
+        application (Application): تطبيق البوت بعد تسجيل المعالجات
+
+    Returns:
+        List[str]: قائمة allowed_updates مرتبة (Update.ALL_TYPES إذا وُجد معالج غير معروف)
+    """
+    types = set()
+    for group, handlers in application.handlers.items():
+        if group < 0:
+            continue
+        for handler in handlers:
+            handler_types = _handler_update_types(handler)
+            if handler_types is None:
+                logger.warning("تعذر تحديد أنواع تحديثات المعالج %s، سيتم طلب جميع الأنواع", handler)
+                return list(Update.ALL_TYPES)
+            types.update(handler_types)
+    return sorted(types)
+
+
+def update_type(update: Update) -> str:
+    """
+    نوع التحديث (اسم الحقل المعبأ فيه).
+
+    Args:
+        update (Update): التحديث
+
+    Returns:
+        str: نوع التحديث أو 'unknown'
+    """
+    for name in Update.ALL_TYPES:
+        if getattr(update, name, None) is not None:
+            return name
+    return "unknown"
+
+
+class UpdateTypeFilter:
+    """
+    مرحلة تصفية ترفض التحديثات التي لا تعالجها أي معالجات.
+    """
+
+    def __init__(self):
+        """تهيئة المرشح (يسمح بكل الأنواع حتى استدعاء configure)."""
+        self.allowed_updates: List[str] = list(Update.ALL_TYPES)
+        self._allowed: FrozenSet[str] = frozenset(self.allowed_updates)
+
+    def configure(self, allowed_updates: Iterable[str]) -> None:
+        """
+        ضبط الأنواع المسموحة.
+
+        Args:
+            allowed_updates (Iterable[str]): أنواع التحديثات المسموحة
+        """
+        self.allowed_updates = sorted(allowed_updates)
+        self._allowed = frozenset(self.allowed_updates)
+        logger.info("📥 أنواع التحديثات المطلوبة: %s", ", ".join(self.allowed_updates))
+
+    async def filter(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        """
+        معالج TypeHandler: إيقاف معالجة التحديثات غير المعالجة.
+
+        Args:
+            update (Update): التحديث
+            context (ContextTypes.DEFAULT_TYPE): السياق
+
+        Raises:
+            ApplicationHandlerStop: إذا كان نوع التحديث غير مسموح
+        """
+        kind = update_type(update)
+        if kind in self._allowed:
+            return
+        DROPPED_UPDATES.inc(kind)
+        raise ApplicationHandlerStop
+
+
+# إنشاء مثيل من المرشح (يُضبط في build_application)
+update_type_filter = UpdateTypeFilter()
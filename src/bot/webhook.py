@@ -0,0 +1,214 @@
+"""
+استقبال التحديثات عبر Webhook بخادم HTTP غير حاجب.
+
+يستقبل الخادم تحديثات Telegram بطلبات POST على مسار محدد، ويتحقق من
+الرمز السري، ثم يضع التحديث في update_queue الخاص بالتطبيق ويرد فوراً
+(المعالجة تتم بالتوازي عبر معالج التحديثات). لا يحتاج إلى tornado.
+
+عند التسجيل لدى Telegram لا تُحذف التحديثات المعلقة (drop_pending_updates=False)،
+وعند الإيقاف يتوقف الخادم عن القبول أولاً ثم تُعالج التحديثات المقبولة قبل الإغلاق،
+فما لم يُقبل يبقى لدى Telegram ويُعاد تسليمه بعد إعادة التشغيل.
+
+اختبار محلي بإرسال تحديثات مسجلة:
+    UPDATE_MODE=webhook python main.py
+    python -m src.devtools.replay updates.jsonl --webhook http://127.0.0.1:8080/telegram
+"""
+
+import asyncio
+import hmac
+import json
+import logging
+import signal
+from typing import Optional, Sequence
+
+from telegram import Update
+from telegram.ext import Application
+
+from src.utils.metrics import metrics_registry
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+SECRET_HEADER: str = "x-telegram-bot-api-secret-token"
+"""ترويسة الرمز السري التي يرسلها Telegram مع كل تحديث"""
+
+_REQUEST_TIMEOUT: float = 60.0
+"""المهلة القصوى لانتظار طلب جديد على اتصال مفتوح بالثواني"""
+
+_MAX_BODY: int = 1 << 20
+"""الحد الأقصى لحجم جسم الطلب بالبايت"""
+
+WEBHOOK_REQUESTS = metrics_registry.counter(
+    "dragon_webhook_requests", "عدد طلبات Webhook حسب رمز الحالة", ("status",)
+)
+
+_STATUS_TEXT = {
+    200: "OK", 400: "Bad Request", 403: "Forbidden", 404: "Not Found",
+    405: "Method Not Allowed", 413: "Payload Too Large",
+}
+
+
+class WebhookServer:
+    """
+    خادم HTTP يستقبل تحديثات Telegram ويضعها في طابور التطبيق.
+    """
+
+    def __init__(
+        self,
+        application: Application,
+        host: str = "127.0.0.1",
+        port: int = 8080,
+        path: str = "/telegram",
+        secret_token: str = ""
+    ):
+        """
+        تهيئة الخادم.
+
+        Args:
+            application (Application): تطبيق البوت (يجب تشغيله عبر start)
+            host (str): عنوان الاستماع
+            port (int): منفذ الاستماع (0 لاختيار منفذ عشوائي)
+            path (str): مسار استقبال التحديثات
+            secret_token (str): الرمز السري المتوقع (فارغ لتعطيل الفحص)
+        """
+        self.application = application
+        self.host = host
+        self.port = port
+        self.path = "/" + path.lstrip("/")
+        self.secret_token = secret_token
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    @property
+    def url(self) -> str:
+        """العنوان المحلي لاستقبال التحديثات."""
+        return f"http://{self.host}:{self.port}{self.path}"
+
+    async def start(self) -> None:
+        """بدء الاستماع على المنفذ المحدد."""
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info("🔗 خادم Webhook يعمل على %s", self.url)
+
+    async def stop(self) -> None:
+        """إيقاف قبول التحديثات وإغلاق الاتصالات."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """معالجة طلبات HTTP على اتصال واحد (مع keep-alive)."""
+        try:
+            while True:
+                head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), _REQUEST_TIMEOUT)
+                request_line, *header_lines = head.decode("latin-1").split("\r\n")
+                method, path, _ = request_line.split(" ", 2)
+                headers = {
+                    name.strip().lower(): value.strip()
+                    for name, _, value in (line.partition(":") for line in header_lines if line)
+                }
+                length = int(headers.get("content-length", 0))
+                if length > _MAX_BODY:
+                    status = 413
+                else:
+                    body = await reader.readexactly(length)
+                    status = await self._receive(method, path.split("?", 1)[0], headers, body)
+
+                WEBHOOK_REQUESTS.inc(status)
+                keep_alive = status != 413 and headers.get("connection", "").lower() != "close"
+                writer.write(
+                    f"HTTP/1.1 {status} {_STATUS_TEXT[status]}\r\n"
+                    f"Content-Length: 0\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1")
+                )
+                await writer.drain()
+                if not keep_alive:
+                    return
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.CancelledError,
+                ValueError, ConnectionError):
+            pass
+        except Exception as e:
+            logger.error(f"خطأ في خادم Webhook: {e}")
+        finally:
+            writer.close()
+
+    async def _receive(self, method: str, path: str, headers: dict, body: bytes) -> int:
+        """التحقق من الطلب ووضع التحديث في الطابور؛ يعيد رمز الحالة."""
+        if path != self.path:
+            return 404
+        if method != "POST":
+            return 405
+        if self.secret_token and not hmac.compare_digest(
+            headers.get(SECRET_HEADER, "").encode(), self.secret_token.encode()
+        ):
+            logger.warning("طلب Webhook برمز سري غير صحيح")
+            return 403
+        try:
+            update = Update.de_json(json.loads(body), self.application.bot)
+        except (ValueError, TypeError, KeyError) as e:
+            logger.warning(f"تحديث Webhook غير صالح: {e}")
+            return 400
+        if update is None:
+            return 400
+        await self.application.update_queue.put(update)
+        return 200
+
+
+async def run_webhook(
+    application: Application,
+    host: str,
+    port: int,
+    path: str,
+    secret_token: str = "",
+    webhook_url: str = "",
+    allowed_updates: Optional[Sequence[str]] = None,
+    stop_event: Optional[asyncio.Event] = None
+) -> None:
+    """
+    تشغيل التطبيق في وضع Webhook حتى الإيقاف (SIGINT/SIGTERM أو stop_event).
+
+    Args:
+        application (Application): تطبيق البوت
+        host (str): عنوان الاستماع
+        port (int): منفذ الاستماع
+        path (str): مسار استقبال التحديثات
+        secret_token (str): الرمز السري (فارغ لتعطيل الفحص)
+        webhook_url (str): العنوان العام المسجل لدى Telegram (فارغ لعدم التسجيل)
+        allowed_updates (Optional[Sequence[str]]): أنواع التحديثات المطلوبة من Telegram
+        stop_event (Optional[asyncio.Event]): حدث الإيقاف (افتراضي: إشارات النظام)
+    """
+    stop_event = stop_event or asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop_event.set)
+        except (NotImplementedError, RuntimeError):
+            pass
+
+    server = WebhookServer(application, host, port, path, secret_token)
+    await application.initialize()
+    try:
+        if application.post_init:
+            await application.post_init(application)
+        if webhook_url:
+            await application.bot.set_webhook(
+                url=webhook_url,
+                secret_token=secret_token or None,
+                allowed_updates=allowed_updates,
+                drop_pending_updates=False,
+                max_connections=min(application.update_processor.max_concurrent_updates, 100),
+            )
+            logger.info("✅ تم تسجيل Webhook: %s", webhook_url)
+        elif not secret_token:
+            logger.warning("⚠️ Webhook يعمل بدون رمز سري")
+
+        await application.start()
+        await server.start()
+        await stop_event.wait()
+    finally:
+        # إيقاف القبول أولاً، ثم معالجة ما في الطابور قبل الإغلاق
+        await server.stop()
+        if application.running:
+            await application.stop()
+        await application.shutdown()
+        if application.post_shutdown:
+            await application.post_shutdown(application)
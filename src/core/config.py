@@ -7,9 +7,10 @@
 
 import os
 import logging
-from typing import Optional, List
+from typing import Dict, Optional, List, Tuple
 from dotenv import load_dotenv
 from src.utils.exceptions import ConfigurationError
+from src.core.logging_setup import setup_logging
 
 # تحميل متغيرات البيئة من ملف .env إذا وجد
 load_dotenv()
@@ -37,6 +38,35 @@ def _get_admin_ids() -> List[int]:
         ) from e
 
 
+def _get_rate_limits() -> Dict[str, Tuple[float, int]]:
+    """
+    الحصول على حدود معدل الطلبات لكل أمر أو بادئة زر من متغير البيئة.
+
+    يتوقع المتغير أن يكون بصيغة: "default=2/6,claim_reward=0.2/2,start=0.1/3"
+    حيث المفتاح اسم أمر (بدون /) أو مفتاح مسار زر أو default،
+    والقيمة عدد الطلبات المسموح في الثانية / السعة القصوى للدفعة.
+
+    Returns:
+        Dict[str, Tuple[float, int]]: المفتاح ← (المعدل في الثانية، السعة)
+
+    Raises:
+        ConfigurationError: إذا كانت البيانات غير صحيحة
+    """
+    rate_limits_str = os.getenv("RATE_LIMITS", "default=2/6,claim_reward=0.2/2,start=0.1/3")
+    limits: Dict[str, Tuple[float, int]] = {}
+    try:
+        for item in filter(None, (part.strip() for part in rate_limits_str.split(","))):
+            key, _, value = item.partition("=")
+            rate, _, burst = value.partition("/")
+            limits[key.strip()] = (float(rate), int(burst))
+    except ValueError as e:
+        raise ConfigurationError(
+            f"RATE_LIMITS يجب أن تكون بصيغة key=rate/burst مفصولة بفواصل. "
+            f"القيمة الحالية: {rate_limits_str}"
+        ) from e
+    return limits
+
+
 # --- إعدادات التسجيل (Logging) ---
 LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO").upper()
 """مستوى تسجيل السجلات (DEBUG, INFO, WARNING, ERROR, CRITICAL)"""
@@ -45,16 +75,29 @@ LOG_FORMAT: str = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 """صيغة رسائل السجل"""
 
 LOG_FILE: str = os.getenv("LOG_FILE", "bot.log")
-"""مسار ملف السجل"""
-
-# إعداد نظام التسجيل
-logging.basicConfig(
-    level=getattr(logging, LOG_LEVEL, logging.INFO),
-    format=LOG_FORMAT,
-    handlers=[
-        logging.StreamHandler(),
-        logging.FileHandler(LOG_FILE, encoding="utf-8")
-    ]
+"""مسار ملف السجل (فارغ لتعطيل الكتابة في ملف)"""
+
+LOG_JSON: bool = os.getenv("LOG_JSON", "false").lower() == "true"
+"""هل تُكتب السجلات كأسطر JSON (مع معرّف التحديث والمستخدم)؟"""
+
+LOG_ROTATION: str = os.getenv("LOG_ROTATION", "size").lower()
+"""نوع تدوير ملف السجل: size (حسب الحجم) أو time (يومياً)"""
+
+LOG_MAX_BYTES: int = int(os.getenv("LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+"""الحجم الأقصى لملف السجل بالبايت قبل تدويره"""
+
+LOG_BACKUP_COUNT: int = int(os.getenv("LOG_BACKUP_COUNT", "5"))
+"""عدد ملفات السجل القديمة المحتفظ بها"""
+
+# إعداد نظام التسجيل (مرة واحدة لكامل العملية)
+setup_logging(
+    level=LOG_LEVEL,
+    log_file=LOG_FILE or None,
+    log_format=LOG_FORMAT,
+    json_format=LOG_JSON,
+    rotation=LOG_ROTATION,
+    max_bytes=LOG_MAX_BYTES,
+    backup_count=LOG_BACKUP_COUNT
 )
 
 logger: logging.Logger = logging.getLogger("DragonBot")
@@ -65,6 +108,9 @@ logger: logging.Logger = logging.getLogger("DragonBot")
 BOT_TOKEN: str = os.getenv("BOT_TOKEN", "")
 """رمز التحقق من البوت من Telegram Bot Father"""
 
+BOT_API_URL: str = os.getenv("BOT_API_URL", "")
+"""عنوان Bot API الأساسي (فارغ لاستخدام Telegram؛ مثلاً خادم اختبار الحمل المحلي)"""
+
 if not BOT_TOKEN:
     raise ConfigurationError(
         "BOT_TOKEN لم يتم تعيينه. "
@@ -78,7 +124,7 @@ ADMIN_IDS: List[int] = _get_admin_ids()
 PRIMARY_ADMIN_ID: int = ADMIN_IDS[0] if ADMIN_IDS else 0
 """معرّف المسؤول الأساسي (الأول في القائمة)"""
 
-logger.info(f"تم تحميل {len(ADMIN_IDS)} مسؤول(ين)")
+logger.info("تم تحميل %d مسؤول(ين)", len(ADMIN_IDS))
 
 
 # --- إعدادات قاعدة البيانات ---
@@ -91,6 +137,12 @@ DATABASE_URL: str = os.getenv(
 )
 """رابط الاتصال بقاعدة البيانات"""
 
+DB_PROFILING: bool = os.getenv("DB_PROFILING", "false").lower() == "true"
+"""هل يتم تفعيل محلل استعلامات SQL عند بدء التشغيل؟"""
+
+DB_SLOW_QUERY_MS: float = float(os.getenv("DB_SLOW_QUERY_MS", "100"))
+"""حد الاستعلام البطيء بالمللي ثانية (يُسجَّل مع خطة التنفيذ)"""
+
 
 # --- إعدادات نظام النقاط والإحالة ---
 POINTS_PER_REFERRAL: int = int(os.getenv("POINTS_PER_REFERRAL", "10"))
@@ -114,6 +166,83 @@ MAX_LEVEL: int = int(os.getenv("MAX_LEVEL", "100"))
 """الحد الأقصى للمستويات"""
 
 
+# --- إعدادات المقاييس والإحصائيات ---
+METRICS_FLUSH_INTERVAL: int = int(os.getenv("METRICS_FLUSH_INTERVAL", "60"))
+"""الفاصل الزمني (بالثواني) لحفظ المقاييس الزمنية في قاعدة البيانات"""
+
+METRICS_RETENTION_DAYS: int = int(os.getenv("METRICS_RETENTION_DAYS", "400"))
+"""عدد أيام الاحتفاظ بالمقاييس اليومية"""
+
+METRICS_HOST: str = os.getenv("METRICS_HOST", "127.0.0.1")
+"""عنوان الاستماع لخادم مقاييس Prometheus"""
+
+METRICS_PORT: int = int(os.getenv("METRICS_PORT", "0"))
+"""منفذ خادم مقاييس Prometheus (0 لتعطيله)"""
+
+LOOP_LAG_THRESHOLD_MS: float = float(os.getenv("LOOP_LAG_THRESHOLD_MS", "250"))
+"""حد توقف حلقة الأحداث بالمللي ثانية الذي يستدعي التقاط مكدس الكود الحاجب (0 لتعطيل المراقب)"""
+
+LOOP_MONITOR_INTERVAL_MS: float = float(os.getenv("LOOP_MONITOR_INTERVAL_MS", "100"))
+"""الفاصل بين نبضات مراقب حلقة الأحداث بالمللي ثانية"""
+
+TRACE_SAMPLE_RATE: float = float(os.getenv("TRACE_SAMPLE_RATE", "0"))
+"""نسبة التحديثات التي تُتتبع عشوائياً بين 0 و 1 (0 لتعطيل العينة)"""
+
+TRACE_SLOW_MS: float = float(os.getenv("TRACE_SLOW_MS", "0"))
+"""تتبع أي تحديث تتجاوز مدته هذا الحد بالمللي ثانية (0 لتعطيله)"""
+
+TRACE_FILE: str = os.getenv("TRACE_FILE", "traces.jsonl")
+"""مسار ملف التتبعات بصيغة JSONL"""
+
+RECORD_UPDATES_FILE: str = os.getenv("RECORD_UPDATES_FILE", "")
+"""مسار ملف تسجيل التحديثات لإعادة تشغيلها (فارغ لتعطيل التسجيل)"""
+
+RECORD_SAMPLE_RATE: float = float(os.getenv("RECORD_SAMPLE_RATE", "0"))
+"""نسبة المستخدمين الذين تُسجَّل تحديثاتهم بين 0 و 1"""
+
+RECORD_SALT: str = os.getenv("RECORD_SALT", "")
+"""ملح تجزئة المعرّفات في التحديثات المسجلة"""
+
+UPDATE_DB_BUDGET: int = int(os.getenv("UPDATE_DB_BUDGET", "4"))
+"""الحد الأقصى لعمليات قاعدة البيانات في التحديث الواحد قبل التحذير (0 لتعطيله)"""
+
+UPDATE_API_BUDGET: int = int(os.getenv("UPDATE_API_BUDGET", "4"))
+"""الحد الأقصى لاستدعاءات Bot API في التحديث الواحد قبل التحذير (0 لتعطيله)"""
+
+MAX_CONCURRENT_UPDATES: int = int(os.getenv("MAX_CONCURRENT_UPDATES", "64"))
+"""الحد الأقصى للتحديثات المعالجة بالتوازي (تحديثات المستخدم الواحد تبقى مرتبة؛ 1 للمعالجة التسلسلية)"""
+
+MAX_PENDING_UPDATES: int = int(os.getenv("MAX_PENDING_UPDATES", "256"))
+"""الحد الأقصى للتحديثات المنتظرة دوراً في المعالجة؛ عند تجاوزه تُسقط التحديثات الأقل أولوية"""
+
+MAX_PENDING_UPDATES_PER_USER: int = int(os.getenv("MAX_PENDING_UPDATES_PER_USER", "8"))
+"""الحد الأقصى لتحديثات المستخدم الواحد الجارية أو المنتظرة؛ ما زاد يُسقط (عدا المسؤولين)"""
+
+UPDATE_MODE: str = os.getenv("UPDATE_MODE", "polling").lower()
+"""طريقة استقبال التحديثات: polling أو webhook"""
+
+WEBHOOK_LISTEN: str = os.getenv("WEBHOOK_LISTEN", "127.0.0.1")
+"""عنوان استماع خادم Webhook المحلي (خلف وكيل HTTPS عكسي)"""
+
+WEBHOOK_PORT: int = int(os.getenv("WEBHOOK_PORT", "8080"))
+"""منفذ خادم Webhook المحلي"""
+
+WEBHOOK_PATH: str = os.getenv("WEBHOOK_PATH", "/telegram")
+"""مسار استقبال التحديثات في خادم Webhook"""
+
+WEBHOOK_SECRET_TOKEN: str = os.getenv("WEBHOOK_SECRET_TOKEN", "")
+"""الرمز السري المتوقع في ترويسة X-Telegram-Bot-Api-Secret-Token (فارغ لتعطيل الفحص)"""
+
+WEBHOOK_URL: str = os.getenv("WEBHOOK_URL", "")
+"""عنوان HTTPS العام الذي يُسجَّل عبر setWebhook (فارغ لعدم التسجيل، مثل الاختبار المحلي)"""
+
+RATE_LIMITS: Dict[str, Tuple[float, int]] = _get_rate_limits()
+"""حدود معدل طلبات كل مستخدم لكل أمر أو بادئة زر: (طلبات في الثانية، السعة)؛ فارغ لتعطيل التحديد"""
+
+CALLBACK_DEDUP_TTL: float = float(os.getenv("CALLBACK_DEDUP_TTL", "3"))
+"""مدة تذكر استعلامات الأزرار المعالجة لتجاهل تكرارها بالثواني (0 لتعطيله)"""
+
+
 # --- إعدادات الرسائل ---
 WELCOME_MESSAGE: str = os.getenv(
     "WELCOME_MESSAGE",
@@ -159,6 +288,24 @@ def validate_config() -> bool:
     
     if MAX_LEVEL <= 0:
         errors.append("MAX_LEVEL يجب أن يكون أكبر من صفر")
+
+    if MAX_CONCURRENT_UPDATES <= 0:
+        errors.append("MAX_CONCURRENT_UPDATES يجب أن يكون أكبر من صفر")
+
+    if MAX_PENDING_UPDATES <= 0:
+        errors.append("MAX_PENDING_UPDATES يجب أن يكون أكبر من صفر")
+
+    if MAX_PENDING_UPDATES_PER_USER <= 0:
+        errors.append("MAX_PENDING_UPDATES_PER_USER يجب أن يكون أكبر من صفر")
+
+    if any(rate <= 0 or burst < 1 for rate, burst in RATE_LIMITS.values()):
+        errors.append("RATE_LIMITS يجب أن تكون معدلاتها موجبة وسعاتها 1 على الأقل")
+
+    if CALLBACK_DEDUP_TTL < 0:
+        errors.append("CALLBACK_DEDUP_TTL لا يمكن أن يكون سالباً")
+
+    if UPDATE_MODE not in ("polling", "webhook"):
+        errors.append("UPDATE_MODE يجب أن يكون polling أو webhook")
     
     if errors:
         raise ConfigurationError(
@@ -0,0 +1,144 @@
+"""
+إعداد نظام التسجيل (Logging) غير الحاجب للبوت.
+
+تُرسل جميع السجلات إلى طابور في الذاكرة عبر QueueHandler، ويتولى
+QueueListener في خيط منفصل الكتابة إلى الطرفية وإلى ملف سجل دوّار
+(حسب الحجم أو الوقت)، فلا تحجب كتابة الملفات حلقة الأحداث.
+يدعم اختيارياً صيغة JSON سطرية تتضمن معرّف التحديث والمستخدم.
+"""
+
+import atexit
+import contextvars
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Iterator, List, Optional, Tuple
+
+_update_context: contextvars.ContextVar[Tuple[Optional[int], Optional[int]]] = (
+    contextvars.ContextVar("dragon_log_update_context", default=(None, None))
+)
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+@contextmanager
+def bind_update_context(update_id: Optional[int], user_id: Optional[int]) -> Iterator[None]:
+    """
+    ربط معرّف التحديث والمستخدم بجميع السجلات داخل الكتلة.
+
+    Args:
+        update_id (Optional[int]): معرّف التحديث
+        user_id (Optional[int]): معرّف المستخدم
+    """
+    token = _update_context.set((update_id, user_id))
+    try:
+        yield
+    finally:
+        _update_context.reset(token)
+
+
+class UpdateContextFilter(logging.Filter):
+    """
+    إضافة update_id و user_id إلى كل سجل من سياق التحديث الحالي.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.update_id, record.user_id = _update_context.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    تنسيق السجلات كأسطر JSON.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "update_id": getattr(record, "update_id", None),
+            "user_id": getattr(record, "user_id", None),
+        }
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def _file_handler(
+    log_file: str,
+    rotation: str,
+    max_bytes: int,
+    backup_count: int
+) -> logging.Handler:
+    """إنشاء معالج ملف دوّار حسب الحجم أو الوقت."""
+    if rotation == "time":
+        return logging.handlers.TimedRotatingFileHandler(
+            log_file, when="midnight", backupCount=backup_count, encoding="utf-8"
+        )
+    return logging.handlers.RotatingFileHandler(
+        log_file, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8"
+    )
+
+
+def setup_logging(
+    level: str = "INFO",
+    log_file: Optional[str] = "bot.log",
+    log_format: str = "%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    json_format: bool = False,
+    rotation: str = "size",
+    max_bytes: int = 10 * 1024 * 1024,
+    backup_count: int = 5
+) -> None:
+    """
+    إعداد التسجيل مرة واحدة لكامل العملية (الاستدعاءات اللاحقة لا تفعل شيئاً).
+
+    Args:
+        level (str): مستوى التسجيل
+        log_file (Optional[str]): مسار ملف السجل (None لتعطيله)
+        log_format (str): صيغة السجلات النصية
+        json_format (bool): استخدام صيغة JSON السطرية بدلاً من النصية
+        rotation (str): نوع التدوير: "size" أو "time" (يومياً عند منتصف الليل)
+        max_bytes (int): الحجم الأقصى لملف السجل قبل تدويره
+        backup_count (int): عدد الملفات القديمة المحتفظ بها
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    formatter: logging.Formatter = JsonFormatter() if json_format else logging.Formatter(log_format)
+    handlers: List[logging.Handler] = [logging.StreamHandler(sys.stdout)]
+    if log_file:
+        handlers.append(_file_handler(log_file, rotation, max_bytes, backup_count))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.addFilter(UpdateContextFilter())
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(getattr(logging, level.upper(), logging.INFO))
+
+    # مكتبة httpx تسجل كل طلب HTTP على مستوى INFO
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging() -> None:
+    """إيقاف خيط الكتابة بعد تفريغ السجلات المتبقية في الطابور."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -9,6 +9,7 @@ from .manager import (
     get_user,
     get_user_by_referral_code,
     save_user,
+    save_users,
     get_all_users,
     get_top_users_by_points,
     get_top_users_by_level,
@@ -19,13 +20,23 @@ from .manager import (
     get_top_users_by_referrals,
     find_user_by_username,
     delete_user,
+    save_metric_buckets,
+    get_metric_buckets,
+    save_activity_sketches,
+    get_activity_sketches,
+    save_activity_bitmaps,
+    get_activity_bitmaps,
+    get_activity_user_index,
+    get_user_join_dates,
 )
+from .profiler import query_profiler, QueryProfiler
 
 __all__ = [
     "init_db",
     "get_user",
     "get_user_by_referral_code",
     "save_user",
+    "save_users",
     "get_all_users",
     "get_top_users_by_points",
     "get_top_users_by_level",
@@ -36,4 +47,14 @@ __all__ = [
     "get_top_users_by_referrals",
     "find_user_by_username",
     "delete_user",
+    "save_metric_buckets",
+    "get_metric_buckets",
+    "save_activity_sketches",
+    "get_activity_sketches",
+    "save_activity_bitmaps",
+    "get_activity_bitmaps",
+    "get_activity_user_index",
+    "get_user_join_dates",
+    "query_profiler",
+    "QueryProfiler",
 ]
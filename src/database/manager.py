@@ -7,14 +7,58 @@
 
 import sqlite3
 import datetime
+import functools
 import logging
-from typing import Optional, List, Dict, Any
+import time
+from typing import Optional, List, Dict, Any, Tuple, Callable, Iterable, TypeVar
 from src.models.user import User
 from src.core.config import DATABASE_FILE
 from src.utils.exceptions import DatabaseError
+from src.utils.metrics import metrics_registry
+from src.utils.round_trips import record_db_operation
+from src.utils.tracing import tracer
+from src.database.profiler import query_profiler, ProfilingConnection
 
 logger: logging.Logger = logging.getLogger(__name__)
 
+F = TypeVar("F", bound=Callable[..., Any])
+
+DB_QUERY_SECONDS = metrics_registry.histogram(
+    "dragon_db_query_seconds", "مدة عمليات قاعدة البيانات بالثواني", ("operation",)
+)
+DB_ERRORS = metrics_registry.counter(
+    "dragon_db_errors", "عدد أخطاء عمليات قاعدة البيانات", ("operation",)
+)
+
+
+def _db_operation(func: F) -> F:
+    """
+    مزخرف لقياس زمن عملية قاعدة بيانات وتسجيل أخطائها في سجل المقاييس،
+    وعدّها ضمن عمليات التحديث الحالي وتسجيلها كفترة في تتبعه.
+
+    Args:
+        func (F): دالة قاعدة البيانات
+
+    Returns:
+        F: الدالة المغلفة
+    """
+    operation = func.__name__
+
+    @functools.wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        record_db_operation(operation)
+        started = time.perf_counter()
+        try:
+            with tracer.span(f"db {operation}"):
+                return func(*args, **kwargs)
+        except DatabaseError:
+            DB_ERRORS.inc(operation)
+            raise
+        finally:
+            DB_QUERY_SECONDS.observe(time.perf_counter() - started, operation)
+
+    return wrapper  # type: ignore[return-value]
+
 
 def get_connection() -> sqlite3.Connection:
     """
@@ -29,7 +73,8 @@ def get_connection() -> sqlite3.Connection:
     try:
         return sqlite3.connect(
             DATABASE_FILE,
-            detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES
+            detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES,
+            factory=ProfilingConnection if query_profiler.enabled else sqlite3.Connection
         )
     except sqlite3.Error as e:
         logger.error(f"فشل الاتصال بقاعدة البيانات: {e}")
@@ -76,6 +121,53 @@ def init_db() -> None:
             cursor.execute(
                 "CREATE INDEX IF NOT EXISTS idx_points ON users(points)"
             )
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS idx_referred_by ON users(referred_by)"
+            )
+            
+            # جدول دلاء المقاييس الزمنية (دقيقة/ساعة/يوم)
+            cursor.execute(
+                """
+                CREATE TABLE IF NOT EXISTS metric_buckets (
+                    name TEXT NOT NULL,
+                    resolution TEXT NOT NULL,
+                    bucket INTEGER NOT NULL,
+                    value INTEGER DEFAULT 0,
+                    PRIMARY KEY (name, resolution, bucket)
+                )
+                """
+            )
+            
+            # جدول رسومات HyperLogLog اليومية للمستخدمين النشطين
+            cursor.execute(
+                """
+                CREATE TABLE IF NOT EXISTS activity_sketches (
+                    day TEXT PRIMARY KEY,
+                    precision INTEGER NOT NULL,
+                    registers BLOB NOT NULL
+                )
+                """
+            )
+            
+            # خرائط النشاط اليومية وفهارس المستخدمين المتتالية
+            cursor.execute(
+                """
+                CREATE TABLE IF NOT EXISTS activity_bitmaps (
+                    kind TEXT NOT NULL,
+                    day TEXT NOT NULL,
+                    bits BLOB NOT NULL,
+                    PRIMARY KEY (kind, day)
+                )
+                """
+            )
+            cursor.execute(
+                """
+                CREATE TABLE IF NOT EXISTS activity_user_index (
+                    user_id INTEGER PRIMARY KEY,
+                    idx INTEGER NOT NULL UNIQUE
+                )
+                """
+            )
             
             conn.commit()
             logger.info("✅ تم تهيئة قاعدة البيانات بنجاح")
@@ -112,6 +204,7 @@ def _row_to_user(row: Optional[sqlite3.Row]) -> Optional[User]:
     return User(**data)
 
 
+@_db_operation
 def get_user(user_id: int) -> Optional[User]:
     """
     الحصول على مستخدم من قاعدة البيانات برقم معرّفه.
@@ -137,6 +230,7 @@ def get_user(user_id: int) -> Optional[User]:
         raise DatabaseError(f"خطأ في استرجاع المستخدم: {e}") from e
 
 
+@_db_operation
 def get_user_by_referral_code(code: str) -> Optional[User]:
     """
     البحث عن مستخدم باستخدام رمز الإحالة الخاص به.
@@ -162,6 +256,7 @@ def get_user_by_referral_code(code: str) -> Optional[User]:
         raise DatabaseError(f"خطأ في البحث عن رمز الإحالة: {e}") from e
 
 
+@_db_operation
 def find_user_by_username(username: str) -> Optional[User]:
     """
     البحث عن مستخدم باستخدام اسم المستخدم (غير حساس لحالة الأحرف).
@@ -190,6 +285,7 @@ def find_user_by_username(username: str) -> Optional[User]:
         raise DatabaseError(f"خطأ في البحث عن المستخدم: {e}") from e
 
 
+@_db_operation
 def save_user(user: User) -> None:
     """
     حفظ أو تحديث مستخدم في قاعدة البيانات.
@@ -220,12 +316,54 @@ def save_user(user: User) -> None:
                 )
             )
             conn.commit()
-            logger.debug(f"تم حفظ المستخدم {user.user_id}")
+            logger.debug("تم حفظ المستخدم %s", user.user_id)
     except sqlite3.Error as e:
         logger.error(f"خطأ في حفظ المستخدم {user.user_id}: {e}")
         raise DatabaseError(f"خطأ في حفظ المستخدم: {e}") from e
 
 
+@_db_operation
+def save_users(users: Iterable[User]) -> int:
+    """
+    حفظ مجموعة من المستخدمين دفعة واحدة في معاملة واحدة.
+
+    Args:
+        users (Iterable[User]): المستخدمون المراد حفظهم
+
+    Returns:
+        int: عدد المستخدمين المحفوظين
+
+    Raises:
+        DatabaseError: في حالة حدوث خطأ في قاعدة البيانات
+    """
+    try:
+        with get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.executemany(
+                """
+                INSERT OR REPLACE INTO users (
+                    user_id, username, first_name, points, referral_code,
+                    referred_by, is_banned, join_date, level, experience, rank
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    (
+                        user.user_id, user.username, user.first_name, user.points,
+                        user.referral_code, user.referred_by, int(user.is_banned),
+                        user.join_date, user.level, user.experience, user.rank
+                    )
+                    for user in users
+                )
+            )
+            conn.commit()
+            logger.debug("تم حفظ %d مستخدم", cursor.rowcount)
+            return cursor.rowcount
+    except sqlite3.Error as e:
+        logger.error(f"خطأ في حفظ المستخدمين: {e}")
+        raise DatabaseError(f"خطأ في حفظ المستخدمين: {e}") from e
+
+
+@_db_operation
 def delete_user(user_id: int) -> bool:
     """
     حذف مستخدم من قاعدة البيانات.
@@ -246,7 +384,7 @@ def delete_user(user_id: int) -> bool:
             conn.commit()
             
             if cursor.rowcount > 0:
-                logger.info(f"تم حذف المستخدم {user_id}")
+                logger.info("تم حذف المستخدم %s", user_id)
                 return True
             return False
     except sqlite3.Error as e:
@@ -254,6 +392,7 @@ def delete_user(user_id: int) -> bool:
         raise DatabaseError(f"خطأ في حذف المستخدم: {e}") from e
 
 
+@_db_operation
 def get_all_users() -> List[User]:
     """
     الحصول على جميع المستخدمين من قاعدة البيانات.
@@ -276,6 +415,7 @@ def get_all_users() -> List[User]:
         raise DatabaseError(f"خطأ في استرجاع المستخدمين: {e}") from e
 
 
+@_db_operation
 def get_top_users_by_points(limit: int = 10) -> List[User]:
     """
     الحصول على أكثر المستخدمين نقاطًا.
@@ -304,6 +444,7 @@ def get_top_users_by_points(limit: int = 10) -> List[User]:
         raise DatabaseError(f"خطأ في استرجاع أعلى المستخدمين: {e}") from e
 
 
+@_db_operation
 def get_top_users_by_level(limit: int = 10) -> List[User]:
     """
     الحصول على أكثر المستخدمين مستوى.
@@ -332,6 +473,7 @@ def get_top_users_by_level(limit: int = 10) -> List[User]:
         raise DatabaseError(f"خطأ في استرجاع أعلى المستخدمين: {e}") from e
 
 
+@_db_operation
 def get_total_users_count() -> int:
     """
     الحصول على العدد الإجمالي للمستخدمين.
@@ -353,6 +495,7 @@ def get_total_users_count() -> int:
         raise DatabaseError(f"خطأ في عد المستخدمين: {e}") from e
 
 
+@_db_operation
 def get_banned_users_count() -> int:
     """
     الحصول على عدد المستخدمين المحظورين.
@@ -374,6 +517,7 @@ def get_banned_users_count() -> int:
         raise DatabaseError(f"خطأ في عد المستخدمين المحظورين: {e}") from e
 
 
+@_db_operation
 def get_active_users_count(days: int = 1) -> int:
     """
     الحصول على عدد المستخدمين النشطين في آخر عدد من الأيام.
@@ -399,6 +543,7 @@ def get_active_users_count(days: int = 1) -> int:
         raise DatabaseError(f"خطأ في عد المستخدمين النشطين: {e}") from e
 
 
+@_db_operation
 def get_referral_count(user_id: int) -> int:
     """
     الحصول على عدد الإحالات لمستخدم معين.
@@ -426,6 +571,7 @@ def get_referral_count(user_id: int) -> int:
         raise DatabaseError(f"خطأ في عد الإحالات: {e}") from e
 
 
+@_db_operation
 def get_top_users_by_referrals(limit: int = 10) -> List[Dict[str, Any]]:
     """
     الحصول على أكثر المستخدمين إحالةً.
@@ -462,3 +608,237 @@ def get_top_users_by_referrals(limit: int = 10) -> List[Dict[str, Any]]:
     except sqlite3.Error as e:
         logger.error(f"خطأ في استرجاع أعلى المستخدمين بالإحالات: {e}")
         raise DatabaseError(f"خطأ في استرجاع أعلى المستخدمين: {e}") from e
+
+
+@_db_operation
+def save_metric_buckets(
+    fine_rows: List[Tuple[str, str, int, int]],
+    day_rows: List[Tuple[str, str, int, int]]
+) -> None:
+    """
+    حفظ دلاء المقاييس الزمنية في قاعدة البيانات.
+    
+    تُستبدل دلاء الدقائق والساعات بالكامل (فهي قليلة ومتغيرة باستمرار)،
+    بينما تُحدَّث دلاء الأيام المعدلة فقط.
+    
+    Args:
+        fine_rows (List[Tuple[str, str, int, int]]): صفوف (الاسم، الدقة، الدلو، القيمة) للدقائق والساعات
+        day_rows (List[Tuple[str, str, int, int]]): صفوف دلاء الأيام المعدلة
+        
+    Raises:
+        DatabaseError: في حالة حدوث خطأ في قاعدة البيانات
+    """
+    try:
+        with get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "DELETE FROM metric_buckets WHERE resolution IN ('minute', 'hour')"
+            )
+            cursor.executemany(
+                """
+                INSERT OR REPLACE INTO metric_buckets (name, resolution, bucket, value)
+                VALUES (?, ?, ?, ?)
+                """,
+                fine_rows + day_rows
+            )
+            conn.commit()
+    except sqlite3.Error as e:
+        logger.error(f"خطأ في حفظ دلاء المقاييس: {e}")
+        raise DatabaseError(f"خطأ في حفظ دلاء المقاييس: {e}") from e
+
+
+@_db_operation
+def get_metric_buckets(min_day_bucket: int = 0) -> List[Tuple[str, str, int, int]]:
+    """
+    استرجاع دلاء المقاييس الزمنية المحفوظة.
+    
+    Args:
+        min_day_bucket (int): أقدم دلو يومي يتم استرجاعه (افتراضي: الكل)
+        
+    Returns:
+        List[Tuple[str, str, int, int]]: صفوف (الاسم، الدقة، الدلو، القيمة)
+        
+    Raises:
+        DatabaseError: في حالة حدوث خطأ في قاعدة البيانات
+    """
+    try:
+        with get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                """
+                SELECT name, resolution, bucket, value FROM metric_buckets
+                WHERE resolution != 'day' OR bucket >= ?
+                """,
+                (min_day_bucket,)
+            )
+            return [tuple(row) for row in cursor.fetchall()]
+    except sqlite3.Error as e:
+        logger.error(f"خطأ في استرجاع دلاء المقاييس: {e}")
+        raise DatabaseError(f"خطأ في استرجاع دلاء المقاييس: {e}") from e
+
+
+@_db_operation
+def save_activity_sketches(rows: List[Tuple[str, int, bytes]]) -> None:
+    """
+    حفظ رسومات النشاط اليومية.
+    
+    Args:
+        rows (List[Tuple[str, int, bytes]]): صفوف (اليوم، الدقة، السجلات المضغوطة)
+        
+    Raises:
+        DatabaseError: في حالة حدوث خطأ في قاعدة البيانات
+    """
+    if not rows:
+        return
+    
+    try:
+        with get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.executemany(
+                """
+                INSERT OR REPLACE INTO activity_sketches (day, precision, registers)
+                VALUES (?, ?, ?)
+                """,
+                rows
+            )
+            conn.commit()
+    except sqlite3.Error as e:
+        logger.error(f"خطأ في حفظ رسومات النشاط: {e}")
+        raise DatabaseError(f"خطأ في حفظ رسومات النشاط: {e}") from e
+
+
+@_db_operation
+def get_activity_sketches(since_day: str) -> List[Tuple[str, int, bytes]]:
+    """
+    استرجاع رسومات النشاط اليومية منذ يوم معين.
+    
+    Args:
+        since_day (str): أقدم يوم بصيغة YYYY-MM-DD
+        
+    Returns:
+        List[Tuple[str, int, bytes]]: صفوف (اليوم، الدقة، السجلات المضغوطة)
+        
+    Raises:
+        DatabaseError: في حالة حدوث خطأ في قاعدة البيانات
+    """
+    try:
+        with get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT day, precision, registers FROM activity_sketches WHERE day >= ?",
+                (since_day,)
+            )
+            return [tuple(row) for row in cursor.fetchall()]
+    except sqlite3.Error as e:
+        logger.error(f"خطأ في استرجاع رسومات النشاط: {e}")
+        raise DatabaseError(f"خطأ في استرجاع رسومات النشاط: {e}") from e
+
+
+@_db_operation
+def save_activity_bitmaps(
+    index_rows: List[Tuple[int, int]],
+    bitmap_rows: List[Tuple[str, str, bytes]]
+) -> None:
+    """
+    حفظ فهارس المستخدمين الجديدة وخرائط النشاط المعدلة.
+    
+    Args:
+        index_rows (List[Tuple[int, int]]): صفوف (معرّف المستخدم، الفهرس)
+        bitmap_rows (List[Tuple[str, str, bytes]]): صفوف (النوع، اليوم، الخريطة المضغوطة)
+        
+    Raises:
+        DatabaseError: في حالة حدوث خطأ في قاعدة البيانات
+    """
+    if not index_rows and not bitmap_rows:
+        return
+    
+    try:
+        with get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.executemany(
+                "INSERT OR IGNORE INTO activity_user_index (user_id, idx) VALUES (?, ?)",
+                index_rows
+            )
+            cursor.executemany(
+                "INSERT OR REPLACE INTO activity_bitmaps (kind, day, bits) VALUES (?, ?, ?)",
+                bitmap_rows
+            )
+            conn.commit()
+    except sqlite3.Error as e:
+        logger.error(f"خطأ في حفظ خرائط النشاط: {e}")
+        raise DatabaseError(f"خطأ في حفظ خرائط النشاط: {e}") from e
+
+
+@_db_operation
+def get_activity_bitmaps(since_day: str) -> List[Tuple[str, str, bytes]]:
+    """
+    استرجاع خرائط النشاط منذ يوم معين.
+    
+    Args:
+        since_day (str): أقدم يوم بصيغة YYYY-MM-DD
+        
+    Returns:
+        List[Tuple[str, str, bytes]]: صفوف (النوع، اليوم، الخريطة المضغوطة)
+        
+    Raises:
+        DatabaseError: في حالة حدوث خطأ في قاعدة البيانات
+    """
+    try:
+        with get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT kind, day, bits FROM activity_bitmaps WHERE day >= ?",
+                (since_day,)
+            )
+            return [tuple(row) for row in cursor.fetchall()]
+    except sqlite3.Error as e:
+        logger.error(f"خطأ في استرجاع خرائط النشاط: {e}")
+        raise DatabaseError(f"خطأ في استرجاع خرائط النشاط: {e}") from e
+
+
+@_db_operation
+def get_activity_user_index() -> List[Tuple[int, int]]:
+    """
+    استرجاع فهارس المستخدمين المتتالية المستخدمة في خرائط النشاط.
+    
+    Returns:
+        List[Tuple[int, int]]: صفوف (معرّف المستخدم، الفهرس)
+        
+    Raises:
+        DatabaseError: في حالة حدوث خطأ في قاعدة البيانات
+    """
+    try:
+        with get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT user_id, idx FROM activity_user_index ORDER BY idx")
+            return [tuple(row) for row in cursor.fetchall()]
+    except sqlite3.Error as e:
+        logger.error(f"خطأ في استرجاع فهارس المستخدمين: {e}")
+        raise DatabaseError(f"خطأ في استرجاع فهارس المستخدمين: {e}") from e
+
+
+@_db_operation
+def get_user_join_dates(since: datetime.date) -> List[Tuple[int, Optional[datetime.datetime]]]:
+    """
+    استرجاع تواريخ انضمام المستخدمين منذ يوم معين.
+    
+    Args:
+        since (datetime.date): أقدم يوم انضمام
+        
+    Returns:
+        List[Tuple[int, Optional[datetime.datetime]]]: صفوف (معرّف المستخدم، تاريخ الانضمام)
+        
+    Raises:
+        DatabaseError: في حالة حدوث خطأ في قاعدة البيانات
+    """
+    try:
+        with get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT user_id, join_date FROM users WHERE join_date >= ?",
+                (since.isoformat(),)
+            )
+            return [tuple(row) for row in cursor.fetchall()]
+    except sqlite3.Error as e:
+        logger.error(f"خطأ في استرجاع تواريخ الانضمام: {e}")
+        raise DatabaseError(f"خطأ في استرجاع تواريخ الانضمام: {e}") from e
@@ -0,0 +1,261 @@
+"""
+محلل استعلامات SQL (اختياري) لقاعدة البيانات.
+
+عند تفعيله، تُنشأ الاتصالات بفئة اتصال خاصة تقيس كل استعلام:
+بصمة الاستعلام، عدد الاستدعاءات، الزمن الكلي والأقصى، وعدد الصفوف.
+الاستعلامات التي تتجاوز الحد المحدد تُسجَّل مع خطة التنفيذ
+(EXPLAIN QUERY PLAN). عند التعطيل لا توجد أي تكلفة إضافية.
+"""
+
+import logging
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional
+
+from src.core.config import DB_SLOW_QUERY_MS
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_WHITESPACE = re.compile(r"\s+")
+_EXPLAINABLE = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH", "REPLACE")
+
+
+def fingerprint(sql: str) -> str:
+    """
+    بصمة الاستعلام: توحيد المسافات واستبدال القيم الحرفية بـ ?.
+
+    Args:
+        sql (str): نص الاستعلام
+
+    Returns:
+        str: البصمة
+    """
+    sql = _STRING_LITERAL.sub("?", sql)
+    sql = _NUMBER_LITERAL.sub("?", sql)
+    return _WHITESPACE.sub(" ", sql).strip()
+
+
+@dataclass
+class QueryStats:
+    """
+    إحصائيات بصمة استعلام واحدة.
+    """
+    calls: int = 0
+    total_time: float = 0.0
+    max_time: float = 0.0
+    rows: int = 0
+    slow_calls: int = 0
+    plan: Optional[str] = None
+
+    @property
+    def avg_time(self) -> float:
+        """متوسط زمن الاستدعاء بالثواني."""
+        return self.total_time / self.calls if self.calls else 0.0
+
+
+class QueryProfiler:
+    """
+    مجمّع إحصائيات الاستعلامات وسجل الاستعلامات البطيئة.
+    """
+
+    def __init__(self, slow_threshold_ms: float = 100.0):
+        """
+        تهيئة المحلل.
+
+        Args:
+            slow_threshold_ms (float): حد الاستعلام البطيء بالمللي ثانية (افتراضي: 100)
+        """
+        self.enabled: bool = False
+        self.slow_threshold: float = slow_threshold_ms / 1000
+        self._stats: Dict[str, QueryStats] = {}
+        self._lock = threading.Lock()
+
+    def enable(self, slow_threshold_ms: Optional[float] = None) -> None:
+        """تفعيل التحليل (يسري على الاتصالات الجديدة)."""
+        if slow_threshold_ms is not None:
+            self.slow_threshold = slow_threshold_ms / 1000
+        self.enabled = True
+        logger.info("🔬 تم تفعيل محلل استعلامات SQL (الحد: %.0f ms)", self.slow_threshold * 1000)
+
+    def disable(self) -> None:
+        """تعطيل التحليل."""
+        self.enabled = False
+        logger.info("تم تعطيل محلل استعلامات SQL")
+
+    def reset(self) -> None:
+        """مسح الإحصائيات المجمعة."""
+        with self._lock:
+            self._stats.clear()
+
+    def record(self, sql: str, elapsed: float, rows: int = 0) -> QueryStats:
+        """
+        تسجيل تنفيذ استعلام.
+
+        Args:
+            sql (str): نص الاستعلام
+            elapsed (float): الزمن بالثواني
+            rows (int): عدد الصفوف المتأثرة أو المعادة
+
+        Returns:
+            QueryStats: إحصائيات البصمة بعد التحديث
+        """
+        key = fingerprint(sql)
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = QueryStats()
+            stats.calls += 1
+            stats.total_time += elapsed
+            stats.max_time = max(stats.max_time, elapsed)
+            stats.rows += rows
+        return stats
+
+    def add_rows(self, sql: str, rows: int, elapsed: float) -> None:
+        """إضافة صفوف وزمن جلب إلى بصمة استعلام منفّذ مسبقاً."""
+        key = fingerprint(sql)
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is not None:
+                stats.rows += rows
+                stats.total_time += elapsed
+
+    def stats(self) -> Dict[str, QueryStats]:
+        """نسخة من الإحصائيات الحالية."""
+        with self._lock:
+            return dict(self._stats)
+
+    def report(self, limit: int = 10) -> str:
+        """
+        تقرير بأثقل الاستعلامات حسب الزمن الكلي بصيغة Markdown.
+
+        Args:
+            limit (int): عدد الاستعلامات في التقرير (افتراضي: 10)
+
+        Returns:
+            str: التقرير
+        """
+        state = "🟢 مفعّل" if self.enabled else "⚪ معطّل"
+        lines = [
+            "🔬 **محلل استعلامات SQL**",
+            f"الحالة: {state} | حد البطء: {self.slow_threshold * 1000:.0f} ms\n",
+        ]
+
+        ranked = sorted(self.stats().items(), key=lambda item: item[1].total_time, reverse=True)
+        if not ranked:
+            lines.append("لا توجد استعلامات مسجلة بعد.")
+        for sql, stats in ranked[:limit]:
+            lines.append(
+                f"`{sql[:120]}`\n"
+                f"  {stats.calls} مرة | كلي {stats.total_time * 1000:.1f} ms | "
+                f"أقصى {stats.max_time * 1000:.1f} ms | صفوف {stats.rows} | "
+                f"بطيء {stats.slow_calls}"
+            )
+            if stats.plan:
+                lines.append(f"  خطة: `{stats.plan[:200]}`")
+        return "\n".join(lines)
+
+    def _explain(self, connection: sqlite3.Connection, sql: str, parameters: Any) -> Optional[str]:
+        """الحصول على خطة تنفيذ الاستعلام (EXPLAIN QUERY PLAN)."""
+        if parameters is None or not sql.lstrip().upper().startswith(_EXPLAINABLE):
+            return None
+        try:
+            cursor = sqlite3.Cursor(connection)
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", parameters)
+            return " | ".join(str(tuple(row)[-1]) for row in cursor.fetchall())
+        except sqlite3.Error as e:
+            return f"تعذر الحصول على الخطة: {e}"
+
+    def check_slow(
+        self,
+        connection: sqlite3.Connection,
+        sql: str,
+        parameters: Any,
+        elapsed: float,
+        stats: QueryStats
+    ) -> None:
+        """تسجيل الاستعلام البطيء مع خطة تنفيذه (parameters=None لتخطي الخطة)."""
+        if elapsed < self.slow_threshold:
+            return
+        with self._lock:
+            stats.slow_calls += 1
+        if stats.plan is None:
+            stats.plan = self._explain(connection, sql, parameters)
+        logger.warning(
+            "🐢 استعلام بطيء (%.1f ms): %s | الخطة: %s",
+            elapsed * 1000, fingerprint(sql), stats.plan
+        )
+
+
+class ProfilingCursor(sqlite3.Cursor):
+    """
+    مؤشر يقيس زمن التنفيذ والجلب وعدد الصفوف لكل استعلام.
+    """
+
+    _sql: Optional[str] = None
+
+    def execute(self, sql: str, parameters: Any = ()) -> "ProfilingCursor":
+        started = time.perf_counter()
+        super().execute(sql, parameters)
+        elapsed = time.perf_counter() - started
+
+        self._sql = sql
+        stats = query_profiler.record(sql, elapsed, max(self.rowcount, 0))
+        query_profiler.check_slow(self.connection, sql, parameters, elapsed, stats)
+        return self
+
+    def executemany(self, sql: str, seq_of_parameters: Iterable[Any]) -> "ProfilingCursor":
+        started = time.perf_counter()
+        super().executemany(sql, seq_of_parameters)
+        elapsed = time.perf_counter() - started
+
+        self._sql = None
+        stats = query_profiler.record(sql, elapsed, max(self.rowcount, 0))
+        query_profiler.check_slow(self.connection, sql, None, elapsed, stats)
+        return self
+
+    def _fetched(self, rows: int, started: float) -> None:
+        """تسجيل الصفوف المجلوبة لآخر استعلام."""
+        if self._sql is not None and rows:
+            query_profiler.add_rows(self._sql, rows, time.perf_counter() - started)
+
+    def fetchone(self) -> Any:
+        started = time.perf_counter()
+        row = super().fetchone()
+        self._fetched(row is not None, started)
+        return row
+
+    def fetchmany(self, size: int = 1) -> List[Any]:
+        started = time.perf_counter()
+        rows = super().fetchmany(size)
+        self._fetched(len(rows), started)
+        return rows
+
+    def fetchall(self) -> List[Any]:
+        started = time.perf_counter()
+        rows = super().fetchall()
+        self._fetched(len(rows), started)
+        return rows
+
+    def __next__(self) -> Any:
+        started = time.perf_counter()
+        row = super().__next__()
+        self._fetched(1, started)
+        return row
+
+
+class ProfilingConnection(sqlite3.Connection):
+    """
+    اتصال تنشئ مؤشراته إحصائيات المحلل.
+    """
+
+    def cursor(self, factory: type = ProfilingCursor) -> sqlite3.Cursor:
+        return super().cursor(factory)
+
+
+# إنشاء مثيل من محلل الاستعلامات
+query_profiler = QueryProfiler(DB_SLOW_QUERY_MS)
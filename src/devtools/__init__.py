@@ -0,0 +1,6 @@
+"""
+أدوات التطوير وقياس الأداء للبوت Dragon-bot.
+
+أدوات تعمل خارج التشغيل الفعلي (بدون Telegram) لإعادة تشغيل
+حركة مسجلة وقياس أداء المعالجات وقاعدة البيانات بين الإصدارات.
+"""
@@ -0,0 +1,292 @@
+"""
+قياس أداء عمليات قاعدة البيانات على أحجام مختلفة (10k/100k/1M مستخدم).
+
+يبني قواعد بيانات اصطناعية بأشجار إحالة واقعية (بعض المحيلين يجلبون
+معظم المستخدمين)، ثم يقيس زمن دوال src/database/manager.py على كل حجم.
+تُكتب النتائج بصيغة JSON، ويقارن وضع --compare النتائج بخط أساس محفوظ
+ويُبلغ عن التراجعات (مع رمز خروج 1 لاستخدامه في CI).
+
+الاستخدام:
+    python -m src.devtools.db_benchmark --sizes 10000,100000 --output bench.json
+    python -m src.devtools.db_benchmark --sizes 10000,100000 --compare bench.json
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# أداة القياس لا تتصل بـ Telegram، لكن الإعدادات تتطلب وجود الرمز
+os.environ.setdefault("BOT_TOKEN", "123456:BENCHMARK")
+
+from src.database import manager
+from src.devtools.replay import percentile
+from src.models.user import User
+
+DEFAULT_SIZES: Tuple[int, ...] = (10_000, 100_000, 1_000_000)
+"""أحجام قواعد البيانات الافتراضية"""
+
+DEFAULT_THRESHOLD: float = 0.25
+"""نسبة الزيادة في الوسيط التي تُعتبر تراجعاً"""
+
+MIN_REGRESSION_MS: float = 0.05
+"""أقل فرق مطلق (ms) يُعتبر تراجعاً، لتجاهل ضجيج العمليات السريعة جداً"""
+
+_REFERRAL_RATE: float = 0.6
+"""نسبة المستخدمين الذين انضموا عبر إحالة"""
+
+
+@dataclass
+class Regression:
+    """
+    تراجع أداء عملية واحدة مقارنة بخط الأساس.
+    """
+    size: str
+    operation: str
+    baseline_ms: float
+    current_ms: float
+
+    @property
+    def ratio(self) -> float:
+        """نسبة الزمن الحالي إلى زمن خط الأساس."""
+        return self.current_ms / self.baseline_ms if self.baseline_ms else float("inf")
+
+
+def generate_users(count: int, seed: int = 42) -> Iterator[User]:
+    """
+    توليد مستخدمين اصطناعيين بشجرة إحالة ذات ذيل طويل.
+
+    نصف الإحالات تُنسب لمحيل سابق بالتناسب مع عدد إحالاته (الارتباط التفضيلي)،
+    والنصف الآخر لمستخدم سابق عشوائي.
+
+    Args:
+        count (int): عدد المستخدمين
+        seed (int): بذرة العشوائية
+
+    Yields:
+        User: المستخدمون بالترتيب من 1 إلى count
+    """
+    rng = random.Random(seed)
+    referred_by: List[Optional[int]] = [None] * (count + 1)
+    referrals = [0] * (count + 1)
+    referrers: List[int] = []
+    for user_id in range(2, count + 1):
+        if rng.random() >= _REFERRAL_RATE:
+            continue
+        if referrers and rng.random() < 0.5:
+            referrer = rng.choice(referrers)
+        else:
+            referrer = rng.randint(1, user_id - 1)
+        referred_by[user_id] = referrer
+        referrals[referrer] += 1
+        referrers.append(referrer)
+
+    now = datetime.datetime(2026, 1, 1)
+    for user_id in range(1, count + 1):
+        experience = int(rng.expovariate(1 / 400))
+        yield User(
+            user_id=user_id,
+            username=f"user{user_id}" if rng.random() < 0.7 else None,
+            first_name=f"User {user_id}",
+            points=referrals[user_id] * 10 + rng.randint(0, 50),
+            referral_code=f"R{user_id:08x}",
+            referred_by=referred_by[user_id],
+            is_banned=rng.random() < 0.01,
+            join_date=now - datetime.timedelta(minutes=rng.randint(0, 365 * 24 * 60)),
+            level=1 + experience // 100,
+            experience=experience,
+        )
+
+
+def build_database(path: str, count: int, seed: int = 42) -> None:
+    """
+    إنشاء قاعدة بيانات اصطناعية (أو إعادة استخدامها إذا كانت بنفس الحجم).
+
+    Args:
+        path (str): مسار ملف قاعدة البيانات
+        count (int): عدد المستخدمين
+        seed (int): بذرة العشوائية
+    """
+    manager.DATABASE_FILE = path
+    manager.init_db()
+    if manager.get_total_users_count() == count:
+        return
+
+    batch: List[User] = []
+    for user in generate_users(count, seed):
+        batch.append(user)
+        if len(batch) >= 50_000:
+            manager.save_users(batch)
+            batch.clear()
+    manager.save_users(batch)
+
+
+def _operations(count: int, rng: random.Random) -> Dict[str, Tuple[Callable[[], Any], int]]:
+    """العمليات المقاسة: الاسم ← (الدالة، عدد مرات التشغيل)."""
+
+    def random_id() -> int:
+        return rng.randint(1, count)
+
+    def save_existing() -> None:
+        user = manager.get_user(random_id())
+        if user:
+            user.points += 1
+            manager.save_user(user)
+
+    return {
+        "get_user": (lambda: manager.get_user(random_id()), 500),
+        "save_user": (save_existing, 200),
+        "find_user_by_username": (lambda: manager.find_user_by_username(f"user{random_id()}"), 500),
+        "get_referral_count": (lambda: manager.get_referral_count(random_id()), 200),
+        "get_top_users_by_points": (manager.get_top_users_by_points, 20),
+        "get_top_users_by_level": (manager.get_top_users_by_level, 20),
+        "get_top_users_by_referrals": (manager.get_top_users_by_referrals, 5),
+        "get_total_users_count": (manager.get_total_users_count, 20),
+        "get_banned_users_count": (manager.get_banned_users_count, 20),
+        "get_active_users_count": (manager.get_active_users_count, 20),
+        "get_all_users": (manager.get_all_users, 3),
+    }
+
+
+def _time_operation(func: Callable[[], Any], runs: int, budget: float) -> Dict[str, float]:
+    """تشغيل عملية حتى عدد المرات أو نفاد الميزانية الزمنية (مرة واحدة على الأقل)."""
+    timings: List[float] = []
+    deadline = time.perf_counter() + budget
+    while len(timings) < runs and (not timings or time.perf_counter() < deadline):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return {
+        "runs": len(timings),
+        "min_ms": round(min(timings) * 1000, 4),
+        "median_ms": round(percentile(timings, 0.5) * 1000, 4),
+        "p95_ms": round(percentile(timings, 0.95) * 1000, 4),
+    }
+
+
+def run_benchmark(
+    sizes: Sequence[int],
+    data_dir: str,
+    seed: int = 42,
+    budget: float = 5.0,
+    operations: Optional[Sequence[str]] = None
+) -> Dict[str, Any]:
+    """
+    قياس جميع العمليات على كل حجم.
+
+    Args:
+        sizes (Sequence[int]): أحجام قواعد البيانات
+        data_dir (str): مجلد ملفات قواعد البيانات (تُعاد الاستخدام بين التشغيلات)
+        seed (int): بذرة العشوائية
+        budget (float): الميزانية الزمنية لكل عملية بالثواني
+        operations (Optional[Sequence[str]]): العمليات المقاسة (افتراضي: الكل)
+
+    Returns:
+        Dict[str, Any]: النتائج بصيغة قابلة للتخزين كـ JSON
+    """
+    results: Dict[str, Dict[str, Dict[str, float]]] = {}
+    for size in sizes:
+        build_started = time.perf_counter()
+        build_database(os.path.join(data_dir, f"bench_{size}.db"), size, seed)
+        print(f"[{size}] database ready in {time.perf_counter() - build_started:.1f}s", file=sys.stderr)
+
+        rng = random.Random(seed)
+        results[str(size)] = {}
+        for name, (func, runs) in _operations(size, rng).items():
+            if operations and name not in operations:
+                continue
+            results[str(size)][name] = _time_operation(func, runs, budget)
+            print(f"[{size}] {name}: {results[str(size)][name]['median_ms']} ms", file=sys.stderr)
+
+    return {
+        "meta": {
+            "created": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "seed": seed,
+        },
+        "results": results,
+    }
+
+
+def compare_results(
+    baseline: Dict[str, Any],
+    current: Dict[str, Any],
+    threshold: float = DEFAULT_THRESHOLD,
+    min_ms: float = MIN_REGRESSION_MS
+) -> List[Regression]:
+    """
+    مقارنة النتائج بخط الأساس.
+
+    Args:
+        baseline (Dict[str, Any]): نتائج خط الأساس
+        current (Dict[str, Any]): النتائج الحالية
+        threshold (float): نسبة الزيادة في الوسيط التي تُعتبر تراجعاً
+        min_ms (float): أقل فرق مطلق بالمللي ثانية يُعتبر تراجعاً
+
+    Returns:
+        List[Regression]: العمليات التي تراجع أداؤها (للأحجام والعمليات المشتركة فقط)
+    """
+    regressions: List[Regression] = []
+    for size, operations in current["results"].items():
+        for name, stats in operations.items():
+            base = baseline["results"].get(size, {}).get(name)
+            if base is None:
+                continue
+            base_ms, current_ms = base["median_ms"], stats["median_ms"]
+            if current_ms > base_ms * (1 + threshold) and current_ms - base_ms > min_ms:
+                regressions.append(Regression(size, name, base_ms, current_ms))
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """نقطة الدخول من سطر الأوامر."""
+    parser = argparse.ArgumentParser(description="Benchmark src/database/manager.py at several sizes")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)), help="comma separated user counts")
+    parser.add_argument("--data-dir", help="where to keep generated databases (default: temporary)")
+    parser.add_argument("--operations", help="comma separated subset of operations")
+    parser.add_argument("--budget", type=float, default=5.0, help="time budget per operation in seconds")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write results JSON to this file")
+    parser.add_argument("--compare", help="baseline results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(",") if size]
+    operations = args.operations.split(",") if args.operations else None
+    with tempfile.TemporaryDirectory() as tmp:
+        results = run_benchmark(sizes, args.data_dir or tmp, args.seed, args.budget, operations)
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+    if not args.compare:
+        return 0
+
+    with open(args.compare, encoding="utf-8") as f:
+        baseline = json.load(f)
+    regressions = compare_results(baseline, results, args.threshold)
+    for r in regressions:
+        print(
+            f"REGRESSION [{r.size}] {r.operation}: {r.baseline_ms} ms -> {r.current_ms} ms (x{r.ratio:.2f})",
+            file=sys.stderr
+        )
+    if not regressions:
+        print(f"No regressions above {args.threshold:.0%}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,245 @@
+"""
+خادم Bot API وهمي محلي لاختبارات الحمل من طرف إلى طرف.
+
+يتحدث ما يكفي من Bot API للبوت (getUpdates وsendMessage وeditMessageText
+وanswerCallbackQuery وgetMe، وتعيد باقي الطرق True)، مع حقن زمن استجابة
+وأخطاء وردود 429 مع retry_after. تُضاف التحديثات عبر push_update
+(أو بطلب POST إلى ‎/_push‎) وتُسلَّم للبوت عبر getUpdates الطويل.
+
+التشغيل المستقل ثم توجيه البوت إليه عبر BOT_API_URL:
+    python -m src.devtools.fake_bot_api --port 8081 --latency-ms 50 --retry-rate 0.01
+    BOT_API_URL=http://127.0.0.1:8081/bot python main.py
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl
+
+from src.devtools.replay import canned_result
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+_REQUEST_TIMEOUT: float = 60.0
+"""المهلة القصوى لانتظار طلب جديد على اتصال مفتوح بالثواني"""
+
+_NO_INJECTION = frozenset({"getUpdates", "getMe", "deleteWebhook", "setWebhook"})
+"""طرق لا تُحقن فيها الأخطاء (حتى يبقى الاستقبال نفسه سليماً)"""
+
+CallObserver = Callable[[str, Dict[str, Any]], None]
+
+
+class FakeBotApiServer:
+    """
+    خادم HTTP غير حاجب يحاكي Bot API.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        retry_rate: float = 0.0,
+        retry_after: int = 1,
+        seed: Optional[int] = None
+    ):
+        """
+        تهيئة الخادم.
+
+        Args:
+            host (str): عنوان الاستماع (افتراضي: 127.0.0.1)
+            port (int): منفذ الاستماع (0 لاختيار منفذ عشوائي)
+            latency (float): زمن الاستجابة المحاكى بالثواني
+            jitter (float): تذبذب عشوائي يضاف إلى الزمن بالثواني
+            error_rate (float): نسبة الطلبات التي تُرد بخطأ 500
+            retry_rate (float): نسبة الطلبات التي تُرد بـ 429 مع retry_after
+            retry_after (int): قيمة retry_after بالثواني في ردود 429
+            seed (Optional[int]): بذرة العشوائية لنتائج قابلة للتكرار
+        """
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.retry_rate = retry_rate
+        self.retry_after = retry_after
+        self.calls: Counter = Counter()
+        self.injected: Counter = Counter()
+        self.observers: List[CallObserver] = []
+        self._random = random.Random(seed)
+        self._updates: List[Dict[str, Any]] = []
+        self._next_update_id = 1
+        self._new_update = asyncio.Event()
+        self._message_id = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    @property
+    def base_url(self) -> str:
+        """عنوان Bot API الأساسي (يُمرَّر إلى base_url في التطبيق)."""
+        return f"http://{self.host}:{self.port}/bot"
+
+    async def start(self) -> None:
+        """بدء الاستماع على المنفذ المحدد."""
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info("🧪 Bot API الوهمي يعمل على %s", self.base_url)
+
+    async def stop(self) -> None:
+        """إيقاف الخادم وإغلاق الاتصالات."""
+        if self._server is not None:
+            self._new_update.set()  # إنهاء طلبات getUpdates المعلقة
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    def push_update(self, update: Dict[str, Any]) -> int:
+        """
+        إضافة تحديث إلى طابور getUpdates.
+
+        Args:
+            update (Dict[str, Any]): التحديث بصيغة Bot API (بدون update_id أو معه)
+
+        Returns:
+            int: معرّف التحديث
+        """
+        update_id = update.setdefault("update_id", self._next_update_id)
+        self._next_update_id = max(self._next_update_id, update_id) + 1
+        self._updates.append(update)
+        self._new_update.set()
+        return update_id
+
+    async def _get_updates(self, parameters: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """تنفيذ getUpdates مع الانتظار الطويل."""
+        offset = int(parameters.get("offset", 0))
+        limit = int(parameters.get("limit", 100))
+        timeout = float(parameters.get("timeout", 0))
+        if offset:
+            self._updates = [u for u in self._updates if u["update_id"] >= offset]
+        if not self._updates and timeout > 0:
+            self._new_update.clear()
+            try:
+                await asyncio.wait_for(self._new_update.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        return self._updates[:limit]
+
+    async def call(self, method: str, parameters: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+        """
+        تنفيذ طريقة Bot API.
+
+        Args:
+            method (str): اسم الطريقة
+            parameters (Dict[str, Any]): معاملات الطلب
+
+        Returns:
+            Tuple[int, Dict[str, Any]]: (رمز حالة HTTP، جسم الرد)
+        """
+        self.calls[method] += 1
+        if method == "getUpdates":
+            return 200, {"ok": True, "result": await self._get_updates(parameters)}
+
+        if self.latency or self.jitter:
+            await asyncio.sleep(self.latency + self._random.random() * self.jitter)
+
+        if method not in _NO_INJECTION:
+            roll = self._random.random()
+            if roll < self.retry_rate:
+                self.injected["retry_after"] += 1
+                return 429, {
+                    "ok": False, "error_code": 429,
+                    "description": f"Too Many Requests: retry after {self.retry_after}",
+                    "parameters": {"retry_after": self.retry_after},
+                }
+            if roll < self.retry_rate + self.error_rate:
+                self.injected["error"] += 1
+                return 500, {"ok": False, "error_code": 500, "description": "Internal Server Error"}
+
+        for observer in self.observers:
+            observer(method, parameters)
+        self._message_id += 1
+        return 200, {"ok": True, "result": canned_result(method, parameters, self._message_id)}
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """معالجة طلبات HTTP على اتصال واحد (مع keep-alive)."""
+        try:
+            while True:
+                head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), _REQUEST_TIMEOUT)
+                request_line, *header_lines = head.decode("latin-1").split("\r\n")
+                _, path, _ = request_line.split(" ", 2)
+                headers = {
+                    name.strip().lower(): value.strip()
+                    for name, _, value in (line.partition(":") for line in header_lines if line)
+                }
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+
+                status, payload = await self._dispatch(path, headers.get("content-type", ""), body)
+                data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                writer.write(
+                    f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(data)}\r\n\r\n".encode("latin-1") + data
+                )
+                await writer.drain()
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.CancelledError,
+                ValueError, ConnectionError):
+            pass
+        except Exception as e:
+            logger.error(f"خطأ في Bot API الوهمي: {e}")
+        finally:
+            writer.close()
+
+    async def _dispatch(self, path: str, content_type: str, body: bytes) -> Tuple[int, Dict[str, Any]]:
+        """توجيه الطلب حسب المسار."""
+        path = path.split("?", 1)[0]
+        if path == "/_push":
+            return 200, {"ok": True, "result": self.push_update(json.loads(body))}
+
+        method = path.rsplit("/", 1)[-1]
+        parameters: Dict[str, Any] = {}
+        if content_type.startswith("application/json") and body:
+            parameters = json.loads(body)
+        elif content_type.startswith("application/x-www-form-urlencoded"):
+            parameters = dict(parse_qsl(body.decode("utf-8")))
+        return await self.call(method, parameters)
+
+
+async def _serve(server: FakeBotApiServer) -> None:
+    """تشغيل الخادم حتى المقاطعة."""
+    await server.start()
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """نقطة الدخول من سطر الأوامر."""
+    parser = argparse.ArgumentParser(description="Local fake Telegram Bot API server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--retry-rate", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    server = FakeBotApiServer(
+        args.host, args.port, args.latency_ms / 1000, args.jitter_ms / 1000,
+        args.error_rate, args.retry_rate, args.retry_after
+    )
+    try:
+        asyncio.run(_serve(server))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
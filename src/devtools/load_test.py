@@ -0,0 +1,368 @@
+"""
+مولّد حمل من طرف إلى طرف عبر خادم Bot API الوهمي.
+
+ينشئ مستخدمين اصطناعيين يرسلون /start (مع رموز إحالة مستخدمين سابقين)
+ثم يضغطون أزرار القائمة بمعدل مستهدف، ومسؤولاً اصطناعياً يتصفح قائمة
+الإشعارات ويرسل إذاعات لجميع المستخدمين، ويقيس زمن الاستجابة من لحظة إتاحة
+التحديث في getUpdates حتى أول رد من البوت لنفس المستخدم (أو answerCallbackQuery
+لنفس الاستعلام). يعمل البوت افتراضياً في نفس العملية (build_application
+مع قاعدة بيانات مؤقتة)، أو خارجياً مع --external و BOT_API_URL
+(سيناريوهات المسؤول تتطلب عندها --admin-id من ADMIN_IDS الخاصة بالبوت).
+
+الاستخدام:
+    python -m src.devtools.load_test --users 200 --rate 50 --duration 30 --latency-ms 40 --retry-rate 0.01
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import tempfile
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional
+
+from src.devtools.fake_bot_api import FakeBotApiServer
+from src.devtools.replay import REPLAY_TOKEN, percentile
+
+MENU_BUTTONS: List[str] = ["user_points", "user_referral", "store_menu", "user_about", "main_menu"]
+"""أزرار القائمة الرئيسية التي يضغطها المستخدمون الاصطناعيون"""
+
+NOTIFICATION_BUTTONS: List[str] = ["show_notifications_menu", "notifications_refresh", "notifications_mark_read"]
+"""أزرار قائمة الإشعارات التي يضغطها المسؤول الاصطناعي"""
+
+BROADCAST_PREFIX: str = "load broadcast"
+"""بداية نص الإذاعات الاصطناعية (لتمييز نسخها المرسلة للمستخدمين عن الردود)"""
+
+FIRST_USER_ID: int = 10_000_000
+"""أول معرّف للمستخدمين الاصطناعيين"""
+
+ADMIN_USER_ID: int = FIRST_USER_ID - 1
+"""معرّف المسؤول الاصطناعي عند تشغيل البوت في نفس العملية"""
+
+ADMIN_SHARE: float = 0.05
+"""نسبة التحديثات التي يرسلها المسؤول الاصطناعي"""
+
+BROADCAST_INTERVAL: float = 5.0
+"""أقل فاصل بين إذاعتين بالثواني (أطول من مدة تجاهل تكرار الأزرار)"""
+
+_REFERRAL_LINK = re.compile(r"start=(\w+)")
+
+
+@dataclass
+class LoadReport:
+    """
+    نتيجة تشغيل حمل واحد.
+    """
+    duration: float = 0.0
+    sent: int = 0
+    latencies: List[float] = field(default_factory=list)
+    unanswered: int = 0
+    referral_starts: int = 0
+    scenarios: Dict[str, int] = field(default_factory=dict)
+    broadcast_deliveries: int = 0
+    api_calls: Dict[str, int] = field(default_factory=dict)
+    injected: Dict[str, int] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """تحويل التقرير إلى قاموس قابل للتخزين كـ JSON."""
+        return {
+            "duration": round(self.duration, 2),
+            "sent": self.sent,
+            "answered": len(self.latencies),
+            "unanswered": self.unanswered,
+            "rate": round(self.sent / self.duration, 1) if self.duration else 0,
+            "referral_starts": self.referral_starts,
+            "scenarios": dict(sorted(self.scenarios.items())),
+            "broadcast_deliveries": self.broadcast_deliveries,
+            "latency_ms": {
+                f"p{int(q * 100)}": round(percentile(self.latencies, q) * 1000, 2)
+                for q in (0.5, 0.9, 0.95, 0.99)
+            },
+            "api_calls": dict(sorted(self.api_calls.items())),
+            "injected": dict(self.injected),
+        }
+
+
+class LoadDriver:
+    """
+    مولّد مستخدمين اصطناعيين بمعدل ثابت (حلقة مفتوحة).
+    """
+
+    def __init__(
+        self,
+        server: FakeBotApiServer,
+        users: int = 100,
+        rate: float = 20.0,
+        seed: Optional[int] = None,
+        admin_id: Optional[int] = None
+    ):
+        """
+        تهيئة المولّد.
+
+        Args:
+            server (FakeBotApiServer): خادم Bot API الوهمي
+            users (int): عدد المستخدمين الاصطناعيين
+            rate (float): عدد التحديثات المرسلة في الثانية
+            seed (Optional[int]): بذرة العشوائية
+            admin_id (Optional[int]): معرّف مسؤول لدى البوت (None لتعطيل سيناريوهات المسؤول)
+        """
+        self.server = server
+        self.users = users
+        self.rate = rate
+        self.admin_id = admin_id
+        self._broadcast_started = False
+        self._broadcasts = 0
+        self._last_broadcast = float("-inf")
+        self._random = random.Random(seed)
+        self._started: List[int] = []
+        self._referral_codes: Dict[int, str] = {}
+        self._pending_messages: Dict[int, Deque[float]] = {}
+        self._pending_callbacks: Dict[str, float] = {}
+        self._callback_id = 0
+        self._report = LoadReport()
+        server.observers.append(self._observe)
+
+    def _observe(self, method: str, parameters: Dict[str, Any]) -> None:
+        """ربط ردود البوت بالتحديثات المنتظرة وقياس زمنها."""
+        now = time.perf_counter()
+        if method == "answerCallbackQuery":
+            sent = self._pending_callbacks.pop(str(parameters.get("callback_query_id")), None)
+            if sent is not None:
+                self._report.latencies.append(now - sent)
+            return
+        if method not in ("sendMessage", "editMessageText"):
+            return
+
+        chat_id = int(parameters.get("chat_id", 0) or 0)
+        if method == "sendMessage" and str(parameters.get("text", "")).startswith(BROADCAST_PREFIX):
+            self._report.broadcast_deliveries += 1
+            return
+        match = _REFERRAL_LINK.search(str(parameters.get("text", "")))
+        if match:
+            self._referral_codes[chat_id] = match.group(1)
+        pending = self._pending_messages.get(chat_id)
+        if method == "sendMessage" and pending:
+            self._report.latencies.append(now - pending.popleft())
+
+    def _user(self, user_id: int) -> Dict[str, Any]:
+        return {"id": user_id, "is_bot": False, "first_name": f"Load{user_id}", "username": f"load{user_id}"}
+
+    def _start_update(self, user_id: int) -> Dict[str, Any]:
+        """تحديث /start مع رمز إحالة مستخدم سابق إن وُجد."""
+        text = "/start"
+        if self._referral_codes and self._random.random() < 0.5:
+            text += " " + self._random.choice(list(self._referral_codes.values()))
+            self._report.referral_starts += 1
+        self._pending_messages.setdefault(user_id, deque()).append(time.perf_counter())
+        return {
+            "message": {
+                "message_id": 1,
+                "date": int(time.time()),
+                "chat": {"id": user_id, "type": "private"},
+                "from": self._user(user_id),
+                "text": text,
+                "entities": [{"type": "bot_command", "offset": 0, "length": 6}],
+            }
+        }
+
+    def _button_update(self, user_id: int, data: Optional[str] = None) -> Dict[str, Any]:
+        """تحديث ضغط زر (افتراضياً زر عشوائي من القائمة)."""
+        self._callback_id += 1
+        callback_id = f"load{self._callback_id}"
+        self._pending_callbacks[callback_id] = time.perf_counter()
+        return {
+            "callback_query": {
+                "id": callback_id,
+                "from": self._user(user_id),
+                "chat_instance": str(user_id),
+                "data": data or self._random.choice(MENU_BUTTONS),
+                "message": {
+                    "message_id": 1,
+                    "date": int(time.time()),
+                    "chat": {"id": user_id, "type": "private"},
+                    "text": "menu",
+                },
+            }
+        }
+
+    def _broadcast_update(self) -> Dict[str, Any]:
+        """رسالة الإذاعة بعد ضغط المسؤول زر الإذاعة."""
+        self._broadcasts += 1
+        self._pending_messages.setdefault(self.admin_id, deque()).append(time.perf_counter())
+        return {
+            "message": {
+                "message_id": 1,
+                "date": int(time.time()),
+                "chat": {"id": self.admin_id, "type": "private"},
+                "from": self._user(self.admin_id),
+                "text": f"{BROADCAST_PREFIX} {self._broadcasts}",
+            }
+        }
+
+    def _admin_update(self) -> Dict[str, Any]:
+        """تحديث المسؤول: إذاعة (زر ثم رسالة) أو تصفح قائمة الإشعارات."""
+        if self._broadcast_started:
+            self._broadcast_started = False
+            return self._broadcast_update()
+        now = time.perf_counter()
+        if self._random.random() < 0.2 and now - self._last_broadcast >= BROADCAST_INTERVAL:
+            self._count("broadcast")
+            self._broadcast_started = True
+            self._last_broadcast = now
+            return self._button_update(self.admin_id, "admin_broadcast")
+        self._count("notifications")
+        return self._button_update(self.admin_id, self._random.choice(NOTIFICATION_BUTTONS))
+
+    def _count(self, scenario: str) -> None:
+        self._report.scenarios[scenario] = self._report.scenarios.get(scenario, 0) + 1
+
+    def next_update(self) -> Dict[str, Any]:
+        """
+        التحديث التالي: مستخدم جديد يرسل /start، أو مستخدم سابق يضغط زراً،
+        أو المسؤول (الإشعارات والإذاعة) بنسبة ADMIN_SHARE.
+
+        Returns:
+            Dict[str, Any]: التحديث بصيغة Bot API
+        """
+        if self.admin_id is not None and self._started and (
+            self._broadcast_started or self._random.random() < ADMIN_SHARE
+        ):
+            return self._admin_update()
+        if len(self._started) < self.users and (not self._started or self._random.random() < 0.3):
+            user_id = FIRST_USER_ID + len(self._started)
+            self._started.append(user_id)
+            self._count("start")
+            return self._start_update(user_id)
+        self._count("menu")
+        return self._button_update(self._random.choice(self._started))
+
+    async def run(self, duration: float, drain: float = 5.0) -> LoadReport:
+        """
+        توليد الحمل لمدة محددة ثم انتظار الردود المتبقية.
+
+        Args:
+            duration (float): مدة توليد الحمل بالثواني
+            drain (float): المهلة القصوى لانتظار الردود المتبقية بالثواني
+
+        Returns:
+            LoadReport: نتيجة التشغيل
+        """
+        interval = 1 / self.rate
+        started = time.perf_counter()
+        next_at = started
+        while time.perf_counter() - started < duration:
+            self.server.push_update(self.next_update())
+            self._report.sent += 1
+            next_at += interval
+            await asyncio.sleep(max(0.0, next_at - time.perf_counter()))
+        self._report.duration = time.perf_counter() - started
+
+        deadline = time.perf_counter() + drain
+        while self._pending_count() and time.perf_counter() < deadline:
+            await asyncio.sleep(0.05)
+
+        self._report.unanswered = self._pending_count()
+        self._report.api_calls = dict(self.server.calls)
+        self._report.injected = dict(self.server.injected)
+        return self._report
+
+    def _pending_count(self) -> int:
+        return len(self._pending_callbacks) + sum(len(q) for q in self._pending_messages.values())
+
+
+async def run_load_test(
+    server: FakeBotApiServer,
+    users: int,
+    rate: float,
+    duration: float,
+    external: bool = False,
+    seed: Optional[int] = None,
+    admin_id: Optional[int] = None
+) -> LoadReport:
+    """
+    تشغيل الخادم الوهمي والبوت (ما لم يكن خارجياً) ثم توليد الحمل.
+
+    Args:
+        server (FakeBotApiServer): خادم Bot API الوهمي
+        users (int): عدد المستخدمين الاصطناعيين
+        rate (float): عدد التحديثات في الثانية
+        duration (float): مدة الحمل بالثواني
+        external (bool): البوت يعمل في عملية أخرى موجهة إلى الخادم عبر BOT_API_URL
+        seed (Optional[int]): بذرة العشوائية
+        admin_id (Optional[int]): معرّف مسؤول البوت الخارجي لسيناريوهات المسؤول
+            (في نفس العملية يُضاف ADMIN_USER_ID مسؤولاً مؤقتاً)
+
+    Returns:
+        LoadReport: نتيجة التشغيل
+    """
+    await server.start()
+    if external:
+        driver = LoadDriver(server, users, rate, seed, admin_id)
+        try:
+            return await driver.run(duration)
+        finally:
+            await server.stop()
+
+    from main import build_application
+    from src.core import config
+    driver = LoadDriver(server, users, rate, seed, ADMIN_USER_ID)
+    admin_ids = config.ADMIN_IDS
+    config.ADMIN_IDS = admin_ids + [ADMIN_USER_ID]
+    application = build_application(REPLAY_TOKEN, base_url=server.base_url)
+    try:
+        async with application:
+            await application.start()
+            await application.updater.start_polling(poll_interval=0, timeout=1)
+            try:
+                return await driver.run(duration)
+            finally:
+                await application.updater.stop()
+                await application.stop()
+    finally:
+        config.ADMIN_IDS = admin_ids
+        await server.stop()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """نقطة الدخول من سطر الأوامر."""
+    parser = argparse.ArgumentParser(description="End-to-end load test against the fake Bot API")
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--rate", type=float, default=20.0, help="updates per second")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds")
+    parser.add_argument("--port", type=int, default=0, help="fake Bot API port (0 = random)")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--retry-rate", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=int, default=1)
+    parser.add_argument("--external", action="store_true", help="bot runs separately with BOT_API_URL")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--admin-id", type=int, help="admin id of the external bot (enables admin scenarios)")
+    args = parser.parse_args(argv)
+
+    server = FakeBotApiServer(
+        "127.0.0.1", args.port, args.latency_ms / 1000, args.jitter_ms / 1000,
+        args.error_rate, args.retry_rate, args.retry_after, args.seed
+    )
+
+    if args.external:
+        report = asyncio.run(run_load_test(
+            server, args.users, args.rate, args.duration, True, args.seed, args.admin_id
+        ))
+    else:
+        from src.database import manager
+        with tempfile.TemporaryDirectory() as tmp:
+            manager.DATABASE_FILE = os.path.join(tmp, "load.db")
+            manager.init_db()
+            report = asyncio.run(run_load_test(server, args.users, args.rate, args.duration, False, args.seed))
+
+    print(json.dumps(report.to_dict(), ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,373 @@
+"""
+إعادة تشغيل تحديثات مسجلة عبر معالجات البوت الحقيقية (بدون Telegram).
+
+تُغذّى التحديثات المسجلة (من src/bot/recorder.py) إلى نفس التطبيق الذي
+يبنيه main.build_application، مع طبقة طلبات وهمية تعيد ردود Bot API جاهزة
+وقاعدة بيانات مؤقتة. يعرض التقرير معدل المعالجة وزمن كل معالج وعدد عمليات
+قاعدة البيانات واستدعاءات Bot API، لمقارنة الإصدارات على نفس الحركة.
+
+يمكن أيضاً إرسال التحديثات المسجلة بطلبات POST إلى بوت يعمل في وضع Webhook
+(--webhook)، لاختبار مسار الاستقبال كاملاً محلياً.
+
+الاستخدام:
+    python -m src.devtools.replay updates.jsonl [--repeat N] [--api-latency-ms MS] [--json]
+    python -m src.devtools.replay updates.jsonl --webhook http://127.0.0.1:8080/telegram [--secret-token T]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# أداة الإعادة لا تتصل بـ Telegram، لكن الإعدادات تتطلب وجود الرمز
+os.environ.setdefault("BOT_TOKEN", "123456:REPLAY")
+
+from telegram import Update
+from telegram.request import BaseRequest, RequestData
+
+from src.utils.metrics import Histogram
+
+REPLAY_TOKEN: str = "123456:REPLAY"
+"""رمز وهمي للتطبيق أثناء الإعادة"""
+
+BOT_USER: Dict[str, Any] = {
+    "id": 123456, "is_bot": True, "first_name": "Dragon", "username": "dragon_replay_bot",
+}
+"""مستخدم البوت الذي تعيده getMe الوهمية"""
+
+_MESSAGE_METHODS = frozenset({
+    "sendMessage", "editMessageText", "sendDocument", "sendPhoto",
+    "editMessageReplyMarkup", "editMessageCaption", "forwardMessage",
+})
+
+
+def canned_result(method: str, parameters: Dict[str, Any], message_id: int) -> Any:
+    """
+    رد Bot API جاهز لطريقة معينة.
+
+    Args:
+        method (str): اسم الطريقة (مثل sendMessage)
+        parameters (Dict[str, Any]): معاملات الطلب
+        message_id (int): معرّف الرسالة المعاد للطرق التي تعيد رسالة
+
+    Returns:
+        Any: حقل result في رد Bot API
+    """
+    if method == "getMe":
+        return BOT_USER
+    if method in _MESSAGE_METHODS and "inline_message_id" not in parameters:
+        chat_id = parameters.get("chat_id", 0)
+        message: Dict[str, Any] = {
+            "message_id": int(parameters.get("message_id", message_id)),
+            "date": int(time.time()),
+            "chat": {"id": int(chat_id) if str(chat_id).lstrip("-").isdigit() else 0, "type": "private"},
+            "from": BOT_USER,
+        }
+        if "text" in parameters:
+            message["text"] = parameters["text"]
+        return message
+    if method == "getUpdates":
+        return []
+    return True
+
+
+def percentile(values: List[float], q: float) -> float:
+    """
+    مئين قائمة قيم (أقرب رتبة).
+
+    Args:
+        values (List[float]): القيم
+        q (float): المئين بين 0 و 1
+
+    Returns:
+        float: قيمة المئين (0 لقائمة فارغة)
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class FakeRequest(BaseRequest):
+    """
+    طبقة طلبات وهمية تعيد ردوداً جاهزة وتحصي الاستدعاءات لكل طريقة.
+    """
+
+    def __init__(self, latency: float = 0.0):
+        """
+        تهيئة الطبقة.
+
+        Args:
+            latency (float): زمن محاكاة كل استدعاء بالثواني (افتراضي: 0)
+        """
+        self.latency = latency
+        self.calls: Counter = Counter()
+        self._message_id = 0
+
+    @property
+    def read_timeout(self) -> Optional[float]:
+        return None
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        pass
+
+    async def do_request(
+        self,
+        url: str,
+        method: str,
+        request_data: Optional[RequestData] = None,
+        read_timeout: Any = None,
+        write_timeout: Any = None,
+        connect_timeout: Any = None,
+        pool_timeout: Any = None,
+    ) -> Tuple[int, bytes]:
+        api_method = url.rsplit("/", 1)[-1]
+        self.calls[api_method] += 1
+        self._message_id += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        parameters = request_data.parameters if request_data else {}
+        result = canned_result(api_method, parameters, self._message_id)
+        return 200, json.dumps({"ok": True, "result": result}).encode()
+
+
+@dataclass
+class ReplayReport:
+    """
+    نتيجة إعادة تشغيل واحدة.
+    """
+    updates: int = 0
+    seconds: float = 0.0
+    latencies: List[float] = field(default_factory=list)
+    handlers: Dict[str, Tuple[int, float]] = field(default_factory=dict)
+    db_operations: Dict[str, int] = field(default_factory=dict)
+    api_calls: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def throughput(self) -> float:
+        """عدد التحديثات المعالجة في الثانية."""
+        return self.updates / self.seconds if self.seconds else 0.0
+
+    def percentile(self, q: float) -> float:
+        """مئين زمن معالجة التحديث بالثواني."""
+        return percentile(self.latencies, q)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """تحويل التقرير إلى قاموس قابل للتخزين كـ JSON."""
+        return {
+            "updates": self.updates,
+            "seconds": round(self.seconds, 4),
+            "throughput": round(self.throughput, 1),
+            "latency_ms": {
+                f"p{int(q * 100)}": round(self.percentile(q) * 1000, 3) for q in (0.5, 0.95, 0.99)
+            },
+            "handlers": {
+                name: {"count": count, "mean_ms": round(total / count * 1000, 3)}
+                for name, (count, total) in sorted(self.handlers.items())
+            },
+            "db_operations": dict(sorted(self.db_operations.items())),
+            "db_per_update": round(sum(self.db_operations.values()) / self.updates, 2) if self.updates else 0,
+            "api_calls": dict(sorted(self.api_calls.items())),
+        }
+
+    def format(self) -> str:
+        """تقرير نصي مختصر."""
+        data = self.to_dict()
+        lines = [
+            f"Replayed {self.updates} updates in {self.seconds:.3f}s ({data['throughput']} updates/s)",
+            "Update latency (ms): " + ", ".join(f"{k}={v}" for k, v in data["latency_ms"].items()),
+            "",
+            f"{'handler':<32}{'count':>8}{'mean ms':>12}",
+        ]
+        for name, stats in data["handlers"].items():
+            lines.append(f"{name:<32}{stats['count']:>8}{stats['mean_ms']:>12}")
+        lines += ["", f"DB operations ({data['db_per_update']} per update):"]
+        lines += [f"  {op:<30}{count:>8}" for op, count in data["db_operations"].items()]
+        lines += ["", "Bot API calls:"]
+        lines += [f"  {method:<30}{count:>8}" for method, count in data["api_calls"].items()]
+        return "\n".join(lines)
+
+
+def _histogram_snapshot(histogram: Histogram) -> Dict[str, Tuple[int, float]]:
+    """لقطة (العدد، المجموع) لكل تسمية من المدرج التكراري."""
+    return {
+        labels[0]: (histogram.count(*labels), histogram.sum(*labels))
+        for labels in histogram.label_sets()
+    }
+
+
+def _histogram_delta(
+    before: Dict[str, Tuple[int, float]],
+    after: Dict[str, Tuple[int, float]]
+) -> Dict[str, Tuple[int, float]]:
+    """الفرق بين لقطتين (ما رُصد أثناء الإعادة فقط)."""
+    delta = {}
+    for name, (count, total) in after.items():
+        prev_count, prev_total = before.get(name, (0, 0.0))
+        if count > prev_count:
+            delta[name] = (count - prev_count, total - prev_total)
+    return delta
+
+
+def load_updates(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    قراءة التحديثات المسجلة من ملف JSONL.
+
+    Args:
+        path (str): مسار الملف
+
+    Yields:
+        Dict[str, Any]: بيانات كل تحديث
+    """
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)["update"]
+
+
+async def replay(
+    updates: Iterable[Dict[str, Any]],
+    repeat: int = 1,
+    api_latency: float = 0.0
+) -> ReplayReport:
+    """
+    إعادة تشغيل تحديثات عبر تطبيق البوت الحقيقي.
+
+    يجب توجيه قاعدة البيانات إلى ملف مؤقت قبل الاستدعاء (انظر run).
+    لا تُشغَّل مهام post_init الخلفية (الحفظ الدوري، خادم المقاييس).
+
+    Args:
+        updates (Iterable[Dict[str, Any]]): التحديثات بصيغة Bot API
+        repeat (int): عدد مرات تكرار الحركة (افتراضي: 1)
+        api_latency (float): زمن محاكاة كل استدعاء Bot API بالثواني
+
+    Returns:
+        ReplayReport: نتيجة الإعادة
+    """
+    from main import build_application
+    from src.bot.handlers import callback_router
+    from src.bot.instrumentation import HANDLER_SECONDS
+    from src.bot.recorder import update_recorder
+    from src.database.manager import DB_QUERY_SECONDS
+
+    update_recorder.configure("", 0, "")
+    request = FakeRequest(api_latency)
+    application = build_application(REPLAY_TOKEN, request=request, get_updates_request=FakeRequest())
+    # تكرار الحركة يعيد نفس استعلامات الأزرار، فلا تُتجاهل كتكرار
+    callback_router.deduplicator.configure(0)
+    stream = list(updates) * repeat
+
+    await application.initialize()
+    handlers_before = _histogram_snapshot(HANDLER_SECONDS)
+    db_before = _histogram_snapshot(DB_QUERY_SECONDS)
+    request.calls.clear()
+
+    report = ReplayReport()
+    started = time.perf_counter()
+    try:
+        for data in stream:
+            update = Update.de_json(data, application.bot)
+            update_started = time.perf_counter()
+            await application.process_update(update)
+            report.latencies.append(time.perf_counter() - update_started)
+    finally:
+        report.seconds = time.perf_counter() - started
+        await application.shutdown()
+
+    report.updates = len(stream)
+    report.handlers = _histogram_delta(handlers_before, _histogram_snapshot(HANDLER_SECONDS))
+    report.db_operations = {
+        op: count for op, (count, _) in
+        _histogram_delta(db_before, _histogram_snapshot(DB_QUERY_SECONDS)).items()
+    }
+    report.api_calls = dict(request.calls)
+    return report
+
+
+async def post_updates(
+    url: str,
+    updates: Iterable[Dict[str, Any]],
+    secret_token: str = ""
+) -> Counter:
+    """
+    إرسال تحديثات مسجلة بطلبات POST إلى خادم Webhook.
+
+    تُرقَّم التحديثات بمعرّفات متتالية حتى لا تُعامل كتكرار.
+
+    Args:
+        url (str): عنوان Webhook المحلي
+        updates (Iterable[Dict[str, Any]]): التحديثات بصيغة Bot API
+        secret_token (str): الرمز السري (ترويسة X-Telegram-Bot-Api-Secret-Token)
+
+    Returns:
+        Counter: عدد الردود حسب رمز حالة HTTP
+    """
+    import httpx
+
+    headers = {"X-Telegram-Bot-Api-Secret-Token": secret_token} if secret_token else {}
+    statuses: Counter = Counter()
+    async with httpx.AsyncClient(timeout=10) as client:
+        for update_id, data in enumerate(updates, 1):
+            response = await client.post(url, json={**data, "update_id": update_id}, headers=headers)
+            statuses[response.status_code] += 1
+    return statuses
+
+
+def run(path: str, repeat: int = 1, api_latency: float = 0.0, database: Optional[str] = None) -> ReplayReport:
+    """
+    إعادة تشغيل ملف تسجيل على قاعدة بيانات جديدة.
+
+    Args:
+        path (str): مسار ملف التحديثات المسجلة
+        repeat (int): عدد مرات تكرار الحركة
+        api_latency (float): زمن محاكاة كل استدعاء Bot API بالثواني
+        database (Optional[str]): مسار قاعدة البيانات (افتراضي: ملف مؤقت جديد)
+
+    Returns:
+        ReplayReport: نتيجة الإعادة
+    """
+    from src.database import manager
+
+    with tempfile.TemporaryDirectory() as tmp:
+        manager.DATABASE_FILE = database or os.path.join(tmp, "replay.db")
+        manager.init_db()
+        return asyncio.run(replay(load_updates(path), repeat, api_latency))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """نقطة الدخول من سطر الأوامر."""
+    parser = argparse.ArgumentParser(description="Replay recorded updates through the bot handlers")
+    parser.add_argument("file", help="JSONL file written by the update recorder")
+    parser.add_argument("--repeat", type=int, default=1, help="replay the stream N times")
+    parser.add_argument("--api-latency-ms", type=float, default=0.0, help="simulated Bot API latency")
+    parser.add_argument("--db", help="database file to use (default: fresh temporary database)")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    parser.add_argument("--webhook", help="POST the updates to a running bot's webhook URL instead")
+    parser.add_argument("--secret-token", default="", help="webhook secret token")
+    args = parser.parse_args(argv)
+
+    if args.webhook:
+        updates = list(load_updates(args.file)) * args.repeat
+        statuses = asyncio.run(post_updates(args.webhook, updates, args.secret_token))
+        print(", ".join(f"HTTP {status}: {count}" for status, count in sorted(statuses.items())))
+        return 0 if all(status == 200 for status in statuses) else 1
+
+    report = run(args.file, args.repeat, args.api_latency_ms / 1000, args.db)
+    if args.json:
+        print(json.dumps(report.to_dict(), ensure_ascii=False, indent=2))
+    else:
+        print(report.format())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+"""
+قياس تكلفة بناء لوحات الأزرار لكل تحديث (src/bot/ui.py).
+
+يقارن زمن الحصول على كل قائمة من src/bot/ui.py (القوائم الثابتة المبنية
+مرة واحدة والقوائم المحفوظة في LRU) بزمن بنائها من جديد كما في كل تحديث.
+
+الاستخدام:
+    python -m src.devtools.ui_benchmark [--runs N] [--json]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+# أداة القياس لا تتصل بـ Telegram، لكن الإعدادات تتطلب وجود الرمز
+os.environ.setdefault("BOT_TOKEN", "123456:BENCHMARK")
+
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup
+
+from src.bot import ui
+
+DEFAULT_RUNS: int = 20000
+"""عدد الاستدعاءات لكل قائمة"""
+
+
+def rebuild(markup: InlineKeyboardMarkup) -> InlineKeyboardMarkup:
+    """
+    بناء نسخة جديدة من لوحة أزرار (تكلفة البناء في كل تحديث).
+
+    Args:
+        markup (InlineKeyboardMarkup): اللوحة المراد إعادة بنائها
+
+    Returns:
+        InlineKeyboardMarkup: نسخة جديدة بنفس الأزرار
+    """
+    return InlineKeyboardMarkup([
+        [
+            InlineKeyboardButton(button.text, callback_data=button.callback_data, url=button.url)
+            for button in row
+        ]
+        for row in markup.inline_keyboard
+    ])
+
+
+def _cases() -> List[Tuple[str, Callable[[], InlineKeyboardMarkup], Callable[[], InlineKeyboardMarkup]]]:
+    """(الاسم، الاستدعاء الحالي، البناء من جديد) لكل قائمة."""
+    cases = []
+    for name in ("create_main_menu", "create_about_menu", "back_to_main_menu_button",
+                 "create_admin_menu", "create_manage_user_menu", "create_leaderboard_menu",
+                 "create_notifications_menu", "create_store_menu"):
+        menu = getattr(ui, name)
+        cases.append((name, menu, lambda menu=menu: rebuild(menu())))
+    cases.append((
+        "create_user_control_panel",
+        lambda: ui.create_user_control_panel(12345, False),
+        lambda: ui.create_user_control_panel.__wrapped__(12345, False),
+    ))
+    cases.append((
+        "create_reward_purchase_menu",
+        lambda: ui.create_reward_purchase_menu(7),
+        lambda: ui.create_reward_purchase_menu.__wrapped__(7),
+    ))
+    return cases
+
+
+def _per_call_us(func: Callable[[], InlineKeyboardMarkup], runs: int) -> float:
+    """متوسط زمن الاستدعاء الواحد بالميكروثانية."""
+    started = time.perf_counter()
+    for _ in range(runs):
+        func()
+    return (time.perf_counter() - started) / runs * 1e6
+
+
+def run_benchmark(runs: int = DEFAULT_RUNS) -> Dict[str, Dict[str, float]]:
+    """
+    قياس زمن كل قائمة محفوظة مقابل بنائها من جديد.
+
+    Args:
+        runs (int): عدد الاستدعاءات لكل قائمة
+
+    Returns:
+        Dict[str, Dict[str, float]]: اسم القائمة ← {cached_us, rebuilt_us, speedup}
+    """
+    results: Dict[str, Dict[str, float]] = {}
+    for name, cached, rebuilt in _cases():
+        cached_us = _per_call_us(cached, runs)
+        rebuilt_us = _per_call_us(rebuilt, runs)
+        results[name] = {
+            "cached_us": round(cached_us, 3),
+            "rebuilt_us": round(rebuilt_us, 3),
+            "speedup": round(rebuilt_us / cached_us, 1) if cached_us else float("inf"),
+        }
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """نقطة الدخول من سطر الأوامر."""
+    parser = argparse.ArgumentParser(description="Benchmark per-update keyboard construction in src/bot/ui.py")
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS, help="calls per menu")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args(argv)
+
+    results = run_benchmark(args.runs)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+
+    print(f"{'menu':<30} {'cached µs':>10} {'rebuilt µs':>11} {'speedup':>8}")
+    for name, stats in results.items():
+        print(f"{name:<30} {stats['cached_us']:>10.3f} {stats['rebuilt_us']:>11.3f} {stats['speedup']:>7.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
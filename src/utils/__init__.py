@@ -35,14 +35,17 @@ from .xp_system import (
     get_xp_progress_bar,
     get_level_stats,
     add_xp,
-    get_rank_emoji,
-    get_rank_name,
-    get_all_ranks,
 )
 from .reward_manager import reward_manager, RewardManager
 from .task_manager import task_manager, TaskManager
 from .message_manager import message_manager, MessageManager
 from .notification_manager import notification_manager, NotificationManager, NotificationType, NotificationLevel, Notification
+from .metrics import metrics_registry, MetricsRegistry, Counter, Gauge, Histogram
+from .metrics_server import MetricsServer
+from .round_trips import RoundTrips, track_round_trips, assert_round_trips
+from .metrics_store import metrics_store, MetricsStore
+from .activity_tracker import activity_tracker, ActivityTracker
+from .activity_bitmaps import activity_bitmaps, ActivityBitmaps
 from .advanced_stats_manager import advanced_stats_manager, AdvancedStatsManager
 
 __all__ = [
@@ -75,9 +78,6 @@ __all__ = [
     "get_xp_progress_bar",
     "get_level_stats",
     "add_xp",
-    "get_rank_emoji",
-    "get_rank_name",
-    "get_all_ranks",
     # managers
     "reward_manager",
     "RewardManager",
@@ -90,6 +90,21 @@ __all__ = [
     "NotificationType",
     "NotificationLevel",
     "Notification",
+    "metrics_registry",
+    "MetricsRegistry",
+    "Counter",
+    "Gauge",
+    "Histogram",
+    "MetricsServer",
+    "RoundTrips",
+    "track_round_trips",
+    "assert_round_trips",
+    "metrics_store",
+    "MetricsStore",
+    "activity_tracker",
+    "ActivityTracker",
+    "activity_bitmaps",
+    "ActivityBitmaps",
     "advanced_stats_manager",
     "AdvancedStatsManager",
 ]
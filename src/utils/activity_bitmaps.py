@@ -0,0 +1,325 @@
+"""
+خرائط النشاط اليومية (Bitmaps) لتحليلات الاحتفاظ والسلاسل.
+
+يُعطى كل مستخدم فهرساً متتالياً، ويُحفظ لكل يوم bitset للمستخدمين النشطين
+وآخر للمنضمين في ذلك اليوم. تُنفَّذ التقاطعات وعدّ البتات بـ NumPy
+لتبقى تقارير الاحتفاظ سريعة حتى مع ملايين المستخدمين.
+"""
+
+import asyncio
+import logging
+import zlib
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+_POPCOUNT: np.ndarray = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+"""جدول عدد البتات المضبوطة لكل قيمة بايت"""
+
+BitmapRow = Tuple[str, str, bytes]
+
+ACTIVE: str = "active"
+"""نوع خريطة المستخدمين النشطين"""
+
+JOINED: str = "joined"
+"""نوع خريطة المستخدمين المنضمين"""
+
+
+def popcount(bits: np.ndarray) -> int:
+    """
+    عدد البتات المضبوطة في خريطة مضغوطة (uint8).
+
+    Args:
+        bits (np.ndarray): الخريطة
+
+    Returns:
+        int: عدد البتات المضبوطة
+    """
+    return int(_POPCOUNT[bits].sum(dtype=np.int64))
+
+
+def intersect_count(first: np.ndarray, second: np.ndarray) -> int:
+    """
+    عدد البتات المشتركة بين خريطتين (قد تختلفان في الطول).
+
+    Args:
+        first (np.ndarray): الخريطة الأولى
+        second (np.ndarray): الخريطة الثانية
+
+    Returns:
+        int: حجم التقاطع
+    """
+    length = min(len(first), len(second))
+    return popcount(np.bitwise_and(first[:length], second[:length]))
+
+
+class ActivityBitmaps:
+    """
+    خرائط نشاط وانضمام يومية بفهارس مستخدمين متتالية.
+    """
+
+    def __init__(self, retention_days: int = 62):
+        """
+        تهيئة الخرائط.
+
+        Args:
+            retention_days (int): عدد الأيام المحتفظ بها في الذاكرة (افتراضي: 62)
+        """
+        self._retention_days = retention_days
+        self._index: Dict[int, int] = {}
+        self._new_index_rows: List[Tuple[int, int]] = []
+        self._bitmaps: Dict[str, Dict[date, np.ndarray]] = {ACTIVE: {}, JOINED: {}}
+        self._dirty: Set[Tuple[str, date]] = set()
+
+    def _user_index(self, user_id: int) -> int:
+        """الحصول على الفهرس المتتالي للمستخدم (مع إنشائه عند الحاجة)."""
+        index = self._index.get(user_id)
+        if index is None:
+            index = self._index[user_id] = len(self._index)
+            self._new_index_rows.append((user_id, index))
+        return index
+
+    def _set_bit(self, kind: str, day: date, index: int) -> None:
+        """ضبط بت المستخدم في خريطة يوم معين (مع توسيعها عند الحاجة)."""
+        bitmaps = self._bitmaps[kind]
+        bits = bitmaps.get(day)
+        byte = index >> 3
+        if bits is None or byte >= len(bits):
+            size = max(1024, 1 << (byte + 1).bit_length())
+            grown = np.zeros(size, dtype=np.uint8)
+            if bits is not None:
+                grown[:len(bits)] = bits
+            else:
+                self._evict(kind, day)
+            bits = bitmaps[day] = grown
+
+        mask = 0x80 >> (index & 7)
+        if not bits[byte] & mask:
+            bits[byte] |= mask
+            self._dirty.add((kind, day))
+
+    def _evict(self, kind: str, today: date) -> None:
+        """حذف خرائط الأيام التي تجاوزت مدة الاحتفاظ من الذاكرة."""
+        cutoff = today - timedelta(days=self._retention_days)
+        bitmaps = self._bitmaps[kind]
+        for day in [d for d in bitmaps if d < cutoff]:
+            del bitmaps[day]
+
+    def record_activity(self, user_id: int, day: Optional[date] = None) -> None:
+        """
+        تسجيل نشاط مستخدم في يوم معين.
+
+        Args:
+            user_id (int): معرّف المستخدم
+            day (Optional[date]): اليوم (افتراضي: اليوم الحالي)
+        """
+        self._set_bit(ACTIVE, day or date.today(), self._user_index(user_id))
+
+    def record_join(self, user_id: int, day: Optional[date] = None) -> None:
+        """
+        تسجيل انضمام مستخدم (يحدد مجموعته في تقارير الاحتفاظ).
+
+        Args:
+            user_id (int): معرّف المستخدم
+            day (Optional[date]): يوم الانضمام (افتراضي: اليوم الحالي)
+        """
+        self._set_bit(JOINED, day or date.today(), self._user_index(user_id))
+
+    def daily_active_users(self, day: Optional[date] = None) -> int:
+        """
+        العدد الدقيق للمستخدمين النشطين في يوم معين (DAU).
+
+        Args:
+            day (Optional[date]): اليوم (افتراضي: اليوم الحالي)
+
+        Returns:
+            int: عدد المستخدمين النشطين
+        """
+        bits = self._bitmaps[ACTIVE].get(day or date.today())
+        return popcount(bits) if bits is not None else 0
+
+    def retention(self, cohort_day: date, offset: int) -> Tuple[int, int]:
+        """
+        احتفاظ مجموعة منضمين في يوم معين بعد عدد من الأيام.
+
+        Args:
+            cohort_day (date): يوم الانضمام
+            offset (int): عدد الأيام بعد الانضمام (N)
+
+        Returns:
+            Tuple[int, int]: (عدد العائدين في اليوم N، حجم المجموعة)
+        """
+        cohort = self._bitmaps[JOINED].get(cohort_day)
+        if cohort is None:
+            return 0, 0
+
+        size = popcount(cohort)
+        active = self._bitmaps[ACTIVE].get(cohort_day + timedelta(days=offset))
+        if active is None:
+            return 0, size
+        return intersect_count(cohort, active), size
+
+    def cohort_report(
+        self,
+        days: int = 30,
+        offsets: Iterable[int] = (1, 7, 14, 30),
+        today: Optional[date] = None
+    ) -> List[dict]:
+        """
+        تقرير احتفاظ لمجموعات المنضمين خلال آخر عدد من الأيام.
+
+        Args:
+            days (int): عدد أيام المجموعات (افتراضي: 30)
+            offsets (Iterable[int]): قيم N المطلوبة
+            today (Optional[date]): اليوم المرجعي
+
+        Returns:
+            List[dict]: صف لكل يوم انضمام يحتوي الحجم ونسب الاحتفاظ
+                (None للأيام التي لم تأتِ بعد)
+        """
+        today = today or date.today()
+        offsets = tuple(offsets)
+        report: List[dict] = []
+
+        for age in range(days - 1, -1, -1):
+            cohort_day = today - timedelta(days=age)
+            cohort = self._bitmaps[JOINED].get(cohort_day)
+            size = popcount(cohort) if cohort is not None else 0
+
+            row = {"day": cohort_day, "size": size, "retention": {}}
+            for offset in offsets:
+                if offset > age:
+                    row["retention"][offset] = None
+                    continue
+                active = self._bitmaps[ACTIVE].get(cohort_day + timedelta(days=offset))
+                returned = (
+                    intersect_count(cohort, active)
+                    if size and active is not None else 0
+                )
+                row["retention"][offset] = returned / size if size else 0.0
+            report.append(row)
+
+        return report
+
+    def streak(self, user_id: int, today: Optional[date] = None) -> int:
+        """
+        عدد الأيام المتتالية التي نشط فيها المستخدم حتى اليوم.
+
+        إذا لم يكن نشطاً اليوم بعد، تُحسب السلسلة حتى الأمس.
+
+        Args:
+            user_id (int): معرّف المستخدم
+            today (Optional[date]): اليوم المرجعي
+
+        Returns:
+            int: طول السلسلة بالأيام
+        """
+        index = self._index.get(user_id)
+        if index is None:
+            return 0
+
+        byte, mask = index >> 3, 0x80 >> (index & 7)
+        bitmaps = self._bitmaps[ACTIVE]
+
+        def is_active(day: date) -> bool:
+            bits = bitmaps.get(day)
+            return bits is not None and byte < len(bits) and bool(bits[byte] & mask)
+
+        day = today or date.today()
+        if not is_active(day):
+            day -= timedelta(days=1)
+
+        streak = 0
+        while is_active(day):
+            streak += 1
+            day -= timedelta(days=1)
+        return streak
+
+    def snapshot(self) -> Tuple[List[Tuple[int, int]], List[BitmapRow]]:
+        """
+        لقطة من الفهارس الجديدة والخرائط المعدلة جاهزة للحفظ.
+
+        Returns:
+            Tuple: (صفوف الفهارس الجديدة، صفوف الخرائط المضغوطة)
+        """
+        index_rows, self._new_index_rows = self._new_index_rows, []
+        bitmap_rows: List[BitmapRow] = [
+            (kind, day.isoformat(), zlib.compress(self._bitmaps[kind][day].tobytes()))
+            for kind, day in self._dirty
+            if day in self._bitmaps[kind]
+        ]
+        self._dirty.clear()
+        return index_rows, bitmap_rows
+
+    def load(self) -> None:
+        """
+        تحميل الفهارس والخرائط من قاعدة البيانات.
+
+        عند التشغيل الأول تُبنى خرائط الانضمام من تواريخ انضمام المستخدمين.
+        """
+        from src.database import (
+            get_activity_user_index, get_activity_bitmaps, get_user_join_dates
+        )
+
+        for user_id, index in get_activity_user_index():
+            self._index[user_id] = index
+
+        since = date.today() - timedelta(days=self._retention_days)
+        for kind, day_str, data in get_activity_bitmaps(since.isoformat()):
+            bits = np.frombuffer(zlib.decompress(data), dtype=np.uint8).copy()
+            self._bitmaps[kind][date.fromisoformat(day_str)] = bits
+
+        if not self._bitmaps[JOINED]:
+            for user_id, join_date in get_user_join_dates(since):
+                if isinstance(join_date, datetime):
+                    self.record_join(user_id, join_date.date())
+
+        logger.info("تم تحميل خرائط النشاط اليومية (%d مستخدم)", len(self._index))
+
+    def flush(self) -> None:
+        """حفظ الفهارس والخرائط المعدلة بشكل متزامن."""
+        from src.database import save_activity_bitmaps
+
+        save_activity_bitmaps(*self.snapshot())
+
+    async def run_periodic_flush(self, interval: float) -> None:
+        """
+        حفظ الخرائط دورياً؛ يتم الضغط والكتابة في خيط منفصل.
+
+        Args:
+            interval (float): الفاصل الزمني بين عمليات الحفظ بالثواني
+        """
+        from src.database import save_activity_bitmaps
+
+        while True:
+            await asyncio.sleep(interval)
+            index_rows, self._new_index_rows = self._new_index_rows, []
+            dirty = [
+                (kind, day, self._bitmaps[kind][day].copy())
+                for kind, day in self._dirty
+                if day in self._bitmaps[kind]
+            ]
+            self._dirty.clear()
+            if not index_rows and not dirty:
+                continue
+
+            def compress_and_save() -> None:
+                rows = [
+                    (kind, day.isoformat(), zlib.compress(bits.tobytes()))
+                    for kind, day, bits in dirty
+                ]
+                save_activity_bitmaps(index_rows, rows)
+
+            try:
+                await asyncio.to_thread(compress_and_save)
+            except Exception as e:
+                self._new_index_rows[:0] = index_rows
+                self._dirty.update((kind, day) for kind, day, _ in dirty)
+                logger.error(f"فشل حفظ خرائط النشاط: {e}")
+
+
+# إنشاء مثيل من خرائط النشاط
+activity_bitmaps = ActivityBitmaps()
@@ -0,0 +1,157 @@
+"""
+متتبع المستخدمين النشطين (DAU/WAU/MAU).
+
+يحتفظ برسم HyperLogLog لكل يوم يُغذّى من مسار معالجة التحديثات،
+ويدمج رسومات الأيام لتقدير النشطين أسبوعياً وشهرياً بذاكرة ثابتة لكل يوم.
+"""
+
+import asyncio
+import logging
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Set, Tuple
+
+from src.utils.hyperloglog import HyperLogLog
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+SketchRow = Tuple[str, int, bytes]
+
+
+class ActivityTracker:
+    """
+    متتبع النشاط اليومي بالاعتماد على رسومات HyperLogLog.
+    """
+
+    def __init__(self, precision: int = 12, retention_days: int = 62):
+        """
+        تهيئة المتتبع.
+
+        Args:
+            precision (int): دقة رسومات HyperLogLog (افتراضي: 12)
+            retention_days (int): عدد الأيام المحتفظ بها في الذاكرة (افتراضي: 62)
+        """
+        self._precision = precision
+        self._retention_days = retention_days
+        self._sketches: Dict[date, HyperLogLog] = {}
+        self._dirty: Set[date] = set()
+
+    @property
+    def relative_error(self) -> float:
+        """الخطأ المعياري النسبي للتقديرات."""
+        return 1.04 / (1 << self._precision) ** 0.5
+
+    def record(self, user_id: int, day: Optional[date] = None) -> None:
+        """
+        تسجيل نشاط مستخدم.
+
+        Args:
+            user_id (int): معرّف المستخدم
+            day (Optional[date]): اليوم (افتراضي: اليوم الحالي)
+        """
+        day = day or date.today()
+        sketch = self._sketches.get(day)
+        if sketch is None:
+            sketch = self._sketches[day] = HyperLogLog(self._precision)
+            self._evict(day)
+
+        if sketch.add(user_id):
+            self._dirty.add(day)
+
+    def _evict(self, today: date) -> None:
+        """حذف رسومات الأيام التي تجاوزت مدة الاحتفاظ من الذاكرة."""
+        cutoff = today - timedelta(days=self._retention_days)
+        for day in [d for d in self._sketches if d < cutoff]:
+            del self._sketches[day]
+
+    def count_between(self, start: date, end: date) -> int:
+        """
+        تقدير عدد المستخدمين المميزين النشطين بين يومين (شاملين).
+
+        Args:
+            start (date): اليوم الأول
+            end (date): اليوم الأخير
+
+        Returns:
+            int: العدد التقديري
+        """
+        sketches = [s for d, s in self._sketches.items() if start <= d <= end]
+        if not sketches:
+            return 0
+        if len(sketches) == 1:
+            return sketches[0].count()
+        return HyperLogLog.union(sketches, self._precision).count()
+
+    def active_today(self, today: Optional[date] = None) -> int:
+        """عدد النشطين اليوم (DAU)."""
+        today = today or date.today()
+        return self.count_between(today, today)
+
+    def active_last_days(self, days: int, today: Optional[date] = None) -> int:
+        """عدد النشطين في آخر عدد من الأيام (تشمل اليوم الحالي)."""
+        today = today or date.today()
+        return self.count_between(today - timedelta(days=days - 1), today)
+
+    def active_this_month(self, today: Optional[date] = None) -> int:
+        """عدد النشطين منذ بداية الشهر الحالي (MAU)."""
+        today = today or date.today()
+        return self.count_between(today.replace(day=1), today)
+
+    def snapshot_rows(self) -> List[SketchRow]:
+        """
+        لقطة من رسومات الأيام المعدلة جاهزة للحفظ.
+
+        Returns:
+            List[SketchRow]: صفوف (اليوم، الدقة، السجلات المضغوطة)
+        """
+        rows = [
+            (day.isoformat(), self._precision, self._sketches[day].to_bytes())
+            for day in self._dirty
+            if day in self._sketches
+        ]
+        self._dirty.clear()
+        return rows
+
+    def load(self) -> None:
+        """تحميل رسومات الأيام المحفوظة من قاعدة البيانات."""
+        from src.database import get_activity_sketches
+
+        since = date.today() - timedelta(days=self._retention_days)
+        for day_str, precision, data in get_activity_sketches(since.isoformat()):
+            if precision != self._precision:
+                continue
+            day = date.fromisoformat(day_str)
+            stored = HyperLogLog.from_bytes(data, precision)
+            if day in self._sketches:
+                stored.merge(self._sketches[day])
+            self._sketches[day] = stored
+        logger.info("تم تحميل رسومات النشاط اليومي من قاعدة البيانات")
+
+    def flush(self) -> None:
+        """حفظ الرسومات المعدلة في قاعدة البيانات بشكل متزامن."""
+        from src.database import save_activity_sketches
+
+        save_activity_sketches(self.snapshot_rows())
+
+    async def run_periodic_flush(self, interval: float) -> None:
+        """
+        حفظ الرسومات دورياً دون حجب حلقة الأحداث.
+
+        Args:
+            interval (float): الفاصل الزمني بين عمليات الحفظ بالثواني
+        """
+        from src.database import save_activity_sketches
+
+        while True:
+            await asyncio.sleep(interval)
+            rows = self.snapshot_rows()
+            if not rows:
+                continue
+            try:
+                await asyncio.to_thread(save_activity_sketches, rows)
+            except Exception as e:
+                self._dirty.update(date.fromisoformat(day) for day, _, _ in rows)
+                logger.error(f"فشل حفظ رسومات النشاط: {e}")
+
+
+# إنشاء مثيل من متتبع النشاط
+activity_tracker = ActivityTracker()
@@ -4,14 +4,177 @@
 يوفر تحليلات شاملة عن أنشطة المستخدمين والبوت.
 """
 
+from collections import deque
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Tuple
+from typing import Deque, Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
 import logging
+import time
+
+from src.utils.activity_bitmaps import ActivityBitmaps, activity_bitmaps
+from src.utils.activity_tracker import ActivityTracker, activity_tracker
+from src.utils.metrics_store import (
+    MetricsStore, metrics_store, start_of_today, start_of_last_days, start_of_month
+)
 
 logger: logging.Logger = logging.getLogger(__name__)
 
 
+class CommandUsageCounter:
+    """
+    عدّاد استخدام الأوامر مع تتبع تزايدي لأكثر الأوامر استخداماً.
+    
+    يحتفظ بالعدد الكلي لكل أمر، وبقائمة مرتبة لأعلى K أمر تُحدَّث
+    في كل زيادة بتكلفة O(K) ثابتة بدلاً من حساب max() على جميع الأوامر،
+    وبدلاء زمنية (دقائق لآخر ساعة، ساعات لآخر أسبوع) لعدّ النوافذ الزمنية.
+    """
+    
+    WINDOWS: Dict[str, int] = {"hour": 3600, "day": 86400, "week": 7 * 86400}
+    """النوافذ الزمنية المدعومة وطولها بالثواني"""
+    
+    def __init__(self, top_k: int = 10):
+        """
+        تهيئة العدّاد.
+        
+        Args:
+            top_k (int): عدد الأوامر المحتفظ بترتيبها (افتراضي: 10)
+        """
+        self._top_k = top_k
+        self._totals: Dict[str, int] = {}
+        self._top: List[List] = []
+        # كل دلو: [رقم الدقيقة/الساعة، إجمالي الدلو، عدّادات الأوامر]
+        self._minute_buckets: Deque[list] = deque(maxlen=60)
+        self._hour_buckets: Deque[list] = deque(maxlen=24 * 7)
+    
+    def increment(self, command: str, now: Optional[float] = None) -> int:
+        """
+        زيادة عدّاد أمر بمقدار واحد.
+        
+        Args:
+            command (str): اسم الأمر
+            now (Optional[float]): الطابع الزمني (افتراضي: الوقت الحالي)
+            
+        Returns:
+            int: العدد الكلي الجديد للأمر
+        """
+        count = self._totals.get(command, 0) + 1
+        self._totals[command] = count
+        self._update_top(command, count)
+        
+        now = time.time() if now is None else now
+        self._bump(self._minute_buckets, int(now // 60), command)
+        self._bump(self._hour_buckets, int(now // 3600), command)
+        return count
+    
+    def _update_top(self, command: str, count: int) -> None:
+        """تحديث قائمة أعلى K أمر بعد زيادة عدّاد أمر واحد."""
+        top = self._top
+        for index, entry in enumerate(top):
+            if entry[0] == command:
+                entry[1] = count
+                break
+        else:
+            if len(top) < self._top_k:
+                top.append([command, count])
+                index = len(top) - 1
+            elif count > top[-1][1]:
+                top[-1] = [command, count]
+                index = len(top) - 1
+            else:
+                return
+        
+        # العدّادات تزداد فقط، لذا يكفي رفع العنصر نحو رأس القائمة
+        while index > 0 and top[index - 1][1] < top[index][1]:
+            top[index - 1], top[index] = top[index], top[index - 1]
+            index -= 1
+    
+    @staticmethod
+    def _bump(buckets: Deque[list], slot: int, command: str) -> None:
+        """زيادة عدّاد الأمر في الدلو الزمني الحالي (مع فتح دلو جديد عند الحاجة)."""
+        if not buckets or buckets[-1][0] != slot:
+            buckets.append([slot, 0, {}])
+        bucket = buckets[-1]
+        bucket[1] += 1
+        bucket[2][command] = bucket[2].get(command, 0) + 1
+    
+    def _buckets_for(self, window: str, now: Optional[float]) -> List[list]:
+        """الحصول على الدلاء الواقعة داخل نافذة زمنية."""
+        if window not in self.WINDOWS:
+            raise ValueError(f"نافذة زمنية غير معروفة: {window}")
+        
+        now = time.time() if now is None else now
+        if window == "hour":
+            first_slot = int(now // 60) - 59
+            buckets = self._minute_buckets
+        else:
+            first_slot = int(now // 3600) - self.WINDOWS[window] // 3600 + 1
+            buckets = self._hour_buckets
+        return [bucket for bucket in buckets if bucket[0] >= first_slot]
+    
+    def total(self, command: str) -> int:
+        """
+        الحصول على العدد الكلي لاستخدام أمر.
+        
+        Args:
+            command (str): اسم الأمر
+            
+        Returns:
+            int: عدد مرات الاستخدام
+        """
+        return self._totals.get(command, 0)
+    
+    def top(self, limit: Optional[int] = None) -> List[Tuple[str, int]]:
+        """
+        الحصول على الأوامر الأكثر استخداماً (محسوبة مسبقاً).
+        
+        Args:
+            limit (Optional[int]): الحد الأقصى للنتائج (افتراضي: K)
+            
+        Returns:
+            List[Tuple[str, int]]: قائمة (الأمر، العدد) مرتبة تنازلياً
+        """
+        entries = self._top if limit is None else self._top[:limit]
+        return [(command, count) for command, count in entries]
+    
+    @property
+    def most_used(self) -> Optional[Tuple[str, int]]:
+        """الأمر الأكثر استخداماً أو None."""
+        return (self._top[0][0], self._top[0][1]) if self._top else None
+    
+    def window_count(self, command: str, window: str, now: Optional[float] = None) -> int:
+        """
+        عدد مرات استخدام أمر خلال نافذة زمنية.
+        
+        Args:
+            command (str): اسم الأمر
+            window (str): النافذة ("hour" أو "day" أو "week")
+            now (Optional[float]): الطابع الزمني المرجعي
+            
+        Returns:
+            int: عدد مرات الاستخدام خلال النافذة
+        """
+        return sum(bucket[2].get(command, 0) for bucket in self._buckets_for(window, now))
+    
+    def window_total(self, window: str, now: Optional[float] = None) -> int:
+        """
+        إجمالي استخدام جميع الأوامر خلال نافذة زمنية.
+        
+        Args:
+            window (str): النافذة ("hour" أو "day" أو "week")
+            now (Optional[float]): الطابع الزمني المرجعي
+            
+        Returns:
+            int: إجمالي الاستخدام خلال النافذة
+        """
+        return sum(bucket[1] for bucket in self._buckets_for(window, now))
+    
+    def __len__(self) -> int:
+        return len(self._totals)
+    
+    def __bool__(self) -> bool:
+        return bool(self._totals)
+
+
 @dataclass
 class UserActivityStats:
     """إحصائيات نشاط المستخدم."""
@@ -54,11 +217,13 @@ class UserActivityStats:
 class FeatureUsageStats:
     """إحصائيات استخدام الميزات."""
     
-    commands_used: Dict[str, int] = field(default_factory=dict)
-    """الأوامر المستخدمة وعددها"""
+    commands_used: CommandUsageCounter = field(default_factory=CommandUsageCounter)
+    """عدّاد الأوامر المستخدمة مع الترتيب والنوافذ الزمنية"""
     
-    most_used_command: Optional[Tuple[str, int]] = None
-    """الأمر الأكثر استخداماً"""
+    @property
+    def most_used_command(self) -> Optional[Tuple[str, int]]:
+        """الأمر الأكثر استخداماً"""
+        return self.commands_used.most_used
     
     rewards_claimed: int = 0
     """المكافآت المطالب بها"""
@@ -106,13 +271,27 @@ class AdvancedStatsManager:
     يتعامل مع جمع وتحليل البيانات الشاملة عن النظام والمستخدمين.
     """
     
-    def __init__(self):
-        """تهيئة مدير الإحصائيات."""
+    def __init__(
+        self,
+        store: Optional[MetricsStore] = None,
+        tracker: Optional[ActivityTracker] = None,
+        bitmaps: Optional[ActivityBitmaps] = None
+    ):
+        """
+        تهيئة مدير الإحصائيات.
+        
+        Args:
+            store (Optional[MetricsStore]): مخزن المقاييس الزمنية (افتراضي: المخزن العام)
+            tracker (Optional[ActivityTracker]): متتبع المستخدمين النشطين (افتراضي: المتتبع العام)
+            bitmaps (Optional[ActivityBitmaps]): خرائط النشاط اليومية (افتراضي: الخرائط العامة)
+        """
+        self._store = store if store is not None else metrics_store
+        self._tracker = tracker if tracker is not None else activity_tracker
+        self._bitmaps = bitmaps if bitmaps is not None else activity_bitmaps
         self._user_activity_stats = UserActivityStats()
         self._feature_usage_stats = FeatureUsageStats()
         self._system_health_stats = SystemHealthStats()
         self._last_update = datetime.now()
-        self._command_history: Dict[str, int] = {}
         self._daily_stats_cache: Dict[str, dict] = {}
     
     def record_command_usage(self, command: str) -> None:
@@ -122,20 +301,9 @@ class AdvancedStatsManager:
         Args:
             command (str): اسم الأمر
         """
-        self._command_history[command] = self._command_history.get(command, 0) + 1
-        self._feature_usage_stats.commands_used[command] = (
-            self._feature_usage_stats.commands_used.get(command, 0) + 1
-        )
-        
-        # تحديث الأمر الأكثر استخداماً
-        most_used = max(
-            self._feature_usage_stats.commands_used.items(),
-            key=lambda x: x[1],
-            default=None
-        )
-        self._feature_usage_stats.most_used_command = most_used
-        
-        logger.debug(f"تم تسجيل استخدام الأمر: {command}")
+        self._feature_usage_stats.commands_used.increment(command)
+        self._store.record("commands")
+        logger.debug("تم تسجيل استخدام الأمر: %s", command)
     
     def record_reward_claimed(self, reward_value: int) -> None:
         """
@@ -145,28 +313,55 @@ class AdvancedStatsManager:
             reward_value (int): قيمة المكافأة
         """
         self._feature_usage_stats.rewards_claimed += 1
-        logger.debug(f"تم تسجيل مكافأة: {reward_value}")
+        self._store.record("rewards_claimed")
+        logger.debug("تم تسجيل مكافأة: %s", reward_value)
     
     def record_task_completed(self) -> None:
         """تسجيل مهمة مكتملة."""
         self._feature_usage_stats.tasks_completed += 1
+        self._store.record("tasks_completed")
         logger.debug("تم تسجيل مهمة مكتملة")
     
     def record_task_abandoned(self) -> None:
         """تسجيل مهمة مهجورة."""
         self._feature_usage_stats.tasks_abandoned += 1
+        self._store.record("tasks_abandoned")
         logger.debug("تم تسجيل مهمة مهجورة")
     
     def record_level_up(self) -> None:
         """تسجيل ارتقاء مستوى."""
         self._feature_usage_stats.levels_reached += 1
+        self._store.record("levels_reached")
         logger.debug("تم تسجيل ارتقاء مستوى")
     
     def record_referral_click(self) -> None:
         """تسجيل نقرة إحالة."""
         self._feature_usage_stats.referral_clicks += 1
+        self._store.record("referral_clicks")
         logger.debug("تم تسجيل نقرة إحالة")
     
+    def record_new_user(self, user_id: Optional[int] = None) -> None:
+        """
+        تسجيل انضمام مستخدم جديد.
+        
+        Args:
+            user_id (Optional[int]): معرّف المستخدم (لإضافته إلى مجموعة انضمام اليوم)
+        """
+        self._store.record("new_users")
+        if user_id is not None:
+            self._bitmaps.record_join(user_id)
+        logger.debug("تم تسجيل مستخدم جديد")
+    
+    def record_points_earned(self, points: int) -> None:
+        """
+        تسجيل نقاط مكتسبة.
+        
+        Args:
+            points (int): عدد النقاط
+        """
+        self._store.record("points_earned", points)
+        logger.debug("تم تسجيل %s نقطة مكتسبة", points)
+    
     def record_error(self, error_type: str) -> None:
         """
         تسجيل خطأ.
@@ -175,8 +370,8 @@ class AdvancedStatsManager:
             error_type (str): نوع الخطأ
         """
         self._system_health_stats.total_errors += 1
-        self._system_health_stats.errors_today += 1
-        logger.warning(f"تم تسجيل خطأ: {error_type}")
+        self._store.record("errors")
+        logger.warning("تم تسجيل خطأ: %s", error_type)
     
     def update_user_activity_stats(self, stats: dict) -> None:
         """
@@ -205,6 +400,11 @@ class AdvancedStatsManager:
         
         logger.info("تم تحديث إحصائيات صحة النظام")
     
+    @property
+    def active_users_error(self) -> float:
+        """الخطأ المعياري النسبي لتقديرات المستخدمين النشطين."""
+        return self._tracker.relative_error
+    
     def get_daily_summary(self) -> dict:
         """
         الحصول على ملخص اليومي.
@@ -212,13 +412,18 @@ class AdvancedStatsManager:
         Returns:
             dict: قاموس يحتوي على ملخص الإحصائيات اليومية
         """
+        today = self._store.totals(
+            ("new_users", "rewards_claimed", "tasks_completed", "errors"),
+            start_of_today()
+        )
+        self._user_activity_stats.active_today = self._tracker.active_today()
         return {
             "date": datetime.now().strftime("%Y-%m-%d"),
             "active_users": self._user_activity_stats.active_today,
-            "new_users": self._user_activity_stats.new_users_today,
-            "rewards_claimed": self._feature_usage_stats.rewards_claimed,
-            "tasks_completed": self._feature_usage_stats.tasks_completed,
-            "errors": self._system_health_stats.errors_today,
+            "new_users": today["new_users"],
+            "rewards_claimed": today["rewards_claimed"],
+            "tasks_completed": today["tasks_completed"],
+            "errors": today["errors"],
             "top_command": self._feature_usage_stats.most_used_command[0] 
                 if self._feature_usage_stats.most_used_command else "N/A",
         }
@@ -230,13 +435,18 @@ class AdvancedStatsManager:
         Returns:
             dict: قاموس يحتوي على ملخص الإحصائيات الأسبوعية
         """
+        week = self._store.totals(
+            ("new_users", "points_earned", "referral_clicks", "tasks_completed", "levels_reached"),
+            start_of_last_days(7)
+        )
+        self._user_activity_stats.active_this_week = self._tracker.active_last_days(7)
         return {
             "week_active_users": self._user_activity_stats.active_this_week,
-            "new_users_this_week": self._user_activity_stats.new_users_this_week,
-            "total_points_earned": self._user_activity_stats.total_points_earned,
-            "referral_clicks": self._feature_usage_stats.referral_clicks,
-            "tasks_completed": self._feature_usage_stats.tasks_completed,
-            "levels_reached": self._feature_usage_stats.levels_reached,
+            "new_users_this_week": week["new_users"],
+            "total_points_earned": week["points_earned"],
+            "referral_clicks": week["referral_clicks"],
+            "tasks_completed": week["tasks_completed"],
+            "levels_reached": week["levels_reached"],
         }
     
     def get_monthly_summary(self) -> dict:
@@ -246,18 +456,23 @@ class AdvancedStatsManager:
         Returns:
             dict: قاموس يحتوي على ملخص الإحصائيات الشهرية
         """
+        self._user_activity_stats.active_this_month = self._tracker.active_this_month()
         avg_engagement = (
             self._user_activity_stats.active_this_month / max(1, self._user_activity_stats.total_users)
         ) * 100
+        month = self._store.totals(
+            ("new_users", "rewards_claimed", "tasks_completed"),
+            start_of_month()
+        )
         
         return {
             "total_users": self._user_activity_stats.total_users,
             "monthly_active_users": self._user_activity_stats.active_this_month,
-            "new_users_this_month": self._user_activity_stats.new_users_this_month,
+            "new_users_this_month": month["new_users"],
             "engagement_rate": f"{avg_engagement:.1f}%",
             "total_referrals": self._user_activity_stats.total_referrals,
-            "rewards_claimed": self._feature_usage_stats.rewards_claimed,
-            "tasks_completed": self._feature_usage_stats.tasks_completed,
+            "rewards_claimed": month["rewards_claimed"],
+            "tasks_completed": month["tasks_completed"],
         }
     
     def get_feature_usage_report(self) -> str:
@@ -269,17 +484,18 @@ class AdvancedStatsManager:
         """
         report = "📊 **تقرير استخدام الميزات**\n\n"
         
-        # الأوامر
-        if self._feature_usage_stats.commands_used:
+        # الأوامر (الترتيب محسوب مسبقاً في العدّاد)
+        commands = self._feature_usage_stats.commands_used
+        if commands:
             report += "🔧 **الأوامر المستخدمة:**\n"
-            sorted_commands = sorted(
-                self._feature_usage_stats.commands_used.items(),
-                key=lambda x: x[1],
-                reverse=True
-            )[:5]
-            
-            for cmd, count in sorted_commands:
+            for cmd, count in commands.top(5):
                 report += f"  • {cmd}: {count} مرة\n"
+            
+            report += (
+                f"  ⏱️ آخر ساعة: {commands.window_total('hour')} | "
+                f"آخر يوم: {commands.window_total('day')} | "
+                f"آخر أسبوع: {commands.window_total('week')}\n"
+            )
         
         report += f"\n💎 **المكافآت المطالب بها:** {self._feature_usage_stats.rewards_claimed}\n"
         report += f"✅ **المهام المكتملة:** {self._feature_usage_stats.tasks_completed}\n"
@@ -297,10 +513,11 @@ class AdvancedStatsManager:
         """
         report = "🏥 **تقرير صحة النظام**\n\n"
         
-        status = "✅ جيد" if self._system_health_stats.errors_today < 5 else "⚠️ تحذير"
+        errors_today = self._store.total("errors", start_of_today())
+        status = "✅ جيد" if errors_today < 5 else "⚠️ تحذير"
         report += f"{status}\n\n"
         
-        report += f"❌ **الأخطاء اليوم:** {self._system_health_stats.errors_today}\n"
+        report += f"❌ **الأخطاء اليوم:** {errors_today}\n"
         report += f"🚫 **إجمالي الأخطاء:** {self._system_health_stats.total_errors}\n"
         report += f"🔒 **المستخدمون المحظورون:** {self._system_health_stats.banned_users}\n"
         
@@ -314,6 +531,32 @@ class AdvancedStatsManager:
         
         return report
     
+    def get_retention_report(self, days: int = 30) -> str:
+        """
+        الحصول على تقرير الاحتفاظ لمجموعات المنضمين.
+        
+        Args:
+            days (int): عدد أيام المجموعات (افتراضي: 30)
+        
+        Returns:
+            str: التقرير المنسق
+        """
+        offsets = (1, 7, 14, 30)
+        report = "📆 **تقرير الاحتفاظ (آخر {} يوم)**\n\n".format(days)
+        report += f"👥 النشطون اليوم (دقيق): {self._bitmaps.daily_active_users()}\n\n"
+        report += "`اليوم       العدد  " + "  ".join(f"D{n:<3}" for n in offsets) + "`\n"
+        
+        for row in self._bitmaps.cohort_report(days, offsets):
+            if not row["size"]:
+                continue
+            cells = [
+                " -  " if value is None else f"{value * 100:3.0f}%"
+                for value in row["retention"].values()
+            ]
+            report += f"`{row['day']:%Y-%m-%d} {row['size']:>6}  " + "  ".join(cells) + "`\n"
+        
+        return report
+    
     def get_complete_stats_report(self) -> str:
         """
         الحصول على تقرير إحصائيات شامل.
@@ -350,7 +593,12 @@ class AdvancedStatsManager:
         return report
     
     def reset_daily_stats(self) -> None:
-        """إعادة تعيين الإحصائيات اليومية."""
+        """
+        إعادة تعيين الإحصائيات اليومية المحدَّثة يدوياً.
+        
+        الأعداد اليومية والأسبوعية والشهرية تُحسب من مخزن المقاييس الزمنية،
+        لذا لا تحتاج إلى إعادة تعيين.
+        """
         self._user_activity_stats.active_today = 0
         self._user_activity_stats.new_users_today = 0
         self._system_health_stats.errors_today = 0
@@ -9,7 +9,7 @@ import string
 import random
 import logging
 from typing import List
-from src.core.config import ADMIN_IDS
+from src.core import config
 
 logger: logging.Logger = logging.getLogger(__name__)
 
@@ -55,7 +55,7 @@ def is_admin(user_id: int) -> bool:
         >>> is_admin(ADMIN_IDS[0])
         True
     """
-    return user_id in ADMIN_IDS
+    return user_id in config.ADMIN_IDS
 
 
 def get_admin_ids() -> List[int]:
@@ -70,7 +70,7 @@ def get_admin_ids() -> List[int]:
         >>> len(admins) > 0
         True
     """
-    return ADMIN_IDS.copy()
+    return config.ADMIN_IDS.copy()
 
 
 def format_number(number: int, thousands_separator: str = ",") -> str:
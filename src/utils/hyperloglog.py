@@ -0,0 +1,150 @@
+"""
+رسم HyperLogLog لتقدير عدد العناصر المميزة.
+
+يستخدم ذاكرة ثابتة (2^p بايت) بغض النظر عن عدد المستخدمين،
+بخطأ معياري نسبي يقارب 1.04 / √(2^p)، ويدعم الدمج لحساب
+نوافذ أطول (أسبوع، شهر) من رسومات الأيام.
+"""
+
+import hashlib
+import math
+import zlib
+from typing import Iterable
+
+
+class HyperLogLog:
+    """
+    رسم HyperLogLog بسجلات بحجم بايت واحد.
+
+    Attributes:
+        precision (int): عدد بتات الفهرس p (عدد السجلات = 2^p)
+    """
+
+    def __init__(self, precision: int = 12):
+        """
+        تهيئة الرسم.
+
+        Args:
+            precision (int): عدد بتات الفهرس بين 4 و 16 (افتراضي: 12 ← 4 كيلوبايت، خطأ ~1.6%)
+
+        Raises:
+            ValueError: إذا كانت الدقة خارج النطاق المسموح
+        """
+        if not 4 <= precision <= 16:
+            raise ValueError(f"دقة HyperLogLog يجب أن تكون بين 4 و 16: {precision}")
+
+        self.precision = precision
+        self._registers = bytearray(1 << precision)
+
+    @property
+    def size(self) -> int:
+        """عدد السجلات."""
+        return len(self._registers)
+
+    @property
+    def relative_error(self) -> float:
+        """الخطأ المعياري النسبي للتقدير."""
+        return 1.04 / math.sqrt(self.size)
+
+    @staticmethod
+    def _hash(item: int) -> int:
+        """تجزئة 64 بت للعنصر."""
+        digest = hashlib.blake2b(str(item).encode(), digest_size=8).digest()
+        return int.from_bytes(digest, "big")
+
+    def add(self, item: int) -> bool:
+        """
+        إضافة عنصر إلى الرسم.
+
+        Args:
+            item (int): العنصر (مثل معرّف المستخدم)
+
+        Returns:
+            bool: True إذا تغيّر الرسم (مفيد لتتبع الحاجة إلى الحفظ)
+        """
+        value = self._hash(item)
+        remaining_bits = 64 - self.precision
+        index = value >> remaining_bits
+        rank = remaining_bits - (value & ((1 << remaining_bits) - 1)).bit_length() + 1
+
+        if rank > self._registers[index]:
+            self._registers[index] = rank
+            return True
+        return False
+
+    def count(self) -> int:
+        """
+        تقدير عدد العناصر المميزة.
+
+        Returns:
+            int: العدد التقديري
+        """
+        m = self.size
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(2.0 ** -r for r in self._registers)
+
+        zeros = self._registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            # تصحيح النطاق الصغير (العد الخطي)
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+    def merge(self, other: "HyperLogLog") -> None:
+        """
+        دمج رسم آخر في هذا الرسم (اتحاد المجموعتين).
+
+        Args:
+            other (HyperLogLog): الرسم المراد دمجه
+
+        Raises:
+            ValueError: إذا اختلفت دقة الرسمين
+        """
+        if other.precision != self.precision:
+            raise ValueError("لا يمكن دمج رسمين بدقتين مختلفتين")
+        self._registers = bytearray(map(max, self._registers, other._registers))
+
+    @classmethod
+    def union(cls, sketches: Iterable["HyperLogLog"], precision: int = 12) -> "HyperLogLog":
+        """
+        إنشاء رسم جديد يمثل اتحاد عدة رسومات.
+
+        Args:
+            sketches (Iterable[HyperLogLog]): الرسومات المراد دمجها
+            precision (int): الدقة المستخدمة إذا كانت القائمة فارغة
+
+        Returns:
+            HyperLogLog: رسم الاتحاد
+        """
+        result = None
+        for sketch in sketches:
+            if result is None:
+                result = cls.from_bytes(sketch.to_bytes(), sketch.precision)
+            else:
+                result.merge(sketch)
+        return result if result is not None else cls(precision)
+
+    def to_bytes(self) -> bytes:
+        """تمثيل مضغوط للسجلات (مناسب للحفظ في قاعدة البيانات)."""
+        return zlib.compress(bytes(self._registers))
+
+    @classmethod
+    def from_bytes(cls, data: bytes, precision: int) -> "HyperLogLog":
+        """
+        استعادة رسم من تمثيله المضغوط.
+
+        Args:
+            data (bytes): البيانات الناتجة عن to_bytes
+            precision (int): دقة الرسم
+
+        Returns:
+            HyperLogLog: الرسم المستعاد
+
+        Raises:
+            ValueError: إذا لم يتطابق حجم البيانات مع الدقة
+        """
+        sketch = cls(precision)
+        registers = zlib.decompress(data)
+        if len(registers) != sketch.size:
+            raise ValueError("حجم بيانات HyperLogLog لا يتطابق مع الدقة")
+        sketch._registers = bytearray(registers)
+        return sketch
@@ -0,0 +1,373 @@
+"""
+سجل المقاييس التشغيلية (عدادات، مقاييس لحظية، مدرجات تكرارية).
+
+سجل بسيط متوافق مع صيغة Prometheus النصية بدون اعتماديات خارجية.
+تُستخدم هذه المقاييس لقياس زمن المعالجات واستعلامات قاعدة البيانات
+واستدعاءات Bot API، وتُعرض عبر أمر إداري وعبر المُصدِّر النصي.
+"""
+
+import bisect
+import logging
+import math
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+LabelValues = Tuple[str, ...]
+
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+"""حدود الدلاء الافتراضية للمدرجات التكرارية بالثواني"""
+
+
+def _format_value(value: float) -> str:
+    """تنسيق قيمة رقمية وفق صيغة Prometheus."""
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    """تنسيق التسميات بصيغة {name="value",...}."""
+    if not names:
+        return ""
+    pairs = []
+    for name, value in zip(names, values):
+        escaped = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{name}="{escaped}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+class _Metric:
+    """
+    الأساس المشترك لجميع أنواع المقاييس.
+    """
+
+    type_name: str = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        """
+        تهيئة المقياس.
+
+        Args:
+            name (str): اسم المقياس
+            documentation (str): وصف المقياس
+            labelnames (Sequence[str]): أسماء التسميات
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames: Tuple[str, ...] = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Sequence[Union[str, int]]) -> LabelValues:
+        """التحقق من عدد التسميات وتحويلها إلى مفتاح."""
+        if len(labels) != len(self.labelnames):
+            raise ValueError(
+                f"{self.name} يتطلب {len(self.labelnames)} تسمية، تم تمرير {len(labels)}"
+            )
+        return tuple(str(label) for label in labels)
+
+    def samples(self) -> Iterable[Tuple[str, str, float]]:
+        """عينات المقياس بصيغة (اللاحقة، التسميات، القيمة)."""
+        return ()
+
+    def render(self) -> List[str]:
+        """
+        تحويل المقياس إلى أسطر بصيغة Prometheus النصية.
+
+        Returns:
+            List[str]: الأسطر
+        """
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+        for suffix, labels, value in self.samples():
+            lines.append(f"{self.name}{suffix}{labels} {_format_value(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    """
+    عداد تراكمي لا يتناقص.
+    """
+
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, *labels: Union[str, int], amount: float = 1.0) -> None:
+        """
+        زيادة العداد.
+
+        Args:
+            *labels: قيم التسميات بنفس ترتيب أسمائها
+            amount (float): مقدار الزيادة (افتراضي: 1)
+        """
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, *labels: Union[str, int]) -> float:
+        """القيمة الحالية للعداد."""
+        return self._values.get(self._key(labels), 0.0)
+
+    def items(self) -> List[Tuple[LabelValues, float]]:
+        """جميع القيم مع تسمياتها."""
+        with self._lock:
+            return list(self._values.items())
+
+    def samples(self) -> Iterable[Tuple[str, str, float]]:
+        for key, value in self.items():
+            yield "_total", _format_labels(self.labelnames, key), value
+
+
+class Gauge(_Metric):
+    """
+    مقياس لحظي يمكن أن يزيد أو ينقص.
+    """
+
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self._function: Optional[Callable[[], float]] = None
+
+    def set(self, value: float, *labels: Union[str, int]) -> None:
+        """تعيين قيمة المقياس."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, *labels: Union[str, int], amount: float = 1.0) -> None:
+        """زيادة المقياس."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, *labels: Union[str, int], amount: float = 1.0) -> None:
+        """إنقاص المقياس."""
+        self.inc(*labels, amount=-amount)
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        """
+        ربط المقياس بدالة تُستدعى عند القراءة (للمقاييس بدون تسميات).
+
+        Args:
+            function (Callable[[], float]): دالة تعيد القيمة الحالية
+        """
+        self._function = function
+
+    def value(self, *labels: Union[str, int]) -> float:
+        """القيمة الحالية للمقياس."""
+        if self._function is not None and not labels:
+            return float(self._function())
+        return self._values.get(self._key(labels), 0.0)
+
+    def items(self) -> List[Tuple[LabelValues, float]]:
+        """جميع القيم مع تسمياتها."""
+        if self._function is not None:
+            return [((), self.value())]
+        with self._lock:
+            return list(self._values.items())
+
+    def samples(self) -> Iterable[Tuple[str, str, float]]:
+        for key, value in self.items():
+            yield "", _format_labels(self.labelnames, key), value
+
+
+class Histogram(_Metric):
+    """
+    مدرج تكراري بدلاء ثابتة مع تقدير المئينات (p50/p95/p99).
+    """
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        """
+        تهيئة المدرج.
+
+        Args:
+            name (str): اسم المقياس
+            documentation (str): وصف المقياس
+            labelnames (Sequence[str]): أسماء التسميات
+            buckets (Sequence[float]): الحدود العليا للدلاء (تصاعدياً)
+        """
+        super().__init__(name, documentation, labelnames)
+        self.buckets: Tuple[float, ...] = tuple(sorted(buckets))
+        # لكل مجموعة تسميات: [عدادات الدلاء (+Inf في الأخير)، المجموع، العدد]
+        self._series: Dict[LabelValues, list] = {}
+
+    def observe(self, value: float, *labels: Union[str, int]) -> None:
+        """
+        تسجيل قيمة مرصودة.
+
+        Args:
+            value (float): القيمة (بالثواني عادة)
+            *labels: قيم التسميات
+        """
+        key = self._key(labels)
+        position = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][position] += 1
+            series[1] += value
+            series[2] += 1
+
+    def count(self, *labels: Union[str, int]) -> int:
+        """عدد القيم المرصودة."""
+        series = self._series.get(self._key(labels))
+        return series[2] if series else 0
+
+    def sum(self, *labels: Union[str, int]) -> float:
+        """مجموع القيم المرصودة."""
+        series = self._series.get(self._key(labels))
+        return series[1] if series else 0.0
+
+    def label_sets(self) -> List[LabelValues]:
+        """جميع مجموعات التسميات المرصودة."""
+        with self._lock:
+            return list(self._series)
+
+    def quantile(self, q: float, *labels: Union[str, int]) -> float:
+        """
+        تقدير مئين بالاستيفاء الخطي داخل الدلو (مثل histogram_quantile).
+
+        Args:
+            q (float): المئين المطلوب بين 0 و 1
+            *labels: قيم التسميات
+
+        Returns:
+            float: القيمة التقديرية (0 إذا لم تُرصد قيم)
+        """
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if not series or not series[2]:
+                return 0.0
+            counts = list(series[0])
+            total = series[2]
+
+        rank = q * total
+        cumulative = 0
+        for index, count in enumerate(counts):
+            if cumulative + count >= rank and count:
+                if index == len(self.buckets):
+                    return self.buckets[-1]
+                lower = self.buckets[index - 1] if index else 0.0
+                upper = self.buckets[index]
+                return lower + (upper - lower) * (rank - cumulative) / count
+            cumulative += count
+        return self.buckets[-1]
+
+    def samples(self) -> Iterable[Tuple[str, str, float]]:
+        with self._lock:
+            snapshot = [(key, list(s[0]), s[1], s[2]) for key, s in self._series.items()]
+
+        for key, counts, total_sum, total_count in snapshot:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                labels = _format_labels(
+                    self.labelnames + ("le",), key + (_format_value(bound),)
+                )
+                yield "_bucket", labels, cumulative
+            labels = _format_labels(self.labelnames, key)
+            yield "_sum", labels, total_sum
+            yield "_count", labels, total_count
+
+
+class MetricsRegistry:
+    """
+    سجل مركزي للمقاييس مع تصديرها بصيغة Prometheus النصية.
+    """
+
+    def __init__(self):
+        """تهيئة السجل."""
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric_class: type, name: str, *args, **kwargs) -> _Metric:
+        """تسجيل مقياس جديد أو إرجاع المقياس المسجل بنفس الاسم."""
+        with self._lock:
+            existing = self._metrics.get(name)
+            if existing is not None:
+                if not isinstance(existing, metric_class):
+                    raise ValueError(f"المقياس {name} مسجل بنوع مختلف")
+                return existing
+            metric = self._metrics[name] = metric_class(name, *args, **kwargs)
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        """إنشاء عداد أو استرجاعه."""
+        return self._register(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        """إنشاء مقياس لحظي أو استرجاعه."""
+        return self._register(Gauge, name, documentation, labelnames)
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        """إنشاء مدرج تكراري أو استرجاعه."""
+        return self._register(Histogram, name, documentation, labelnames, buckets)
+
+    def get(self, name: str) -> Optional[_Metric]:
+        """استرجاع مقياس مسجل بالاسم."""
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        """
+        تصدير جميع المقاييس بصيغة Prometheus النصية.
+
+        Returns:
+            str: نص التصدير
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+
+        lines: List[str] = []
+        for metric in metrics:
+            try:
+                lines.extend(metric.render())
+            except Exception as e:
+                logger.error(f"فشل تصدير المقياس {metric.name}: {e}")
+        return "\n".join(lines) + "\n"
+
+
+# إنشاء مثيل من سجل المقاييس
+metrics_registry = MetricsRegistry()
+
+CACHE_LOOKUPS = metrics_registry.counter(
+    "dragon_cache_lookups", "عمليات البحث في الذاكرات المؤقتة حسب النتيجة", ("cache", "result")
+)
+
+
+def record_cache_lookup(cache: str, hit: bool) -> None:
+    """
+    تسجيل نتيجة بحث في ذاكرة مؤقتة (لحساب نسبة الإصابة).
+
+    Args:
+        cache (str): اسم الذاكرة المؤقتة
+        hit (bool): هل وُجدت القيمة؟
+    """
+    CACHE_LOOKUPS.inc(cache, "hit" if hit else "miss")
@@ -0,0 +1,89 @@
+"""
+خادم HTTP محلي لتصدير المقاييس بصيغة Prometheus.
+
+يعمل على نفس حلقة الأحداث الخاصة بالبوت باستخدام asyncio.start_server،
+ويخدم المسار /metrics بصيغة Prometheus النصية والمسار /healthz للتحقق من الحياة.
+"""
+
+import asyncio
+import logging
+from typing import Optional
+
+from src.utils.metrics import MetricsRegistry, metrics_registry
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+CONTENT_TYPE: str = "text/plain; version=0.0.4; charset=utf-8"
+"""نوع محتوى صيغة Prometheus النصية"""
+
+_REQUEST_TIMEOUT: float = 5.0
+"""المهلة القصوى لقراءة طلب HTTP بالثواني"""
+
+
+class MetricsServer:
+    """
+    خادم HTTP بسيط غير حاجب لتصدير سجل المقاييس.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 9100,
+        registry: Optional[MetricsRegistry] = None
+    ):
+        """
+        تهيئة الخادم.
+
+        Args:
+            host (str): عنوان الاستماع (افتراضي: 127.0.0.1)
+            port (int): منفذ الاستماع (0 لاختيار منفذ عشوائي)
+            registry (Optional[MetricsRegistry]): سجل المقاييس (افتراضي: السجل العام)
+        """
+        self.host = host
+        self.port = port
+        self._registry = registry or metrics_registry
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self) -> None:
+        """بدء الاستماع على المنفذ المحدد."""
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info("📈 خادم المقاييس يعمل على http://%s:%d/metrics", self.host, self.port)
+
+    async def stop(self) -> None:
+        """إيقاف الخادم وإغلاق الاتصالات."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """معالجة طلب HTTP واحد."""
+        try:
+            head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), _REQUEST_TIMEOUT)
+            method, path, _ = head.split(b"\r\n", 1)[0].decode("latin-1").split(" ", 2)
+            path = path.split("?", 1)[0]
+
+            if method != "GET":
+                status, content_type, body = "405 Method Not Allowed", "text/plain", b""
+            elif path == "/metrics":
+                status, content_type = "200 OK", CONTENT_TYPE
+                body = self._registry.render().encode("utf-8")
+            elif path == "/healthz":
+                status, content_type, body = "200 OK", "text/plain", b"ok\n"
+            else:
+                status, content_type, body = "404 Not Found", "text/plain", b""
+
+            writer.write(
+                f"HTTP/1.1 {status}\r\n"
+                f"Content-Type: {content_type}\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: close\r\n\r\n".encode("latin-1") + body
+            )
+            await writer.drain()
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError, ConnectionError):
+            pass
+        except Exception as e:
+            logger.error(f"خطأ في خادم المقاييس: {e}")
+        finally:
+            writer.close()
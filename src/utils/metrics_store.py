@@ -0,0 +1,252 @@
+"""
+مخزن المقاييس الزمنية المتدحرجة.
+
+يجمع الأحداث في دلاء دقيقة تُلَفّ تلقائياً إلى دلاء ساعة ثم يوم،
+ويُحفظ دورياً في SQLite ليجيب عن أي نافذة زمنية (اليوم، آخر 7 أيام،
+هذا الشهر) دون فقدان البيانات عند إعادة تشغيل البوت.
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from src.core import config
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+Row = Tuple[str, str, int, int]
+
+
+def start_of_today(now: Optional[datetime] = None) -> datetime:
+    """بداية اليوم الحالي (منتصف الليل بالتوقيت المحلي)."""
+    now = now or datetime.now()
+    return now.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def start_of_last_days(days: int, now: Optional[datetime] = None) -> datetime:
+    """بداية نافذة آخر عدد من الأيام (تشمل اليوم الحالي)."""
+    return start_of_today(now) - timedelta(days=days - 1)
+
+
+def start_of_month(now: Optional[datetime] = None) -> datetime:
+    """بداية الشهر الحالي."""
+    return start_of_today(now).replace(day=1)
+
+
+class MetricsStore:
+    """
+    مخزن مقاييس بدلاء زمنية متدرجة (دقيقة ← ساعة ← يوم).
+
+    تبقى دلاء الدقائق لآخر ساعة، ودلاء الساعات لآخر 48 ساعة،
+    ثم تُجمع في دلاء أيام تبدأ من منتصف الليل المحلي. كل حدث يقع في طبقة
+    واحدة فقط، لذا يكون مجموع أي نافذة تبدأ عند منتصف الليل دقيقاً.
+    """
+
+    MINUTE_SPAN: int = 3600
+    """المدة (بالثواني) التي تبقى فيها دلاء الدقائق قبل لفّها إلى ساعات"""
+
+    HOUR_SPAN: int = 48 * 3600
+    """المدة (بالثواني) التي تبقى فيها دلاء الساعات قبل لفّها إلى أيام"""
+
+    def __init__(self, retention_days: Optional[int] = None):
+        """
+        تهيئة المخزن.
+
+        Args:
+            retention_days (Optional[int]): عدد أيام الاحتفاظ بدلاء الأيام
+                (افتراضي: METRICS_RETENTION_DAYS من الإعدادات)
+        """
+        self._retention_days = retention_days
+        self._minutes: Dict[str, Dict[int, int]] = {}
+        self._hours: Dict[str, Dict[int, int]] = {}
+        self._days: Dict[str, Dict[int, int]] = {}
+        self._dirty_days: Set[Tuple[str, int]] = set()
+        self._last_rollup_minute: int = 0
+
+    def record(self, name: str, value: int = 1, now: Optional[float] = None) -> None:
+        """
+        تسجيل حدث في دلو الدقيقة الحالية.
+
+        Args:
+            name (str): اسم المقياس
+            value (int): القيمة المضافة (افتراضي: 1)
+            now (Optional[float]): الطابع الزمني (افتراضي: الوقت الحالي)
+        """
+        now = time.time() if now is None else now
+        minute = int(now // 60)
+        buckets = self._minutes.setdefault(name, {})
+        buckets[minute] = buckets.get(minute, 0) + value
+
+        if minute != self._last_rollup_minute:
+            self.rollup(now)
+
+    def rollup(self, now: Optional[float] = None) -> None:
+        """
+        لفّ الدلاء القديمة إلى الدقة الأعلى وحذف ما تجاوز مدة الاحتفاظ.
+
+        Args:
+            now (Optional[float]): الطابع الزمني المرجعي
+        """
+        now = time.time() if now is None else now
+        self._last_rollup_minute = int(now // 60)
+
+        minute_cutoff = int((now - self.MINUTE_SPAN) // 60)
+        for name, buckets in self._minutes.items():
+            for minute in [m for m in buckets if m < minute_cutoff]:
+                hours = self._hours.setdefault(name, {})
+                hour = minute // 60
+                hours[hour] = hours.get(hour, 0) + buckets.pop(minute)
+
+        hour_cutoff = int((now - self.HOUR_SPAN) // 3600)
+        for name, buckets in self._hours.items():
+            for hour in [h for h in buckets if h < hour_cutoff]:
+                days = self._days.setdefault(name, {})
+                day = self._day_bucket(hour * 3600)
+                days[day] = days.get(day, 0) + buckets.pop(hour)
+                self._dirty_days.add((name, day))
+
+        day_cutoff = self._day_bucket(now - self.retention_days * 86400)
+        for buckets in self._days.values():
+            for day in [d for d in buckets if d < day_cutoff]:
+                del buckets[day]
+
+    @property
+    def retention_days(self) -> int:
+        """عدد أيام الاحتفاظ بدلاء الأيام."""
+        if self._retention_days is None:
+            return config.METRICS_RETENTION_DAYS
+        return self._retention_days
+
+    @staticmethod
+    def _day_bucket(timestamp: float) -> int:
+        """الطابع الزمني لمنتصف الليل المحلي لليوم الذي يقع فيه الطابع."""
+        return int(start_of_today(datetime.fromtimestamp(timestamp)).timestamp())
+
+    def total(
+        self,
+        name: str,
+        start: datetime,
+        end: Optional[datetime] = None
+    ) -> int:
+        """
+        مجموع مقياس خلال نافذة زمنية [start, end).
+
+        Args:
+            name (str): اسم المقياس
+            start (datetime): بداية النافذة (يُفضّل أن تكون عند منتصف الليل)
+            end (Optional[datetime]): نهاية النافذة (افتراضي: الآن)
+
+        Returns:
+            int: مجموع القيم داخل النافذة
+        """
+        start_ts = start.timestamp()
+        end_ts = end.timestamp() if end else float("inf")
+
+        result = 0
+        for buckets, width in (
+            (self._minutes.get(name, {}), 60),
+            (self._hours.get(name, {}), 3600),
+        ):
+            for bucket, value in buckets.items():
+                if start_ts <= bucket * width < end_ts:
+                    result += value
+
+        for day, value in self._days.get(name, {}).items():
+            if start_ts <= day < end_ts:
+                result += value
+        return result
+
+    def totals(
+        self,
+        names: Iterable[str],
+        start: datetime,
+        end: Optional[datetime] = None
+    ) -> Dict[str, int]:
+        """
+        مجاميع عدة مقاييس خلال نفس النافذة.
+
+        Args:
+            names (Iterable[str]): أسماء المقاييس
+            start (datetime): بداية النافذة
+            end (Optional[datetime]): نهاية النافذة (افتراضي: الآن)
+
+        Returns:
+            Dict[str, int]: قاموس الاسم ← المجموع
+        """
+        return {name: self.total(name, start, end) for name in names}
+
+    def snapshot_rows(self) -> Tuple[List[Row], List[Row]]:
+        """
+        لقطة من الدلاء جاهزة للحفظ.
+
+        Returns:
+            Tuple[List[Row], List[Row]]: (دلاء الدقائق والساعات، دلاء الأيام المعدلة)
+        """
+        fine_rows: List[Row] = []
+        for resolution, tier in (("minute", self._minutes), ("hour", self._hours)):
+            for name, buckets in tier.items():
+                fine_rows.extend((name, resolution, b, v) for b, v in buckets.items())
+
+        day_rows: List[Row] = [
+            (name, "day", day, self._days[name][day])
+            for name, day in self._dirty_days
+            if day in self._days.get(name, {})
+        ]
+        self._dirty_days.clear()
+        return fine_rows, day_rows
+
+    def load(self) -> None:
+        """تحميل الدلاء المحفوظة من قاعدة البيانات (تُدمج مع الموجود في الذاكرة)."""
+        from src.database import get_metric_buckets
+
+        min_day = self._day_bucket(time.time() - self.retention_days * 86400)
+        tiers = {"minute": self._minutes, "hour": self._hours, "day": self._days}
+        for name, resolution, bucket, value in get_metric_buckets(min_day):
+            buckets = tiers[resolution].setdefault(name, {})
+            buckets[bucket] = buckets.get(bucket, 0) + value
+
+        self.rollup()
+        logger.info("تم تحميل المقاييس الزمنية من قاعدة البيانات")
+
+    def flush(self) -> None:
+        """
+        حفظ الدلاء في قاعدة البيانات بشكل متزامن.
+
+        عند فشل الحفظ تُعاد الأيام المعدلة إلى قائمة الحفظ ثم يُعاد رفع الخطأ.
+        """
+        from src.database import save_metric_buckets
+
+        self.rollup()
+        fine_rows, day_rows = self.snapshot_rows()
+        try:
+            save_metric_buckets(fine_rows, day_rows)
+        except Exception:
+            self._dirty_days.update((name, day) for name, _, day, _ in day_rows)
+            raise
+
+    async def run_periodic_flush(self, interval: float) -> None:
+        """
+        حفظ الدلاء دورياً دون حجب حلقة الأحداث.
+
+        تُؤخذ اللقطة داخل الحلقة ثم تُكتب في خيط منفصل.
+
+        Args:
+            interval (float): الفاصل الزمني بين عمليات الحفظ بالثواني
+        """
+        from src.database import save_metric_buckets
+
+        while True:
+            await asyncio.sleep(interval)
+            self.rollup()
+            fine_rows, day_rows = self.snapshot_rows()
+            try:
+                await asyncio.to_thread(save_metric_buckets, fine_rows, day_rows)
+            except Exception as e:
+                self._dirty_days.update((name, day) for name, _, day, _ in day_rows)
+                logger.error(f"فشل حفظ المقاييس الزمنية: {e}")
+
+
+# إنشاء مثيل من مخزن المقاييس
+metrics_store = MetricsStore()
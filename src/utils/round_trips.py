@@ -0,0 +1,148 @@
+"""
+محاسبة عمليات قاعدة البيانات واستدعاءات Bot API لكل تحديث.
+
+يُنشأ سجل محاسبة لكل تحديث ويُحمل عبر متغير سياق (ContextVar)،
+فيسجل فيه مدير قاعدة البيانات وطبقة طلبات Bot API كل عملية.
+يفيد ذلك في اكتشاف أنماط N+1 (تكرار نفس الاستعلام داخل التحديث الواحد)
+وفي تثبيت ميزانية العمليات في الاختبارات عبر assert_round_trips.
+"""
+
+import contextvars
+import logging
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Iterator, List, Optional
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RoundTrips:
+    """
+    سجل عمليات تحديث واحد.
+    """
+    db_operations: List[str] = field(default_factory=list)
+    api_calls: List[str] = field(default_factory=list)
+    handlers: List[str] = field(default_factory=list)
+
+    @property
+    def db(self) -> int:
+        """عدد عمليات قاعدة البيانات."""
+        return len(self.db_operations)
+
+    @property
+    def api(self) -> int:
+        """عدد استدعاءات Bot API."""
+        return len(self.api_calls)
+
+    @property
+    def handler(self) -> str:
+        """اسم آخر معالج نُفّذ (أو '-' إذا لم يُنفّذ أي معالج)."""
+        return self.handlers[-1] if self.handlers else "-"
+
+    def repeated_db_operations(self) -> List[str]:
+        """عمليات قاعدة البيانات التي تكررت داخل نفس التحديث."""
+        return [name for name, count in Counter(self.db_operations).items() if count > 1]
+
+    def summary(self) -> str:
+        """ملخص نصي للعمليات."""
+        return (
+            f"db={self.db} {self.db_operations} | "
+            f"api={self.api} {self.api_calls} | handlers={self.handlers}"
+        )
+
+
+_current: contextvars.ContextVar[Optional[RoundTrips]] = contextvars.ContextVar(
+    "dragon_round_trips", default=None
+)
+
+
+def current_round_trips() -> Optional[RoundTrips]:
+    """سجل التحديث الحالي (None خارج معالجة التحديثات)."""
+    return _current.get()
+
+
+def record_db_operation(operation: str) -> None:
+    """تسجيل عملية قاعدة بيانات في سجل التحديث الحالي."""
+    trips = _current.get()
+    if trips is not None:
+        trips.db_operations.append(operation)
+
+
+def record_api_call(method: str) -> None:
+    """تسجيل استدعاء Bot API في سجل التحديث الحالي."""
+    trips = _current.get()
+    if trips is not None:
+        trips.api_calls.append(method)
+
+
+def record_handler(name: str) -> None:
+    """تسجيل اسم المعالج الذي يعمل على التحديث الحالي."""
+    trips = _current.get()
+    if trips is not None:
+        trips.handlers.append(name)
+
+
+@contextmanager
+def track_round_trips() -> Iterator[RoundTrips]:
+    """
+    بدء سجل محاسبة جديد للكتلة الحالية.
+
+    Yields:
+        RoundTrips: السجل الذي تُجمع فيه العمليات
+    """
+    trips = RoundTrips()
+    token = _current.set(trips)
+    try:
+        yield trips
+    finally:
+        _current.reset(token)
+
+
+def check_budget(trips: RoundTrips, db_budget: int, api_budget: int) -> bool:
+    """
+    التحقق من ميزانية عمليات التحديث وتسجيل تحذير عند تجاوزها.
+
+    Args:
+        trips (RoundTrips): سجل التحديث
+        db_budget (int): الحد الأقصى لعمليات قاعدة البيانات (0 لتعطيل الفحص)
+        api_budget (int): الحد الأقصى لاستدعاءات Bot API (0 لتعطيل الفحص)
+
+    Returns:
+        bool: True إذا كانت العمليات ضمن الميزانية
+    """
+    over_db = db_budget and trips.db > db_budget
+    over_api = api_budget and trips.api > api_budget
+    if not (over_db or over_api):
+        return True
+
+    logger.warning(
+        "⚠️ تجاوز ميزانية العمليات في %s: %s | مكررة: %s",
+        trips.handler, trips.summary(), trips.repeated_db_operations()
+    )
+    return False
+
+
+@contextmanager
+def assert_round_trips(db: Optional[int] = None, api: Optional[int] = None) -> Iterator[RoundTrips]:
+    """
+    مساعد اختبارات: التأكد من أن الكتلة لا تتجاوز عدداً من العمليات.
+
+    Args:
+        db (Optional[int]): الحد الأقصى لعمليات قاعدة البيانات
+        api (Optional[int]): الحد الأقصى لاستدعاءات Bot API
+
+    Yields:
+        RoundTrips: سجل العمليات
+
+    Raises:
+        AssertionError: إذا تجاوزت الكتلة الحد المحدد
+    """
+    with track_round_trips() as trips:
+        yield trips
+
+    if db is not None and trips.db > db:
+        raise AssertionError(f"عمليات قاعدة البيانات {trips.db} > {db}: {trips.db_operations}")
+    if api is not None and trips.api > api:
+        raise AssertionError(f"استدعاءات Bot API {trips.api} > {api}: {trips.api_calls}")
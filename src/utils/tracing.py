@@ -0,0 +1,233 @@
+"""
+تتبع خفيف لكل تحديث (Tracing) عبر المعالجات وقاعدة البيانات وBot API.
+
+يحصل كل تحديث على معرّف تتبع يُحمل عبر متغير سياق (ContextVar)،
+وتُسجَّل فيه فترات (Spans) للمعالج ولكل عملية قاعدة بيانات ولكل استدعاء Bot API.
+تُكتب التتبعات المختارة (بالعينة أو لأنها بطيئة) كأسطر JSON بحقول متوافقة
+مع OTLP في ملف محلي، من خيط كتابة منفصل حتى لا تُحجب حلقة الأحداث.
+"""
+
+import atexit
+import contextvars
+import json
+import logging
+import queue
+import random
+import threading
+import time
+from contextlib import nullcontext
+from typing import Any, Dict, List, Optional
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+_NOOP = nullcontext()
+
+
+class Trace:
+    """
+    تتبع تحديث واحد: معرّف التتبع والفترات المسجلة فيه.
+    """
+
+    __slots__ = ("trace_id", "sampled", "spans")
+
+    def __init__(self, sampled: bool):
+        self.trace_id: str = f"{random.getrandbits(128):032x}"
+        self.sampled = sampled
+        self.spans: List["Span"] = []
+
+
+class Span:
+    """
+    فترة زمنية مسماة داخل تتبع، تُستخدم كمدير سياق.
+    """
+
+    __slots__ = ("trace", "span_id", "parent_id", "name", "attributes",
+                 "start_ns", "end_ns", "error", "_token")
+
+    def __init__(self, trace: Trace, name: str, parent: Optional["Span"], attributes: Dict[str, Any]):
+        self.trace = trace
+        self.span_id: str = f"{random.getrandbits(64):016x}"
+        self.parent_id: Optional[str] = parent.span_id if parent else None
+        self.name = name
+        self.attributes = attributes
+        self.start_ns: int = 0
+        self.end_ns: int = 0
+        self.error: Optional[str] = None
+        self._token: Optional[contextvars.Token] = None
+
+    @property
+    def duration(self) -> float:
+        """مدة الفترة بالثواني."""
+        return (self.end_ns - self.start_ns) / 1e9
+
+    def __enter__(self) -> "Span":
+        self.start_ns = time.time_ns()
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.end_ns = time.time_ns()
+        if exc_type is not None:
+            self.error = exc_type.__name__
+        _current_span.reset(self._token)
+        self.trace.spans.append(self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """تحويل الفترة إلى قاموس بحقول متوافقة مع OTLP."""
+        return {
+            "traceId": self.trace.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_id,
+            "name": self.name,
+            "startTimeUnixNano": self.start_ns,
+            "endTimeUnixNano": self.end_ns,
+            "attributes": self.attributes,
+            "status": {"code": "ERROR", "message": self.error} if self.error else {"code": "OK"},
+        }
+
+
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar(
+    "dragon_current_span", default=None
+)
+
+
+def current_trace_id() -> Optional[str]:
+    """معرّف التتبع الحالي (None خارج التحديثات المتتبعة)."""
+    span = _current_span.get()
+    return span.trace.trace_id if span else None
+
+
+class Tracer:
+    """
+    منشئ التتبعات وكاتبها.
+    """
+
+    def __init__(self, path: str = "traces.jsonl", sample_rate: float = 0.0, slow_ms: float = 0.0):
+        """
+        تهيئة المتتبع.
+
+        Args:
+            path (str): مسار ملف التتبعات (JSONL)
+            sample_rate (float): نسبة التحديثات المتتبعة عشوائياً بين 0 و 1
+            slow_ms (float): كتابة أي تتبع تتجاوز مدته هذا الحد بالمللي ثانية (0 لتعطيله)
+        """
+        self.path = path
+        self.sample_rate = sample_rate
+        self.slow_threshold = slow_ms / 1000
+        self._queue: "queue.SimpleQueue[Optional[List[Span]]]" = queue.SimpleQueue()
+        self._writer: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def configure(self, path: str, sample_rate: float, slow_ms: float) -> None:
+        """
+        ضبط إعدادات المتتبع (يُستدعى عند بدء التشغيل).
+
+        Args:
+            path (str): مسار ملف التتبعات
+            sample_rate (float): نسبة التحديثات المتتبعة عشوائياً
+            slow_ms (float): حد التتبعات البطيئة بالمللي ثانية
+        """
+        self.path = path
+        self.sample_rate = sample_rate
+        self.slow_threshold = slow_ms / 1000
+        if self.enabled:
+            logger.info(
+                "🧵 التتبع مفعّل (العينة: %.1f%%، البطيء: %.0f ms) → %s",
+                sample_rate * 100, slow_ms, path
+            )
+
+    @property
+    def enabled(self) -> bool:
+        """هل التتبع مفعّل (بالعينة أو للتحديثات البطيئة)؟"""
+        return self.sample_rate > 0 or self.slow_threshold > 0
+
+    def start_trace(self, name: str, **attributes: Any):
+        """
+        بدء تتبع جديد (الفترة الجذرية) للتحديث الحالي.
+
+        Args:
+            name (str): اسم الفترة الجذرية
+            **attributes: خصائص الفترة
+
+        Returns:
+            مدير سياق الفترة الجذرية (أو سياق فارغ إذا كان التتبع معطلاً)
+        """
+        if not self.enabled:
+            return _NOOP
+        trace = Trace(sampled=random.random() < self.sample_rate)
+        return _RootSpan(self, trace, name, attributes)
+
+    def span(self, name: str, **attributes: Any):
+        """
+        فترة فرعية داخل التتبع الحالي (لا تكلفة خارج التتبعات).
+
+        Args:
+            name (str): اسم الفترة
+            **attributes: خصائص الفترة
+
+        Returns:
+            مدير سياق الفترة
+        """
+        parent = _current_span.get()
+        if parent is None:
+            return _NOOP
+        return Span(parent.trace, name, parent, attributes)
+
+    def _finish(self, root: Span) -> None:
+        """كتابة التتبع إذا كان ضمن العينة أو بطيئاً."""
+        trace = root.trace
+        if not (trace.sampled or (self.slow_threshold and root.duration >= self.slow_threshold)):
+            return
+        self._ensure_writer()
+        self._queue.put(trace.spans)
+
+    def _ensure_writer(self) -> None:
+        """تشغيل خيط الكتابة عند أول تتبع."""
+        if self._writer is not None:
+            return
+        with self._lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_loop, name="trace-writer", daemon=True)
+                self._writer.start()
+                atexit.register(self.close)
+
+    def _write_loop(self) -> None:
+        """خيط الكتابة: إضافة كل تتبع كأسطر JSON إلى الملف."""
+        while True:
+            spans = self._queue.get()
+            if spans is None:
+                return
+            try:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    for span in spans:
+                        f.write(json.dumps(span.to_dict(), ensure_ascii=False, default=str) + "\n")
+            except OSError as e:
+                logger.error(f"فشل كتابة التتبعات: {e}")
+
+    def close(self) -> None:
+        """إيقاف خيط الكتابة بعد كتابة التتبعات المتبقية."""
+        writer = self._writer
+        if writer is not None:
+            self._queue.put(None)
+            writer.join(timeout=5)
+            self._writer = None
+
+
+class _RootSpan(Span):
+    """
+    الفترة الجذرية للتحديث؛ تُسلّم التتبع للكاتب عند انتهائها.
+    """
+
+    __slots__ = ("tracer",)
+
+    def __init__(self, tracer: Tracer, trace: Trace, name: str, attributes: Dict[str, Any]):
+        super().__init__(trace, name, None, attributes)
+        self.tracer = tracer
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        super().__exit__(exc_type, exc, tb)
+        self.tracer._finish(self)
+
+
+# إنشاء مثيل من المتتبع (معطل حتى استدعاء configure)
+tracer = Tracer()
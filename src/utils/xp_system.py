@@ -7,7 +7,7 @@
 
 import logging
 from typing import Tuple, Dict, Any
-from src.core.config import XP_PER_LEVEL, MAX_LEVEL
+from src.core import config
 from src.utils.exceptions import InvalidOperation
 
 logger: logging.Logger = logging.getLogger(__name__)
@@ -60,8 +60,8 @@ def calculate_level_from_xp(experience: int) -> int:
     if experience < 0:
         return 1
     
-    level = (experience // XP_PER_LEVEL) + 1
-    return min(level, MAX_LEVEL)
+    level = (experience // config.XP_PER_LEVEL) + 1
+    return min(level, config.MAX_LEVEL)
 
 
 def calculate_xp_for_level(level: int) -> int:
@@ -78,7 +78,7 @@ def calculate_xp_for_level(level: int) -> int:
         return 0
     
     # معادلة: كل مستوى يحتاج XP_PER_LEVEL نقطة
-    return (level - 1) * XP_PER_LEVEL
+    return (level - 1) * config.XP_PER_LEVEL
 
 
 def calculate_xp_progress(current_xp: int) -> Tuple[int, int, int]:
@@ -94,7 +94,7 @@ def calculate_xp_progress(current_xp: int) -> Tuple[int, int, int]:
     current_level = calculate_level_from_xp(current_xp)
     xp_needed_for_level = calculate_xp_for_level(current_level)
     xp_in_current_level = current_xp - xp_needed_for_level
-    xp_remaining = XP_PER_LEVEL - xp_in_current_level
+    xp_remaining = config.XP_PER_LEVEL - xp_in_current_level
     
     return current_level, xp_in_current_level, max(0, xp_remaining)
 
@@ -160,7 +160,7 @@ def get_xp_progress_bar(current_xp: int, bar_length: int = 10) -> str:
     """
     _, xp_in_level, xp_remaining = calculate_xp_progress(current_xp)
     
-    total_xp_in_level = XP_PER_LEVEL
+    total_xp_in_level = config.XP_PER_LEVEL
     filled = int((xp_in_level / total_xp_in_level) * bar_length)
     empty = bar_length - filled
     
@@ -185,7 +185,7 @@ def get_level_stats(level: int, experience: int) -> Dict[str, Any]:
     rank = calculate_rank_for_level(level)
     
     # حساب النسبة المئوية للمستوى التالي
-    progress_percentage = (xp_in_level / XP_PER_LEVEL) * 100
+    progress_percentage = (xp_in_level / config.XP_PER_LEVEL) * 100
     
     return {
         "level": level,
@@ -194,9 +194,9 @@ def get_level_stats(level: int, experience: int) -> Dict[str, Any]:
         "xp_in_level": xp_in_level,
         "xp_remaining": xp_remaining,
         "progress_percentage": progress_percentage,
-        "xp_per_level": XP_PER_LEVEL,
-        "max_level": MAX_LEVEL,
-        "is_max_level": level >= MAX_LEVEL,
+        "xp_per_level": config.XP_PER_LEVEL,
+        "max_level": config.MAX_LEVEL,
+        "is_max_level": level >= config.MAX_LEVEL,
     }
 
 
@@ -218,7 +218,7 @@ def add_xp(current_xp: int, xp_to_add: int) -> Tuple[int, bool, int]:
     new_xp = current_xp + xp_to_add
     
     # الحد الأقصى للخبرة (حسب الحد الأقصى للمستويات)
-    max_xp = calculate_xp_for_level(MAX_LEVEL + 1)
+    max_xp = calculate_xp_for_level(config.MAX_LEVEL + 1)
     new_xp = min(new_xp, max_xp)
     
     new_level = calculate_level_from_xp(new_xp)
@@ -0,0 +1,93 @@
+"""
+اختبارات خرائط النشاط اليومية.
+
+يتحقق من:
+1. حساب الاحتفاظ لمجموعات المنضمين وDAU
+2. حساب سلاسل الأيام المتتالية
+3. الحفظ والتحميل من SQLite
+4. سرعة تقرير 30 يوماً مع مليون مستخدم
+"""
+
+import time
+from datetime import date, timedelta
+
+import numpy as np
+
+
+def test_retention_and_dau() -> None:
+    """نسب الاحتفاظ تطابق العائدين الفعليين."""
+    from src.utils.activity_bitmaps import ActivityBitmaps
+
+    bitmaps = ActivityBitmaps()
+    cohort_day = date(2026, 3, 1)
+    for user_id in range(100):
+        bitmaps.record_join(user_id, cohort_day)
+        bitmaps.record_activity(user_id, cohort_day)
+    for user_id in range(0, 100, 4):  # ربع المجموعة يعود في اليوم التالي
+        bitmaps.record_activity(user_id, cohort_day + timedelta(days=1))
+    bitmaps.record_activity(5000, cohort_day + timedelta(days=1))  # ليس من المجموعة
+
+    assert bitmaps.retention(cohort_day, 1) == (25, 100)
+    assert bitmaps.daily_active_users(cohort_day + timedelta(days=1)) == 26
+
+    report = bitmaps.cohort_report(days=3, offsets=(1, 7), today=cohort_day + timedelta(days=2))
+    first = report[0]
+    assert first["day"] == cohort_day and first["size"] == 100
+    assert first["retention"] == {1: 0.25, 7: None}
+
+
+def test_streak() -> None:
+    """السلسلة تتوقف عند أول يوم غير نشط."""
+    from src.utils.activity_bitmaps import ActivityBitmaps
+
+    bitmaps = ActivityBitmaps()
+    today = date(2026, 3, 10)
+    for offset in (1, 2, 3, 5):
+        bitmaps.record_activity(42, today - timedelta(days=offset))
+
+    assert bitmaps.streak(42, today) == 3  # لم ينشط اليوم بعد
+    bitmaps.record_activity(42, today)
+    assert bitmaps.streak(42, today) == 4
+    assert bitmaps.streak(7, today) == 0
+
+
+def test_flush_and_load_round_trip(tmp_path, monkeypatch) -> None:
+    """الخرائط والفهارس تُستعاد بعد إعادة التشغيل."""
+    from src.database import manager
+    from src.utils.activity_bitmaps import ActivityBitmaps
+
+    monkeypatch.setattr(manager, "DATABASE_FILE", str(tmp_path / "bitmaps.db"))
+    manager.init_db()
+
+    today = date.today()
+    bitmaps = ActivityBitmaps()
+    bitmaps.record_join(10, today - timedelta(days=1))
+    bitmaps.record_activity(10, today - timedelta(days=1))
+    bitmaps.record_activity(10, today)
+    bitmaps.flush()
+
+    restored = ActivityBitmaps()
+    restored.load()
+    assert restored.streak(10, today) == 2
+    assert restored.retention(today - timedelta(days=1), 1) == (1, 1)
+
+
+def test_cohort_report_speed_with_million_users() -> None:
+    """تقرير 30 يوماً لمليون مستخدم يكتمل خلال جزء من الثانية."""
+    from src.utils.activity_bitmaps import ActivityBitmaps, ACTIVE, JOINED
+
+    bitmaps = ActivityBitmaps()
+    today = date(2026, 3, 31)
+    rng = np.random.default_rng(1)
+    size = 1_000_000 // 8
+    for age in range(60):
+        day = today - timedelta(days=age)
+        bitmaps._bitmaps[ACTIVE][day] = rng.integers(0, 256, size, dtype=np.uint8)
+        bitmaps._bitmaps[JOINED][day] = rng.integers(0, 256, size, dtype=np.uint8) & 0x01
+
+    started = time.perf_counter()
+    report = bitmaps.cohort_report(days=30, today=today)
+    elapsed = time.perf_counter() - started
+
+    assert len(report) == 30
+    assert elapsed < 1.0
@@ -0,0 +1,118 @@
+"""
+اختبارات التحكم في قبول التحديثات تحت الحمل.
+
+يتحقق من:
+1. منح المقاعد حسب الأولوية وليس حسب ترتيب الوصول
+2. إسقاط الأقل أولوية عند امتلاء الطابور (دون إسقاط المسؤولين)
+3. تأجيل الأعمال الثانوية تحت الحمل وتنفيذها بعد انخفاضه
+"""
+
+import asyncio
+
+import pytest
+
+
+def test_slots_granted_by_priority() -> None:
+    """عند تحرير المقعد يحصل عليه المنتظر الأعلى أولوية."""
+    from src.bot.admission import AdmissionController, Priority
+
+    controller = AdmissionController(max_active=1, max_pending=10)
+    order = []
+
+    async def worker(priority: Priority, started: asyncio.Event = None) -> None:
+        async with controller.admit(priority):
+            order.append(priority)
+            if started is not None:
+                started.set()
+                await asyncio.sleep(0.01)
+
+    async def run() -> None:
+        started = asyncio.Event()
+        first = asyncio.create_task(worker(Priority.OTHER, started))
+        await started.wait()
+        waiting = [asyncio.create_task(worker(p)) for p in
+                   (Priority.OTHER, Priority.START, Priority.CALLBACK, Priority.ADMIN)]
+        await asyncio.sleep(0)
+        assert controller.pending == 4 and controller.overloaded
+        await asyncio.gather(first, *waiting)
+
+    asyncio.run(run())
+    assert order == [Priority.OTHER, Priority.ADMIN, Priority.CALLBACK, Priority.START, Priority.OTHER]
+    assert controller.pending == 0 and not controller.overloaded
+
+
+def test_full_queue_sheds_lowest_priority() -> None:
+    """الطابور الممتلئ يُسقط أحدث الأقل أولوية، والمسؤول يتجاوز الحد."""
+    from src.bot.admission import AdmissionController, Priority, UpdateShed, SHED_UPDATES
+
+    controller = AdmissionController(max_active=1, max_pending=2)
+    shed_before = SHED_UPDATES.value("other")
+
+    async def run() -> list:
+        release = asyncio.Event()
+
+        async def hold() -> None:
+            async with controller.admit(Priority.CALLBACK):
+                await release.wait()
+
+        async def wait_turn(priority: Priority) -> str:
+            try:
+                async with controller.admit(priority):
+                    return priority.name
+            except UpdateShed:
+                return f"shed {priority.name}"
+
+        holder = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+        tasks = []
+        for priority in (Priority.START, Priority.OTHER, Priority.CALLBACK, Priority.OTHER, Priority.ADMIN):
+            tasks.append(asyncio.create_task(wait_turn(priority)))
+            await asyncio.sleep(0)
+        assert controller.pending == 3
+        release.set()
+        await holder
+        return await asyncio.gather(*tasks)
+
+    results = asyncio.run(run())
+    assert results == ["START", "shed OTHER", "CALLBACK", "shed OTHER", "ADMIN"]
+    assert SHED_UPDATES.value("other") == shed_before + 2
+
+
+def test_low_priority_jobs_deferred_under_load() -> None:
+    """الأعمال الثانوية تُؤجل أثناء الحمل وتُنفذ بعد تحرير المقاعد."""
+    from src.bot.admission import AdmissionController, Priority
+
+    controller = AdmissionController(max_active=1, max_pending=10)
+    sent = []
+
+    async def notify(name: str) -> None:
+        sent.append(name)
+
+    async def run() -> None:
+        await controller.run_or_defer("admin_new_user", lambda: notify("idle"))
+        async with controller.admit(Priority.START):
+            await controller.run_or_defer("admin_new_user", lambda: notify("busy"))
+            assert sent == ["idle"]
+        await asyncio.sleep(0.01)
+        await controller.close()
+
+    asyncio.run(run())
+    assert sent == ["idle", "busy"]
+
+
+@pytest.mark.parametrize("text, expected", [("/start abc", "START"), ("/startx", "OTHER"), ("hi", "OTHER")])
+def test_update_priority(text: str, expected: str) -> None:
+    """تصنيف الرسائل حسب الأمر."""
+    from telegram import Update
+
+    from src.bot.admission import update_priority
+
+    update = Update.de_json({
+        "update_id": 1,
+        "message": {
+            "message_id": 1, "date": 1700000000, "text": text,
+            "chat": {"id": 7, "type": "private"},
+            "from": {"id": 7, "is_bot": False, "first_name": "U"},
+        },
+    }, None)
+    assert update_priority(update).name == expected
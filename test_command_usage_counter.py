@@ -0,0 +1,65 @@
+"""
+اختبارات عدّاد استخدام الأوامر في AdvancedStatsManager.
+
+يتحقق من:
+1. صحة الترتيب التزايدي لأعلى K أمر
+2. عدّ النوافذ الزمنية (ساعة/يوم/أسبوع)
+3. تقرير استخدام الميزات
+"""
+
+import random
+from collections import Counter
+
+
+def test_top_k_matches_full_sort() -> None:
+    """الترتيب التزايدي يطابق الترتيب الكامل للعدّادات."""
+    from src.utils.advanced_stats_manager import CommandUsageCounter
+
+    counter = CommandUsageCounter(top_k=5)
+    reference: Counter = Counter()
+    rng = random.Random(42)
+
+    for _ in range(5000):
+        command = f"cmd_{int(rng.expovariate(0.3))}"
+        counter.increment(command, now=0)
+        reference[command] += 1
+
+    expected_counts = sorted(reference.values(), reverse=True)[:5]
+    assert [count for _, count in counter.top()] == expected_counts
+    for command, count in counter.top():
+        assert reference[command] == count
+    assert counter.most_used[1] == expected_counts[0]
+    assert len(counter) == len(reference)
+
+
+def test_window_counts() -> None:
+    """عدّ الاستخدام داخل النوافذ الزمنية."""
+    from src.utils.advanced_stats_manager import CommandUsageCounter
+
+    counter = CommandUsageCounter()
+    now = 10 * 86400.0
+
+    counter.increment("start", now=now - 6 * 86400)  # قبل 6 أيام
+    counter.increment("start", now=now - 5 * 3600)   # قبل 5 ساعات
+    counter.increment("start", now=now - 10 * 60)    # قبل 10 دقائق
+    counter.increment("admin", now=now)
+
+    assert counter.window_count("start", "hour", now=now) == 1
+    assert counter.window_count("start", "day", now=now) == 2
+    assert counter.window_count("start", "week", now=now) == 3
+    assert counter.window_total("hour", now=now) == 2
+    assert counter.total("start") == 3
+
+
+def test_feature_usage_report() -> None:
+    """التقرير يعرض الأوامر الأكثر استخداماً بالترتيب."""
+    from src.utils.advanced_stats_manager import AdvancedStatsManager
+
+    manager = AdvancedStatsManager()
+    for _ in range(3):
+        manager.record_command_usage("start")
+    manager.record_command_usage("admin")
+
+    report = manager.get_feature_usage_report()
+    assert report.index("start: 3") < report.index("admin: 1")
+    assert manager.get_daily_summary()["top_command"] == "start"
@@ -0,0 +1,44 @@
+"""
+اختبارات أداة قياس أداء قاعدة البيانات.
+
+يتحقق من:
+1. بناء قاعدة بيانات اصطناعية بشجرة إحالة وقياس جميع العمليات
+2. اكتشاف التراجعات مقارنة بخط الأساس مع تجاهل الضجيج
+"""
+
+
+def test_benchmark_builds_referral_tree_and_times_operations(tmp_path, monkeypatch) -> None:
+    """كل العمليات تُقاس، والإحالات تتركز عند بعض المحيلين."""
+    from src.database import manager
+    from src.devtools.db_benchmark import run_benchmark
+
+    monkeypatch.setattr(manager, "DATABASE_FILE", manager.DATABASE_FILE)
+    results = run_benchmark([500], str(tmp_path), budget=0.2)
+
+    timings = results["results"]["500"]
+    assert "get_top_users_by_referrals" in timings and "get_all_users" in timings
+    assert all(stats["runs"] >= 1 and stats["median_ms"] >= 0 for stats in timings.values())
+
+    assert manager.get_total_users_count() == 500
+    top = manager.get_top_users_by_referrals(1)[0]
+    assert top["referral_count"] >= 10
+
+
+def test_compare_flags_only_real_regressions() -> None:
+    """تراجع كبير يُبلغ عنه، والفروق الصغيرة جداً تُتجاهل."""
+    from src.devtools.db_benchmark import compare_results
+
+    baseline = {"results": {"1000": {
+        "get_user": {"median_ms": 0.01},
+        "get_all_users": {"median_ms": 10.0},
+        "get_top_users_by_points": {"median_ms": 1.0},
+    }}}
+    current = {"results": {"1000": {
+        "get_user": {"median_ms": 0.03},
+        "get_all_users": {"median_ms": 20.0},
+        "get_top_users_by_points": {"median_ms": 1.1},
+        "get_banned_users_count": {"median_ms": 5.0},
+    }}}
+
+    regressions = compare_results(baseline, current, threshold=0.25)
+    assert [(r.operation, r.ratio) for r in regressions] == [("get_all_users", 2.0)]
@@ -0,0 +1,46 @@
+"""
+اختبارات خادم Bot API الوهمي ومولّد الحمل.
+
+يتحقق من:
+1. حقن ردود 429 مع retry_after
+2. تشغيل البوت من طرف إلى طرف عبر getUpdates الطويل وقياس الردود
+"""
+
+import asyncio
+
+
+def test_retry_after_injection() -> None:
+    """كل الطلبات تُرد بـ 429 عند retry_rate=1، عدا getMe."""
+    from src.devtools.fake_bot_api import FakeBotApiServer
+
+    server = FakeBotApiServer(retry_rate=1.0, retry_after=3)
+
+    status, payload = asyncio.run(server.call("sendMessage", {"chat_id": "1", "text": "hi"}))
+    assert status == 429
+    assert payload["parameters"] == {"retry_after": 3}
+    assert server.injected["retry_after"] == 1
+
+    status, payload = asyncio.run(server.call("getMe", {}))
+    assert status == 200 and payload["result"]["is_bot"] is True
+
+
+def test_load_driver_end_to_end(tmp_path, monkeypatch) -> None:
+    """البوت يستقبل التحديثات من الخادم الوهمي ويرد على كل مستخدم."""
+    from src.database import manager
+    from src.devtools.fake_bot_api import FakeBotApiServer
+    from src.devtools.load_test import run_load_test
+
+    monkeypatch.setattr(manager, "DATABASE_FILE", str(tmp_path / "load.db"))
+    manager.init_db()
+
+    server = FakeBotApiServer(seed=3)
+    report = asyncio.run(run_load_test(server, users=5, rate=40, duration=1.0, seed=3))
+
+    assert report.sent >= 30
+    assert report.unanswered == 0
+    assert len(report.latencies) == report.sent
+    assert server.calls["getUpdates"] >= 1
+    assert server.calls["answerCallbackQuery"] >= 1
+    assert manager.get_total_users_count() == 5
+    assert report.scenarios["broadcast"] == 1 and report.scenarios["notifications"] >= 1
+    assert report.broadcast_deliveries == 5
@@ -0,0 +1,65 @@
+"""
+اختبارات HyperLogLog ومتتبع المستخدمين النشطين.
+
+يتحقق من:
+1. دقة التقدير ضمن حدود الخطأ المعروفة
+2. دمج رسومات الأيام لنوافذ الأسبوع والشهر
+3. الحفظ المضغوط والاستعادة
+"""
+
+from datetime import date, timedelta
+
+
+def test_estimate_within_error_bounds() -> None:
+    """التقدير يقع ضمن أربعة أضعاف الخطأ المعياري."""
+    from src.utils.hyperloglog import HyperLogLog
+
+    sketch = HyperLogLog(precision=12)
+    for user_id in range(50_000):
+        sketch.add(user_id)
+        sketch.add(user_id)  # التكرار لا يغيّر العدد
+
+    error = abs(sketch.count() - 50_000) / 50_000
+    assert error < 4 * sketch.relative_error
+
+
+def test_small_counts_are_exact_enough() -> None:
+    """العد الخطي يعطي نتائج شبه دقيقة للأعداد الصغيرة."""
+    from src.utils.hyperloglog import HyperLogLog
+
+    sketch = HyperLogLog()
+    for user_id in range(100):
+        sketch.add(user_id)
+    assert 97 <= sketch.count() <= 103
+
+
+def test_round_trip_bytes() -> None:
+    """الاستعادة من البيانات المضغوطة تعطي نفس التقدير."""
+    from src.utils.hyperloglog import HyperLogLog
+
+    sketch = HyperLogLog()
+    for user_id in range(1000):
+        sketch.add(user_id)
+
+    data = sketch.to_bytes()
+    assert len(data) < sketch.size
+    assert HyperLogLog.from_bytes(data, sketch.precision).count() == sketch.count()
+
+
+def test_tracker_windows_merge_days() -> None:
+    """نوافذ الأسبوع والشهر تعدّ المستخدم المتكرر مرة واحدة."""
+    from src.utils.activity_tracker import ActivityTracker
+
+    tracker = ActivityTracker()
+    today = date(2026, 5, 20)
+    for offset in range(10):
+        day = today - timedelta(days=offset)
+        for user_id in range(200):  # نفس المستخدمين كل يوم
+            tracker.record(user_id, day)
+        tracker.record(10_000 + offset, day)  # مستخدم جديد كل يوم
+
+    tolerance = 3 * tracker.relative_error
+    assert abs(tracker.active_today(today) - 201) <= 201 * tolerance
+    assert abs(tracker.active_last_days(7, today) - 207) <= 207 * tolerance
+    assert abs(tracker.active_this_month(today) - 210) <= 210 * tolerance
+    assert tracker.active_last_days(7, today) > tracker.active_today(today)
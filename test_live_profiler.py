@@ -0,0 +1,54 @@
+"""
+اختبارات المحلل الحي للأداء.
+
+يتحقق من التقاط الدوال المنفذة أثناء الجلسة ومن منع الجلسات المتزامنة.
+"""
+
+import asyncio
+import marshal
+
+import pytest
+
+
+def busy_handler_work() -> int:
+    """عمل متزامن يظهر في التقرير."""
+    return sum(i * i for i in range(20_000))
+
+
+def test_profile_captures_live_work() -> None:
+    """التقرير وملف pstats يحتويان الدوال المنفذة أثناء الجلسة."""
+    from src.bot.profiling import LiveProfiler
+
+    profiler = LiveProfiler()
+
+    async def traffic() -> None:
+        for _ in range(5):
+            busy_handler_work()
+            await asyncio.sleep(0.05)
+
+    async def scenario():
+        task = asyncio.create_task(traffic())
+        result = await profiler.profile(1)
+        await task
+        return result
+
+    report, raw = asyncio.run(scenario())
+    assert "busy_handler_work" in report
+    assert any(key[2] == "busy_handler_work" for key in marshal.loads(raw))
+    assert not profiler.running
+
+
+def test_concurrent_sessions_are_rejected() -> None:
+    """لا يمكن تشغيل جلستين في نفس الوقت."""
+    from src.bot.profiling import LiveProfiler
+
+    profiler = LiveProfiler()
+
+    async def scenario() -> None:
+        first = asyncio.create_task(profiler.profile(1))
+        await asyncio.sleep(0)
+        with pytest.raises(RuntimeError):
+            await profiler.profile(1)
+        await first
+
+    asyncio.run(scenario())
@@ -0,0 +1,42 @@
+"""
+اختبارات إعداد التسجيل غير الحاجب.
+
+يتحقق من صيغة JSON السطرية وإضافة معرّف التحديث والمستخدم من السياق.
+"""
+
+import json
+import logging
+
+
+def test_json_lines_carry_update_context() -> None:
+    """السجل داخل سياق التحديث يحمل update_id و user_id."""
+    from src.core.logging_setup import JsonFormatter, UpdateContextFilter, bind_update_context
+
+    context_filter = UpdateContextFilter()
+    formatter = JsonFormatter()
+
+    def emit(message: str, *args) -> dict:
+        record = logging.LogRecord("dragon.test", logging.INFO, __file__, 1, message, args, None)
+        context_filter.filter(record)
+        return json.loads(formatter.format(record))
+
+    with bind_update_context(77, 1234):
+        inside = emit("عرض النقاط للمستخدم %s", 1234)
+    outside = emit("بدون سياق")
+
+    assert inside["message"] == "عرض النقاط للمستخدم 1234"
+    assert (inside["update_id"], inside["user_id"]) == (77, 1234)
+    assert (outside["update_id"], outside["user_id"]) == (None, None)
+
+
+def test_root_logger_uses_single_queue_handler() -> None:
+    """الجذر يحتوي معالج طابور واحداً فقط بعد تحميل الإعدادات."""
+    import logging.handlers
+
+    import src.core.config  # noqa: F401
+
+    # معالجات pytest الخاصة بالتقاط السجلات ليست جزءاً من إعداد البوت
+    handlers = [h for h in logging.getLogger().handlers if not type(h).__module__.startswith("_pytest")]
+    queue_handlers = [h for h in handlers if isinstance(h, logging.handlers.QueueHandler)]
+    assert len(queue_handlers) == 1
+    assert not any(isinstance(h, logging.FileHandler) for h in handlers)
@@ -0,0 +1,42 @@
+"""
+اختبارات مراقب تأخر حلقة الأحداث.
+
+يتحقق من التقاط مكدس الكود الحاجب واسم المعالج عند توقف الحلقة.
+"""
+
+import asyncio
+import time
+
+
+def blocking_database_call() -> None:
+    """محاكاة استدعاء متزامن يحجب الحلقة."""
+    time.sleep(0.3)
+
+
+def test_stall_captures_blocking_stack_and_handler() -> None:
+    """التوقف يُسجَّل مع اسم المعالج والدالة الحاجبة."""
+    from src.bot.instrumentation import instrument_callback
+    from src.bot.loop_monitor import LoopLagMonitor
+
+    async def slow_handler(update, context):
+        blocking_database_call()
+
+    monitor = LoopLagMonitor(interval=0.02, threshold=0.1)
+    handler = instrument_callback(slow_handler, "slow_handler")
+
+    async def scenario() -> None:
+        monitor.start()
+        try:
+            await asyncio.sleep(0.05)
+            await handler(None, None)
+            await asyncio.sleep(0.05)
+        finally:
+            monitor.stop()
+
+    asyncio.run(scenario())
+
+    assert len(monitor.reports) == 1
+    report = monitor.reports[0]
+    assert report.handler == "slow_handler"
+    assert report.duration >= 0.1
+    assert any("blocking_database_call" in line for line in report.stack)
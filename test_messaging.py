@@ -0,0 +1,75 @@
+"""
+اختبارات تجاهل تعديلات الرسائل التي لا تغير شيئاً.
+
+يتحقق من:
+1. عدم استدعاء Bot API لتعديل بنفس النص والأزرار
+2. تعديل الرسالة عند تغير النص أو الأزرار أو طريقة التنسيق
+3. معاملة خطأ "message is not modified" كتعديل مطابق
+4. دعم الرسائل غير المتاحة (InaccessibleMessage) التي لا تملك chat_id
+"""
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+from telegram import Chat, InaccessibleMessage, InlineKeyboardButton, InlineKeyboardMarkup
+from telegram.error import BadRequest
+
+
+def _query(message_id: int) -> SimpleNamespace:
+    return SimpleNamespace(
+        message=SimpleNamespace(chat=SimpleNamespace(id=5), message_id=message_id),
+        edit_message_text=AsyncMock(),
+    )
+
+
+def _markup(label: str) -> InlineKeyboardMarkup:
+    return InlineKeyboardMarkup([[InlineKeyboardButton(label, callback_data="main_menu")]])
+
+
+def test_identical_edit_skipped() -> None:
+    """التعديل المطابق لا يصل إلى Bot API، والمختلف يصل."""
+    from src.bot.messaging import edit_message_text
+
+    query = _query(101)
+
+    async def run() -> list:
+        return [
+            await edit_message_text(query, "menu", reply_markup=_markup("back")),
+            await edit_message_text(query, "menu", reply_markup=_markup("back")),
+            await edit_message_text(query, "menu", reply_markup=_markup("home")),
+            await edit_message_text(query, "menu", reply_markup=_markup("home"), parse_mode="Markdown"),
+            await edit_message_text(_query(102), "menu", reply_markup=_markup("home")),
+        ]
+
+    assert asyncio.run(run()) == [True, False, True, True, True]
+    assert query.edit_message_text.await_count == 3
+
+
+def test_not_modified_error_remembered() -> None:
+    """خطأ "not modified" لا يُرفع ويُحفظ المحتوى، وبقية الأخطاء تُرفع."""
+    from src.bot.messaging import edit_message_text
+
+    query = _query(201)
+    query.edit_message_text.side_effect = BadRequest("Message is not modified: specified new message content")
+    assert asyncio.run(edit_message_text(query, "stats")) is False
+    assert asyncio.run(edit_message_text(query, "stats")) is False
+    assert query.edit_message_text.await_count == 1
+
+    query.edit_message_text.side_effect = BadRequest("Message to edit not found")
+    with pytest.raises(BadRequest):
+        asyncio.run(edit_message_text(query, "other"))
+
+
+def test_inaccessible_message_edit() -> None:
+    """رسائل الاستعلام غير المتاحة تُعرّف بمحادثتها، والتعديل المطابق يُتجاهل."""
+    from src.bot.messaging import edit_message_text
+
+    query = SimpleNamespace(
+        message=InaccessibleMessage(chat=Chat(id=5, type=Chat.PRIVATE), message_id=301),
+        edit_message_text=AsyncMock(),
+    )
+    assert asyncio.run(edit_message_text(query, "menu")) is True
+    assert asyncio.run(edit_message_text(query, "menu")) is False
+    assert query.edit_message_text.await_count == 1
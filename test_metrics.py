@@ -0,0 +1,129 @@
+"""
+اختبارات سجل المقاييس وطبقة قياس أداء المعالجات.
+
+يتحقق من:
+1. تقدير المئينات من دلاء المدرج التكراري
+2. صيغة التصدير النصية المتوافقة مع Prometheus
+3. تغليف المعالجات (بما فيها معالجات المحادثة) وقياس الأخطاء
+4. قياس زمن عمليات قاعدة البيانات
+5. خادم تصدير المقاييس عبر HTTP
+"""
+
+import asyncio
+
+import pytest
+
+
+def test_histogram_quantiles() -> None:
+    """المئينات تقع داخل الدلو الصحيح."""
+    from src.utils.metrics import Histogram
+
+    histogram = Histogram("test_seconds", "اختبار", ("handler",), buckets=(0.01, 0.1, 1.0))
+    for _ in range(90):
+        histogram.observe(0.005, "start")
+    for _ in range(10):
+        histogram.observe(0.5, "start")
+
+    assert histogram.count("start") == 100
+    assert 0 < histogram.quantile(0.5, "start") <= 0.01
+    assert 0.1 < histogram.quantile(0.99, "start") <= 1.0
+    assert histogram.quantile(0.5, "missing") == 0.0
+
+
+def test_render_prometheus_text() -> None:
+    """التصدير يحتوي على الدلاء التراكمية والمجموع والعدد."""
+    from src.utils.metrics import MetricsRegistry
+
+    registry = MetricsRegistry()
+    counter = registry.counter("test_events", "أحداث", ("kind",))
+    counter.inc("a")
+    counter.inc("a", amount=2)
+    histogram = registry.histogram("test_latency_seconds", "زمن", buckets=(0.1, 1.0))
+    histogram.observe(0.05)
+    histogram.observe(5)
+
+    text = registry.render()
+    assert '# TYPE test_events counter' in text
+    assert 'test_events_total{kind="a"} 3' in text
+    assert 'test_latency_seconds_bucket{le="0.1"} 1' in text
+    assert 'test_latency_seconds_bucket{le="+Inf"} 2' in text
+    assert 'test_latency_seconds_count 2' in text
+    assert registry.counter("test_events", "أحداث", ("kind",)) is counter
+
+
+def test_instrument_application_wraps_all_handlers() -> None:
+    """جميع المعالجات تُغلَّف مرة واحدة وتُسجَّل أخطاؤها."""
+    from telegram.ext import (
+        Application, CallbackQueryHandler, CommandHandler, ConversationHandler
+    )
+    from src.bot.instrumentation import (
+        HANDLER_ERRORS, HANDLER_SECONDS, instrument_application
+    )
+
+    async def instrumented_ok(update, context):
+        return 1
+
+    async def instrumented_fail(update, context):
+        raise RuntimeError("boom")
+
+    application = Application.builder().token("123:TEST").build()
+    application.add_handler(CommandHandler("ok", instrumented_ok))
+    application.add_handler(ConversationHandler(
+        entry_points=[CallbackQueryHandler(instrumented_fail)],
+        states={1: [CommandHandler("ok2", instrumented_ok)]},
+        fallbacks=[],
+        per_message=False,
+    ))
+
+    assert instrument_application(application) == 3
+    assert instrument_application(application) == 0
+
+    handlers = application.handlers[0]
+    assert asyncio.run(handlers[0].callback(None, None)) == 1
+    with pytest.raises(RuntimeError):
+        asyncio.run(handlers[1].entry_points[0].callback(None, None))
+
+    assert HANDLER_SECONDS.count("instrumented_ok") == 1
+    assert HANDLER_ERRORS.value("instrumented_fail") == 1
+
+
+def test_db_operations_are_timed(tmp_path, monkeypatch) -> None:
+    """كل عملية قاعدة بيانات تُسجَّل في مدرج الزمن."""
+    from src.database import manager
+
+    monkeypatch.setattr(manager, "DATABASE_FILE", str(tmp_path / "metrics.db"))
+    manager.init_db()
+
+    before = manager.DB_QUERY_SECONDS.count("get_user")
+    assert manager.get_user(1) is None
+    assert manager.DB_QUERY_SECONDS.count("get_user") == before + 1
+
+
+def test_metrics_server_serves_prometheus_text() -> None:
+    """خادم المقاييس يعيد نص التصدير على /metrics و404 لغيره."""
+    from src.utils.metrics import MetricsRegistry
+    from src.utils.metrics_server import MetricsServer
+
+    registry = MetricsRegistry()
+    registry.counter("test_scrapes", "اختبار").inc()
+
+    async def fetch(port: int, path: str) -> bytes:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+        await writer.drain()
+        data = await reader.read()
+        writer.close()
+        return data
+
+    async def scenario() -> None:
+        server = MetricsServer("127.0.0.1", 0, registry)
+        await server.start()
+        try:
+            response = await fetch(server.port, "/metrics")
+            assert response.startswith(b"HTTP/1.1 200 OK")
+            assert b"test_scrapes_total 1" in response
+            assert (await fetch(server.port, "/other")).startswith(b"HTTP/1.1 404")
+        finally:
+            await server.stop()
+
+    asyncio.run(scenario())
@@ -0,0 +1,83 @@
+"""
+اختبارات مخزن المقاييس الزمنية المتدحرجة.
+
+يتحقق من:
+1. لفّ الدلاء (دقيقة ← ساعة ← يوم) دون فقدان القيم
+2. الإجابة عن النوافذ الزمنية من الدلاء الملفوفة
+3. الحفظ والتحميل من SQLite
+4. الإبقاء على الأيام المعدلة عند فشل الحفظ
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+
+def test_rollup_preserves_window_totals() -> None:
+    """المجاميع لا تتغير بعد لفّ الدلاء إلى دقة أعلى."""
+    from src.utils.metrics_store import MetricsStore, start_of_today, start_of_last_days
+
+    store = MetricsStore()
+    now = datetime.now()
+    today = start_of_today(now)
+
+    store.record("new_users", now=(today - timedelta(days=3, hours=-2)).timestamp())
+    store.record("new_users", now=(today - timedelta(days=10)).timestamp())
+    store.record("new_users", 2, now=(today + timedelta(minutes=1)).timestamp())
+
+    store.rollup(now=now.timestamp())
+
+    assert store.total("new_users", today, now + timedelta(seconds=1)) == 2
+    assert store.total("new_users", start_of_last_days(7, now)) == 3
+    assert store.total("new_users", today - timedelta(days=30)) == 4
+    assert store.total("missing", today) == 0
+
+
+def test_flush_and_load_round_trip(tmp_path, monkeypatch) -> None:
+    """الدلاء المحفوظة تُستعاد بعد إعادة التشغيل."""
+    from src.database import manager
+    from src.utils.metrics_store import MetricsStore, start_of_last_days
+
+    monkeypatch.setattr(manager, "DATABASE_FILE", str(tmp_path / "metrics.db"))
+    manager.init_db()
+
+    now = datetime.now()
+    store = MetricsStore()
+    store.record("errors", now=now.timestamp())
+    store.record("errors", now=(now - timedelta(days=4)).timestamp())
+    store.flush()
+
+    restored = MetricsStore()
+    restored.load()
+    assert restored.total("errors", start_of_last_days(7, now)) == 2
+
+
+def test_failed_flush_keeps_day_rollups(tmp_path, monkeypatch) -> None:
+    """فشل الحفظ يعيد رفع الخطأ ويُبقي الأيام المعدلة لمحاولة لاحقة."""
+    import src.database
+    from src.database import manager
+    from src.utils.exceptions import DatabaseError
+    from src.utils.metrics_store import MetricsStore, start_of_last_days
+
+    monkeypatch.setattr(manager, "DATABASE_FILE", str(tmp_path / "metrics.db"))
+    manager.init_db()
+
+    now = datetime.now()
+    store = MetricsStore()
+    store.record("errors", now=(now - timedelta(days=4)).timestamp())
+
+    save = src.database.save_metric_buckets
+
+    def failing_save(*rows) -> None:
+        raise DatabaseError("disk full")
+
+    monkeypatch.setattr(src.database, "save_metric_buckets", failing_save)
+    with pytest.raises(DatabaseError):
+        store.flush()
+
+    monkeypatch.setattr(src.database, "save_metric_buckets", save)
+    store.flush()
+
+    restored = MetricsStore()
+    restored.load()
+    assert restored.total("errors", start_of_last_days(7, now)) == 1
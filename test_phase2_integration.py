@@ -36,7 +36,7 @@ def test_imports() -> bool:
         # استيراد المعالجات
         from src.bot.handlers import (
             show_notifications_menu,
-            notifications_callback_handler,
+            mark_notifications_read,
             toggle_notification_type,
         )
         print("  ✅ تم استيراد المعالجات بنجاح")
@@ -0,0 +1,53 @@
+"""
+اختبارات محلل استعلامات SQL.
+
+يتحقق من:
+1. توحيد بصمات الاستعلامات
+2. تجميع الاستدعاءات والصفوف عبر اتصالات المدير
+3. التقاط خطة التنفيذ للاستعلامات البطيئة
+"""
+
+
+def test_fingerprint_normalizes_literals() -> None:
+    """القيم الحرفية والمسافات لا تغيّر البصمة."""
+    from src.database.profiler import fingerprint
+
+    assert fingerprint("SELECT *  FROM users\n WHERE user_id = 42") == \
+        fingerprint("SELECT * FROM users WHERE user_id = 7")
+    assert fingerprint("SELECT 'abc'") == "SELECT ?"
+
+
+def test_profiler_collects_stats_and_slow_plans(tmp_path, monkeypatch) -> None:
+    """المحلل يعدّ الاستدعاءات والصفوف ويلتقط الخطة عند تجاوز الحد."""
+    from src.database import manager
+    from src.database.profiler import fingerprint, query_profiler
+    from src.models.user import User
+
+    monkeypatch.setattr(manager, "DATABASE_FILE", str(tmp_path / "profile.db"))
+    manager.init_db()
+    for user_id in range(5):
+        manager.save_user(User(
+            user_id=user_id, first_name=f"u{user_id}",
+            username=f"name{user_id}", referral_code=f"ref{user_id}"
+        ))
+
+    query_profiler.reset()
+    query_profiler.enable(slow_threshold_ms=0)
+    try:
+        manager.find_user_by_username("NAME3")
+        manager.find_user_by_username("name4")
+        manager.get_all_users()
+    finally:
+        query_profiler.disable()
+
+    stats = query_profiler.stats()
+    by_username = stats[fingerprint("SELECT * FROM users WHERE LOWER(username) = LOWER(?)")]
+    assert by_username.calls == 2
+    assert by_username.rows == 2
+    assert by_username.slow_calls == 2
+    assert "SCAN" in by_username.plan
+
+    # بعد التعطيل لا تُسجَّل استعلامات جديدة
+    manager.get_all_users()
+    assert query_profiler.stats() == stats
+    query_profiler.reset()
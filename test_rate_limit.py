@@ -0,0 +1,70 @@
+"""
+اختبارات تحديد معدل طلبات المستخدمين.
+
+يتحقق من:
+1. السماح بالدفعة ثم التحديد ثم إعادة الملء مع الوقت، وحذف الدلاء الممتلئة
+2. الرد على الزر المحدود دون الوصول إلى المعالجات أو قاعدة البيانات
+"""
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_bucket_burst_refill_and_eviction() -> None:
+    """السعة تُستهلك، والمعدل يعيد الملء، والنطاقات منفصلة، والدلاء الممتلئة تُحذف."""
+    from src.bot.rate_limit import RateLimiter
+
+    clock = _Clock()
+    limiter = RateLimiter({"default": (1.0, 3), "claim_reward": (0.5, 1)}, clock=clock)
+
+    assert [limiter.allow(1, "user_points")[0] for _ in range(4)] == [True, True, True, False]
+    assert limiter.allow(1, "claim_reward") == (True, "claim_reward")
+    assert limiter.allow(1, "claim_reward") == (False, "claim_reward")
+    assert limiter.allow(2, "main_menu") == (True, "default")
+
+    clock.now += 1.0
+    assert limiter.allow(1, None)[0] is True
+    assert limiter.allow(1, None)[0] is False
+
+    clock.now += 60
+    limiter.allow(3, None)
+    assert len(limiter.buckets) == 1
+
+
+def test_throttled_callback_answered_without_handlers(monkeypatch) -> None:
+    """الزر المحدود يُرد عليه ويوقف المعالجة، والمسؤول مستثنى."""
+    from telegram.ext import ApplicationHandlerStop
+
+    from src.bot.rate_limit import RateLimiter, THROTTLED_MESSAGE, THROTTLED_UPDATES
+    from src.core import config
+
+    monkeypatch.setattr(config, "ADMIN_IDS", [99])
+    limiter = RateLimiter({"claim_reward": (0.1, 1)}, clock=_Clock())
+    throttled_before = THROTTLED_UPDATES.value("claim_reward")
+
+    def update(user_id: int) -> SimpleNamespace:
+        query = SimpleNamespace(data="claim_reward:3", answer=AsyncMock())
+        return SimpleNamespace(
+            callback_query=query, message=None, effective_user=SimpleNamespace(id=user_id)
+        )
+
+    asyncio.run(limiter.throttle(update(1), None))
+    second = update(1)
+    with pytest.raises(ApplicationHandlerStop):
+        asyncio.run(limiter.throttle(second, None))
+    second.callback_query.answer.assert_awaited_once_with(THROTTLED_MESSAGE)
+    assert THROTTLED_UPDATES.value("claim_reward") == throttled_before + 1
+
+    for _ in range(3):
+        asyncio.run(limiter.throttle(update(99), None))
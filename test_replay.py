@@ -0,0 +1,144 @@
+"""
+اختبارات تسجيل التحديثات وإعادة تشغيلها.
+
+يتحقق من:
+1. إخفاء البيانات الشخصية مع ثبات المعرّفات المجزأة
+2. إخفاء مستخدمي إشارات text_mention ومعرّفات المستخدمين في بيانات الأزرار
+3. إعادة تشغيل تحديثات مسجلة عبر معالجات البوت الحقيقية
+4. تجزئة المعرّف المكتوب عند البحث عن مستخدم بنفس قيمة معرّفه المسجَّل
+"""
+
+import asyncio
+import json
+
+
+def _message_update(update_id: int, user_id: int, text: str) -> dict:
+    user = {"id": user_id, "is_bot": False, "first_name": "Ali", "username": "ali_real"}
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": 1700000000,
+            "chat": {"id": user_id, "type": "private", "first_name": "Ali"},
+            "from": user,
+            "text": text,
+            "entities": [{"type": "bot_command", "offset": 0, "length": len(text)}]
+            if text.startswith("/") else [],
+        },
+    }
+
+
+def _callback_update(update_id: int, user_id: int, data: str) -> dict:
+    user = {"id": user_id, "is_bot": False, "first_name": "Ali"}
+    return {
+        "update_id": update_id,
+        "callback_query": {
+            "id": str(update_id),
+            "from": user,
+            "chat_instance": "1",
+            "data": data,
+            "message": {
+                "message_id": 1,
+                "date": 1700000000,
+                "chat": {"id": user_id, "type": "private"},
+                "text": "menu",
+            },
+        },
+    }
+
+
+def test_anonymize_hashes_ids_and_masks_text() -> None:
+    """المعرّفات تُجزأ بثبات، والأسماء والنصوص الحرة تُخفى."""
+    from src.bot.recorder import UpdateRecorder
+
+    recorder = UpdateRecorder("updates.jsonl", sample_rate=1.0, salt="s")
+    command = recorder.anonymize(_message_update(1, 42, "/start"))
+    free_text = recorder.anonymize(_message_update(2, 42, "my phone is 555"))
+
+    sender = command["message"]["from"]
+    assert sender["id"] != 42
+    assert sender["id"] == free_text["message"]["from"]["id"] == command["message"]["chat"]["id"]
+    assert sender["first_name"] == "first_name" and sender["username"] == "username"
+    assert command["message"]["text"] == "/start"
+    assert free_text["message"]["text"] == "xx xxxxx xx xxx"
+    assert UpdateRecorder(salt="other")._hash_id(42) != sender["id"]
+
+
+
+def test_anonymize_mentions_and_user_ids_in_callback_data() -> None:
+    """مستخدم text_mention يُخفى كالمرسل، ومعرّف ban:<id> يُجزأ بنفس القيمة."""
+    from src.bot.recorder import UpdateRecorder
+
+    recorder = UpdateRecorder("updates.jsonl", sample_rate=1.0, salt="s")
+    update = _message_update(1, 42, "hi Omar")
+    update["message"]["entities"] = [{
+        "type": "text_mention", "offset": 3, "length": 4,
+        "user": {"id": 777, "is_bot": False, "first_name": "Omar", "username": "omar_real"},
+    }]
+    entity = recorder.anonymize(update)["message"]["entities"][0]
+    assert (entity["type"], entity["offset"], entity["length"]) == ("text_mention", 3, 4)
+    assert entity["user"] == {
+        "id": recorder._hash_id(777), "is_bot": False, "first_name": "first_name", "username": "username",
+    }
+
+    ban = recorder.anonymize(_callback_update(2, 42, "ban:777"))["callback_query"]
+    assert ban["data"] == f"ban:{recorder._hash_id(777)}"
+    assert recorder.anonymize(_callback_update(3, 42, "claim_reward:5"))["callback_query"]["data"] == "claim_reward:5"
+
+
+def test_replay_runs_recorded_updates_through_handlers(tmp_path, monkeypatch) -> None:
+    """إعادة التشغيل تمر بالمعالجات الحقيقية وتحصي العمليات."""
+    from src.database import manager
+    from src.devtools.replay import replay
+
+    monkeypatch.setattr(manager, "DATABASE_FILE", str(tmp_path / "replay.db"))
+    manager.init_db()
+
+    updates = [_message_update(1, 7, "/start"), _callback_update(2, 7, "user_points")]
+    report = asyncio.run(replay(updates, repeat=2))
+
+    assert report.updates == 4
+    assert report.handlers["start"][0] == 2
+    assert report.handlers["show_user_points"][0] == 2
+    assert report.db_operations["get_user"] >= 4
+    assert report.api_calls["sendMessage"] >= 1
+    assert report.api_calls["answerCallbackQuery"] == 2
+    assert json.loads(json.dumps(report.to_dict()))["updates"] == 4
+
+
+def test_replay_find_user_by_typed_id(tmp_path, monkeypatch) -> None:
+    """المعرّف المكتوب بعد admin_find_user_by_id يُجزأ فيجد المستخدم المسجَّل عند إعادة التشغيل."""
+    from src.bot.handlers import admin_handlers
+    from src.bot.recorder import UpdateRecorder
+    from src.core import config
+    from src.database import manager
+    from src.devtools.replay import replay
+
+    monkeypatch.setattr(manager, "DATABASE_FILE", str(tmp_path / "replay.db"))
+    manager.init_db()
+
+    recorder = UpdateRecorder("updates.jsonl", sample_rate=1.0, salt="s")
+    admin_id, user_id = 42, 987654321
+    updates = [
+        recorder.anonymize(update) for update in (
+            _message_update(1, user_id, "/start"),
+            _callback_update(2, admin_id, "admin_find_user_by_id"),
+            _message_update(3, admin_id, str(user_id)),
+        )
+    ]
+    assert updates[2]["message"]["text"] == str(recorder._hash_id(user_id))
+    assert str(user_id) not in json.dumps(updates)
+
+    found = []
+    display = admin_handlers.display_user_info_for_admin
+
+    async def spy(update, context, db_user) -> None:
+        found.append(db_user)
+        await display(update, context, db_user)
+
+    monkeypatch.setattr(admin_handlers, "display_user_info_for_admin", spy)
+    monkeypatch.setattr(config, "ADMIN_IDS", config.ADMIN_IDS + [recorder._hash_id(admin_id)])
+    asyncio.run(replay(updates))
+
+    assert len(found) == 1 and found[0] is not None
+    assert found[0].user_id == recorder._hash_id(user_id)
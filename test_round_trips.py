@@ -0,0 +1,97 @@
+"""
+اختبارات محاسبة العمليات لكل تحديث.
+
+يتحقق من:
+1. تسجيل عمليات قاعدة البيانات داخل سجل التحديث فقط
+2. فشل assert_round_trips عند تجاوز الميزانية
+3. ميزانية عمليات قاعدة البيانات لزر "نقاطي" (المستخدم يُحمَّل مرة واحدة)
+4. رفض المستخدم المحظور قبل المعالجات
+"""
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+
+
+@pytest.fixture
+def database(tmp_path, monkeypatch):
+    """قاعدة بيانات مؤقتة تحتوي مستخدماً واحداً."""
+    from src.database import manager
+    from src.models.user import User
+
+    monkeypatch.setattr(manager, "DATABASE_FILE", str(tmp_path / "trips.db"))
+    manager.init_db()
+    manager.save_user(User(user_id=1, first_name="Ali", referral_code="ref1"))
+    return manager
+
+
+def test_operations_recorded_only_inside_tracking(database) -> None:
+    """العمليات خارج سجل التحديث لا تُحسب."""
+    from src.utils.round_trips import current_round_trips, track_round_trips
+
+    database.get_user(1)
+    assert current_round_trips() is None
+
+    with track_round_trips() as trips:
+        database.get_user(1)
+        database.get_user(1)
+        database.get_referral_count(1)
+
+    assert trips.db == 3
+    assert trips.repeated_db_operations() == ["get_user"]
+
+
+def test_assert_round_trips_fails_over_budget(database) -> None:
+    """تجاوز الميزانية يرفع AssertionError مع أسماء العمليات."""
+    from src.utils.round_trips import assert_round_trips
+
+    with pytest.raises(AssertionError, match="get_user"):
+        with assert_round_trips(db=1):
+            database.get_user(1)
+            database.get_user(1)
+
+
+def test_user_points_button_query_budget(database) -> None:
+    """زر "نقاطي" لا يتجاوز ميزانية عمليات قاعدة البيانات."""
+    from src.bot.handlers import callback_router
+    from src.bot.middleware import load_user_context
+    from src.utils.round_trips import assert_round_trips
+
+    query = SimpleNamespace(
+        id="q1",
+        data="user_points",
+        from_user=SimpleNamespace(id=1, first_name="Ali"),
+        answer=AsyncMock(),
+        edit_message_text=AsyncMock(),
+    )
+    update = SimpleNamespace(callback_query=query, effective_user=query.from_user)
+
+    async def process() -> None:
+        context = SimpleNamespace()
+        await load_user_context(update, context)
+        await callback_router.dispatch(update, context)
+
+    with assert_round_trips(db=2) as trips:
+        asyncio.run(process())
+
+    assert trips.db_operations == ["get_user", "get_referral_count"]
+    assert "نقاطك" in query.edit_message_text.call_args.args[0]
+
+
+def test_banned_user_rejected_before_handlers(database) -> None:
+    """المستخدم المحظور يُرفض في مرحلة تحميل المستخدم."""
+    from telegram.ext import ApplicationHandlerStop
+
+    from src.bot.middleware import load_user_context
+    from src.models.user import User
+
+    database.save_user(User(user_id=2, first_name="Omar", referral_code="ref2", is_banned=True))
+    query = SimpleNamespace(answer=AsyncMock())
+    update = SimpleNamespace(callback_query=query, effective_user=SimpleNamespace(id=2))
+
+    with pytest.raises(ApplicationHandlerStop):
+        asyncio.run(load_user_context(update, SimpleNamespace()))
+
+    assert query.answer.call_args.kwargs["show_alert"] is True
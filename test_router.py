@@ -0,0 +1,165 @@
+"""
+اختبارات موجّه استعلامات الأزرار.
+
+يتحقق من:
+1. إيجاد المسار بالمفتاح وتحليل الحمولة بالنوع المعلن
+2. رفض المسارات الإدارية لغير المسؤولين قبل استدعاء المعالج
+3. وصول أزرار محادثة المدير إلى المحادثة بدلاً من معالج آخر
+4. تنفيذ الزر المكرر (ضغط مزدوج أو إعادة تسليم) مرة واحدة فقط
+"""
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+
+def _router():
+    from src.bot.router import CallbackRouter
+
+    router = CallbackRouter()
+    calls = []
+
+    @router.route("user_points")
+    async def show_points(update, context):
+        calls.append("points")
+
+    @router.route("ban", admin=True, payload=int)
+    async def ban(update, context, user_id):
+        calls.append(("ban", user_id))
+
+    return router, calls
+
+
+def _query(data: str, user_id: int = 1, query_id: str = "") -> SimpleNamespace:
+    return SimpleNamespace(
+        id=query_id or f"q-{data}",
+        data=data,
+        from_user=SimpleNamespace(id=user_id),
+        answer=AsyncMock(),
+        edit_message_text=AsyncMock(),
+    )
+
+
+def test_resolve_by_key_with_typed_payload() -> None:
+    """المفتاح يحدد المسار، والحمولة تُحلَّل أو يُرفض الزر."""
+    router, _ = _router()
+
+    assert router.resolve("user_points")[0].key == "user_points"
+    assert router.resolve("ban:42")[1] == 42
+    assert router.resolve("ban:abc") is None
+    assert router.resolve("ban") is None
+    assert router.resolve("user_points:1") is None
+    assert router.resolve("admin_ban_42") is None
+    assert router.pattern_for("ban", "admin_broadcast") == "^(ban|admin_broadcast)(:|$)"
+
+
+def test_admin_route_denied_for_regular_user(monkeypatch) -> None:
+    """غير المسؤول يتلقى تنبيهاً ولا يُستدعى المعالج."""
+    from src.core import config
+
+    monkeypatch.setattr(config, "ADMIN_IDS", [99])
+    router, calls = _router()
+
+    query = _query("ban:5", user_id=1)
+    asyncio.run(router.dispatch(SimpleNamespace(callback_query=query), SimpleNamespace()))
+    assert calls == []
+    assert query.answer.call_args.kwargs["show_alert"] is True
+
+    query = _query("ban:5", user_id=99)
+    asyncio.run(router.dispatch(SimpleNamespace(callback_query=query), SimpleNamespace()))
+    assert calls == [("ban", 5)]
+
+    query = _query("unknown_button")
+    asyncio.run(router.dispatch(SimpleNamespace(callback_query=query), SimpleNamespace()))
+    query.answer.assert_awaited_once()
+
+
+
+def test_duplicate_callbacks_run_handler_once() -> None:
+    """الضغط المزدوج وإعادة التسليم لا يعيدان التنفيذ، والفشل يسمح بإعادة المحاولة."""
+    from src.bot.router import CallbackRouter, ALREADY_DONE_MESSAGE, IN_FLIGHT_MESSAGE
+
+    router = CallbackRouter()
+    now = [100.0]
+    router.deduplicator._clock = lambda: now[0]
+    calls = []
+    release = asyncio.Event()
+
+    @router.route("claim_reward", payload=int, answer=False)
+    async def claim(update, context, reward_id):
+        calls.append(reward_id)
+        if reward_id == 2:
+            await release.wait()
+        if reward_id == 3 and calls.count(3) == 1:
+            raise RuntimeError("boom")
+        await update.callback_query.answer("claimed")
+
+    def dispatch(query):
+        return router.dispatch(SimpleNamespace(callback_query=query), SimpleNamespace())
+
+    first = _query("claim_reward:1", query_id="a")
+    tap = _query("claim_reward:1", query_id="b")
+    redelivered = _query("claim_reward:1", query_id="a")
+    for query in (first, tap, redelivered):
+        asyncio.run(dispatch(query))
+    assert calls == [1]
+    tap.answer.assert_awaited_once_with(ALREADY_DONE_MESSAGE)
+    redelivered.answer.assert_not_awaited()
+
+    async def in_flight():
+        running = asyncio.create_task(dispatch(_query("claim_reward:2", query_id="c")))
+        await asyncio.sleep(0)
+        duplicate = _query("claim_reward:2", query_id="d")
+        await dispatch(duplicate)
+        release.set()
+        await running
+        return duplicate
+
+    assert asyncio.run(in_flight()).answer.call_args.args == (IN_FLIGHT_MESSAGE,)
+    assert calls == [1, 2]
+
+    asyncio.run(dispatch(_query("claim_reward:3", query_id="e")))
+    asyncio.run(dispatch(_query("claim_reward:3", query_id="f")))
+    now[0] += 10
+    asyncio.run(dispatch(_query("claim_reward:1", query_id="g")))
+    assert calls == [1, 2, 3, 3, 1]
+
+
+def test_broadcast_button_enters_admin_conversation(tmp_path, monkeypatch) -> None:
+    """زر الإذاعة يبدأ المحادثة، فتصل الرسالة التالية إلى معالج الإذاعة."""
+    from telegram import Update
+
+    from main import build_application
+    from src.core import config
+    from src.database import manager
+    from src.devtools.replay import FakeRequest, REPLAY_TOKEN
+
+    monkeypatch.setattr(manager, "DATABASE_FILE", str(tmp_path / "router.db"))
+    monkeypatch.setattr(config, "ADMIN_IDS", [7])
+    manager.init_db()
+
+    user = {"id": 7, "is_bot": False, "first_name": "Admin"}
+    chat = {"id": 7, "type": "private"}
+    updates = [
+        {"update_id": 1, "callback_query": {
+            "id": "1", "from": user, "chat_instance": "1", "data": "admin_broadcast",
+            "message": {"message_id": 1, "date": 1700000000, "chat": chat, "text": "menu"},
+        }},
+        {"update_id": 2, "message": {
+            "message_id": 2, "date": 1700000000, "chat": chat, "from": user, "text": "hello",
+        }},
+    ]
+
+    async def run() -> FakeRequest:
+        request = FakeRequest()
+        application = build_application(REPLAY_TOKEN, request=request, get_updates_request=FakeRequest())
+        await application.initialize()
+        for data in updates:
+            await application.process_update(Update.de_json(data, application.bot))
+        await application.shutdown()
+        return request
+
+    request = asyncio.run(run())
+    assert request.calls["answerCallbackQuery"] == 1
+    assert request.calls["editMessageText"] == 1
+    assert request.calls["sendMessage"] == 2
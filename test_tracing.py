@@ -0,0 +1,66 @@
+"""
+اختبارات التتبع لكل تحديث.
+
+يتحقق من:
+1. تسلسل الفترات: التحديث ← المعالج ← عملية قاعدة البيانات
+2. كتابة التتبعات البطيئة فقط عند تعطيل العينة
+"""
+
+import asyncio
+import json
+import time
+
+
+def _read_spans(path) -> list:
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def test_update_handler_and_db_spans_are_nested(tmp_path, monkeypatch) -> None:
+    """فترة قاعدة البيانات تتبع المعالج، والمعالج يتبع التحديث."""
+    from src.bot.instrumentation import instrument_callback
+    from src.database import manager
+    from src.utils.tracing import tracer
+
+    monkeypatch.setattr(manager, "DATABASE_FILE", str(tmp_path / "trace.db"))
+    manager.init_db()
+    trace_file = tmp_path / "traces.jsonl"
+    tracer.configure(str(trace_file), sample_rate=1.0, slow_ms=0)
+
+    async def show_points(update, context):
+        manager.get_user(1)
+
+    handler = instrument_callback(show_points, "show_points")
+
+    async def process() -> None:
+        with tracer.start_trace("update", update_id=5, user_id=1):
+            await handler(None, None)
+
+    try:
+        asyncio.run(process())
+    finally:
+        tracer.close()
+        tracer.configure("traces.jsonl", sample_rate=0, slow_ms=0)
+
+    spans = {span["name"]: span for span in _read_spans(trace_file)}
+    assert set(spans) == {"update", "handler show_points", "db get_user"}
+    assert len({span["traceId"] for span in spans.values()}) == 1
+    assert spans["update"]["parentSpanId"] is None
+    assert spans["update"]["attributes"] == {"update_id": 5, "user_id": 1}
+    assert spans["handler show_points"]["parentSpanId"] == spans["update"]["spanId"]
+    assert spans["db get_user"]["parentSpanId"] == spans["handler show_points"]["spanId"]
+
+
+def test_only_slow_traces_are_written_without_sampling(tmp_path) -> None:
+    """مع تعطيل العينة تُكتب التتبعات التي تتجاوز الحد فقط."""
+    from src.utils.tracing import Tracer
+
+    trace_file = tmp_path / "slow.jsonl"
+    local_tracer = Tracer(str(trace_file), sample_rate=0, slow_ms=20)
+
+    with local_tracer.start_trace("fast"):
+        pass
+    with local_tracer.start_trace("slow"):
+        time.sleep(0.03)
+    local_tracer.close()
+
+    assert [span["name"] for span in _read_spans(trace_file)] == ["slow"]
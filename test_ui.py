@@ -0,0 +1,49 @@
+"""
+اختبارات لوحات أزرار الواجهة.
+
+يتحقق من:
+1. إعادة نفس كائن القائمة الثابتة في كل استدعاء
+2. حفظ القوائم ذات المعاملات في ذاكرة محدودة
+3. عدم تكرار تعريف أي دالة في src/bot/ui.py
+4. تشغيل أداة قياس تكلفة بناء الواجهة
+"""
+
+import ast
+import collections
+import inspect
+
+
+def test_static_menus_built_once_and_parameterized_memoized() -> None:
+    """القوائم الثابتة مشتركة، والقوائم ذات المعاملات تُحفظ لكل معاملات."""
+    from src.bot import ui
+
+    assert ui.create_main_menu() is ui.create_main_menu() is ui.MAIN_MENU
+    assert ui.create_admin_menu() is ui.ADMIN_MENU
+
+    panel = ui.create_user_control_panel(42, False)
+    assert ui.create_user_control_panel(42, False) is panel
+    assert ui.create_user_control_panel(42, True) is not panel
+    assert panel.inline_keyboard[0][0].callback_data == "ban:42"
+
+    by_keyword = ui.create_user_control_panel(user_id=42, is_banned=True)
+    assert ui.create_user_control_panel(user_id=42, is_banned=True) is by_keyword
+    assert by_keyword.inline_keyboard[0][0].callback_data == "unban:42"
+    assert ui.create_user_control_panel.cache_info().maxsize == 1024
+
+
+def test_ui_functions_defined_once() -> None:
+    """لا تُعرّف أي دالة مرتين (التعريف المتأخر كان يستبدل الأول بصمت)."""
+    from src.bot import ui
+
+    tree = ast.parse(inspect.getsource(ui))
+    names = collections.Counter(node.name for node in tree.body if isinstance(node, ast.FunctionDef))
+    assert [name for name, count in names.items() if count > 1] == []
+
+
+def test_ui_benchmark_reports_every_menu() -> None:
+    """أداة القياس تقيس كل قائمة وتقارن بالبناء من جديد."""
+    from src.devtools.ui_benchmark import run_benchmark
+
+    results = run_benchmark(runs=20)
+    assert "create_main_menu" in results and "create_user_control_panel" in results
+    assert all(stats["cached_us"] >= 0 and stats["rebuilt_us"] > 0 for stats in results.values())
@@ -0,0 +1,106 @@
+"""
+اختبارات معالج التحديثات المتوازي.
+
+يتحقق من:
+1. معالجة تحديثات نفس المستخدم بالترتيب دون تداخل
+2. معالجة تحديثات المستخدمين المختلفين بالتوازي
+3. حذف أقفال المستخدمين بعد انتهاء تحديثاتهم
+4. إسقاط تحديثات المستخدم الواحد التي تتجاوز حد الانتظار
+"""
+
+import asyncio
+
+from telegram import Update
+
+
+def _update(update_id: int, user_id: int) -> Update:
+    return Update.de_json({
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": 1700000000,
+            "chat": {"id": user_id, "type": "private"},
+            "from": {"id": user_id, "is_bot": False, "first_name": "U"},
+            "text": "hi",
+        },
+    }, None)
+
+
+def test_same_user_ordered_other_users_parallel() -> None:
+    """تحديثات المستخدم الواحد متسلسلة، والمستخدمون المختلفون متوازون."""
+    from src.bot.update_processor import PerUserUpdateProcessor
+
+    processor = PerUserUpdateProcessor(8)
+    events = []
+
+    async def handle(name: str) -> None:
+        events.append(f"start {name}")
+        await asyncio.sleep(0.02)
+        events.append(f"end {name}")
+
+    async def run() -> None:
+        await asyncio.gather(
+            processor.process_update(_update(1, 1), handle("a1")),
+            processor.process_update(_update(2, 1), handle("a2")),
+            processor.process_update(_update(3, 2), handle("b1")),
+        )
+
+    asyncio.run(run())
+
+    assert events.index("end a1") < events.index("start a2")
+    assert events.index("start b1") < events.index("end a1")
+    assert len(processor.user_locks) == 0
+
+
+def test_lock_released_when_handler_fails() -> None:
+    """استثناء في المعالجة لا يترك قفل المستخدم مأخوذاً."""
+    from src.bot.update_processor import PerUserUpdateProcessor
+
+    processor = PerUserUpdateProcessor(2)
+
+    async def fail() -> None:
+        raise RuntimeError("boom")
+
+    async def ok() -> str:
+        return "ok"
+
+    async def run() -> None:
+        try:
+            await processor.process_update(_update(1, 5), fail())
+        except RuntimeError:
+            pass
+        await asyncio.wait_for(processor.process_update(_update(2, 5), ok()), 1)
+
+    asyncio.run(run())
+    assert len(processor.user_locks) == 0
+
+
+def test_single_user_flood_is_shed() -> None:
+    """سيل تحديثات من مستخدم واحد لا ينتظر بلا حد: ما زاد على الحد يُسقط."""
+    from src.bot.admission import SHED_UPDATES
+    from src.bot.update_processor import PerUserUpdateProcessor
+
+    processor = PerUserUpdateProcessor(4, max_user_backlog=3)
+    shed_before = SHED_UPDATES.value("other")
+    processed = []
+
+    async def handle(index: int, release: asyncio.Event) -> None:
+        await release.wait()
+        processed.append(index)
+
+    async def run() -> None:
+        release = asyncio.Event()
+        tasks = []
+        for index in range(10):
+            tasks.append(asyncio.create_task(
+                processor.process_update(_update(index, 9), handle(index, release))
+            ))
+            await asyncio.sleep(0)
+        assert processor.user_locks.backlog(9) == 3
+        release.set()
+        await asyncio.gather(*tasks)
+
+    asyncio.run(run())
+    assert processed == [0, 1, 2]
+    assert SHED_UPDATES.value("other") == shed_before + 7
+    assert len(processor.user_locks) == 0
@@ -0,0 +1,52 @@
+"""
+اختبارات تقييد أنواع التحديثات.
+
+يتحقق من:
+1. استخراج allowed_updates من المعالجات المسجلة (بما فيها المحادثات)
+2. رفض التحديثات غير المعالجة في مرحلة التصفية قبل بقية المراحل
+"""
+
+import asyncio
+
+import pytest
+from telegram import Update
+
+
+def test_allowed_updates_derived_from_handlers() -> None:
+    """البوت يطلب الرسائل والأزرار فقط، ومعالج غير معروف يطلب كل شيء."""
+    from telegram.ext import TypeHandler
+
+    from main import build_application
+    from src.bot.update_types import handled_update_types
+    from src.devtools.replay import FakeRequest, REPLAY_TOKEN
+
+    application = build_application(REPLAY_TOKEN, request=FakeRequest(), get_updates_request=FakeRequest())
+    assert handled_update_types(application) == ["callback_query", "message"]
+
+    async def anything(update, context) -> None:
+        pass
+
+    application.add_handler(TypeHandler(Update, anything), group=1)
+    assert handled_update_types(application) == list(Update.ALL_TYPES)
+
+
+def test_filter_drops_unhandled_update_types() -> None:
+    """الرسالة المعدلة تُرفض، والرسالة الجديدة تمر."""
+    from telegram.ext import ApplicationHandlerStop
+
+    from src.bot.update_types import UpdateTypeFilter, DROPPED_UPDATES
+
+    message = {
+        "message_id": 1, "date": 1700000000, "text": "hi",
+        "chat": {"id": 1, "type": "private"},
+    }
+    update_filter = UpdateTypeFilter()
+    update_filter.configure(["callback_query", "message"])
+    dropped_before = DROPPED_UPDATES.value("edited_message")
+
+    asyncio.run(update_filter.filter(Update.de_json({"update_id": 1, "message": message}, None), None))
+    with pytest.raises(ApplicationHandlerStop):
+        asyncio.run(update_filter.filter(
+            Update.de_json({"update_id": 2, "edited_message": message}, None), None
+        ))
+    assert DROPPED_UPDATES.value("edited_message") == dropped_before + 1
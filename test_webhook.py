@@ -0,0 +1,58 @@
+"""
+اختبارات استقبال التحديثات عبر Webhook.
+
+يتحقق من:
+1. قبول التحديثات ذات الرمز السري الصحيح ورفض غيرها
+2. معالجة جميع التحديثات المقبولة عند الإيقاف بدلاً من حذفها
+"""
+
+import asyncio
+
+
+def _start_update(user_id: int) -> dict:
+    return {
+        "message": {
+            "message_id": 1,
+            "date": 1700000000,
+            "chat": {"id": user_id, "type": "private"},
+            "from": {"id": user_id, "is_bot": False, "first_name": "U"},
+            "text": "/start",
+            "entities": [{"type": "bot_command", "offset": 0, "length": 6}],
+        },
+    }
+
+
+def test_webhook_accepts_posted_updates_and_drains_on_stop(tmp_path, monkeypatch) -> None:
+    """التحديثات المرسلة بـ POST تُعالج كلها، والرمز الخاطئ يُرفض."""
+    from main import build_application
+    from src.bot.webhook import WebhookServer
+    from src.database import manager
+    from src.devtools.replay import FakeRequest, REPLAY_TOKEN, post_updates
+
+    monkeypatch.setattr(manager, "DATABASE_FILE", str(tmp_path / "webhook.db"))
+    manager.init_db()
+
+    async def run():
+        request = FakeRequest(latency=0.01)
+        application = build_application(REPLAY_TOKEN, request=request, get_updates_request=FakeRequest())
+        server = WebhookServer(application, "127.0.0.1", 0, "/hook", secret_token="s3cret")
+        await application.initialize()
+        await application.start()
+        await server.start()
+
+        accepted = await post_updates(server.url, [_start_update(i) for i in range(1, 6)], "s3cret")
+        rejected = await post_updates(server.url, [_start_update(9)], "wrong")
+        missing = await post_updates(server.url.replace("/hook", "/other"), [_start_update(9)], "s3cret")
+
+        await server.stop()
+        await application.stop()
+        await application.shutdown()
+        return request, accepted, rejected, missing
+
+    request, accepted, rejected, missing = asyncio.run(run())
+
+    assert accepted == {200: 5}
+    assert rejected == {403: 1}
+    assert missing == {404: 1}
+    assert manager.get_total_users_count() == 5
+    assert request.calls["sendMessage"] >= 5